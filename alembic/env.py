@@ -30,6 +30,7 @@ from app.models_revive import *
 from app.models_zombies import *
 from app.models_changeset import *
 from app.models_agent_pool import *
+from app.models_ingest_queue import *
 import app.models_iteration   # For iteration_loops
 
 # This is the Alembic Config object
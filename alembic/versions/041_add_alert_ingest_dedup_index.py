@@ -0,0 +1,48 @@
+"""Add unique (fingerprint, timestamp) index for batched alert ingestion
+
+Revision ID: 041_alert_ingest_dedup_index
+Revises: a3c55b6b9914
+Create Date: 2026-10-16 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from migration_helpers import create_index_safe, drop_index_safe
+
+
+# revision identifiers, used by Alembic.
+revision = '041_alert_ingest_dedup_index'
+down_revision = 'a3c55b6b9914'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+
+    # Older deployments may hold duplicates created by concurrent webhook
+    # deliveries. Leave the data alone and skip the index in that case;
+    # ingestion still dedups via its bulk lookup.
+    duplicates = conn.execute(sa.text(
+        "SELECT 1 FROM alerts WHERE fingerprint IS NOT NULL "
+        "GROUP BY fingerprint, timestamp HAVING count(*) > 1 LIMIT 1"
+    )).scalar()
+    if duplicates:
+        print("Warning: duplicate (fingerprint, timestamp) alerts found; "
+              "skipping uq_alerts_fingerprint_timestamp")
+        return
+
+    create_index_safe(
+        'uq_alerts_fingerprint_timestamp',
+        'alerts',
+        ['fingerprint', 'timestamp'],
+        unique=True
+    )
+
+
+def downgrade() -> None:
+    drop_index_safe('uq_alerts_fingerprint_timestamp', table_name='alerts')
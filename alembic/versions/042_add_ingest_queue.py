@@ -0,0 +1,46 @@
+"""Add ingest_queue_jobs table for durable webhook post-processing
+
+Revision ID: 042_add_ingest_queue
+Revises: 041_alert_ingest_dedup_index
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from migration_helpers import create_table_safe, create_index_safe, drop_table_safe
+
+
+# revision identifiers, used by Alembic.
+revision = '042_add_ingest_queue'
+down_revision = '041_alert_ingest_dedup_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    create_table_safe(
+        'ingest_queue_jobs',
+        sa.Column('id', sa.UUID(as_uuid=True), nullable=False),
+        sa.Column('stage', sa.String(length=20), nullable=False),
+        sa.Column('alert_id', sa.UUID(as_uuid=True), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False, server_default='pending'),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('max_attempts', sa.Integer(), nullable=False, server_default='5'),
+        sa.Column('available_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
+        sa.Column('locked_by', sa.String(length=100), nullable=True),
+        sa.Column('locked_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
+        sa.PrimaryKeyConstraint('id'),
+        sa.ForeignKeyConstraint(['alert_id'], ['alerts.id'], ondelete='CASCADE')
+    )
+    create_index_safe('ix_ingest_queue_jobs_alert_id', 'ingest_queue_jobs', ['alert_id'])
+    create_index_safe('idx_ingest_queue_claim', 'ingest_queue_jobs', ['stage', 'status', 'available_at'])
+
+
+def downgrade() -> None:
+    drop_table_safe('ingest_queue_jobs')
@@ -0,0 +1,35 @@
+"""Add (runbook_id, queued_at) index for batched trigger safety checks
+
+Revision ID: 043_execution_runbook_queued_idx
+Revises: 042_add_ingest_queue
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from migration_helpers import create_index_safe, drop_index_safe
+
+
+# revision identifiers, used by Alembic.
+revision = '043_execution_runbook_queued_idx'
+down_revision = '042_add_ingest_queue'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Serves the per-runbook "executions in the last hour" count and
+    # "last queued" lookups done for every trigger match
+    create_index_safe(
+        'idx_executions_runbook_queued_at',
+        'runbook_executions',
+        ['runbook_id', 'queued_at']
+    )
+
+
+def downgrade() -> None:
+    drop_index_safe('idx_executions_runbook_queued_at', 'runbook_executions')
@@ -0,0 +1,35 @@
+"""Add worker lease columns to runbook_executions
+
+Revision ID: 044_add_execution_leases
+Revises: 043_execution_runbook_queued_idx
+Create Date: 2026-10-16 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from migration_helpers import add_column_safe, drop_column_safe, create_index_safe, drop_index_safe
+
+
+# revision identifiers, used by Alembic.
+revision = '044_add_execution_leases'
+down_revision = '043_execution_runbook_queued_idx'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    add_column_safe('runbook_executions', sa.Column('worker_id', sa.String(length=100), nullable=True))
+    add_column_safe('runbook_executions', sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True))
+    add_column_safe('runbook_executions', sa.Column('claim_count', sa.Integer(), nullable=True, server_default='0'))
+    create_index_safe('idx_executions_lease', 'runbook_executions', ['lease_expires_at'])
+
+
+def downgrade() -> None:
+    drop_index_safe('idx_executions_lease', 'runbook_executions')
+    drop_column_safe('runbook_executions', 'claim_count')
+    drop_column_safe('runbook_executions', 'lease_expires_at')
+    drop_column_safe('runbook_executions', 'worker_id')
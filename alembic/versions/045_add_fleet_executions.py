@@ -0,0 +1,79 @@
+"""Add fleet_executions table for runbook fan-out across server groups
+
+Revision ID: 045_add_fleet_executions
+Revises: 044_add_execution_leases
+Create Date: 2026-10-16 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from migration_helpers import (
+    create_table_safe, drop_table_safe, add_column_safe, drop_column_safe,
+    create_index_safe, drop_index_safe, create_foreign_key_safe, drop_constraint_safe
+)
+
+
+# revision identifiers, used by Alembic.
+revision = '045_add_fleet_executions'
+down_revision = '044_add_execution_leases'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    create_table_safe(
+        'fleet_executions',
+        sa.Column('id', sa.UUID(as_uuid=True), nullable=False),
+        sa.Column('runbook_id', sa.UUID(as_uuid=True), nullable=False),
+        sa.Column('runbook_version', sa.Integer(), nullable=False),
+        sa.Column('server_group_id', sa.UUID(as_uuid=True), nullable=True),
+        sa.Column('label_selector_json', sa.JSON(), nullable=True),
+        sa.Column('alert_id', sa.UUID(as_uuid=True), nullable=True),
+        sa.Column('triggered_by', sa.UUID(as_uuid=True), nullable=True),
+        sa.Column('dry_run', sa.Boolean(), nullable=True, server_default='false'),
+        sa.Column('variables_json', sa.JSON(), nullable=True),
+        sa.Column('parallelism', sa.Integer(), nullable=True, server_default='10'),
+        sa.Column('batch_size', sa.Integer(), nullable=True),
+        sa.Column('batch_percent', sa.Integer(), nullable=True),
+        sa.Column('max_failure_ratio', sa.Float(), nullable=True, server_default='0.1'),
+        sa.Column('status', sa.String(length=20), nullable=True, server_default='pending'),
+        sa.Column('stop_reason', sa.Text(), nullable=True),
+        sa.Column('servers_total', sa.Integer(), nullable=True, server_default='0'),
+        sa.Column('servers_succeeded', sa.Integer(), nullable=True, server_default='0'),
+        sa.Column('servers_failed', sa.Integer(), nullable=True, server_default='0'),
+        sa.Column('servers_skipped', sa.Integer(), nullable=True, server_default='0'),
+        sa.Column('batches_total', sa.Integer(), nullable=True, server_default='0'),
+        sa.Column('batches_completed', sa.Integer(), nullable=True, server_default='0'),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.ForeignKeyConstraint(['runbook_id'], ['runbooks.id']),
+        sa.ForeignKeyConstraint(['server_group_id'], ['server_groups.id']),
+        sa.ForeignKeyConstraint(['alert_id'], ['alerts.id']),
+        sa.ForeignKeyConstraint(['triggered_by'], ['users.id'])
+    )
+    create_index_safe('ix_fleet_executions_status', 'fleet_executions', ['status'])
+
+    add_column_safe('runbook_executions', sa.Column('fleet_execution_id', sa.UUID(as_uuid=True), nullable=True))
+    add_column_safe('runbook_executions', sa.Column('fleet_batch', sa.Integer(), nullable=True))
+    create_foreign_key_safe(
+        'fk_runbook_executions_fleet_execution_id',
+        'runbook_executions', 'fleet_executions',
+        ['fleet_execution_id'], ['id'],
+        ondelete='CASCADE'
+    )
+    create_index_safe('idx_executions_fleet', 'runbook_executions', ['fleet_execution_id'])
+
+
+def downgrade() -> None:
+    drop_index_safe('idx_executions_fleet', 'runbook_executions')
+    drop_constraint_safe('fk_runbook_executions_fleet_execution_id', 'runbook_executions', type_='foreignkey')
+    drop_column_safe('runbook_executions', 'fleet_batch')
+    drop_column_safe('runbook_executions', 'fleet_execution_id')
+    drop_index_safe('ix_fleet_executions_status', 'fleet_executions')
+    drop_table_safe('fleet_executions')
@@ -0,0 +1,49 @@
+"""Add step_output_chunks for streamed step output with head/tail retention
+
+Revision ID: 046_add_step_output_chunks
+Revises: 045_add_fleet_executions
+Create Date: 2026-10-16 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from migration_helpers import (
+    create_table_safe, drop_table_safe, add_column_safe, drop_column_safe
+)
+
+
+# revision identifiers, used by Alembic.
+revision = '046_add_step_output_chunks'
+down_revision = '045_add_fleet_executions'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    create_table_safe(
+        'step_output_chunks',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('step_execution_id', sa.UUID(as_uuid=True), nullable=False),
+        sa.Column('seq', sa.Integer(), nullable=False),
+        sa.Column('stream', sa.String(length=10), nullable=False, server_default='stdout'),
+        sa.Column('offset', sa.BigInteger(), nullable=False),
+        sa.Column('length', sa.Integer(), nullable=False),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.ForeignKeyConstraint(['step_execution_id'], ['step_executions.id'], ondelete='CASCADE'),
+        sa.UniqueConstraint('step_execution_id', 'seq', name='uq_step_output_chunk_seq')
+    )
+
+    add_column_safe('step_executions', sa.Column('output_chars', sa.BigInteger(), nullable=True, server_default='0'))
+    add_column_safe('step_executions', sa.Column('output_dropped_chars', sa.BigInteger(), nullable=True, server_default='0'))
+
+
+def downgrade() -> None:
+    drop_column_safe('step_executions', 'output_dropped_chars')
+    drop_column_safe('step_executions', 'output_chars')
+    drop_table_safe('step_output_chunks')
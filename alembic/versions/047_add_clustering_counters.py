@@ -0,0 +1,127 @@
+"""Add clustering_counters maintained by statement-level triggers
+
+Revision ID: 047_add_clustering_counters
+Revises: 046_add_step_output_chunks
+Create Date: 2026-10-16 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from migration_helpers import (
+    create_table_safe, drop_table_safe, create_index_safe, drop_index_safe
+)
+
+
+# revision identifiers, used by Alembic.
+revision = '047_add_clustering_counters'
+down_revision = '046_add_step_output_chunks'
+branch_labels = None
+depends_on = None
+
+
+# Each trigger appends one delta row per statement (not per row, and never
+# updating a shared row), so concurrent ingest transactions do not contend.
+COUNT_ALERTS = """
+CREATE OR REPLACE FUNCTION clustering_count_alerts() RETURNS trigger AS $$
+DECLARE
+    d_alerts bigint := 0;
+    d_clustered bigint := 0;
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        SELECT d_alerts + count(*), d_clustered + count(cluster_id)
+          INTO d_alerts, d_clustered FROM new_rows;
+    END IF;
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        SELECT d_alerts - count(*), d_clustered - count(cluster_id)
+          INTO d_alerts, d_clustered FROM old_rows;
+    END IF;
+    INSERT INTO clustering_counters (name, delta)
+    SELECT d.name, d.delta
+      FROM (VALUES ('alerts', d_alerts), ('clustered_alerts', d_clustered)) AS d(name, delta)
+     WHERE d.delta <> 0;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+COUNT_CLUSTERS = """
+CREATE OR REPLACE FUNCTION clustering_count_clusters() RETURNS trigger AS $$
+DECLARE
+    d_clusters bigint := 0;
+    d_active bigint := 0;
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        SELECT d_clusters + count(*), d_active + count(*) FILTER (WHERE is_active)
+          INTO d_clusters, d_active FROM new_rows;
+    END IF;
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        SELECT d_clusters - count(*), d_active - count(*) FILTER (WHERE is_active)
+          INTO d_clusters, d_active FROM old_rows;
+    END IF;
+    INSERT INTO clustering_counters (name, delta)
+    SELECT d.name, d.delta
+      FROM (VALUES ('clusters', d_clusters), ('active_clusters', d_active)) AS d(name, delta)
+     WHERE d.delta <> 0;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+# Transition tables allow only one event per trigger
+TRIGGERS = [
+    ('alerts', 'clustering_count_alerts', 'INSERT', 'NEW TABLE AS new_rows'),
+    ('alerts', 'clustering_count_alerts', 'UPDATE', 'OLD TABLE AS old_rows NEW TABLE AS new_rows'),
+    ('alerts', 'clustering_count_alerts', 'DELETE', 'OLD TABLE AS old_rows'),
+    ('alert_clusters', 'clustering_count_clusters', 'INSERT', 'NEW TABLE AS new_rows'),
+    ('alert_clusters', 'clustering_count_clusters', 'UPDATE', 'OLD TABLE AS old_rows NEW TABLE AS new_rows'),
+    ('alert_clusters', 'clustering_count_clusters', 'DELETE', 'OLD TABLE AS old_rows'),
+]
+
+
+def _trigger_name(table: str, event: str) -> str:
+    return f'{table}_clustering_count_{event.lower()}'
+
+
+def upgrade() -> None:
+    create_table_safe(
+        'clustering_counters',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('delta', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    create_index_safe('ix_alerts_timestamp_cluster', 'alerts', ['timestamp', 'cluster_id'])
+
+    op.execute(COUNT_ALERTS)
+    op.execute(COUNT_CLUSTERS)
+    for table, function, event, referencing in TRIGGERS:
+        name = _trigger_name(table, event)
+        op.execute(f'DROP TRIGGER IF EXISTS {name} ON {table}')
+        op.execute(
+            f'CREATE TRIGGER {name} AFTER {event} ON {table} '
+            f'REFERENCING {referencing} FOR EACH STATEMENT EXECUTE PROCEDURE {function}()'
+        )
+
+    # Seed once, in the same transaction as the triggers: CREATE TRIGGER
+    # blocks writers until commit, so nothing is counted twice or missed
+    op.execute("DELETE FROM clustering_counters")
+    op.execute("""
+        INSERT INTO clustering_counters (name, delta)
+        SELECT 'alerts', count(*) FROM alerts
+        UNION ALL SELECT 'clustered_alerts', count(cluster_id) FROM alerts
+        UNION ALL SELECT 'clusters', count(*) FROM alert_clusters
+        UNION ALL SELECT 'active_clusters', count(*) FILTER (WHERE is_active) FROM alert_clusters
+    """)
+
+
+def downgrade() -> None:
+    for table, _, event, _ in TRIGGERS:
+        op.execute(f'DROP TRIGGER IF EXISTS {_trigger_name(table, event)} ON {table}')
+    op.execute('DROP FUNCTION IF EXISTS clustering_count_clusters()')
+    op.execute('DROP FUNCTION IF EXISTS clustering_count_alerts()')
+    drop_index_safe('ix_alerts_timestamp_cluster', table_name='alerts')
+    drop_table_safe('clustering_counters')
@@ -0,0 +1,41 @@
+"""Add embedding_cache for content-hash keyed embeddings
+
+Revision ID: 048_add_embedding_cache
+Revises: 047_add_clustering_counters
+Create Date: 2026-10-16 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from migration_helpers import (
+    create_table_safe, drop_table_safe, create_index_safe, drop_index_safe
+)
+
+
+# revision identifiers, used by Alembic.
+revision = '048_add_embedding_cache'
+down_revision = '047_add_clustering_counters'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    create_table_safe(
+        'embedding_cache',
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('model', sa.String(length=100), nullable=False),
+        sa.Column('embedding', Vector(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('content_hash')
+    )
+    create_index_safe('ix_embedding_cache_created_at', 'embedding_cache', ['created_at'])
+
+
+def downgrade() -> None:
+    drop_index_safe('ix_embedding_cache_created_at', table_name='embedding_cache')
+    drop_table_safe('embedding_cache')
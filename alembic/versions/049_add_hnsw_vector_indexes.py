@@ -0,0 +1,65 @@
+"""Add HNSW indexes for design_chunks and alerts embeddings
+
+Revision ID: 049_add_hnsw_vector_indexes
+Revises: 048_add_embedding_cache
+Create Date: 2026-10-16 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from migration_helpers import (
+    extension_exists, create_index_safe, drop_index_safe
+)
+
+
+# revision identifiers, used by Alembic.
+revision = '049_add_hnsw_vector_indexes'
+down_revision = '048_add_embedding_cache'
+branch_labels = None
+depends_on = None
+
+
+# (index, table, legacy ivfflat index)
+INDEXES = [
+    ('design_chunks_embedding_hnsw_idx', 'design_chunks', 'design_chunks_embedding_idx'),
+    ('alerts_embedding_hnsw_idx', 'alerts', 'alerts_embedding_idx'),
+]
+
+# pgvector defaults; recall is tuned per query with hnsw.ef_search
+HNSW_WITH = {'m': '16', 'ef_construction': '64'}
+
+# Settings of the ivfflat indexes restored on downgrade
+IVFFLAT_WITH = {'lists': '100'}
+
+
+def upgrade() -> None:
+    if not extension_exists('vector'):
+        print("Warning: pgvector extension not available. Skipping vector indexes.")
+        return
+
+    for index, table, legacy in INDEXES:
+        drop_index_safe(legacy, table_name=table)
+        create_index_safe(
+            index, table, ['embedding'],
+            postgresql_using='hnsw',
+            postgresql_with=HNSW_WITH,
+            postgresql_ops={'embedding': 'vector_cosine_ops'}
+        )
+
+
+def downgrade() -> None:
+    if not extension_exists('vector'):
+        return
+
+    for index, table, legacy in INDEXES:
+        drop_index_safe(index, table_name=table)
+        create_index_safe(
+            legacy, table, ['embedding'],
+            postgresql_using='ivfflat',
+            postgresql_with=IVFFLAT_WITH,
+            postgresql_ops={'embedding': 'vector_cosine_ops'}
+        )
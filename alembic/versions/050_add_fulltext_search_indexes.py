@@ -0,0 +1,45 @@
+"""Add full-text search indexes for design_chunks and runbooks
+
+Revision ID: 050_add_fulltext_search_indexes
+Revises: 049_add_hnsw_vector_indexes
+Create Date: 2026-10-16 23:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from migration_helpers import create_index_safe, drop_index_safe
+
+
+# revision identifiers, used by Alembic.
+revision = '050_add_fulltext_search_indexes'
+down_revision = '049_add_hnsw_vector_indexes'
+branch_labels = None
+depends_on = None
+
+
+# (index, table, tsvector expression); must match app/services/hybrid_search.py
+INDEXES = [
+    (
+        'design_chunks_content_fts_idx', 'design_chunks',
+        "to_tsvector('english', content)"
+    ),
+    (
+        'idx_runbooks_fts', 'runbooks',
+        "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+    ),
+]
+
+
+def upgrade() -> None:
+    for index, table, expression in INDEXES:
+        create_index_safe(index, table, [sa.text(expression)], postgresql_using='gin')
+
+
+def downgrade() -> None:
+    for index, table, _ in INDEXES:
+        drop_index_safe(index, table_name=table)
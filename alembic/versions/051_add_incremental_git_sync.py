@@ -0,0 +1,44 @@
+"""Add git_sync_states and design_documents.content_hash for incremental git sync
+
+Revision ID: 051_add_incremental_git_sync
+Revises: 050_add_fulltext_search_indexes
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from migration_helpers import (
+    create_table_safe, drop_table_safe, add_column_safe, drop_column_safe
+)
+
+
+# revision identifiers, used by Alembic.
+revision = '051_add_incremental_git_sync'
+down_revision = '050_add_fulltext_search_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    add_column_safe('design_documents', sa.Column('content_hash', sa.String(length=64), nullable=True))
+
+    create_table_safe(
+        'git_sync_states',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('repo_url', sa.String(length=1000), nullable=False),
+        sa.Column('branch', sa.String(length=255), nullable=False),
+        sa.Column('last_commit', sa.String(length=64), nullable=True),
+        sa.Column('last_synced_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('repo_url', 'branch', name='uq_git_sync_states_repo_branch')
+    )
+
+
+def downgrade() -> None:
+    drop_table_safe('git_sync_states')
+    drop_column_safe('design_documents', 'content_hash')
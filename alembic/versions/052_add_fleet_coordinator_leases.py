@@ -0,0 +1,37 @@
+"""Add coordinator lease, stored targets and cancel flag to fleet_executions
+
+Revision ID: 052_add_fleet_coordinator_leases
+Revises: 051_add_incremental_git_sync
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+from migration_helpers import add_column_safe, drop_column_safe
+
+
+# revision identifiers, used by Alembic.
+revision = '052_add_fleet_coordinator_leases'
+down_revision = '051_add_incremental_git_sync'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    add_column_safe('fleet_executions', sa.Column('target_server_ids', sa.JSON(), nullable=True))
+    add_column_safe('fleet_executions', sa.Column('cancel_requested', sa.Boolean(), nullable=True, server_default='false'))
+    add_column_safe('fleet_executions', sa.Column('coordinator_id', sa.String(length=100), nullable=True))
+    add_column_safe('fleet_executions', sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True))
+    add_column_safe('fleet_executions', sa.Column('claim_count', sa.Integer(), nullable=True, server_default='0'))
+
+
+def downgrade() -> None:
+    drop_column_safe('fleet_executions', 'claim_count')
+    drop_column_safe('fleet_executions', 'lease_expires_at')
+    drop_column_safe('fleet_executions', 'coordinator_id')
+    drop_column_safe('fleet_executions', 'cancel_requested')
+    drop_column_safe('fleet_executions', 'target_server_ids')
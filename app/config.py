@@ -32,6 +32,7 @@ class Settings(BaseSettings):
     debug: bool = False
     app_port: int = 8080
     recording_dir: str = "storage/recordings"
+    git_sync_mirror_dir: str = "storage/git_mirrors"  # persistent checkouts for incremental knowledge sync
     testing: bool = False
 
     # Prometheus Integration
@@ -39,6 +40,14 @@ class Settings(BaseSettings):
     enable_prometheus_queries: bool = True
     prometheus_timeout: int = 30  # seconds
 
+    # Observability backend HTTP clients (pooled per backend origin)
+    http_client_max_connections: int = 100  # open connections per backend origin
+    http_client_max_keepalive: int = 20  # idle keep-alive connections per backend origin
+    http_client_keepalive_expiry: float = 30.0  # seconds an idle connection is kept
+    http_client_timeout: float = 30.0  # default read/write/pool timeout; callers may override per request
+    http_client_connect_timeout: float = 5.0
+    http_client_http2: bool = True  # over TLS, when the h2 package is installed
+
     # Prometheus Dashboard Settings
     prometheus_dashboard_enabled: bool = True
     prometheus_refresh_interval: int = 30  # seconds
@@ -73,6 +82,98 @@ class Settings(BaseSettings):
     prometheus_cache_ttl: int = 60  # seconds
     prometheus_max_retries: int = 3
     prometheus_retry_delay: int = 2  # seconds
+    prometheus_health_cache_ttl: int = 15  # seconds, 0 disables the instance health cache
+    prometheus_health_concurrency: int = 10  # per-instance queries in flight when a fleet-wide query fails
+
+    # Observability Query Result Cache
+    query_cache_max_entries: int = 1000
+    query_cache_max_bytes: int = 64 * 1024 * 1024  # JSON-encoded size of cached results
+    query_cache_ttl: int = 300  # seconds
+    query_cache_bucket_seconds: int = 30  # shortest time bucket for relative ranges ("last 1h")
+    query_cache_redis_url: str = ""  # shared cache across replicas (needs the redis package)
+
+    # Panel Range Query Cache (only the missing tail of a panel's range is re-queried)
+    panel_cache_enabled: bool = True
+    panel_cache_max_bytes: int = 128 * 1024 * 1024  # estimated memory for cached samples
+    panel_cache_freshness_seconds: int = 60  # newer samples are re-queried on every refresh
+    dashboard_query_concurrency: int = 4  # batch dashboard queries in flight per datasource
+
+    # Webhook Ingest Queue
+    ingest_queue_enabled: bool = True
+    ingest_queue_analysis_concurrency: int = 4
+    ingest_queue_remediation_concurrency: int = 8
+    ingest_queue_max_attempts: int = 5
+    ingest_queue_retry_base_seconds: int = 5
+    ingest_queue_retry_max_seconds: int = 600
+    ingest_queue_poll_interval: float = 1.0  # seconds
+    ingest_queue_visibility_timeout: int = 900  # seconds without a heartbeat before a job is reclaimed
+
+    # Runbook Execution Worker
+    execution_worker_concurrency: int = 8
+    execution_worker_max_per_server: int = 1
+    execution_worker_max_per_runbook: int = 4
+    execution_worker_poll_interval: float = 5.0  # seconds, used while no NOTIFY listener is connected
+    execution_worker_safety_poll_interval: float = 30.0  # seconds, safety net while listening
+    execution_notify_enabled: bool = True  # LISTEN/NOTIFY wakeups for ready executions
+    execution_lease_seconds: int = 120  # renewed by heartbeat every third of this
+    execution_max_claims: int = 3  # claims before a repeatedly orphaned execution is failed
+    fleet_max_parallelism: int = 16  # unfinished host executions a fleet keeps enqueued at once
+    fleet_worker_concurrency: int = 4  # fleets coordinated at once per replica
+    fleet_poll_interval: float = 5.0  # seconds between fleet claims and batch progress checks
+
+    # SSH Connection Pool
+    ssh_pool_enabled: bool = True
+    ssh_pool_max_connections: int = 64  # open connections across all hosts
+    ssh_pool_max_channels_per_host: int = 8  # concurrent sessions per connection, below OpenSSH MaxSessions (10)
+    ssh_pool_idle_ttl_seconds: int = 300
+    ssh_pool_max_lifetime_seconds: int = 3600  # recycle long-lived connections once idle
+    ssh_pool_health_check_interval: float = 30.0  # probe idle connections older than this before reuse
+    ssh_pool_acquire_timeout: float = 30.0  # wait for a free slot when the pool is full
+    ssh_keepalive_interval: int = 30  # seconds, 0 disables
+    ssh_keepalive_count_max: int = 3
+
+    # WinRM
+    winrm_max_threads: int = 16  # dedicated pool for blocking pywinrm calls
+    winrm_operation_timeout: int = 20  # seconds per output poll; bounds how fast a timeout is noticed
+
+    # Step Output Streaming
+    step_output_head_chars: int = 262144  # always kept from the start of a step's output
+    step_output_tail_chars: int = 262144  # kept from the end; the middle is dropped
+    step_output_chunk_chars: int = 16384
+    step_output_flush_interval: float = 0.5  # seconds before buffered output is written
+    step_output_result_chars: int = 1048576  # head+tail of output held in memory for success checks and variables
+
+    # Alert Clustering
+    clustering_online_enabled: bool = True  # assign alerts to clusters at ingest time
+    clustering_checkpoint_interval: float = 5.0  # seconds between writes of in-memory cluster state
+    clustering_state_horizon_minutes: int = 60  # clusters and unpaired alerts idle longer are evicted
+    clustering_temporal_window_minutes: int = 5
+    clustering_semantic_threshold: float = 0.7  # cosine similarity
+    clustering_semantic_max_candidates: int = 2000  # recent alerts/centroids compared per alert
+    clustering_repair_interval_minutes: int = 30  # batch re-clustering of alerts the engine missed
+    clustering_gauge_interval_seconds: int = 60  # refresh of active-cluster/noise-reduction gauges
+
+    # Embeddings
+    embedding_backend: str = "openai"  # openai, local (hashing model on the CPU, no network)
+    embedding_cache_size: int = 10000  # in-memory LRU entries
+    embedding_cache_persist: bool = True  # share embeddings across processes via the embedding_cache table
+    embedding_cache_retention_days: int = 30  # embedding_cache rows older than this are pruned daily
+    embedding_cache_max_rows: int = 500000  # newest rows kept by the daily prune
+    embedding_batch_size: int = 100  # texts per backend call
+    embedding_batch_wait_ms: int = 10  # how long a queued text waits for others to batch with
+    embedding_on_ingest: bool = True  # embed new alerts in the background right after ingest
+    embedding_ingest_flush_interval: float = 1.0  # seconds new alerts are collected before embedding
+    embedding_backfill_chunk_size: int = 500  # alerts per keyset page, embedding call and UPDATE
+    embedding_backfill_interval_minutes: int = 30  # scheduled backfill of alerts still without embeddings
+
+    # Vector Search (pgvector)
+    vector_search_ef_search: int = 40  # HNSW candidate list; raised per query to the candidates requested
+    vector_search_probes: int = 10  # ivfflat lists scanned
+    vector_search_overfetch: int = 4  # candidates per result when filters run after the index scan
+
+    # Hybrid Search (full-text + vector)
+    hybrid_search_enabled: bool = True  # fuse ranked full-text matches with vector results
+    hybrid_search_rrf_k: int = 60  # reciprocal-rank fusion damping constant
 
     @property
     def database_url(self) -> str:
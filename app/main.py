@@ -20,6 +20,7 @@ import app.models_knowledge  # noqa: F401
 import app.models_learning  # noqa: F401 - Phase 3: Learning System
 import app.models_dashboards  # noqa: F401 - Prometheus Dashboard Builder
 import app.models_agent  # noqa: F401 - Agent Mode
+import app.models_ingest_queue  # noqa: F401 - Durable webhook ingest queue
 from app.services.auth_service import (
     get_current_user_optional,
     create_user,
@@ -79,6 +80,13 @@ from app.routers import (
 )
 from app import api_credential_profiles
 from app.services.execution_worker import start_execution_worker, stop_execution_worker
+from app.services.fleet_executor import start_fleet_worker, stop_fleet_worker
+from app.services.ssh_pool import close_ssh_pool
+from app.services.winrm_session import shutdown_winrm_thread_pool
+from app.services.http_clients import close_http_clients
+from app.services.ingest_queue import start_ingest_queue_worker, stop_ingest_queue_worker
+from app.services.online_clustering import start_clustering_engine, stop_clustering_engine
+from app.services.embedding_backfill import start_alert_embedder, stop_alert_embedder
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
@@ -202,6 +210,25 @@ async def lifespan(app: FastAPI):
         logger.info("Starting execution worker...")
         await start_execution_worker()
         
+        # Start fleet coordinator (claims fleet executions via DB lease)
+        logger.info("Starting fleet worker...")
+        await start_fleet_worker()
+        
+        # Start ingest queue consumers (webhook auto-analysis/remediation)
+        if settings.ingest_queue_enabled:
+            logger.info("Starting ingest queue worker...")
+            await start_ingest_queue_worker()
+        
+        # Start online alert clustering (assigns clusters at ingest time)
+        if settings.clustering_online_enabled:
+            logger.info("Starting online clustering engine...")
+            await start_clustering_engine()
+        
+        # Embed new alerts in the background right after ingest
+        if settings.embedding_on_ingest:
+            logger.info("Starting alert embedder...")
+            await start_alert_embedder()
+        
         # Start scheduler
         logger.info("Starting scheduler...")
         from app.services.scheduler_service import get_scheduler
@@ -238,6 +265,11 @@ async def lifespan(app: FastAPI):
         start_clustering_jobs(scheduler._scheduler)  # Pass APScheduler instance
         logger.info("✅ Alert clustering jobs started")
         
+        # Start alert embedding backfill job
+        from app.services.embedding_backfill import start_embedding_jobs
+        start_embedding_jobs(scheduler._scheduler)  # Pass APScheduler instance
+        logger.info("✅ Embedding jobs registered")
+        
         # Start ITSM sync background jobs
         logger.info("Starting ITSM sync background jobs...")
         from app.services.itsm_sync_worker import start_itsm_sync_jobs
@@ -261,6 +293,29 @@ async def lifespan(app: FastAPI):
         # Stop execution worker gracefully
         logger.info("Stopping execution worker...")
         await stop_execution_worker()
+        
+        # Stop fleet coordinator, releasing its fleets to other replicas
+        logger.info("Stopping fleet worker...")
+        await stop_fleet_worker()
+        
+        # Stop ingest queue consumers, letting in-flight jobs finish
+        logger.info("Stopping ingest queue worker...")
+        await stop_ingest_queue_worker()
+        
+        # Write in-memory cluster state before exiting
+        logger.info("Stopping online clustering engine...")
+        await stop_clustering_engine()
+        
+        # Embed alerts still queued from ingest
+        logger.info("Stopping alert embedder...")
+        await stop_alert_embedder()
+    
+    # Close pooled SSH connections and stop WinRM threads
+    await close_ssh_pool()
+    shutdown_winrm_thread_pool()
+    
+    # Close pooled observability backend connections
+    await close_http_clients()
     
     logger.info("AIOps Platform shutdown complete")
 
@@ -97,6 +97,12 @@ WEBHOOK_DURATION = Histogram(
     buckets=[0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0]
 )
 
+WEBHOOK_BATCH_SIZE = Histogram(
+    'aiops_webhook_batch_size',
+    'Number of alerts per webhook payload',
+    buckets=[1, 5, 10, 25, 50, 100, 250, 500, 1000]
+)
+
 # =============================================================================
 # HTTP Metrics (general)
 # =============================================================================
@@ -146,6 +152,12 @@ NOISE_REDUCTION = Gauge(
     'Current noise reduction percentage from clustering'
 )
 
+NOISE_REDUCTION_WINDOW = Gauge(
+    'aiops_noise_reduction_window_percent',
+    'Noise reduction percentage from clustering over recent alerts',
+    ['window']  # 24h, 7d
+)
+
 CLUSTERING_DURATION = Histogram(
     'aiops_clustering_duration_seconds',
     'Time spent running clustering job',
@@ -157,3 +169,251 @@ AI_SUMMARIES_GENERATED = Counter(
     'Total AI summaries generated for clusters',
     ['status']  # success, error
 )
+
+CLUSTERING_ASSIGNMENTS = Counter(
+    'aiops_clustering_assignments_total',
+    'Alerts seen by the online clustering engine, by the layer that placed them',
+    ['layer']  # exact, temporal, semantic, unclustered
+)
+
+CLUSTERING_CHECKPOINT_DURATION = Histogram(
+    'aiops_clustering_checkpoint_duration_seconds',
+    'Time spent writing in-memory cluster state to the database',
+    buckets=[0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0]
+)
+
+CLUSTERING_ENGINE_STATE = Gauge(
+    'aiops_clustering_engine_state',
+    'Entries held in memory by the online clustering engine',
+    ['kind']  # clusters, unclustered
+)
+
+# =============================================================================
+# Ingest Queue Metrics
+# =============================================================================
+
+INGEST_QUEUE_DEPTH = Gauge(
+    'aiops_ingest_queue_depth',
+    'Number of jobs in the webhook ingest queue',
+    ['stage', 'status']  # stage: analysis, remediation; status: pending, processing, dead
+)
+
+INGEST_QUEUE_LAG = Gauge(
+    'aiops_ingest_queue_lag_seconds',
+    'Age of the oldest ready job in the ingest queue',
+    ['stage']
+)
+
+INGEST_QUEUE_IN_FLIGHT = Gauge(
+    'aiops_ingest_queue_in_flight',
+    'Jobs currently being processed by this replica',
+    ['stage']
+)
+
+INGEST_QUEUE_JOBS = Counter(
+    'aiops_ingest_queue_jobs_total',
+    'Ingest queue job outcomes',
+    ['stage', 'outcome']  # success, retry, dead
+)
+
+INGEST_QUEUE_JOB_DURATION = Histogram(
+    'aiops_ingest_queue_job_duration_seconds',
+    'Time spent processing an ingest queue job',
+    ['stage'],
+    buckets=[0.1, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0, 120.0]
+)
+
+
+# =============================================================================
+# Execution Worker Metrics
+# =============================================================================
+
+EXECUTIONS_IN_FLIGHT = Gauge(
+    'aiops_executions_in_flight',
+    'Runbook executions currently running on this replica'
+)
+
+EXECUTION_CLAIMS = Counter(
+    'aiops_execution_claims_total',
+    'Runbook executions claimed by the execution worker',
+    ['kind']  # new, recovered, abandoned
+)
+
+EXECUTION_LEASES_LOST = Counter(
+    'aiops_execution_leases_lost_total',
+    'Executions cancelled because their lease was taken over by another worker'
+)
+
+
+# =============================================================================
+# SSH Connection Pool Metrics
+# =============================================================================
+
+SSH_POOL_REQUESTS = Counter(
+    'aiops_ssh_pool_requests_total',
+    'SSH connection requests served by the pool',
+    ['result']  # hit, miss
+)
+
+SSH_HANDSHAKE_DURATION = Histogram(
+    'aiops_ssh_handshake_duration_seconds',
+    'Time to establish and authenticate a new SSH connection',
+    buckets=[0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0]
+)
+
+SSH_POOL_CONNECTIONS = Gauge(
+    'aiops_ssh_pool_connections',
+    'Open SSH connections held by the pool'
+)
+
+SSH_POOL_CHANNELS_IN_USE = Gauge(
+    'aiops_ssh_pool_channels_in_use',
+    'SSH sessions currently open on pooled connections'
+)
+
+SSH_POOL_EVICTIONS = Counter(
+    'aiops_ssh_pool_evictions_total',
+    'Pooled SSH connections closed by the pool',
+    ['reason']  # idle, lifetime, capacity, unhealthy, closed, shutdown
+)
+
+
+# =============================================================================
+# WinRM Metrics
+# =============================================================================
+
+WINRM_THREADS_BUSY = Gauge(
+    'aiops_winrm_threads_busy',
+    'WinRM pool threads currently running a pywinrm call'
+)
+
+WINRM_CALLS_QUEUED = Gauge(
+    'aiops_winrm_calls_queued',
+    'pywinrm calls waiting for a free WinRM pool thread'
+)
+
+WINRM_QUEUE_WAIT = Histogram(
+    'aiops_winrm_queue_wait_seconds',
+    'Time a pywinrm call waited for a WinRM pool thread',
+    buckets=[0.001, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0]
+)
+
+WINRM_SHELLS_OPENED = Counter(
+    'aiops_winrm_shells_opened_total',
+    'Remote WinRM shells opened'
+)
+
+WINRM_COMMANDS_CANCELLED = Counter(
+    'aiops_winrm_commands_cancelled_total',
+    'WinRM commands terminated after a timeout or cancellation'
+)
+
+
+# =============================================================================
+# Step Output Metrics
+# =============================================================================
+
+STEP_OUTPUT_CHARS = Counter(
+    'aiops_step_output_chars_total',
+    'Characters of runbook step output stored',
+    ['stream']  # stdout, stderr
+)
+
+STEP_OUTPUT_DROPPED_CHARS = Counter(
+    'aiops_step_output_dropped_chars_total',
+    'Characters of runbook step output discarded by head/tail retention'
+)
+
+
+# =============================================================================
+# Embedding Metrics
+# =============================================================================
+
+ALERT_EMBEDDINGS = Counter(
+    'aiops_alert_embeddings_total',
+    'Alerts given an embedding',
+    ['source', 'result']  # source: ingest, backfill; result: embedded, failed
+)
+
+EMBEDDING_BACKFILL_RATE = Gauge(
+    'aiops_embedding_backfill_alerts_per_second',
+    'Throughput of the last alert embedding backfill run'
+)
+
+
+# =============================================================================
+# Observability Backend HTTP Client Metrics
+# =============================================================================
+
+HTTP_CLIENT_REQUESTS = Counter(
+    'aiops_http_client_requests_total',
+    'Requests sent to observability backends through the pooled clients',
+    ['backend', 'status']  # status: 2xx, 4xx, 5xx, error
+)
+
+HTTP_CLIENT_DURATION = Histogram(
+    'aiops_http_client_request_duration_seconds',
+    'Time from sending a backend request to its response headers',
+    ['backend'],
+    buckets=[0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0]
+)
+
+HTTP_CLIENT_IN_FLIGHT = Gauge(
+    'aiops_http_client_requests_in_flight',
+    'Backend requests currently waiting for a response',
+    ['backend', 'host']
+)
+
+HTTP_CLIENT_POOL_SATURATION = Gauge(
+    'aiops_http_client_pool_saturation',
+    'In-flight requests as a fraction of the connection limit (1 = requests queue for a connection)',
+    ['backend', 'host']
+)
+
+
+# =============================================================================
+# Observability Query Cache Metrics
+# =============================================================================
+
+QUERY_CACHE_REQUESTS = Counter(
+    'aiops_query_cache_requests_total',
+    'Observability query cache lookups',
+    ['result']  # hit, shared_hit, coalesced, miss
+)
+
+QUERY_CACHE_EVICTIONS = Counter(
+    'aiops_query_cache_evictions_total',
+    'Entries removed from the query cache before being replaced',
+    ['reason']  # expired, lru, size
+)
+
+QUERY_CACHE_ENTRIES = Gauge(
+    'aiops_query_cache_entries',
+    'Entries held in the local query cache'
+)
+
+QUERY_CACHE_BYTES = Gauge(
+    'aiops_query_cache_bytes',
+    'JSON-encoded size of the results held in the local query cache'
+)
+
+
+# =============================================================================
+# Panel Range Query Cache Metrics
+# =============================================================================
+
+PANEL_CACHE_REQUESTS = Counter(
+    'aiops_panel_cache_requests_total',
+    'Panel range queries served through the range query cache',
+    ['result']  # hit, partial, miss
+)
+
+PANEL_CACHE_EVICTIONS = Counter(
+    'aiops_panel_cache_evictions_total',
+    'Cached panel ranges evicted to stay within the memory budget'
+)
+
+PANEL_CACHE_BYTES = Gauge(
+    'aiops_panel_cache_bytes',
+    'Estimated memory held by cached panel ranges'
+)
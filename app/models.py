@@ -1,7 +1,7 @@
 """SQLAlchemy ORM Models"""
 import uuid
 from datetime import datetime, timezone
-from sqlalchemy import Column, String, Boolean, Integer, Text, ForeignKey, DateTime, JSON, CheckConstraint
+from sqlalchemy import Column, String, Boolean, Integer, BigInteger, Text, ForeignKey, DateTime, JSON, CheckConstraint, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from typing import TYPE_CHECKING
@@ -161,6 +161,22 @@ class AlertCluster(Base):
         return inactive_duration.total_seconds() / 3600 >= inactive_hours
 
 
+class ClusteringCounter(Base):
+    """
+    Delta rows for the clustering gauges
+
+    Written by statement-level triggers on alerts and alert_clusters (see
+    migration 047), so totals stay transactionally consistent without
+    counting either table. Summing by name gives the current value; the
+    clustering worker periodically folds the rows into one per name.
+    """
+    __tablename__ = "clustering_counters"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    name = Column(String(50), nullable=False)  # alerts, clustered_alerts, clusters, active_clusters
+    delta = Column(BigInteger, nullable=False)
+
+
 class Alert(Base):
     __tablename__ = "alerts"
 
@@ -212,6 +228,20 @@ class Alert(Base):
     cluster = relationship("AlertCluster", back_populates="alerts")
     metrics = relationship("IncidentMetrics", back_populates="alert", uselist=False)
 
+    __table_args__ = (
+        # Webhook dedup key; lets batched ingestion use INSERT ... ON CONFLICT
+        Index('uq_alerts_fingerprint_timestamp', 'fingerprint', 'timestamp', unique=True),
+        # Windowed noise-reduction counts (index-only range scan)
+        Index('ix_alerts_timestamp_cluster', 'timestamp', 'cluster_id'),
+        # Cosine top-k search (see services/vector_search.py)
+        Index(
+            'alerts_embedding_hnsw_idx', 'embedding',
+            postgresql_using='hnsw',
+            postgresql_with={'m': 16, 'ef_construction': 64},
+            postgresql_ops={'embedding': 'vector_cosine_ops'}
+        ),
+    )
+
 
 
 class IncidentMetrics(Base):
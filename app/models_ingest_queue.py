@@ -0,0 +1,50 @@
+"""
+Ingest Queue Models
+
+Durable work queue between the Alertmanager webhook and downstream
+processing (auto-analysis, auto-remediation). Consumers claim rows with
+SELECT ... FOR UPDATE SKIP LOCKED so several app replicas can drain it.
+"""
+
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Text, Index
+from sqlalchemy.dialects.postgresql import UUID
+import uuid
+from datetime import datetime, timezone
+
+from .database import Base
+
+
+def utc_now():
+    """Return current UTC time as timezone-aware datetime."""
+    return datetime.now(timezone.utc)
+
+
+class IngestQueueJob(Base):
+    """
+    One unit of post-ingest work for a stored alert.
+    Completed jobs are deleted; jobs that exhaust their retries stay as 'dead'.
+    """
+    __tablename__ = "ingest_queue_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    stage = Column(String(20), nullable=False)  # analysis, remediation
+    alert_id = Column(UUID(as_uuid=True), ForeignKey("alerts.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    # Delivery state
+    status = Column(String(20), nullable=False, default="pending")  # pending, processing, dead
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    available_at = Column(DateTime(timezone=True), nullable=False, default=utc_now)
+    locked_by = Column(String(100), nullable=True)
+    locked_at = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), nullable=False, default=utc_now)
+
+    __table_args__ = (
+        # Claim query: WHERE stage = ? AND status = 'pending' AND available_at <= now()
+        Index('idx_ingest_queue_claim', 'stage', 'status', 'available_at'),
+    )
+
+    def __repr__(self):
+        return f"<IngestQueueJob {self.stage}:{self.alert_id} ({self.status})>"
@@ -2,7 +2,7 @@
 SQLAlchemy models for Knowledge Base
 Handles design documents, images, and chunked content with vector embeddings
 """
-from sqlalchemy import Column, String, Integer, Text, Boolean, DateTime, ForeignKey, CheckConstraint, Index
+from sqlalchemy import Column, String, Integer, Text, Boolean, DateTime, ForeignKey, CheckConstraint, UniqueConstraint, Index, text
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -41,6 +41,7 @@ class DesignDocument(Base):
     
     # Versioning
     version = Column(Integer, default=1)
+    content_hash = Column(String(64), nullable=True)  # sha256 of raw_content; unchanged files are not re-synced
     status = Column(String(20), default='active', index=True)
     
     # Audit
@@ -157,4 +158,42 @@ class DesignChunk(Base):
         ),
         Index('design_chunks_source_idx', 'source_type', 'source_id'),
         Index('design_chunks_metadata_idx', 'chunk_metadata', postgresql_using='gin'),
+        # Cosine top-k search (see services/vector_search.py)
+        Index(
+            'design_chunks_embedding_hnsw_idx', 'embedding',
+            postgresql_using='hnsw',
+            postgresql_with={'m': 16, 'ef_construction': 64},
+            postgresql_ops={'embedding': 'vector_cosine_ops'}
+        ),
+        # Full-text search (see services/hybrid_search.py)
+        Index(
+            'design_chunks_content_fts_idx',
+            text("to_tsvector('english', content)"),
+            postgresql_using='gin'
+        ),
+    )
+
+
+class EmbeddingCacheEntry(Base):
+    """Embeddings keyed by a hash of model and text, shared across processes"""
+    __tablename__ = "embedding_cache"
+
+    content_hash = Column(String(64), primary_key=True)  # sha256 of model + text
+    model = Column(String(100), nullable=False)
+    embedding = Column(Vector(), nullable=False)  # width depends on the model
+    created_at = Column(DateTime(timezone=True), default=utc_now, index=True)
+
+
+class GitSyncState(Base):
+    """Last commit of a repository branch synced into the knowledge base"""
+    __tablename__ = "git_sync_states"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    repo_url = Column(String(1000), nullable=False)  # without credentials
+    branch = Column(String(255), nullable=False)
+    last_commit = Column(String(64), nullable=True)
+    last_synced_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint('repo_url', 'branch', name='uq_git_sync_states_repo_branch'),
     )
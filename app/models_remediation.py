@@ -8,8 +8,8 @@ import uuid
 from datetime import datetime, timezone
 from typing import List, Optional
 from sqlalchemy import (
-    Column, String, Boolean, Integer, Text, ForeignKey, 
-    DateTime, JSON, CheckConstraint, UniqueConstraint, Index
+    Column, String, Boolean, Integer, BigInteger, Float, Text, ForeignKey, 
+    DateTime, JSON, CheckConstraint, UniqueConstraint, Index, text
 )
 from sqlalchemy.dialects.postgresql import UUID, ARRAY
 from sqlalchemy.orm import relationship
@@ -34,6 +34,7 @@ def utc_now():
 # ExecutionStatus: "pending", "approved", "running", "success", "failed", 
 #                  "timeout", "cancelled", "rolled_back"
 # StepStatus: "pending", "running", "success", "failed", "skipped", "timeout"
+# FleetStatus: "pending", "running", "success", "partial", "failed", "stopped", "cancelled"
 # CircuitState: "closed", "open", "half_open"
 # Recurrence: "once", "daily", "weekly", "monthly"
 
@@ -111,6 +112,15 @@ class Runbook(Base):
     __table_args__ = (
         Index("idx_runbooks_enabled_auto", "enabled", "auto_execute"),
         Index("idx_runbooks_category", "category"),
+        # Full-text search (see services/hybrid_search.py)
+        Index(
+            "idx_runbooks_fts",
+            text(
+                "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+                "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+            ),
+            postgresql_using="gin"
+        ),
     )
 
 
@@ -286,6 +296,15 @@ class RunbookExecution(Base):
     # Variables passed to execution
     variables_json = Column(JSON, nullable=True)  # Runtime parameters
     
+    # Worker lease (set while a worker owns the execution, renewed by heartbeat)
+    worker_id = Column(String(100), nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+    claim_count = Column(Integer, default=0)  # Times claimed; >1 means recovered after a crash
+    
+    # Fleet fan-out (set when this is one host of a FleetExecution)
+    fleet_execution_id = Column(UUID(as_uuid=True), ForeignKey("fleet_executions.id", ondelete="CASCADE"), nullable=True)
+    fleet_batch = Column(Integer, nullable=True)  # 0-based rolling batch index
+    
     # Relationships
     runbook = relationship("Runbook", back_populates="executions")
     alert = relationship("Alert")
@@ -294,16 +313,78 @@ class RunbookExecution(Base):
     triggered_by_user = relationship("User", foreign_keys=[triggered_by])
     approved_by_user = relationship("User", foreign_keys=[approved_by])
     step_executions = relationship("StepExecution", back_populates="execution", cascade="all, delete-orphan", order_by="StepExecution.step_order")
+    fleet_execution = relationship("FleetExecution", back_populates="executions")
     
     __table_args__ = (
         Index("idx_executions_status", "status"),
         Index("idx_executions_runbook_status", "runbook_id", "status"),
         Index("idx_executions_alert", "alert_id"),
         Index("idx_executions_queued_at", "queued_at"),
+        Index("idx_executions_runbook_queued_at", "runbook_id", "queued_at"),
+        Index("idx_executions_lease", "lease_expires_at"),
         Index("idx_executions_approval_token", "approval_token"),
+        Index("idx_executions_fleet", "fleet_execution_id"),
     )
 
 
+class FleetExecution(Base):
+    """
+    A runbook fanned out across a server group or label selector.
+    Each targeted host gets its own RunbookExecution, run in rolling batches.
+    """
+    __tablename__ = "fleet_executions"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    
+    # What is executed
+    runbook_id = Column(UUID(as_uuid=True), ForeignKey("runbooks.id"), nullable=False)
+    runbook_version = Column(Integer, nullable=False)
+    
+    # Targets: servers in the group (and its subgroups) matching the selector
+    server_group_id = Column(UUID(as_uuid=True), ForeignKey("server_groups.id"), nullable=True)
+    label_selector_json = Column(JSON, nullable=True)  # {"environment": "production", "tags": ["web"]}
+    
+    # Context
+    alert_id = Column(UUID(as_uuid=True), ForeignKey("alerts.id"), nullable=True)
+    triggered_by = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True)
+    dry_run = Column(Boolean, default=False)
+    variables_json = Column(JSON, nullable=True)
+    
+    # Rollout policy
+    parallelism = Column(Integer, default=10)  # Hosts running at once within a batch
+    batch_size = Column(Integer, nullable=True)  # Hosts per batch; wins over batch_percent
+    batch_percent = Column(Integer, nullable=True)  # Hosts per batch as % of targets
+    max_failure_ratio = Column(Float, default=0.1)  # Stop once failed/finished exceeds this
+    
+    # Status & aggregated result
+    status = Column(String(20), default="pending", index=True)
+    stop_reason = Column(Text, nullable=True)
+    servers_total = Column(Integer, default=0)
+    servers_succeeded = Column(Integer, default=0)
+    servers_failed = Column(Integer, default=0)
+    servers_skipped = Column(Integer, default=0)
+    batches_total = Column(Integer, default=0)
+    batches_completed = Column(Integer, default=0)
+    target_server_ids = Column(JSON, nullable=True)  # Targets resolved at submission, in rollout order
+    cancel_requested = Column(Boolean, default=False)
+    
+    # Coordinator lease (see fleet_executor.FleetWorker)
+    coordinator_id = Column(String(100), nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+    claim_count = Column(Integer, default=0)
+    
+    # Timing
+    created_at = Column(DateTime(timezone=True), default=utc_now)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    
+    # Relationships
+    runbook = relationship("Runbook")
+    server_group = relationship("ServerGroup")
+    triggered_by_user = relationship("User")
+    executions = relationship("RunbookExecution", back_populates="fleet_execution", order_by="RunbookExecution.fleet_batch")
+
+
 class StepExecution(Base):
     """
     Record of individual step execution within a runbook execution.
@@ -324,9 +405,11 @@ class StepExecution(Base):
     command_executed = Column(Text, nullable=True)  # Actual command that was run
 
     # Output (for command execution)
-    stdout = Column(Text, nullable=True)
+    stdout = Column(Text, nullable=True)  # First 10k chars; full output is in step_output_chunks
     stderr = Column(Text, nullable=True)
     exit_code = Column(Integer, nullable=True)
+    output_chars = Column(BigInteger, default=0)  # Total streamed output, both streams
+    output_dropped_chars = Column(BigInteger, default=0)  # Discarded between head and tail retention
 
     # API Response (for API execution)
     http_status_code = Column(Integer, nullable=True)  # HTTP response status code
@@ -358,6 +441,30 @@ class StepExecution(Base):
     )
 
 
+class StepOutputChunk(Base):
+    """
+    Append-only chunk of a step's streamed output.
+
+    Each chunk holds text from one stream. Offsets count characters across
+    both streams, so the middle of an oversized output can be dropped (head
+    and tail retention) without renumbering what is kept.
+    """
+    __tablename__ = "step_output_chunks"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    step_execution_id = Column(UUID(as_uuid=True), ForeignKey("step_executions.id", ondelete="CASCADE"), nullable=False)
+    seq = Column(Integer, nullable=False)
+    stream = Column(String(10), nullable=False, default="stdout")  # stdout, stderr
+    offset = Column(BigInteger, nullable=False)
+    length = Column(Integer, nullable=False)
+    content = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), default=utc_now)
+
+    __table_args__ = (
+        UniqueConstraint("step_execution_id", "seq", name="uq_step_output_chunk_seq"),
+    )
+
+
 # =============================================================================
 # SAFETY MECHANISMS
 # =============================================================================
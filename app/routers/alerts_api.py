@@ -10,6 +10,7 @@ from typing import List, Dict, Any
 import httpx
 from app.database import get_db
 from app.models_dashboards import PrometheusDatasource
+from app.services.http_clients import get_http_client
 
 router = APIRouter(
     prefix="/api/alerts",
@@ -28,14 +29,14 @@ async def fetch_alertmanager_alerts(alertmanager_url: str) -> Dict[str, Any]:
         Dictionary containing alerts data
     """
     try:
-        async with httpx.AsyncClient() as client:
-            # Fetch alerts from AlertManager API
-            response = await client.get(
-                f"{alertmanager_url}/api/v2/alerts",
-                timeout=10.0
-            )
-            response.raise_for_status()
-            return {"alerts": response.json()}
+        client = get_http_client("alertmanager", alertmanager_url)
+        # Fetch alerts from AlertManager API
+        response = await client.get(
+            f"{alertmanager_url}/api/v2/alerts",
+            timeout=10.0
+        )
+        response.raise_for_status()
+        return {"alerts": response.json()}
     except httpx.HTTPError as e:
         raise HTTPException(status_code=503, detail=f"Failed to fetch alerts from AlertManager: {str(e)}")
     except Exception as e:
@@ -2,16 +2,22 @@
 Dashboard Management API
 Provides CRUD operations for managing dashboards and their panels
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
 from pydantic import BaseModel, Field, validator
 from datetime import datetime
+from functools import partial
+import json
 import uuid
 
+from app.config import get_settings
 from app.database import get_db
 from app.models_dashboards import Dashboard, DashboardPanel, PrometheusPanel, PrometheusDatasource
 from app.routers.auth import get_current_user
+from app.routers.panels_api import calculate_step, execute_cached_range_query, parse_time_range
+from app.services.dashboard_batch import resolve_variable_values, run_concurrently, substitute_variables
 
 router = APIRouter(prefix="/api/dashboards", tags=["Dashboards"])
 
@@ -718,6 +724,145 @@ async def get_home_dashboard(
     )
 
 
+@router.get("/{dashboard_id}/data")
+async def get_dashboard_data(
+    dashboard_id: str,
+    request: Request,
+    start: Optional[datetime] = Query(None, description="Start time (ISO format)"),
+    end: Optional[datetime] = Query(None, description="End time (ISO format)"),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Get data for all panels of a dashboard in one request
+
+    - **start**: Start time (defaults to now - the panel's time range)
+    - **end**: End time (defaults to now)
+    - **var-<name>**: Value of dashboard variable <name> (defaults to
+      its current or default value)
+
+    Panels with the same query, datasource and range share one
+    execution, and queries run concurrently with at most
+    dashboard_query_concurrency in flight per datasource.
+
+    Streams server-sent events: one ``panel`` event per panel as its
+    query completes (the /api/panels/{panel_id}/data payload, or an
+    ``error``), then a ``done`` event.
+    """
+    from app.models_dashboards import DashboardVariable
+
+    dashboard = db.query(Dashboard).filter(
+        Dashboard.id == dashboard_id
+    ).first()
+
+    if not dashboard:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Dashboard {dashboard_id} not found"
+        )
+
+    # Panel definitions and their datasources in one query
+    rows = db.query(DashboardPanel, PrometheusPanel, PrometheusDatasource).join(
+        PrometheusPanel, PrometheusPanel.id == DashboardPanel.panel_id
+    ).outerjoin(
+        PrometheusDatasource, PrometheusDatasource.id == PrometheusPanel.datasource_id
+    ).filter(
+        DashboardPanel.dashboard_id == dashboard_id
+    ).order_by(DashboardPanel.display_order).all()
+
+    variables = db.query(DashboardVariable).filter(
+        DashboardVariable.dashboard_id == dashboard_id
+    ).all()
+    overrides = {
+        name[len("var-"):]: value
+        for name, value in request.query_params.items()
+        if name.startswith("var-")
+    }
+    values = resolve_variable_values(variables, overrides)
+
+    # One job per distinct (datasource, query, range, step)
+    jobs = {}
+    panels_by_job: Dict[Any, List[Dict[str, Any]]] = {}
+    errors = []
+    query_end = end or datetime.utcnow()
+    for dp, panel, datasource in rows:
+        if datasource is None:
+            errors.append({
+                "type": "panel",
+                "panel_id": panel.id,
+                "error": f"Datasource {panel.datasource_id} not found"
+            })
+            continue
+
+        query = substitute_variables(panel.promql_query, values)
+        if start:
+            query_start = start
+            duration = query_end - start
+        else:
+            duration = parse_time_range(dp.override_time_range or dashboard.time_range)
+            query_start = query_end - duration
+        step = calculate_step(duration) if panel.step == "auto" else panel.step
+
+        job_key = (datasource.id, query, query_start, query_end, step)
+        if job_key not in jobs:
+            jobs[job_key] = (
+                datasource.id,
+                partial(execute_cached_range_query, datasource, query, query_start, query_end, step)
+            )
+        panels_by_job.setdefault(job_key, []).append({
+            "panel_id": panel.id,
+            "panel_name": panel.name,
+            "query": query,
+            "datasource": datasource.name
+        })
+
+    async def generate_events():
+        for event in errors:
+            yield f"data: {json.dumps(event)}\n\n"
+
+        concurrency = get_settings().dashboard_query_concurrency
+        async for job_key, outcome, error in run_concurrently(jobs, concurrency):
+            step = job_key[4]
+            for panel in panels_by_job[job_key]:
+                if error is not None:
+                    event = {
+                        "type": "panel",
+                        "panel_id": panel["panel_id"],
+                        "error": getattr(error, "detail", None) or str(error)
+                    }
+                else:
+                    result, query_start, query_end = outcome
+                    data = result.get("data", {})
+                    series = data.get("result", [])
+                    event = {
+                        "type": "panel",
+                        "panel_id": panel["panel_id"],
+                        "panel_name": panel["panel_name"],
+                        "query": panel["query"],
+                        "result_type": data.get("resultType", "unknown"),
+                        "data": series,
+                        "metadata": {
+                            "start": query_start.isoformat(),
+                            "end": query_end.isoformat(),
+                            "step": step,
+                            "series_count": len(series),
+                            "datasource": panel["datasource"]
+                        }
+                    }
+                yield f"data: {json.dumps(event)}\n\n"
+
+        yield f"data: {json.dumps({'type': 'done', 'panel_count': len(rows), 'query_count': len(jobs)})}\n\n"
+
+    return StreamingResponse(
+        generate_events(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+
 @router.get("/{dashboard_id}/export")
 async def export_dashboard(
     dashboard_id: str,
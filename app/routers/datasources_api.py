@@ -14,6 +14,7 @@ from app.database import get_db
 from app.models_dashboards import PrometheusDatasource
 from app.routers.auth import get_current_user
 from app.config import get_settings
+from app.services.http_clients import get_http_client
 from cryptography.fernet import Fernet
 import base64
 
@@ -347,67 +348,69 @@ async def test_datasource(
         headers.update(datasource.custom_headers)
 
     # Test connection
-    async with httpx.AsyncClient(timeout=datasource.timeout) as client:
-        try:
-            # Try to get build info
-            response = await client.get(
-                f"{datasource.url}/api/v1/status/buildinfo",
+    client = get_http_client("prometheus", datasource.url)
+    try:
+        # Try to get build info
+        response = await client.get(
+            f"{datasource.url}/api/v1/status/buildinfo",
+            headers=headers,
+            auth=auth,
+            timeout=datasource.timeout
+        )
+
+        if response.status_code == 200:
+            build_info = response.json()
+            version = build_info.get("data", {}).get("version", "unknown")
+
+            # Also get runtime info for uptime
+            runtime_response = await client.get(
+                f"{datasource.url}/api/v1/status/runtimeinfo",
                 headers=headers,
-                auth=auth
+                auth=auth,
+                timeout=datasource.timeout
             )
 
-            if response.status_code == 200:
-                build_info = response.json()
-                version = build_info.get("data", {}).get("version", "unknown")
-
-                # Also get runtime info for uptime
-                runtime_response = await client.get(
-                    f"{datasource.url}/api/v1/status/runtimeinfo",
-                    headers=headers,
-                    auth=auth
-                )
-
-                uptime = None
-                if runtime_response.status_code == 200:
-                    runtime_data = runtime_response.json()
-                    startTime_str = runtime_data.get("data", {}).get("startTime")
-                    if startTime_str:
-                        try:
-                            # Parse RFC3339 string to datetime
-                            # Python 3.11+ supports ISO parsing including Z
-                            start_dt = datetime.fromisoformat(startTime_str.replace('Z', '+00:00'))
-                            uptime = (datetime.now(start_dt.tzinfo) - start_dt).total_seconds()
-                        except Exception:
-                            uptime = None
-
-                return DatasourceTestResult(
-                    success=True,
-                    message="Successfully connected to Prometheus",
-                    version=version,
-                    uptime_seconds=uptime
-                )
-            else:
-                return DatasourceTestResult(
-                    success=False,
-                    message=f"Failed to connect: HTTP {response.status_code}"
-                )
-
-        except httpx.TimeoutException:
-            return DatasourceTestResult(
-                success=False,
-                message=f"Connection timeout after {datasource.timeout}s"
-            )
-        except httpx.ConnectError:
+            uptime = None
+            if runtime_response.status_code == 200:
+                runtime_data = runtime_response.json()
+                startTime_str = runtime_data.get("data", {}).get("startTime")
+                if startTime_str:
+                    try:
+                        # Parse RFC3339 string to datetime
+                        # Python 3.11+ supports ISO parsing including Z
+                        start_dt = datetime.fromisoformat(startTime_str.replace('Z', '+00:00'))
+                        uptime = (datetime.now(start_dt.tzinfo) - start_dt).total_seconds()
+                    except Exception:
+                        uptime = None
+
             return DatasourceTestResult(
-                success=False,
-                message=f"Cannot connect to {datasource.url}"
+                success=True,
+                message="Successfully connected to Prometheus",
+                version=version,
+                uptime_seconds=uptime
             )
-        except Exception as e:
+        else:
             return DatasourceTestResult(
                 success=False,
-                message=f"Error: {str(e)}"
+                message=f"Failed to connect: HTTP {response.status_code}"
             )
 
+    except httpx.TimeoutException:
+        return DatasourceTestResult(
+            success=False,
+            message=f"Connection timeout after {datasource.timeout}s"
+        )
+    except httpx.ConnectError:
+        return DatasourceTestResult(
+            success=False,
+            message=f"Cannot connect to {datasource.url}"
+        )
+    except Exception as e:
+        return DatasourceTestResult(
+            success=False,
+            message=f"Error: {str(e)}"
+        )
+
 
 @router.get("/default/get", response_model=DatasourceResponse)
 async def get_default_datasource(
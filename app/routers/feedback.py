@@ -23,6 +23,7 @@ from app.schemas_learning import (
 )
 from app.services.effectiveness_service import EffectivenessService
 from app.services.similarity_service import SimilarityService
+from app.services.embedding_backfill import backfill_alert_embeddings
 from app.routers.auth import get_current_user
 
 logger = logging.getLogger(__name__)
@@ -328,7 +329,6 @@ async def generate_alert_embeddings(
     # Add background task
     background_tasks.add_task(
         _generate_embeddings_task,
-        db_session=db,
         limit=request.limit,
         force_regenerate=request.force_regenerate
     )
@@ -344,17 +344,15 @@ async def generate_alert_embeddings(
 
 
 def _generate_embeddings_task(
-    db_session: Session,
     limit: int,
     force_regenerate: bool
 ):
-    """Background task to generate embeddings."""
+    """Background task to generate embeddings (uses its own sessions, committed per chunk)."""
     try:
-        similarity_service = SimilarityService(db_session)
-        processed = similarity_service.generate_missing_embeddings(
-            limit=limit,
-            force_regenerate=force_regenerate
+        report = backfill_alert_embeddings(limit=limit, force_regenerate=force_regenerate)
+        logger.info(
+            f"Embedding generation task completed: {report.embedded}/{report.alerts} alerts embedded "
+            f"({report.unique_texts} distinct texts, {report.rate:.0f} alerts/s)"
         )
-        logger.info(f"Embedding generation task completed: {processed} alerts processed")
     except Exception as e:
         logger.error(f"Embedding generation task failed: {e}")
@@ -26,6 +26,7 @@ from app.schemas_grafana_datasource import (
 )
 from app.services.loki_client import LokiClient
 from app.services.tempo_client import TempoClient
+from app.services.http_clients import get_http_client
 from app.services.auth_service import get_current_user
 from app.models import User
 
@@ -78,28 +79,26 @@ async def test_datasource_connection(
                 return False, "Tempo is not ready", response_time_ms
 
         elif datasource_type in ["prometheus", "mimir"]:
-            # Use httpx to test prometheus/mimir ready endpoint
-            import httpx
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                response = await client.get(f"{url.rstrip('/')}/-/ready")
-                response_time_ms = (time.time() - start_time) * 1000
+            # Test prometheus/mimir ready endpoint
+            client = get_http_client(datasource_type, url)
+            response = await client.get(f"{url.rstrip('/')}/-/ready", timeout=timeout)
+            response_time_ms = (time.time() - start_time) * 1000
 
-                if response.status_code == 200:
-                    return True, f"{datasource_type.capitalize()} connection successful", response_time_ms
-                else:
-                    return False, f"{datasource_type.capitalize()} returned status {response.status_code}", response_time_ms
+            if response.status_code == 200:
+                return True, f"{datasource_type.capitalize()} connection successful", response_time_ms
+            else:
+                return False, f"{datasource_type.capitalize()} returned status {response.status_code}", response_time_ms
 
         elif datasource_type == "alertmanager":
             # Test alertmanager status endpoint
-            import httpx
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                response = await client.get(f"{url.rstrip('/')}/-/ready")
-                response_time_ms = (time.time() - start_time) * 1000
-
-                if response.status_code == 200:
-                    return True, "Alertmanager connection successful", response_time_ms
-                else:
-                    return False, f"Alertmanager returned status {response.status_code}", response_time_ms
+            client = get_http_client("alertmanager", url)
+            response = await client.get(f"{url.rstrip('/')}/-/ready", timeout=timeout)
+            response_time_ms = (time.time() - start_time) * 1000
+
+            if response.status_code == 200:
+                return True, "Alertmanager connection successful", response_time_ms
+            else:
+                return False, f"Alertmanager returned status {response.status_code}", response_time_ms
 
         else:
             return False, f"Datasource type '{datasource_type}' not supported for connection testing", None
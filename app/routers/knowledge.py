@@ -20,6 +20,7 @@ from app.schemas_knowledge import (
 from app.services.document_service import DocumentService
 from app.services.embedding_service import EmbeddingService
 from app.services.knowledge_search_service import KnowledgeSearchService
+from app.services.source_metadata import invalidate_source_metadata
 from app.services.pdf_service import PDFService
 from app.services.vision_ai_service import VisionAIService
 import os
@@ -161,6 +162,7 @@ async def create_document(
         
         db.commit()
         db.refresh(document)
+        invalidate_source_metadata()
         
         logger.info(f"Created document {document.id} with {len(chunks)} chunks")
         
@@ -267,6 +269,7 @@ async def update_document(
     
     db.commit()
     db.refresh(document)
+    invalidate_source_metadata()
     
     return document
 
@@ -284,6 +287,7 @@ async def delete_document(
         raise HTTPException(status_code=404, detail="Document not found")
     
     db.commit()
+    invalidate_source_metadata()
     
     return None
 
@@ -309,7 +313,7 @@ async def search_knowledge(
     
     search_service = KnowledgeSearchService(db)
     
-    results = search_service.search_similar(
+    results = await search_service.search_similar(
         query=query.query,
         app_id=query.app_id,
         doc_types=query.doc_types,
@@ -393,6 +397,7 @@ class GitSyncRequest(BaseModel):
     repo_url: str
     branch: str = "main"
     app_id: Optional[UUID] = None
+    incremental: bool = True  # False re-lists every file (unchanged ones are still skipped)
 
 @router.post("/sync/git", status_code=status.HTTP_200_OK)
 async def sync_git_repository(
@@ -402,7 +407,8 @@ async def sync_git_repository(
 ):
     """
     Trigger synchronization from a Git repository.
-    Clones the repo and auto-imports all markdown files.
+    Fetches the repo into a persistent mirror and imports the markdown
+    files changed since the last sync.
     """
     sync_service = GitSyncService(db)
     try:
@@ -410,8 +416,10 @@ async def sync_git_repository(
             repo_url=sync_req.repo_url,
             app_id=sync_req.app_id,
             branch=sync_req.branch,
-            user_id=current_user.id
+            user_id=current_user.id,
+            incremental=sync_req.incremental
         )
+        invalidate_source_metadata()
         return {
             "message": "Git sync completed",
             "stats": stats,
@@ -378,30 +378,24 @@ async def query_observability_formatted(
                 "architecture_type": profile.architecture_type
             })
 
-    # Check cache
+    async def execute():
+        # Execute query
+        orchestrator = get_observability_orchestrator()
+        result = await orchestrator.query(request.query, app_context)
+
+        # Format response
+        formatter = get_response_formatter()
+        return formatter.format(result)
+
+    if not use_cache:
+        return await execute()
+
+    # Serve from cache; concurrent identical queries share one execution.
+    # The parsed time range buckets the key, so "last 1h" keeps hitting
+    # until the window has moved on.
+    time_range = get_intent_parser().parse(request.query).time_range
     cache = get_query_cache()
-    if use_cache:
-        cached_result = cache.get(request.query, app_context)
-        if cached_result is not None:
-            logger.info("Returning cached formatted result")
-            return cached_result
-
-    # Execute query
-    orchestrator = get_observability_orchestrator()
-    result = await orchestrator.query(request.query, app_context)
-
-    # Format response
-    formatter = get_response_formatter()
-    formatted = formatter.format(result)
-
-    # Save to database for persistence
-
-
-    # Cache result
-    if use_cache:
-        cache.set(request.query, formatted, app_context)
-
-    return formatted
+    return await cache.get_or_load(request.query, execute, app_context, time_range=time_range)
 
 
 # ============================================================================
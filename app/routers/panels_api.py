@@ -4,16 +4,19 @@ Provides CRUD operations for managing saved panels and executing PromQL queries
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from pydantic import BaseModel, Field, field_validator
 from datetime import datetime, timedelta
 import httpx
 import uuid
 
+from app.config import get_settings
 from app.database import get_db
 from app.models_dashboards import PrometheusPanel, PrometheusDatasource, PanelType
 from app.routers.auth import get_current_user
 from app.routers.datasources_api import decrypt_password
+from app.services.http_clients import get_http_client
+from app.services.range_query_cache import get_range_query_cache, parse_step_seconds
 
 router = APIRouter(prefix="/api/panels", tags=["Panels"])
 
@@ -173,39 +176,72 @@ async def execute_prometheus_query(
         headers.update(datasource.custom_headers)
 
     # Execute query
-    async with httpx.AsyncClient(timeout=datasource.timeout) as client:
-        try:
-            response = await client.get(
-                f"{datasource.url}/api/v1/query_range",
-                params={
-                    "query": query,
-                    "start": start.timestamp(),
-                    "end": end.timestamp(),
-                    "step": step
-                },
-                headers=headers,
-                auth=auth
-            )
-
-            if response.status_code == 200:
-                return response.json()
-            else:
-                raise HTTPException(
-                    status_code=status.HTTP_502_BAD_GATEWAY,
-                    detail=f"Prometheus returned HTTP {response.status_code}: {response.text}"
-                )
+    client = get_http_client("prometheus", datasource.url)
+    try:
+        response = await client.get(
+            f"{datasource.url}/api/v1/query_range",
+            params={
+                "query": query,
+                "start": start.timestamp(),
+                "end": end.timestamp(),
+                "step": step
+            },
+            headers=headers,
+            auth=auth,
+            timeout=datasource.timeout
+        )
 
-        except httpx.TimeoutException:
-            raise HTTPException(
-                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
-                detail=f"Prometheus query timeout after {datasource.timeout}s"
-            )
-        except httpx.ConnectError:
+        if response.status_code == 200:
+            return response.json()
+        else:
             raise HTTPException(
                 status_code=status.HTTP_502_BAD_GATEWAY,
-                detail=f"Cannot connect to Prometheus at {datasource.url}"
+                detail=f"Prometheus returned HTTP {response.status_code}: {response.text}"
             )
 
+    except httpx.TimeoutException:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=f"Prometheus query timeout after {datasource.timeout}s"
+        )
+    except httpx.ConnectError:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"Cannot connect to Prometheus at {datasource.url}"
+        )
+
+
+async def execute_cached_range_query(
+    datasource: PrometheusDatasource,
+    query: str,
+    start: datetime,
+    end: datetime,
+    step: str
+) -> Tuple[Dict[str, Any], datetime, datetime]:
+    """
+    Execute a PromQL range query through the panel range query cache
+
+    The cache aligns the range to the step and only queries Prometheus
+    for samples it does not hold yet.
+
+    Returns:
+        (result, start, end) with the range as actually queried
+    """
+    step_seconds = parse_step_seconds(step)
+    if not get_settings().panel_cache_enabled or not step_seconds:
+        return await execute_prometheus_query(datasource, query, start, end, step), start, end
+
+    async def fetch(fetch_start: float, fetch_end: float) -> Dict[str, Any]:
+        return await execute_prometheus_query(
+            datasource, query, datetime.fromtimestamp(fetch_start), datetime.fromtimestamp(fetch_end), step
+        )
+
+    cache_key = (str(datasource.id), datasource.url, query, step_seconds)
+    result, start_ts, end_ts = await get_range_query_cache().query_range(
+        cache_key, fetch, start.timestamp(), end.timestamp(), step_seconds
+    )
+    return result, datetime.fromtimestamp(start_ts, tz=start.tzinfo), datetime.fromtimestamp(end_ts, tz=end.tzinfo)
+
 
 # API Endpoints
 @router.get("/", response_model=List[PanelResponse])
@@ -436,60 +472,61 @@ async def test_query(
         headers.update(datasource.custom_headers)
 
     # Execute test query (instant query for speed)
-    async with httpx.AsyncClient(timeout=datasource.timeout) as client:
-        try:
-            response = await client.get(
-                f"{datasource.url}/api/v1/query",
-                params={"query": request.promql_query},
-                headers=headers,
-                auth=auth
-            )
+    client = get_http_client("prometheus", datasource.url)
+    try:
+        response = await client.get(
+            f"{datasource.url}/api/v1/query",
+            params={"query": request.promql_query},
+            headers=headers,
+            auth=auth,
+            timeout=datasource.timeout
+        )
 
-            if response.status_code == 200:
-                data = response.json()
-
-                if data.get("status") == "success":
-                    result = data.get("data", {}).get("result", [])
-                    result_type = data.get("data", {}).get("resultType", "unknown")
-
-                    # Sample data (first 5 series)
-                    sample = result[:5] if len(result) > 5 else result
-
-                    return QueryTestResponse(
-                        valid=True,
-                        message=f"Query valid, returned {len(result)} series",
-                        result_type=result_type,
-                        series_count=len(result),
-                        sample_data=sample
-                    )
-                else:
-                    error_msg = data.get("error", "Unknown error")
-                    return QueryTestResponse(
-                        valid=False,
-                        message=f"Query error: {error_msg}"
-                    )
+        if response.status_code == 200:
+            data = response.json()
+
+            if data.get("status") == "success":
+                result = data.get("data", {}).get("result", [])
+                result_type = data.get("data", {}).get("resultType", "unknown")
+
+                # Sample data (first 5 series)
+                sample = result[:5] if len(result) > 5 else result
+
+                return QueryTestResponse(
+                    valid=True,
+                    message=f"Query valid, returned {len(result)} series",
+                    result_type=result_type,
+                    series_count=len(result),
+                    sample_data=sample
+                )
             else:
+                error_msg = data.get("error", "Unknown error")
                 return QueryTestResponse(
                     valid=False,
-                    message=f"HTTP {response.status_code}: {response.text}"
+                    message=f"Query error: {error_msg}"
                 )
-
-        except httpx.TimeoutException:
-            return QueryTestResponse(
-                valid=False,
-                message=f"Query timeout after {datasource.timeout}s"
-            )
-        except httpx.ConnectError:
-            return QueryTestResponse(
-                valid=False,
-                message=f"Cannot connect to {datasource.url}"
-            )
-        except Exception as e:
+        else:
             return QueryTestResponse(
                 valid=False,
-                message=f"Error: {str(e)}"
+                message=f"HTTP {response.status_code}: {response.text}"
             )
 
+    except httpx.TimeoutException:
+        return QueryTestResponse(
+            valid=False,
+            message=f"Query timeout after {datasource.timeout}s"
+        )
+    except httpx.ConnectError:
+        return QueryTestResponse(
+            valid=False,
+            message=f"Cannot connect to {datasource.url}"
+        )
+    except Exception as e:
+        return QueryTestResponse(
+            valid=False,
+            message=f"Error: {str(e)}"
+        )
+
 
 @router.get("/{panel_id}/data", response_model=PanelDataResponse)
 async def get_panel_data(
@@ -546,7 +583,7 @@ async def get_panel_data(
             step = panel.step
 
     # Execute query
-    result = await execute_prometheus_query(
+    result, start, end = await execute_cached_range_query(
         datasource, panel.promql_query, start, end, step
     )
 
@@ -14,6 +14,7 @@ from typing import Optional
 from app.services.auth_service import get_current_user
 from app.models import User
 from app.config import get_settings
+from app.services.http_clients import get_http_client
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -49,25 +50,25 @@ async def proxy_prometheus(path: str, request: Request, current_user: User = Dep
     # Read body for POST
     body = await request.body()
     
-    client = httpx.AsyncClient(timeout=60.0)
+    client = get_http_client("prometheus", PROMETHEUS_URL)
     req = client.build_request(
         method=request.method,
         url=url,
         headers=headers,
         params=request.query_params,
-        content=body
+        content=body,
+        timeout=60.0
     )
 
     try:
         response = await client.send(req, stream=True)
     except httpx.RequestError as exc:
-        await client.aclose()
         logger.error(f"Prometheus proxy connection error: {exc}")
         return Response(content=f"Error connecting to Prometheus: {exc}", status_code=502)
 
     # Handle redirects
     if response.status_code in [301, 302, 307, 308] and 'location' in response.headers:
-        await client.aclose()
+        await response.aclose()
         location = response.headers['location']
         if location.startswith(PROMETHEUS_URL):
             location = location.replace(PROMETHEUS_URL, "/prometheus")
@@ -81,7 +82,7 @@ async def proxy_prometheus(path: str, request: Request, current_user: User = Dep
     if 'text/html' in content_type:
         try:
             content = await response.aread() 
-            await client.aclose()
+            await response.aclose()
             
             html_content = content.decode('utf-8', errors='replace')
             
@@ -104,7 +105,7 @@ async def proxy_prometheus(path: str, request: Request, current_user: User = Dep
             return HTMLResponse(content=html_content, status_code=response.status_code)
             
         except Exception as e:
-            await client.aclose()
+            await response.aclose()
             logger.error(f"Error injecting into Prometheus response: {e}")
             return Response(content="Error processing response", status_code=500)
 
@@ -113,5 +114,5 @@ async def proxy_prometheus(path: str, request: Request, current_user: User = Dep
         response.aiter_raw(),
         status_code=response.status_code,
         headers=dict(response.headers),
-        background=BackgroundTask(client.aclose)
+        background=BackgroundTask(response.aclose)
     )
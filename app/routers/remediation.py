@@ -5,36 +5,46 @@ Provides CRUD operations for runbooks, triggers, executions, and safety controls
 Supports IaC import/export via YAML format.
 """
 
+import asyncio
+import json
 from datetime import datetime, timezone, timedelta
 from typing import List, Optional, Dict, Any
 from uuid import UUID, uuid4
 import yaml
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Query, status, BackgroundTasks, WebSocket, WebSocketDisconnect
 from fastapi.responses import Response
 from sqlalchemy import select, func, and_, or_, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, Session
 
-from ..database import get_async_db
+from ..database import get_async_db, get_db, async_session_factory
 from ..models import User, ServerCredential
 from ..models_remediation import (
     Runbook, RunbookStep, RunbookTrigger,
-    RunbookExecution, StepExecution, CircuitBreaker, BlackoutWindow
+    RunbookExecution, StepExecution, CircuitBreaker, BlackoutWindow, FleetExecution
 )
 from ..schemas_remediation import (
     RunbookCreate, RunbookUpdate, RunbookResponse, RunbookListResponse,
     RunbookStepCreate, RunbookStepResponse,
     RunbookTriggerCreate, RunbookTriggerResponse,
     ExecuteRunbookRequest, RunbookExecutionResponse, ExecutionListResponse,
-    ApprovalRequest, StepExecutionResponse,
+    ApprovalRequest, StepExecutionResponse, StepOutputRangeResponse,
     BlackoutWindowCreate, BlackoutWindowUpdate, BlackoutWindowResponse,
     CircuitBreakerResponse, CircuitBreakerOverride,
     ImportRunbookRequest, ImportRunbookResponse,
-    RunbookYAML
+    RunbookYAML,
+    FleetExecutionRequest, FleetExecutionResponse, FleetHostResult
 )
-from ..services.auth_service import get_current_user, require_role
+from ..services.auth_service import get_current_user, require_role, get_current_user_ws
 from ..services.runbook_knowledge_service import RunbookKnowledgeService
+from ..services.trigger_matcher import invalidate_trigger_index
+from ..services.source_metadata import invalidate_source_metadata
+from ..services.execution_worker import notify_execution_ready
+from ..services.fleet_executor import (
+    resolve_fleet_targets, request_fleet_cancel, wake_fleet_worker
+)
+from ..services.step_output import read_output_range, read_new_chunks, subscribe_output
 
 router = APIRouter(prefix="/api/remediation", tags=["Auto-Remediation"])
 
@@ -209,6 +219,8 @@ async def create_runbook(
     db.add(circuit_breaker)
     
     await db.commit()
+    invalidate_trigger_index()
+    invalidate_source_metadata()
     
     # Reload with relationships
     result = await db.execute(
@@ -374,6 +386,8 @@ async def update_runbook(
         runbook.version += 1
 
         await db.commit()
+        invalidate_trigger_index()
+        invalidate_source_metadata()
 
         # Reload with relationships
         result = await db.execute(
@@ -422,6 +436,8 @@ async def delete_runbook(
 
     await db.delete(runbook)
     await db.commit()
+    invalidate_trigger_index()
+    invalidate_source_metadata()
 
 
 @router.post("/runbooks/{runbook_id}/clone", response_model=RunbookResponse, status_code=status.HTTP_201_CREATED)
@@ -537,6 +553,8 @@ async def clone_runbook(
     db.add(circuit_breaker)
 
     await db.commit()
+    invalidate_trigger_index()
+    invalidate_source_metadata()
 
     # Reload with relationships
     result = await db.execute(
@@ -655,6 +673,8 @@ async def bulk_runbook_action(
             affected_count += 1
 
     await db.commit()
+    invalidate_trigger_index()
+    invalidate_source_metadata()
 
     return {
         "success": True,
@@ -718,6 +738,7 @@ async def add_step(
     
     await db.commit()
     await db.refresh(step)
+    invalidate_source_metadata()
     
     return step
 
@@ -752,6 +773,7 @@ async def delete_step(
     
     await db.delete(step)
     await db.commit()
+    invalidate_source_metadata()
 
 
 # ============================================================================
@@ -792,6 +814,7 @@ async def add_trigger(
     )
     db.add(trigger)
     await db.commit()
+    invalidate_trigger_index()
     await db.refresh(trigger)
     
     return trigger
@@ -820,6 +843,7 @@ async def delete_trigger(
     
     await db.delete(trigger)
     await db.commit()
+    invalidate_trigger_index()
 
 
 # ============================================================================
@@ -1069,6 +1093,8 @@ async def import_runbook_yaml(
         db.add(circuit_breaker)
     
     await db.commit()
+    invalidate_trigger_index()
+    invalidate_source_metadata()
     
     return ImportRunbookResponse(
         success=True,
@@ -1138,6 +1164,49 @@ async def list_executions(
     return response
 
 
+async def _check_manual_execution_allowed(
+    db: AsyncSession,
+    runbook: Runbook,
+    bypass_cooldown: bool,
+    bypass_blackout: bool
+):
+    """Raise 503 if the runbook's circuit breaker is open or a blackout window is active."""
+    result = await db.execute(
+        select(CircuitBreaker).where(
+            and_(CircuitBreaker.scope == "runbook", CircuitBreaker.scope_id == runbook.id)
+        )
+    )
+    circuit_breaker = result.scalar_one_or_none()
+    
+    if circuit_breaker and circuit_breaker.state == "open" and not bypass_cooldown:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Circuit breaker is open - runbook execution temporarily disabled"
+        )
+    
+    if bypass_blackout:
+        return
+    
+    now = utc_now()
+    result = await db.execute(
+        select(BlackoutWindow).where(
+            and_(
+                BlackoutWindow.enabled == True,
+                BlackoutWindow.recurrence == "once",
+                BlackoutWindow.start_time <= now,
+                BlackoutWindow.end_time >= now
+            )
+        )
+    )
+    blackout = result.scalars().first()
+    
+    if blackout:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Execution blocked by blackout window: {blackout.name}"
+        )
+
+
 @router.post("/executions", response_model=RunbookExecutionResponse, status_code=status.HTTP_201_CREATED)
 async def execute_runbook(
     exec_request: ExecuteRunbookRequest,
@@ -1187,40 +1256,9 @@ async def execute_runbook(
                 detail=f"Server {server_id} not found"
             )
     
-    # Check circuit breaker
-    result = await db.execute(
-        select(CircuitBreaker).where(
-            and_(CircuitBreaker.scope == "runbook", CircuitBreaker.scope_id == runbook.id)
-        )
+    await _check_manual_execution_allowed(
+        db, runbook, exec_request.bypass_cooldown, exec_request.bypass_blackout
     )
-    circuit_breaker = result.scalar_one_or_none()
-    
-    if circuit_breaker and circuit_breaker.state == "open" and not exec_request.bypass_cooldown:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Circuit breaker is open - runbook execution temporarily disabled"
-        )
-    
-    # Check blackout windows
-    if not exec_request.bypass_blackout:
-        now = utc_now()
-        result = await db.execute(
-            select(BlackoutWindow).where(
-                and_(
-                    BlackoutWindow.enabled == True,
-                    BlackoutWindow.recurrence == "once",
-                    BlackoutWindow.start_time <= now,
-                    BlackoutWindow.end_time >= now
-                )
-            )
-        )
-        blackout = result.scalar_one_or_none()
-        
-        if blackout:
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail=f"Execution blocked by blackout window: {blackout.name}"
-            )
     
     # Determine initial status
     if runbook.approval_required and not exec_request.dry_run:
@@ -1250,6 +1288,8 @@ async def execute_runbook(
         variables_json=exec_request.variables
     )
     db.add(execution)
+    if initial_status == "running":
+        await notify_execution_ready(db)
     await db.commit()
     
     result = await db.execute(
@@ -1354,7 +1394,8 @@ async def approve_execution(
         execution.status = "approved"
         execution.approved_by = current_user.id
         execution.approved_at = utc_now()
-        # The background ExecutionWorker will pick up and execute approved runbooks
+        # Wakes the background ExecutionWorker, which executes approved runbooks
+        await notify_execution_ready(db)
     else:
         execution.status = "cancelled"
         execution.rejection_reason = approval.reason
@@ -1465,6 +1506,8 @@ async def retry_execution(
     )
 
     db.add(new_execution)
+    if initial_status == "running":
+        await notify_execution_ready(db)
     await db.commit()
 
     # Reload with steps for response
@@ -1588,6 +1631,306 @@ async def test_single_step(
     return step_execution
 
 
+# ============================================================================
+# STEP OUTPUT
+# ============================================================================
+
+# Viewers on other replicas aren't woken in-process, so the stream also polls
+OUTPUT_STREAM_POLL_SECONDS = 1.0
+WS_CLOSE_AUTH_FAILED = 4001
+WS_CLOSE_NOT_FOUND = 4004
+
+
+@router.get(
+    "/executions/{execution_id}/steps/{step_execution_id}/output",
+    response_model=StepOutputRangeResponse
+)
+async def get_step_output(
+    execution_id: UUID,
+    step_execution_id: UUID,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(65536, ge=1, le=1048576),
+    stream: Optional[str] = Query(None, pattern="^(stdout|stderr)$"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Read a range of a step's streamed output.
+
+    Page through with ``offset=next_offset`` until ``complete``. Offsets count
+    characters across both streams; output dropped by head/tail retention
+    is skipped.
+    """
+    step_execution = await db.get(StepExecution, step_execution_id)
+    if not step_execution or step_execution.execution_id != execution_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Step execution {step_execution_id} not found"
+        )
+
+    page = await read_output_range(db, step_execution_id, offset, limit, stream)
+    finished = step_execution.completed_at is not None
+    total = max(step_execution.output_chars or 0, page["stored_end"])
+
+    return StepOutputRangeResponse(
+        step_execution_id=step_execution_id,
+        status=step_execution.status,
+        offset=offset,
+        next_offset=page["next_offset"],
+        total_chars=total,
+        dropped_chars=step_execution.output_dropped_chars or 0,
+        complete=finished and page["next_offset"] >= page["stream_end"],
+        chunks=page["chunks"]
+    )
+
+
+@router.websocket("/executions/{execution_id}/output/ws")
+async def stream_execution_output(
+    websocket: WebSocket,
+    execution_id: UUID,
+    token: str = Query(...),
+    db: Session = Depends(get_db)
+):
+    """
+    Live output of an execution's steps.
+
+    Sends ``{"type": "chunk", ...}`` messages in the order output was stored
+    (head and current tail for viewers that join late), then
+    ``{"type": "complete", "status": ...}`` once the execution has finished.
+    """
+    user = await get_current_user_ws(token, db)
+    if not user:
+        await websocket.close(code=WS_CLOSE_AUTH_FAILED)
+        return
+
+    await websocket.accept()
+    last_id = 0
+    try:
+        async with subscribe_output(execution_id) as updated:
+            while True:
+                updated.clear()
+                async with async_session_factory() as adb:
+                    execution = await adb.get(RunbookExecution, execution_id)
+                    if execution is None:
+                        await websocket.close(code=WS_CLOSE_NOT_FOUND)
+                        return
+                    chunks = await read_new_chunks(adb, execution_id, last_id)
+
+                for chunk, step_order in chunks:
+                    last_id = chunk.id
+                    await websocket.send_text(json.dumps({
+                        "type": "chunk",
+                        "step_execution_id": str(chunk.step_execution_id),
+                        "step_order": step_order,
+                        "seq": chunk.seq,
+                        "stream": chunk.stream,
+                        "offset": chunk.offset,
+                        "content": chunk.content,
+                    }))
+
+                if chunks:
+                    continue  # drain backlog before waiting
+                if execution.completed_at is not None:
+                    await websocket.send_text(json.dumps({"type": "complete", "status": execution.status}))
+                    await websocket.close()
+                    return
+
+                try:
+                    await asyncio.wait_for(updated.wait(), timeout=OUTPUT_STREAM_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+    except WebSocketDisconnect:
+        pass
+
+
+# ============================================================================
+# FLEET EXECUTIONS
+# ============================================================================
+
+def _fleet_response(fleet: FleetExecution) -> FleetExecutionResponse:
+    """Build the aggregated fleet view from a fleet loaded with its host executions."""
+    hosts = [
+        FleetHostResult(
+            execution_id=ex.id,
+            server_id=ex.server_id,
+            server_name=ex.server.name if ex.server else None,
+            batch=ex.fleet_batch,
+            status=ex.status,
+            steps_completed=ex.steps_completed or 0,
+            steps_failed=ex.steps_failed or 0,
+            error_message=ex.error_message,
+            started_at=ex.started_at,
+            completed_at=ex.completed_at
+        )
+        for ex in fleet.executions
+    ]
+    status_counts: Dict[str, int] = {}
+    for host in hosts:
+        status_counts[host.status] = status_counts.get(host.status, 0) + 1
+
+    return FleetExecutionResponse(
+        id=fleet.id,
+        runbook_id=fleet.runbook_id,
+        runbook_name=fleet.runbook.name if fleet.runbook else None,
+        status=fleet.status,
+        stop_reason=fleet.stop_reason,
+        server_group_id=fleet.server_group_id,
+        label_selector=fleet.label_selector_json,
+        dry_run=fleet.dry_run,
+        parallelism=fleet.parallelism,
+        batch_size=fleet.batch_size,
+        batch_percent=fleet.batch_percent,
+        max_failure_ratio=fleet.max_failure_ratio,
+        servers_total=fleet.servers_total or 0,
+        servers_succeeded=fleet.servers_succeeded or 0,
+        servers_failed=fleet.servers_failed or 0,
+        servers_skipped=fleet.servers_skipped or 0,
+        batches_total=fleet.batches_total or 0,
+        batches_completed=fleet.batches_completed or 0,
+        created_at=fleet.created_at,
+        started_at=fleet.started_at,
+        completed_at=fleet.completed_at,
+        status_counts=status_counts,
+        hosts=hosts
+    )
+
+
+async def _load_fleet(db: AsyncSession, fleet_id: UUID) -> FleetExecution:
+    result = await db.execute(
+        select(FleetExecution)
+        .options(
+            selectinload(FleetExecution.runbook),
+            selectinload(FleetExecution.executions).selectinload(RunbookExecution.server)
+        )
+        .where(FleetExecution.id == fleet_id)
+        .execution_options(populate_existing=True)
+    )
+    fleet = result.scalar_one_or_none()
+    if not fleet:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Fleet execution {fleet_id} not found"
+        )
+    return fleet
+
+
+@router.post("/runbooks/{runbook_id}/fleet-executions", response_model=FleetExecutionResponse, status_code=status.HTTP_201_CREATED)
+async def execute_runbook_on_fleet(
+    runbook_id: UUID,
+    fleet_request: FleetExecutionRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(require_role(["admin", "engineer", "operator"]))
+):
+    """
+    Fan a runbook out across a server group and/or label selector.
+
+    Hosts run in rolling batches (batch_size or batch_percent) with at most
+    `parallelism` at once; the rollout stops when the failure ratio exceeds
+    max_failure_ratio. Poll GET /fleet-executions/{id} for the aggregated result.
+    """
+    runbook = await db.get(Runbook, runbook_id)
+    if not runbook:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Runbook {runbook_id} not found"
+        )
+
+    if not runbook.enabled:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Runbook is disabled"
+        )
+
+    # Same gates as a single-host run; approval is per execution, so an
+    # approval-gated runbook cannot be fanned out (dry runs need no approval)
+    await _check_manual_execution_allowed(
+        db, runbook, fleet_request.bypass_cooldown, fleet_request.bypass_blackout
+    )
+
+    if runbook.approval_required and not fleet_request.dry_run:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Runbook requires approval and cannot be executed on a fleet; run it per host or as a dry run"
+        )
+
+    if not fleet_request.server_group_id and not fleet_request.label_selector:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Either server_group_id or label_selector is required"
+        )
+
+    try:
+        targets = await resolve_fleet_targets(
+            db,
+            fleet_request.server_group_id,
+            fleet_request.label_selector,
+            runbook.target_os_filter
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if not targets:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No servers match the requested group/selector"
+        )
+
+    fleet = FleetExecution(
+        runbook_id=runbook.id,
+        runbook_version=runbook.version,
+        server_group_id=fleet_request.server_group_id,
+        label_selector_json=fleet_request.label_selector,
+        alert_id=fleet_request.alert_id,
+        triggered_by=current_user.id,
+        dry_run=fleet_request.dry_run,
+        variables_json=fleet_request.variables,
+        parallelism=fleet_request.parallelism,
+        batch_size=fleet_request.batch_size,
+        batch_percent=fleet_request.batch_percent,
+        max_failure_ratio=fleet_request.max_failure_ratio,
+        servers_total=len(targets),
+        target_server_ids=[str(server.id) for server in targets],
+        created_at=utc_now()
+    )
+    db.add(fleet)
+    await db.commit()
+
+    # The FleetWorker on some replica leases and coordinates the fleet
+    wake_fleet_worker()
+
+    return _fleet_response(await _load_fleet(db, fleet.id))
+
+
+@router.get("/fleet-executions/{fleet_id}", response_model=FleetExecutionResponse)
+async def get_fleet_execution(
+    fleet_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get a fleet execution with per-host results and status counts."""
+    return _fleet_response(await _load_fleet(db, fleet_id))
+
+
+@router.post("/fleet-executions/{fleet_id}/cancel", response_model=FleetExecutionResponse)
+async def cancel_fleet(
+    fleet_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(require_role(["admin", "engineer", "operator"]))
+):
+    """Stop a fleet execution; hosts not yet started are cancelled, running ones finish."""
+    fleet = await _load_fleet(db, fleet_id)
+
+    if fleet.status not in ["pending", "running"]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cannot cancel fleet execution with status: {fleet.status}"
+        )
+
+    await request_fleet_cancel(db, fleet.id)
+
+    return _fleet_response(await _load_fleet(db, fleet.id))
+
+
 # ============================================================================
 # CIRCUIT BREAKERS
 # ============================================================================
@@ -2274,6 +2617,8 @@ async def create_runbook_from_template(
     db.add(circuit_breaker)
 
     await db.commit()
+    invalidate_trigger_index()
+    invalidate_source_metadata()
 
     # Reload with relationships
     result = await db.execute(
@@ -14,7 +14,7 @@ from app.schemas import (
     RuleTestRequest, RuleTestResponse
 )
 from app.services.auth_service import get_current_user, require_admin
-from app.services.rules_engine import test_rules
+from app.services.rules_engine import test_rules, invalidate_rule_index
 
 router = APIRouter(prefix="/api/rules", tags=["Rules"])
 
@@ -64,6 +64,7 @@ async def create_rule(
     db.add(rule)
     db.commit()
     db.refresh(rule)
+    invalidate_rule_index()
     
     # Audit log
     audit = AuditLog(
@@ -134,6 +135,7 @@ async def update_rule(
     
     db.commit()
     db.refresh(rule)
+    invalidate_rule_index()
     
     # Audit log
     audit = AuditLog(
@@ -181,6 +183,7 @@ async def delete_rule(
     
     db.delete(rule)
     db.commit()
+    invalidate_rule_index()
     
     return {"message": "Rule deleted successfully"}
 
@@ -230,6 +233,7 @@ async def toggle_rule(
     
     rule.enabled = not rule.enabled
     db.commit()
+    invalidate_rule_index()
     
     # Audit log
     audit = AuditLog(
@@ -14,6 +14,7 @@ import uuid
 import secrets
 
 from app.database import get_db
+from app.services.http_clients import get_http_client
 from app.models_dashboards import (
     Dashboard, DashboardSnapshot, DashboardPanel, PrometheusPanel,
     DashboardVariable, DashboardAnnotation
@@ -266,7 +267,6 @@ async def query_snapshot_data(
     This is a public endpoint (no auth required) to allow snapshot pages
     to display live chart data.
     """
-    import httpx
     from datetime import timedelta
     
     # Get the default datasource
@@ -308,24 +308,25 @@ async def query_snapshot_data(
         step = f"{step_seconds // 3600}h"
     
     try:
-        async with httpx.AsyncClient(timeout=30) as client:
-            response = await client.get(
-                f"{datasource.url}/api/v1/query_range",
-                params={
-                    "query": promql_query,
-                    "start": start.timestamp(),
-                    "end": end.timestamp(),
-                    "step": step
-                }
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                if data.get("status") == "success":
-                    return {"data": data.get("data", {}).get("result", [])}
-                else:
-                    return {"data": [], "error": data.get("error", "Query failed")}
+        client = get_http_client("prometheus", datasource.url)
+        response = await client.get(
+            f"{datasource.url}/api/v1/query_range",
+            params={
+                "query": promql_query,
+                "start": start.timestamp(),
+                "end": end.timestamp(),
+                "step": step
+            },
+            timeout=30
+        )
+        
+        if response.status_code == 200:
+            data = response.json()
+            if data.get("status") == "success":
+                return {"data": data.get("data", {}).get("result", [])}
             else:
-                return {"data": [], "error": f"HTTP {response.status_code}"}
+                return {"data": [], "error": data.get("error", "Query failed")}
+        else:
+            return {"data": [], "error": f"HTTP {response.status_code}"}
     except Exception as e:
         return {"data": [], "error": str(e)}
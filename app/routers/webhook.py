@@ -9,18 +9,17 @@ Handles incoming alerts from Alertmanager and triggers:
 import time
 from datetime import datetime, timezone
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
-from sqlalchemy.orm import Session
 from sqlalchemy.ext.asyncio import AsyncSession
 import logging
 
-from app.database import get_db, get_async_db
-from app.models import Alert, LLMProvider, IncidentMetrics
+from app.database import get_async_db
+from app.models import Alert
 from app.schemas import AlertmanagerWebhook
-from app.services.rules_engine import find_matching_rule
+from app.services.alert_ingestion_service import ingest_alerts
 from app.services.llm_service import analyze_alert
 from app.metrics import (
-    ALERTS_RECEIVED, ALERTS_PROCESSED, ALERTS_ANALYZED,
-    WEBHOOK_REQUESTS, WEBHOOK_DURATION
+    ALERTS_PROCESSED, ALERTS_ANALYZED,
+    WEBHOOK_REQUESTS, WEBHOOK_DURATION, WEBHOOK_BATCH_SIZE
 )
 
 logger = logging.getLogger(__name__)
@@ -28,10 +27,20 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/webhook", tags=["Webhook"])
 
 
+async def _run_in_background(handler, alert_id: str):
+    """Run a queue handler in-process, for when the ingest queue is disabled."""
+    try:
+        await handler(alert_id)
+    except Exception:
+        # Already logged by the handler; keep later background tasks running
+        pass
+
+
 async def perform_auto_remediation(alert_id: str):
     """
-    Background task to check for matching runbook triggers
-    and initiate auto-remediation if configured.
+    Ingest queue handler that checks for matching runbook triggers
+    and initiates auto-remediation if configured.
+    Raises on failure so the queue can retry.
     """
     from app.database import AsyncSessionLocal
     from app.services.trigger_matcher import AlertTriggerMatcher
@@ -56,6 +65,10 @@ async def perform_auto_remediation(alert_id: str):
             trigger_matcher = AlertTriggerMatcher(db)
             remediation_result = await trigger_matcher.process_alert_for_remediation(alert)
             
+            # process_alert_for_remediation reports errors instead of raising
+            if remediation_result.get("error"):
+                raise RuntimeError(f"Remediation processing failed: {remediation_result['error']}")
+            
             if remediation_result.get("auto_executed"):
                 logger.info(
                     f"Auto-remediation triggered for alert {alert.alert_name}: "
@@ -76,13 +89,15 @@ async def perform_auto_remediation(alert_id: str):
                 
         except Exception as e:
             logger.error(f"Auto-remediation check failed for alert {alert_id}: {str(e)}")
+            raise
         finally:
             await db.close()
 
 
 async def perform_auto_analysis(alert_id: str):
     """
-    Background task to perform auto-analysis on an alert.
+    Ingest queue handler that performs auto-analysis on an alert.
+    Raises on failure so the queue can retry.
     """
     from app.database import SessionLocal
     
@@ -114,6 +129,7 @@ async def perform_auto_analysis(alert_id: str):
     except Exception as e:
         logger.error(f"Auto-analysis failed for alert {alert_id}: {str(e)}")
         ALERTS_ANALYZED.labels(provider="unknown", status="error").inc()
+        raise
     finally:
         db.close()
 
@@ -122,151 +138,57 @@ async def perform_auto_analysis(alert_id: str):
 async def receive_alertmanager_webhook(
     webhook: AlertmanagerWebhook,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Receive alerts from Alertmanager.
     
     This endpoint:
-    1. Stores all incoming alerts
+    1. Stores all incoming alerts in one batch (bulk dedup + multi-row insert)
     2. Matches each alert against rules
     3. Based on rule action:
        - auto_analyze: Queue for AI analysis
        - ignore: Store but mark as ignored
        - manual: Store and wait for user action
+    4. Queues an auto-remediation check for every stored alert
+    
+    Analysis and remediation are drained from the ingest queue by
+    IngestQueueWorker consumers, not by the web worker handling this request.
     """
     start_time = time.time()
     WEBHOOK_REQUESTS.inc()
+    WEBHOOK_BATCH_SIZE.observe(len(webhook.alerts))
     
     from app.config import get_settings
-    settings = get_settings()
-    
-    processed = []
+    use_queue = get_settings().ingest_queue_enabled
     
-    for alert_data in webhook.alerts:
-        try:
-            # Extract alert details
-            labels = alert_data.labels
-            annotations = alert_data.annotations
-            
-            alert_name = labels.get("alertname", "Unknown")
-            severity = labels.get("severity", "unknown")
-            instance = labels.get("instance", "")
-            job = labels.get("job", "")
-            fingerprint = alert_data.fingerprint
-            
-            # Record alert received metric
-            ALERTS_RECEIVED.labels(severity=severity, status=alert_data.status).inc()
-            
-            # Parse timestamp
-            try:
-                timestamp = datetime.fromisoformat(alert_data.startsAt.replace("Z", "+00:00"))
-            except:
-                timestamp = datetime.now(timezone.utc)
-            
-            # Check if alert already exists (by fingerprint and timestamp)
-            existing = db.query(Alert).filter(
-                Alert.fingerprint == fingerprint,
-                Alert.timestamp == timestamp
-            ).first()
-            
-            if existing:
-                # Update status if changed
-                if existing.status != alert_data.status:
-                    existing.status = alert_data.status
-                    db.commit()
-                processed.append({
-                    "alert_name": alert_name,
-                    "action": "updated",
-                    "id": str(existing.id)
-                })
-                continue
-            
-            # Find matching rule
-            matched_rule, action = find_matching_rule(db, alert_name, severity, instance, job)
-            
-            # Handle ignored alerts
-            if action == "ignore":
-                logger.info(f"Ignoring alert: {alert_name} (matched rule: {matched_rule.name if matched_rule else 'none'})")
-                ALERTS_PROCESSED.labels(action="ignore").inc()
-                processed.append({
-                    "alert_name": alert_name,
-                    "action": "ignored"
-                })
-                continue
-            
-            # Create alert record
-            alert = Alert(
-                fingerprint=fingerprint,
-                timestamp=timestamp,
-                alert_name=alert_name,
-                severity=severity,
-                instance=instance,
-                job=job,
-                status=alert_data.status,
-                labels_json=labels,
-                annotations_json=annotations,
-                raw_alert_json=alert_data.model_dump(),
-                matched_rule_id=matched_rule.id if matched_rule else None,
-                action_taken=action if action != "manual" else "pending",
-                analyzed=False
-            )
-            
-            db.add(alert)
-            db.commit()
-            db.refresh(alert)
-            
-            # Create incident metrics
-            metric = IncidentMetrics(
-                alert_id=alert.id,
-                incident_started=timestamp,
-                incident_detected=timestamp,  # Same as started for now
-                service_name=job or labels.get("service") or labels.get("app"),
-                severity=severity
-            )
-            metric.calculate_durations()
-            db.add(metric)
-            db.commit()
-            
-            logger.info(f"Stored alert: {alert_name} (action: {action})")
-            
-            # Queue auto-analysis if needed
-            if action == "auto_analyze":
-                background_tasks.add_task(
-                    perform_auto_analysis,
-                    str(alert.id)
-                )
-                ALERTS_PROCESSED.labels(action="auto_analyze").inc()
-                processed.append({
-                    "alert_name": alert_name,
-                    "action": "auto_analyze_queued",
-                    "id": str(alert.id)
-                })
-            else:
-                ALERTS_PROCESSED.labels(action="manual").inc()
-                processed.append({
-                    "alert_name": alert_name,
-                    "action": "stored_pending",
-                    "id": str(alert.id)
-                })
-            
-            # Always check for auto-remediation triggers (runs in background)
-            background_tasks.add_task(
-                perform_auto_remediation,
-                str(alert.id)
-            )
-                
-        except Exception as e:
-            logger.error(f"Error processing alert: {str(e)}")
-            ALERTS_PROCESSED.labels(action="error").inc()
-            processed.append({
+    try:
+        # Follow-up work is written to the durable ingest queue in the same transaction
+        result = await ingest_alerts(db, webhook.alerts, enqueue=use_queue)
+    except Exception as e:
+        logger.error(f"Error processing webhook payload: {str(e)}")
+        await db.rollback()
+        ALERTS_PROCESSED.labels(action="error").inc(len(webhook.alerts))
+        processed = [
+            {
                 "alert_name": alert_data.labels.get("alertname", "Unknown"),
                 "action": "error",
                 "error": str(e)
-            })
-    
-    # Record webhook processing duration
-    WEBHOOK_DURATION.observe(time.time() - start_time)
+            }
+            for alert_data in webhook.alerts
+        ]
+    else:
+        processed = result.processed
+        
+        if not use_queue:
+            # Queue disabled: fall back to in-process background tasks
+            for alert_id in result.analyze_ids:
+                background_tasks.add_task(_run_in_background, perform_auto_analysis, alert_id)
+            for alert_id in result.remediate_ids:
+                background_tasks.add_task(_run_in_background, perform_auto_remediation, alert_id)
+    finally:
+        # Record webhook processing duration for the whole payload
+        WEBHOOK_DURATION.observe(time.time() - start_time)
     
     return {
         "status": "received",
@@ -337,10 +337,13 @@ class StepExecutionResponse(BaseModel):
     status: StepStatus
     command_executed: Optional[str]
 
-    # Command execution output
+    # Command execution output (stdout/stderr are the first 10k chars;
+    # read the full output from /executions/{id}/steps/{step_id}/output)
     stdout: Optional[str]
     stderr: Optional[str]
     exit_code: Optional[int]
+    output_chars: Optional[int] = None
+    output_dropped_chars: Optional[int] = None
 
     # API execution output
     http_status_code: Optional[int]
@@ -360,6 +363,26 @@ class StepExecutionResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class StepOutputChunkResponse(BaseModel):
+    """A slice of streamed step output."""
+    seq: int
+    stream: str
+    offset: int
+    content: str
+
+
+class StepOutputRangeResponse(BaseModel):
+    """A range read of a step's streamed output."""
+    step_execution_id: UUID
+    status: StepStatus
+    offset: int
+    next_offset: int
+    total_chars: int
+    dropped_chars: int
+    complete: bool
+    chunks: List[StepOutputChunkResponse] = []
+
+
 class RunbookExecutionResponse(BaseModel):
     """Schema for runbook execution response."""
     id: UUID
@@ -422,6 +445,62 @@ class ExecutionListResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class FleetExecutionRequest(BaseModel):
+    """Schema for fanning a runbook out across a server group or label selector."""
+    server_group_id: Optional[UUID] = None  # Includes subgroups
+    label_selector: Optional[Dict[str, Any]] = None  # environment, os_type, protocol, tags
+    parallelism: int = Field(default=10, ge=1, le=500)  # Hosts running at once, capped by fleet_max_parallelism
+    batch_size: Optional[int] = Field(default=None, ge=1)  # Hosts per rolling batch
+    batch_percent: Optional[int] = Field(default=None, ge=1, le=100)  # Or % of targets per batch
+    max_failure_ratio: float = Field(default=0.1, ge=0, le=1)  # Stop rollout above this
+    alert_id: Optional[UUID] = None
+    dry_run: bool = False
+    variables: Optional[Dict[str, str]] = None
+    bypass_cooldown: bool = False  # Skip the open circuit breaker check
+    bypass_blackout: bool = False  # Skip the blackout window check
+
+
+class FleetHostResult(BaseModel):
+    """Per-host outcome within a fleet execution."""
+    execution_id: UUID
+    server_id: Optional[UUID]
+    server_name: Optional[str]
+    batch: Optional[int]
+    status: ExecutionStatus
+    steps_completed: int
+    steps_failed: int
+    error_message: Optional[str]
+    started_at: Optional[datetime]
+    completed_at: Optional[datetime]
+
+
+class FleetExecutionResponse(BaseModel):
+    """Schema for a fleet execution with its aggregated result."""
+    id: UUID
+    runbook_id: UUID
+    runbook_name: Optional[str] = None
+    status: str  # pending, running, success, partial, failed, stopped, cancelled
+    stop_reason: Optional[str]
+    server_group_id: Optional[UUID]
+    label_selector: Optional[Dict[str, Any]]
+    dry_run: bool
+    parallelism: int
+    batch_size: Optional[int]
+    batch_percent: Optional[int]
+    max_failure_ratio: float
+    servers_total: int
+    servers_succeeded: int
+    servers_failed: int
+    servers_skipped: int
+    batches_total: int
+    batches_completed: int
+    created_at: datetime
+    started_at: Optional[datetime]
+    completed_at: Optional[datetime]
+    status_counts: Dict[str, int] = {}  # Host executions by status
+    hosts: List[FleetHostResult] = []
+
+
 # =============================================================================
 # SAFETY MECHANISM SCHEMAS
 # =============================================================================
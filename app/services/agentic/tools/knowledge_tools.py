@@ -143,7 +143,7 @@ class KnowledgeTools(ToolModule):
         try:
             service = KnowledgeSearchService(self.db)
             doc_types = [doc_type] if doc_type else None
-            results = service.search_similar(
+            results = await service.search_similar(
                 query=query,
                 doc_types=doc_types,
                 limit=limit,
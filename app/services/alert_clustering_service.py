@@ -4,7 +4,7 @@ Alert Clustering Service
 Multi-layer clustering algorithm to reduce alert noise:
 - Layer 1: Exact Match (70% coverage) - Fast O(n) grouping
 - Layer 2: Temporal (20% coverage) - Time-window based
-- Layer 3: Semantic (10% coverage) - ML-based similarity
+- Layer 3: Semantic (10% coverage) - Text similarity, near-linear
 
 Target: 60-80% noise reduction
 """
@@ -15,15 +15,45 @@ from datetime import datetime, timedelta
 from collections import defaultdict
 from uuid import UUID
 
+from sqlalchemy import update
 from sqlalchemy.orm import Session
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import numpy as np
 
 from app.models import Alert, AlertCluster, utc_now
+from app.services.semantic_clustering import get_semantic_vectorizer, semantic_groups
 
 logger = logging.getLogger(__name__)
 
+SEVERITY_ORDER = {'critical': 3, 'warning': 2, 'info': 1}
+
+
+def exact_cluster_key(alert_name: Optional[str], instance: Optional[str], job: Optional[str]) -> str:
+    """Cluster key shared by alerts with identical name, instance and job"""
+    # Use MD5 hash for consistent key length
+    key_string = '|'.join([alert_name or '', instance or '', job or ''])
+    return hashlib.md5(key_string.encode()).hexdigest()
+
+
+def temporal_cluster_key(alert_name: Optional[str], first_timestamp: datetime) -> str:
+    """Cluster key for an alert storm, from its name and first alert's minute"""
+    key_string = '|'.join([alert_name or '', first_timestamp.strftime('%Y%m%d%H%M')])
+    return hashlib.md5(key_string.encode()).hexdigest()
+
+
+def alert_text(
+    alert_name: Optional[str],
+    instance: Optional[str],
+    job: Optional[str],
+    annotations: Optional[Dict]
+) -> str:
+    """Convert alert fields to text for semantic analysis"""
+    parts = [alert_name or '', instance or '', job or '']
+
+    # Add annotations if available
+    if annotations:
+        parts.extend([annotations.get('summary', ''), annotations.get('description', '')])
+
+    return ' '.join(parts)
+
 
 class AlertClusteringService:
     """Multi-layer alert clustering service"""
@@ -116,47 +146,71 @@ class AlertClusteringService:
         """
         Save clustering results to database
 
+        Set-based: one query loads the alerts, then per chunk of clusters
+        one upsert keyed on cluster_key, one UPDATE ... FROM (VALUES ...)
+        linking alerts and one recount of alert_count.
+
         Args:
             clusters: Dict of cluster_key → alert_ids
 
         Returns:
             List of created/updated AlertCluster objects
         """
-        created_clusters = []
+        from app.services import cluster_store
 
-        for cluster_key, alert_ids in clusters.items():
-            # Skip single-alert clusters
-            if len(alert_ids) < 2:
-                continue
-
-            # Get alerts
-            alerts = self.db.query(Alert).filter(Alert.id.in_(alert_ids)).all()
+        # Skip single-alert clusters
+        clusters = {key: ids for key, ids in clusters.items() if len(ids) >= 2}
+        if not clusters:
+            return []
 
+        # Get alerts
+        alert_ids = [alert_id for ids in clusters.values() for alert_id in ids]
+        alerts_by_id = {}
+        for chunk in cluster_store.chunked(alert_ids):
+            for alert in self.db.query(Alert).filter(Alert.id.in_(chunk)):
+                alerts_by_id[alert.id] = alert
+
+        members = {}
+        rows = []
+        for cluster_key, ids in clusters.items():
+            alerts = [alerts_by_id[i] for i in ids if i in alerts_by_id]
             if not alerts:
                 continue
-
-            # Check if cluster exists
-            existing = self.db.query(AlertCluster).filter(
-                AlertCluster.cluster_key == cluster_key
-            ).first()
-
-            if existing:
-                # Update existing cluster
-                self._update_cluster(existing, alerts)
-                created_clusters.append(existing)
-            else:
-                # Create new cluster
-                cluster = self._create_cluster(cluster_key, alerts)
-                created_clusters.append(cluster)
-
-            # Link alerts to cluster
-            for alert in alerts:
-                if not alert.cluster_id:
-                    alert.cluster_id = existing.id if existing else cluster.id
-                    alert.clustered_at = utc_now()
+            members[cluster_key] = alerts
+            rows.append(cluster_store.cluster_row(
+                cluster_key,
+                'exact',  # Default, can be updated
+                len(alerts),
+                min(a.timestamp for a in alerts),
+                max(a.timestamp for a in alerts),
+                self._calculate_severity(alerts),
+                self._extract_metadata(alerts)
+            ))
+
+        # Create new clusters, widen existing ones
+        saved = {}
+        for chunk in cluster_store.chunked(rows):
+            for row in self.db.execute(cluster_store.upsert_clusters(chunk)):
+                saved[row.cluster_key] = row.id
+
+        # Link alerts to cluster
+        now = utc_now()
+        links = [(alert.id, saved[key]) for key, alerts in members.items() for alert in alerts]
+        for chunk in cluster_store.chunked(links):
+            self.db.execute(cluster_store.link_alerts(chunk, now))
+
+        cluster_ids = list(saved.values())
+        for chunk in cluster_store.chunked(cluster_ids):
+            self.db.execute(cluster_store.recount_clusters(chunk))
 
         self.db.commit()
 
+        by_id = {}
+        for chunk in cluster_store.chunked(cluster_ids):
+            for cluster in self.db.query(AlertCluster).filter(AlertCluster.id.in_(chunk)):
+                by_id[cluster.id] = cluster
+        created_clusters = [by_id[saved[key]] for key in members if saved[key] in by_id]
+
         logger.info(f"Applied clustering: {len(created_clusters)} clusters saved")
 
         return created_clusters
@@ -173,17 +227,16 @@ class AlertClusteringService:
         """
         cutoff_time = utc_now() - timedelta(hours=inactive_hours)
 
-        inactive_clusters = self.db.query(AlertCluster).filter(
-            AlertCluster.is_active == True,
-            AlertCluster.last_seen < cutoff_time
-        ).all()
-
-        count = 0
-        for cluster in inactive_clusters:
-            cluster.is_active = False
-            cluster.closed_at = utc_now()
-            cluster.closed_reason = 'timeout'
-            count += 1
+        result = self.db.execute(
+            update(AlertCluster)
+            .where(
+                AlertCluster.is_active == True,
+                AlertCluster.last_seen < cutoff_time
+            )
+            .values(is_active=False, closed_at=utc_now(), closed_reason='timeout')
+            .execution_options(synchronize_session=False)
+        )
+        count = result.rowcount or 0
 
         self.db.commit()
 
@@ -213,14 +266,7 @@ class AlertClusteringService:
 
     def _generate_exact_key(self, alert: Alert) -> str:
         """Generate unique key for exact match clustering"""
-        # Use MD5 hash for consistent key length
-        key_parts = [
-            alert.alert_name or '',
-            alert.instance or '',
-            alert.job or ''
-        ]
-        key_string = '|'.join(key_parts)
-        return hashlib.md5(key_string.encode()).hexdigest()
+        return exact_cluster_key(alert.alert_name, alert.instance, alert.job)
 
     # ========== LAYER 2: TEMPORAL ==========
 
@@ -280,12 +326,7 @@ class AlertClusteringService:
 
             # Generate key from first alert + timestamp
             first_alert = group[0]
-            key_parts = [
-                first_alert.alert_name or '',
-                first_alert.timestamp.strftime('%Y%m%d%H%M')
-            ]
-            key_string = '|'.join(key_parts)
-            key = hashlib.md5(key_string.encode()).hexdigest()
+            key = temporal_cluster_key(first_alert.alert_name, first_alert.timestamp)
 
             result[key] = group
 
@@ -299,8 +340,9 @@ class AlertClusteringService:
         similarity_threshold: float = 0.7
     ) -> List[List[Alert]]:
         """
-        Group alerts with similar descriptions using TF-IDF + cosine similarity
+        Group alerts with similar descriptions using hashed TF-IDF + cosine similarity
         Only runs on unclustered alerts (<10%)
+        Near-linear: signature-sorted neighbour search, no N x N matrix
         """
         if len(alerts) < 2:
             return []
@@ -309,33 +351,9 @@ class AlertClusteringService:
         alert_texts = [self._alert_to_text(a) for a in alerts]
 
         try:
-            # TF-IDF vectorization
-            vectorizer = TfidfVectorizer(
-                max_features=100,
-                stop_words='english',
-                ngram_range=(1, 2)
-            )
-            tfidf_matrix = vectorizer.fit_transform(alert_texts)
-
-            # Compute cosine similarity
-            similarity_matrix = cosine_similarity(tfidf_matrix)
-
-            # Find clusters using similarity threshold
-            clustered = set()
-            clusters = []
-
-            for i in range(len(alerts)):
-                if i in clustered:
-                    continue
-
-                # Find similar alerts
-                similar_indices = np.where(similarity_matrix[i] >= similarity_threshold)[0]
-
-                if len(similar_indices) > 1:
-                    cluster = [alerts[j] for j in similar_indices if j not in clustered]
-                    if len(cluster) > 1:
-                        clusters.append(cluster)
-                        clustered.update(similar_indices)
+            vectors = get_semantic_vectorizer().update_transform(alert_texts)
+            groups = semantic_groups(vectors, similarity_threshold)
+            clusters = [[alerts[i] for i in group] for group in groups]
 
             logger.debug(f"Semantic: {len(alerts)} alerts → {len(clusters)} clusters")
 
@@ -347,19 +365,7 @@ class AlertClusteringService:
 
     def _alert_to_text(self, alert: Alert) -> str:
         """Convert alert to text for semantic analysis"""
-        parts = [
-            alert.alert_name or '',
-            alert.instance or '',
-            alert.job or ''
-        ]
-
-        # Add annotations if available
-        if alert.annotations_json:
-            summary = alert.annotations_json.get('summary', '')
-            description = alert.annotations_json.get('description', '')
-            parts.extend([summary, description])
-
-        return ' '.join(parts)
+        return alert_text(alert.alert_name, alert.instance, alert.job, alert.annotations_json)
 
     def _convert_semantic_to_dict(
         self,
@@ -387,54 +393,14 @@ class AlertClusteringService:
 
     # ========== HELPER METHODS ==========
 
-    def _create_cluster(
-        self,
-        cluster_key: str,
-        alerts: List[Alert]
-    ) -> AlertCluster:
-        """Create new cluster from alerts"""
-        cluster = AlertCluster(
-            cluster_key=cluster_key,
-            alert_count=len(alerts),
-            first_seen=min(a.timestamp for a in alerts),
-            last_seen=max(a.timestamp for a in alerts),
-            severity=self._calculate_severity(alerts),
-            cluster_type='exact',  # Default, can be updated
-            cluster_metadata=self._extract_metadata(alerts),
-            is_active=True
-        )
-
-        self.db.add(cluster)
-        self.db.flush()  # Get ID without committing
-
-        logger.debug(f"Created cluster {cluster_key} with {len(alerts)} alerts")
-
-        return cluster
-
-    def _update_cluster(
-        self,
-        cluster: AlertCluster,
-        alerts: List[Alert]
-    ):
-        """Update existing cluster with new alerts"""
-        cluster.alert_count = len(alerts)
-        cluster.first_seen = min(a.timestamp for a in alerts)
-        cluster.last_seen = max(a.timestamp for a in alerts)
-        cluster.severity = self._calculate_severity(alerts)
-        cluster.cluster_metadata = self._extract_metadata(alerts)
-        cluster.updated_at = utc_now()
-
-        logger.debug(f"Updated cluster {cluster.cluster_key} with {len(alerts)} alerts")
-
     def _calculate_severity(self, alerts: List[Alert]) -> str:
         """Calculate highest severity from alerts"""
-        severity_order = {'critical': 3, 'warning': 2, 'info': 1}
         severities = [a.severity for a in alerts if a.severity]
 
         if not severities:
             return 'info'
 
-        return max(severities, key=lambda s: severity_order.get(s, 0))
+        return max(severities, key=lambda s: SEVERITY_ORDER.get(s, 0))
 
     def _extract_metadata(self, alerts: List[Alert]) -> Dict:
         """Extract common metadata from alerts"""
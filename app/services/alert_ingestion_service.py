@@ -0,0 +1,274 @@
+"""
+Alert Ingestion Service
+
+Batched, async ingestion of Alertmanager webhook payloads.
+
+A payload is processed as a whole instead of alert-by-alert:
+1. One lookup for all (fingerprint, timestamp) pairs already stored
+2. Rules matched in one pass against the cached, compiled rule index
+3. One multi-row INSERT ... ON CONFLICT for new alerts
+4. One multi-row INSERT ... ON CONFLICT for their incident metrics
+5. Optionally, one INSERT of follow-up jobs into the durable ingest queue
+6. A single commit
+7. New firing alerts handed to the online clustering engine (in memory)
+"""
+import logging
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional, Tuple
+
+from sqlalchemy import select, update, and_, or_, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Alert, IncidentMetrics
+from app.schemas import AlertmanagerAlert
+from app.services.rules_engine import get_rule_index_async
+from app.services.ingest_queue import enqueue_jobs, STAGE_ANALYSIS, STAGE_REMEDIATION
+from app.services.online_clustering import observe_alerts
+from app.services.embedding_backfill import embed_new_alerts
+from app.metrics import ALERTS_RECEIVED, ALERTS_PROCESSED
+
+logger = logging.getLogger(__name__)
+
+# asyncpg caps a statement at 32767 bind parameters; alerts use ~16 per row
+INSERT_CHUNK_SIZE = 500
+
+AlertKey = Tuple[Optional[str], datetime]
+
+
+@dataclass
+class IngestResult:
+    """Outcome of ingesting one webhook payload."""
+    processed: List[Dict[str, Any]] = field(default_factory=list)
+    analyze_ids: List[str] = field(default_factory=list)
+    remediate_ids: List[str] = field(default_factory=list)
+
+
+def parse_alert_timestamp(starts_at: Optional[str]) -> datetime:
+    """Parse an Alertmanager ``startsAt`` value, falling back to now."""
+    try:
+        return datetime.fromisoformat(starts_at.replace("Z", "+00:00"))
+    except (AttributeError, ValueError):
+        return datetime.now(timezone.utc)
+
+
+def build_alert_row(alert_data: AlertmanagerAlert, timestamp: datetime) -> Dict[str, Any]:
+    """Build the column values for a new ``alerts`` row (rule fields excluded)."""
+    labels = alert_data.labels
+    return {
+        "id": uuid.uuid4(),
+        "fingerprint": alert_data.fingerprint,
+        "timestamp": timestamp,
+        "alert_name": labels.get("alertname", "Unknown"),
+        "severity": labels.get("severity", "unknown"),
+        "instance": labels.get("instance", ""),
+        "job": labels.get("job", ""),
+        "status": alert_data.status,
+        "labels_json": labels,
+        "annotations_json": alert_data.annotations,
+        "raw_alert_json": alert_data.model_dump(),
+        "analyzed": False,
+        "analysis_count": 0,
+        "created_at": datetime.now(timezone.utc),
+    }
+
+
+def build_metrics_row(alert_row: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the ``incident_metrics`` row for a freshly stored alert."""
+    labels = alert_row["labels_json"] or {}
+    now = datetime.now(timezone.utc)
+    return {
+        "id": uuid.uuid4(),
+        "alert_id": alert_row["id"],
+        "incident_started": alert_row["timestamp"],
+        "incident_detected": alert_row["timestamp"],  # Same as started for now
+        "time_to_detect": 0,
+        "service_name": alert_row["job"] or labels.get("service") or labels.get("app"),
+        "severity": alert_row["severity"],
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+async def _fetch_existing(
+    db: AsyncSession,
+    keys: List[AlertKey]
+) -> Dict[AlertKey, Tuple[uuid.UUID, str]]:
+    """Return {(fingerprint, timestamp): (id, status)} for already stored alerts."""
+    if not keys:
+        return {}
+
+    keyed = [k for k in keys if k[0] is not None]
+    unkeyed_ts = [ts for fp, ts in keys if fp is None]
+
+    conditions = []
+    if keyed:
+        conditions.append(tuple_(Alert.fingerprint, Alert.timestamp).in_(keyed))
+    if unkeyed_ts:
+        conditions.append(and_(Alert.fingerprint.is_(None), Alert.timestamp.in_(unkeyed_ts)))
+
+    result = await db.execute(
+        select(Alert.id, Alert.fingerprint, Alert.timestamp, Alert.status)
+        .where(or_(*conditions))
+    )
+    return {
+        (row.fingerprint, row.timestamp): (row.id, row.status)
+        for row in result
+    }
+
+
+async def _insert_alerts(db: AsyncSession, rows: List[Dict[str, Any]]) -> set:
+    """Insert alert rows in chunks; return the ids that were actually inserted."""
+    inserted = set()
+    for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+        chunk = rows[start:start + INSERT_CHUNK_SIZE]
+        result = await db.execute(
+            pg_insert(Alert)
+            .values(chunk)
+            .on_conflict_do_nothing()
+            .returning(Alert.id)
+        )
+        inserted.update(result.scalars().all())
+    return inserted
+
+
+async def _insert_metrics(db: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+    """Insert incident metrics rows in chunks, skipping alerts that already have one."""
+    for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+        chunk = rows[start:start + INSERT_CHUNK_SIZE]
+        await db.execute(
+            pg_insert(IncidentMetrics)
+            .values(chunk)
+            .on_conflict_do_nothing(index_elements=[IncidentMetrics.alert_id])
+        )
+
+
+async def ingest_alerts(
+    db: AsyncSession,
+    alerts: List[AlertmanagerAlert],
+    enqueue: bool = False
+) -> IngestResult:
+    """
+    Store a webhook payload's alerts in a handful of statements.
+
+    Returns an IngestResult describing what happened to each alert plus the ids
+    that need auto-analysis and auto-remediation follow-up. With ``enqueue``,
+    that follow-up work is written to the ingest queue in the same transaction.
+    """
+    result = IngestResult()
+    if not alerts:
+        return result
+
+    # Parse and collapse duplicates inside the payload (last status wins)
+    parsed: Dict[AlertKey, AlertmanagerAlert] = {}
+    for alert_data in alerts:
+        ALERTS_RECEIVED.labels(
+            severity=alert_data.labels.get("severity", "unknown"),
+            status=alert_data.status
+        ).inc()
+        key = (alert_data.fingerprint, parse_alert_timestamp(alert_data.startsAt))
+        parsed[key] = alert_data
+
+    existing = await _fetch_existing(db, list(parsed.keys()))
+
+    # Existing alerts: group status changes so each target status is one UPDATE
+    status_updates: Dict[str, List[uuid.UUID]] = {}
+    candidates: List[Dict[str, Any]] = []
+
+    for key, alert_data in parsed.items():
+        if key in existing:
+            alert_id, current_status = existing[key]
+            if current_status != alert_data.status:
+                status_updates.setdefault(alert_data.status, []).append(alert_id)
+            result.processed.append({
+                "alert_name": alert_data.labels.get("alertname", "Unknown"),
+                "action": "updated",
+                "id": str(alert_id)
+            })
+            continue
+
+        candidates.append(build_alert_row(alert_data, key[1]))
+
+    # Match all new alerts against the rule index in one pass
+    matches = []
+    if candidates:
+        rule_index = await get_rule_index_async(db)
+        matches = rule_index.match_many(
+            (row["alert_name"], row["severity"], row["instance"], row["job"])
+            for row in candidates
+        )
+
+    new_rows: List[Dict[str, Any]] = []
+    for row, (matched_rule, action) in zip(candidates, matches):
+        if action == "ignore":
+            logger.info(
+                f"Ignoring alert: {row['alert_name']} "
+                f"(matched rule: {matched_rule.name if matched_rule else 'none'})"
+            )
+            ALERTS_PROCESSED.labels(action="ignore").inc()
+            result.processed.append({"alert_name": row["alert_name"], "action": "ignored"})
+            continue
+
+        row["matched_rule_id"] = matched_rule.rule_id if matched_rule else None
+        row["action_taken"] = action if action != "manual" else "pending"
+        new_rows.append(row)
+
+    for new_status, ids in status_updates.items():
+        await db.execute(
+            update(Alert)
+            .where(Alert.id.in_(ids))
+            .values(status=new_status)
+            .execution_options(synchronize_session=False)
+        )
+
+    inserted = await _insert_alerts(db, new_rows) if new_rows else set()
+    stored_rows = [row for row in new_rows if row["id"] in inserted]
+    if stored_rows:
+        await _insert_metrics(db, [build_metrics_row(row) for row in stored_rows])
+
+    for row in new_rows:
+        alert_id = str(row["id"])
+        if row["id"] not in inserted:
+            # Lost a race with a concurrent delivery of the same alert
+            result.processed.append({"alert_name": row["alert_name"], "action": "duplicate"})
+            continue
+
+        if row["action_taken"] == "auto_analyze":
+            result.analyze_ids.append(alert_id)
+            ALERTS_PROCESSED.labels(action="auto_analyze").inc()
+            result.processed.append({
+                "alert_name": row["alert_name"],
+                "action": "auto_analyze_queued",
+                "id": alert_id
+            })
+        else:
+            ALERTS_PROCESSED.labels(action="manual").inc()
+            result.processed.append({
+                "alert_name": row["alert_name"],
+                "action": "stored_pending",
+                "id": alert_id
+            })
+
+        # Always check for auto-remediation triggers
+        result.remediate_ids.append(alert_id)
+
+    if enqueue:
+        await enqueue_jobs(
+            db,
+            [(STAGE_ANALYSIS, uuid.UUID(alert_id)) for alert_id in result.analyze_ids]
+            + [(STAGE_REMEDIATION, uuid.UUID(alert_id)) for alert_id in result.remediate_ids]
+        )
+
+    await db.commit()
+
+    if stored_rows:
+        observe_alerts(stored_rows)
+        embed_new_alerts(stored_rows)
+
+    logger.info(
+        f"Ingested webhook payload: {len(alerts)} alert(s), {len(stored_rows)} stored, "
+        f"{sum(len(ids) for ids in status_updates.values())} status update(s)"
+    )
+    return result
@@ -0,0 +1,199 @@
+"""
+Cluster Store
+
+Set-based statements for persisting clustering results, shared by the
+batch AlertClusteringService (sync session) and the online clustering
+engine (async session). Persisting any number of clusters takes:
+
+1. One multi-row INSERT ... ON CONFLICT (cluster_key) DO UPDATE per chunk
+2. One UPDATE alerts ... FROM (VALUES ...) linking alerts per chunk
+3. One grouped recount of alert_count per chunk
+
+It also builds the cheap queries behind the clustering gauges: totals
+from the trigger-maintained clustering_counters table and per-window
+counts over the (timestamp, cluster_id) index on alerts.
+
+Statements are built here and executed by the caller, so both session
+types can use them.
+"""
+
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+from sqlalchemy import select, insert, update, delete, func, case, cast, and_, column, values, literal_column, BigInteger
+from sqlalchemy.dialects.postgresql import insert as pg_insert, UUID as PG_UUID
+
+from ..models import Alert, AlertCluster, ClusteringCounter
+from .alert_clustering_service import SEVERITY_ORDER
+
+# Rows per statement; asyncpg caps a statement at 32767 bind parameters
+CHUNK_SIZE = 1000
+
+
+def chunked(items: Sequence, size: int = CHUNK_SIZE) -> Iterator[Sequence]:
+    """Yield consecutive slices of at most ``size`` items."""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _severity_rank(expr):
+    return case(SEVERITY_ORDER, value=expr, else_=0)
+
+
+def cluster_row(
+    cluster_key: str,
+    cluster_type: str,
+    alert_count: int,
+    first_seen: datetime,
+    last_seen: datetime,
+    severity: str,
+    metadata: Dict[str, Any],
+    cluster_id: uuid.UUID = None
+) -> Dict[str, Any]:
+    """Column values for one ``alert_clusters`` row in an upsert."""
+    now = datetime.now(timezone.utc)
+    return {
+        "id": cluster_id or uuid.uuid4(),
+        "cluster_key": cluster_key,
+        "alert_count": alert_count,
+        "first_seen": first_seen,
+        "last_seen": last_seen,
+        "severity": severity,
+        "cluster_type": cluster_type,
+        "cluster_metadata": metadata,
+        "is_active": True,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def upsert_clusters(rows: List[Dict[str, Any]]):
+    """
+    Insert clusters, or widen existing ones with the same key.
+
+    An existing cluster keeps its id and type; its time range and severity
+    grow to cover the new alerts, its metadata is replaced and it is
+    reopened if it had been closed. Returns (id, cluster_key, inserted).
+    """
+    stmt = pg_insert(AlertCluster).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[AlertCluster.cluster_key],
+        set_={
+            "first_seen": func.least(AlertCluster.first_seen, stmt.excluded.first_seen),
+            "last_seen": func.greatest(AlertCluster.last_seen, stmt.excluded.last_seen),
+            "severity": case(
+                (
+                    _severity_rank(stmt.excluded.severity) > _severity_rank(AlertCluster.severity),
+                    stmt.excluded.severity
+                ),
+                else_=AlertCluster.severity
+            ),
+            "cluster_metadata": stmt.excluded.cluster_metadata,
+            "is_active": True,
+            "closed_at": None,
+            "closed_reason": None,
+            "updated_at": stmt.excluded.updated_at,
+        }
+    ).returning(
+        AlertCluster.id,
+        AlertCluster.cluster_key,
+        literal_column("xmax = 0").label("inserted")
+    )
+
+
+def link_alerts(links: Sequence[Tuple[uuid.UUID, uuid.UUID]], now: datetime):
+    """Point alerts at clusters from (alert_id, cluster_id) pairs; alerts already clustered are left alone."""
+    link = values(
+        column("alert_id", PG_UUID(as_uuid=True)),
+        column("cluster_id", PG_UUID(as_uuid=True)),
+        name="link"
+    ).data(list(links))
+    return (
+        update(Alert)
+        .where(and_(Alert.id == link.c.alert_id, Alert.cluster_id.is_(None)))
+        .values(cluster_id=link.c.cluster_id, clustered_at=now)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def recount_clusters(cluster_ids: Sequence[uuid.UUID]):
+    """Set alert_count from the linked alerts. Returns (id, alert_count)."""
+    linked = (
+        select(Alert.cluster_id, func.count(Alert.id).label("n"))
+        .where(Alert.cluster_id.in_(list(cluster_ids)))
+        .group_by(Alert.cluster_id)
+        .subquery()
+    )
+    return (
+        update(AlertCluster)
+        .where(AlertCluster.id == linked.c.cluster_id)
+        .values(alert_count=linked.c.n)
+        .returning(AlertCluster.id, AlertCluster.alert_count)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _closed_before(cutoff: datetime):
+    return and_(AlertCluster.is_active == False, AlertCluster.closed_at < cutoff)
+
+
+def unlink_closed_clusters(cutoff: datetime):
+    """Detach alerts from clusters closed before ``cutoff``."""
+    return (
+        update(Alert)
+        .where(Alert.cluster_id.in_(select(AlertCluster.id).where(_closed_before(cutoff))))
+        .values(cluster_id=None, clustered_at=None)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def delete_closed_clusters(cutoff: datetime):
+    """Delete clusters closed before ``cutoff``. Returns their ids."""
+    return (
+        delete(AlertCluster)
+        .where(_closed_before(cutoff))
+        .returning(AlertCluster.id)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def compact_counters():
+    """Fold the counter delta rows into one row per name."""
+    moved = (
+        delete(ClusteringCounter)
+        .returning(ClusteringCounter.name, ClusteringCounter.delta)
+        .cte("moved")
+    )
+    return insert(ClusteringCounter).from_select(
+        ["name", "delta"],
+        select(moved.c.name, cast(func.sum(moved.c.delta), BigInteger)).group_by(moved.c.name)
+    )
+
+
+def counter_totals():
+    """Current value of each counter. Returns (name, total)."""
+    return (
+        select(ClusteringCounter.name, cast(func.sum(ClusteringCounter.delta), BigInteger).label("total"))
+        .group_by(ClusteringCounter.name)
+    )
+
+
+def window_counts(since: datetime):
+    """Alerts since ``since``: (alerts, clustered_alerts, clusters)."""
+    return select(
+        func.count(Alert.id),
+        func.count(Alert.cluster_id),
+        func.count(Alert.cluster_id.distinct())
+    ).where(Alert.timestamp >= since)
+
+
+def noise_reduction(alerts: int, clustered_alerts: int, clusters: int) -> float:
+    """
+    Percentage of alerts folded away by clustering.
+
+    A cluster of n alerts is seen as one item, so it removes n - 1 of them.
+    """
+    if not alerts:
+        return 0.0
+    return round(max(clustered_alerts - clusters, 0) / alerts * 100, 1)
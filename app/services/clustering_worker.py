@@ -2,35 +2,50 @@
 Alert Clustering Background Worker
 
 Scheduled jobs for automated alert clustering:
-- cluster_recent_alerts: Runs every 5 minutes
+- cluster_recent_alerts: Runs every 5 minutes, or as a repair pass every
+  clustering_repair_interval_minutes when the online engine clusters alerts
+  at ingest time (see online_clustering.py)
 - cleanup_old_clusters: Runs daily at 2 AM
+- update_clustering_gauges: Runs every clustering_gauge_interval_seconds
 - AI summary generation: Async for large clusters
 """
 import logging
 import asyncio
 import threading
 from datetime import datetime, timedelta
-from typing import List
+from uuid import UUID
+from typing import Dict, List, Optional
 
 from sqlalchemy.orm import Session
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
+from app.config import get_settings
 from app.database import get_db
 from app.models import Alert, AlertCluster, utc_now
 from app.services.alert_clustering_service import AlertClusteringService
+from app.services.cluster_store import (
+    unlink_closed_clusters, delete_closed_clusters,
+    compact_counters, counter_totals, window_counts, noise_reduction
+)
 from app.metrics import (
     CLUSTERS_CREATED, ALERTS_CLUSTERED, CLUSTERS_CLOSED,
-    ACTIVE_CLUSTERS, NOISE_REDUCTION, CLUSTERING_DURATION,
-    AI_SUMMARIES_GENERATED
+    ACTIVE_CLUSTERS, NOISE_REDUCTION, NOISE_REDUCTION_WINDOW,
+    CLUSTERING_DURATION, AI_SUMMARIES_GENERATED
 )
 
 logger = logging.getLogger(__name__)
 
 
-def cluster_recent_alerts(db: Session):
+def cluster_recent_alerts(db: Session, settled_after: Optional[timedelta] = None):
     """
     Cluster unclustered alerts from the last hour
     Runs every 5 minutes
+
+    Args:
+        db: Database session
+        settled_after: Repair mode. Only alerts ingested more than this long
+            ago (and at most an hour before that) are considered, i.e. alerts
+            the online engine has already given up pairing.
     """
     import time
     start_time = time.time()
@@ -39,12 +54,19 @@ def cluster_recent_alerts(db: Session):
         logger.info("Starting alert clustering job")
 
         # Get unclustered alerts from last hour
-        cutoff_time = utc_now() - timedelta(hours=1)
-        unclustered_alerts = db.query(Alert).filter(
+        query = db.query(Alert).filter(
             Alert.cluster_id.is_(None),
-            Alert.timestamp >= cutoff_time,
             Alert.status == 'firing'
-        ).all()
+        )
+        if settled_after is None:
+            query = query.filter(Alert.timestamp >= utc_now() - timedelta(hours=1))
+        else:
+            settled = utc_now() - settled_after
+            query = query.filter(
+                Alert.created_at < settled,
+                Alert.created_at >= settled - timedelta(hours=1)
+            )
+        unclustered_alerts = query.all()
 
         if not unclustered_alerts:
             logger.info("No unclustered alerts found")
@@ -69,13 +91,7 @@ def cluster_recent_alerts(db: Session):
 
         # Generate AI summaries asynchronously (non-blocking)
         if created_clusters:
-            logger.info(f"Scheduling AI summary generation for {len(created_clusters)} clusters")
-            # Use threading to avoid event loop issues in sync context
-            thread = threading.Thread(
-                target=lambda: asyncio.run(_generate_summaries_async(created_clusters)),
-                daemon=True
-            )
-            thread.start()
+            schedule_summaries([cluster.id for cluster in created_clusters])
         
         # Record metrics
         for cluster in created_clusters:
@@ -86,15 +102,8 @@ def cluster_recent_alerts(db: Session):
             CLUSTERS_CLOSED.labels(reason='inactive').inc(closed_count)
         
         # Update gauges
-        active_count = db.query(AlertCluster).filter(AlertCluster.is_active == True).count()
-        ACTIVE_CLUSTERS.set(active_count)
-        
-        total_alerts = db.query(Alert).count()
-        clustered_alerts = db.query(Alert).filter(Alert.cluster_id.isnot(None)).count()
-        if total_alerts > 0:
-            noise_reduction = ((total_alerts - active_count) / total_alerts) * 100
-            NOISE_REDUCTION.set(round(noise_reduction, 1))
-        
+        update_clustering_gauges(db)
+
         # Record duration
         duration = time.time() - start_time
         CLUSTERING_DURATION.observe(duration)
@@ -104,7 +113,67 @@ def cluster_recent_alerts(db: Session):
         db.rollback()
 
 
-async def _generate_summaries_async(clusters: List[AlertCluster]):
+# Windows for the per-window noise reduction gauge
+NOISE_REDUCTION_WINDOWS = {
+    '24h': timedelta(hours=24),
+    '7d': timedelta(days=7),
+}
+
+
+def update_clustering_gauges(db: Session) -> Dict[str, float]:
+    """
+    Refresh ACTIVE_CLUSTERS and the noise reduction gauges
+
+    Totals come from the trigger-maintained clustering_counters table and
+    window counts from an index range scan, so no table is counted in full.
+
+    Returns:
+        The values published, keyed by gauge ('global', '24h', '7d', ...)
+    """
+    try:
+        db.execute(compact_counters())
+        totals = {name: total for name, total in db.execute(counter_totals())}
+        db.commit()
+
+        published = {
+            'active_clusters': totals.get('active_clusters', 0),
+            'global': noise_reduction(
+                totals.get('alerts', 0), totals.get('clustered_alerts', 0), totals.get('clusters', 0)
+            ),
+        }
+        now = utc_now()
+        for window, span in NOISE_REDUCTION_WINDOWS.items():
+            alerts, clustered, clusters = db.execute(window_counts(now - span)).one()
+            published[window] = noise_reduction(alerts, clustered, clusters)
+
+    except Exception as e:
+        logger.error(f"Failed to update clustering gauges: {e}", exc_info=True)
+        db.rollback()
+        return {}
+
+    ACTIVE_CLUSTERS.set(published['active_clusters'])
+    NOISE_REDUCTION.set(published['global'])
+    for window in NOISE_REDUCTION_WINDOWS:
+        NOISE_REDUCTION_WINDOW.labels(window=window).set(published[window])
+
+    return published
+
+
+def schedule_summaries(cluster_ids: List[UUID]):
+    """
+    Generate AI summaries for clusters in the background
+    Safe to call from sync jobs and from the event loop
+    """
+    logger.info(f"Scheduling AI summary generation for {len(cluster_ids)} clusters")
+    # Use threading to avoid event loop issues in sync context
+    thread = threading.Thread(
+        target=lambda: asyncio.run(_generate_summaries_async(cluster_ids)),
+        daemon=True
+    )
+    thread.start()
+
+
+async def _generate_summaries_async(cluster_ids: List[UUID]):
     """
     Generate AI summaries for clusters asynchronously
     Only for clusters with 3+ alerts
@@ -115,6 +184,8 @@ async def _generate_summaries_async(clusters: List[AlertCluster]):
 
         from app.services.llm_service import generate_completion
 
+        clusters = db.query(AlertCluster).filter(AlertCluster.id.in_(cluster_ids)).all()
+
         for cluster in clusters:
             # Only generate for clusters with 3+ alerts
             if cluster.alert_count < 3:
@@ -185,35 +256,25 @@ def cleanup_old_clusters(db: Session):
     """
     Delete inactive clusters older than 30 days
     Runs daily at 2 AM
+    One UPDATE unlinks their alerts, one DELETE removes them
     """
     try:
         logger.info("Starting cluster cleanup job")
 
         cutoff_time = utc_now() - timedelta(days=30)
 
-        # Find old inactive clusters
-        old_clusters = db.query(AlertCluster).filter(
-            AlertCluster.is_active == False,
-            AlertCluster.closed_at < cutoff_time
-        ).all()
-
-        if not old_clusters:
-            logger.info("No old clusters to clean up")
-            return
-
         # Unlink alerts from clusters before deletion
-        for cluster in old_clusters:
-            db.query(Alert).filter(
-                Alert.cluster_id == cluster.id
-            ).update({'cluster_id': None, 'clustered_at': None})
+        db.execute(unlink_closed_clusters(cutoff_time))
 
         # Delete clusters
-        count = len(old_clusters)
-        for cluster in old_clusters:
-            db.delete(cluster)
+        count = len(db.execute(delete_closed_clusters(cutoff_time)).fetchall())
 
         db.commit()
 
+        if not count:
+            logger.info("No old clusters to clean up")
+            return
+
         logger.info(f"Cleaned up {count} old clusters")
 
     except Exception as e:
@@ -230,11 +291,12 @@ def start_clustering_jobs(scheduler: AsyncIOScheduler):
     """
     logger.info("Registering alert clustering jobs")
 
-    # Job 1: Cluster recent alerts every 5 minutes
+    # Job 1: Cluster recent alerts every 5 minutes (repair pass when clustering online)
+    settings = get_settings()
     scheduler.add_job(
         func='app.services.clustering_worker:cluster_recent_alerts_job',
         trigger='interval',
-        minutes=5,
+        minutes=settings.clustering_repair_interval_minutes if settings.clustering_online_enabled else 5,
         id='cluster_recent_alerts',
         name='Cluster Recent Alerts',
         replace_existing=True,
@@ -252,6 +314,17 @@ def start_clustering_jobs(scheduler: AsyncIOScheduler):
         replace_existing=True
     )
 
+    # Job 3: Refresh clustering gauges
+    scheduler.add_job(
+        func='app.services.clustering_worker:update_clustering_gauges_job',
+        trigger='interval',
+        seconds=settings.clustering_gauge_interval_seconds,
+        id='update_clustering_gauges',
+        name='Update Clustering Gauges',
+        replace_existing=True,
+        max_instances=1
+    )
+
     logger.info("Alert clustering jobs registered successfully")
 
 
@@ -259,9 +332,13 @@ def start_clustering_jobs(scheduler: AsyncIOScheduler):
 def cluster_recent_alerts_job():
     """Wrapper function for cluster_recent_alerts"""
     from app.database import SessionLocal
+    settings = get_settings()
+    settled_after = None
+    if settings.clustering_online_enabled:
+        settled_after = timedelta(minutes=settings.clustering_state_horizon_minutes)
     db = SessionLocal()
     try:
-        cluster_recent_alerts(db)
+        cluster_recent_alerts(db, settled_after=settled_after)
     finally:
         db.close()
 
@@ -274,3 +351,13 @@ def cleanup_old_clusters_job():
         cleanup_old_clusters(db)
     finally:
         db.close()
+
+
+def update_clustering_gauges_job():
+    """Wrapper function for update_clustering_gauges"""
+    from app.database import SessionLocal
+    db = SessionLocal()
+    try:
+        update_clustering_gauges(db)
+    finally:
+        db.close()
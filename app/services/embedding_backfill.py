@@ -0,0 +1,387 @@
+"""
+Alert Embedding Backfill
+
+Gives alerts their similarity-search embeddings in bulk:
+
+- backfill_alert_embeddings: walks alerts in keyset-paginated chunks,
+  embeds each distinct alert text once per chunk (alert storms repeat the
+  same text thousands of times), and writes every chunk with one UPDATE
+  and its own commit, so an interrupted run keeps what it finished. Runs
+  on a schedule and from the /feedback embeddings endpoint
+- AlertEmbedder: embeds freshly ingested alerts in the background,
+  batching whatever arrived in the last flush interval
+- prune_embedding_cache: daily job bounding the ``embedding_cache`` table
+  by age and row count
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select, update, delete, cast, and_, or_, column, values, Integer, Text
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from pgvector.sqlalchemy import Vector
+
+from app.config import get_settings
+from app.models import Alert
+from app.models_knowledge import EmbeddingCacheEntry
+from app.services.embedding_service import EmbeddingService, alert_embedding_text, get_embedding_service
+from app.metrics import ALERT_EMBEDDINGS, EMBEDDING_BACKFILL_RATE
+
+logger = logging.getLogger(__name__)
+
+
+def dedup_texts(texts: Sequence[str]) -> Tuple[List[str], List[int]]:
+    """Distinct texts in first-seen order, and the index of each input in them."""
+    positions: Dict[str, int] = {}
+    index = [positions.setdefault(text, len(positions)) for text in texts]
+    return list(positions), index
+
+
+def embedding_update(
+    alert_ids: Sequence[uuid.UUID],
+    index: Sequence[int],
+    texts: Sequence[str],
+    embeddings: Sequence[Optional[List[float]]]
+):
+    """
+    One UPDATE writing embeddings for a chunk of alerts.
+
+    Each distinct text and its vector is sent once; alerts point at it by
+    position. Alerts whose text failed to embed are left untouched.
+    """
+    embedded = values(
+        column("idx", Integer),
+        column("embedding", Vector()),
+        column("embedding_text", Text),
+        name="embedded"
+    ).data([(i, vector, text) for i, (text, vector) in enumerate(zip(texts, embeddings)) if vector])
+    link = values(
+        column("alert_id", PG_UUID(as_uuid=True)),
+        column("idx", Integer),
+        name="link"
+    ).data([(alert_id, i) for alert_id, i in zip(alert_ids, index) if embeddings[i]])
+    return (
+        update(Alert)
+        .where(and_(Alert.id == link.c.alert_id, link.c.idx == embedded.c.idx))
+        .values(
+            embedding=cast(embedded.c.embedding, Vector()),
+            embedding_text=embedded.c.embedding_text
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+@dataclass
+class BackfillReport:
+    """Progress of a backfill run; ``last_id`` resumes it via ``start_after``."""
+    alerts: int = 0
+    unique_texts: int = 0
+    embedded: int = 0
+    failed: int = 0
+    chunks: int = 0
+    seconds: float = 0.0
+    last_id: Optional[uuid.UUID] = None
+
+    @property
+    def rate(self) -> float:
+        """Alerts processed per second."""
+        return self.alerts / self.seconds if self.seconds else 0.0
+
+
+def backfill_alert_embeddings(
+    limit: Optional[int] = None,
+    force_regenerate: bool = False,
+    start_after: Optional[uuid.UUID] = None,
+    chunk_size: Optional[int] = None,
+    session_factory=None,
+    embedding_service: Optional[EmbeddingService] = None
+) -> BackfillReport:
+    """
+    Embed alerts in keyset-paginated chunks.
+
+    Args:
+        limit: Maximum number of alerts to process (None: all)
+        force_regenerate: Re-embed alerts that already have an embedding
+        start_after: Alert id to resume after (a previous report's last_id)
+        chunk_size: Alerts per page, embedding call and UPDATE
+        session_factory: Sync session factory (default SessionLocal)
+        embedding_service: Sync embedding service (default EmbeddingService())
+
+    Returns:
+        BackfillReport with counts and throughput
+    """
+    if session_factory is None:
+        from app.database import SessionLocal
+        session_factory = SessionLocal
+    embedding_service = embedding_service or EmbeddingService()
+    chunk_size = chunk_size or get_settings().embedding_backfill_chunk_size
+
+    report = BackfillReport(last_id=start_after)
+    if not embedding_service.is_configured():
+        logger.error("Embedding service not configured - cannot generate embeddings")
+        return report
+
+    started = time.monotonic()
+    with session_factory() as db:
+        while limit is None or report.alerts < limit:
+            page = chunk_size if limit is None else min(chunk_size, limit - report.alerts)
+            query = select(
+                Alert.id, Alert.alert_name, Alert.severity,
+                Alert.labels_json, Alert.annotations_json, Alert.instance
+            ).order_by(Alert.id).limit(page)
+            if not force_regenerate:
+                query = query.where(Alert.embedding.is_(None))
+            if report.last_id is not None:
+                query = query.where(Alert.id > report.last_id)
+
+            rows = db.execute(query).all()
+            if not rows:
+                break
+
+            texts, index = dedup_texts([alert_embedding_text(row) for row in rows])
+            embeddings = embedding_service.generate_embeddings_batch(texts, batch_size=chunk_size)
+            embedded = sum(1 for i in index if embeddings[i])
+
+            try:
+                if embedded:
+                    db.execute(embedding_update([row.id for row in rows], index, texts, embeddings))
+                db.commit()
+            except Exception as e:
+                logger.error(f"Failed to write embeddings for chunk after {report.last_id}: {e}")
+                db.rollback()
+                break
+
+            # Checkpoint: everything up to here is committed
+            report.alerts += len(rows)
+            report.unique_texts += len(texts)
+            report.embedded += embedded
+            report.failed += len(rows) - embedded
+            report.chunks += 1
+            report.last_id = rows[-1].id
+            report.seconds = time.monotonic() - started
+            ALERT_EMBEDDINGS.labels(source='backfill', result='embedded').inc(embedded)
+            ALERT_EMBEDDINGS.labels(source='backfill', result='failed').inc(len(rows) - embedded)
+
+            logger.info(
+                f"Embedding backfill chunk {report.chunks}: {len(rows)} alerts, "
+                f"{len(texts)} distinct texts, {embedded} embedded "
+                f"({report.rate:.0f} alerts/s overall, last id {report.last_id})"
+            )
+
+    report.seconds = time.monotonic() - started
+    EMBEDDING_BACKFILL_RATE.set(report.rate)
+    logger.info(
+        f"Embedding backfill finished: {report.embedded}/{report.alerts} alerts embedded "
+        f"({report.unique_texts} distinct texts) in {report.seconds:.1f}s, {report.rate:.0f} alerts/s"
+    )
+    return report
+
+
+def embedding_cache_prune(cutoff: datetime, max_rows: int):
+    """
+    DELETEs bounding the embedding cache table, both driven by the
+    created_at index.
+
+    The first drops rows created before ``cutoff``, the second everything
+    older than the newest ``max_rows`` rows. A pruned embedding is simply
+    recomputed and stored again the next time its text is embedded.
+    """
+    expired = delete(EmbeddingCacheEntry).where(
+        or_(EmbeddingCacheEntry.created_at < cutoff, EmbeddingCacheEntry.created_at.is_(None))
+    )
+    oldest_kept = (
+        select(EmbeddingCacheEntry.created_at)
+        .order_by(EmbeddingCacheEntry.created_at.desc())
+        .offset(max_rows - 1)
+        .limit(1)
+        .scalar_subquery()
+    )
+    over_cap = delete(EmbeddingCacheEntry).where(EmbeddingCacheEntry.created_at < oldest_kept)
+    return [
+        stmt.execution_options(synchronize_session=False)
+        for stmt in (expired, over_cap)
+    ]
+
+
+def prune_embedding_cache(session_factory=None) -> int:
+    """
+    Remove expired and surplus rows from the embedding cache table.
+
+    Args:
+        session_factory: Sync session factory (default SessionLocal)
+
+    Returns:
+        Number of rows deleted
+    """
+    if session_factory is None:
+        from app.database import SessionLocal
+        session_factory = SessionLocal
+    settings = get_settings()
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.embedding_cache_retention_days)
+
+    deleted = 0
+    with session_factory() as db:
+        for stmt in embedding_cache_prune(cutoff, max(settings.embedding_cache_max_rows, 1)):
+            deleted += db.execute(stmt).rowcount or 0
+        db.commit()
+    return deleted
+
+
+def embedding_backfill_job():
+    """Scheduled backfill of alerts still without embeddings"""
+    embedding_service = EmbeddingService()
+    if not embedding_service.is_configured():
+        logger.debug("Embeddings not configured - skipping scheduled backfill")
+        return
+    backfill_alert_embeddings(embedding_service=embedding_service)
+
+
+def embedding_cache_prune_job():
+    """Scheduled prune of the embedding cache table"""
+    try:
+        deleted = prune_embedding_cache()
+        logger.info(f"Pruned {deleted} embedding cache entries")
+    except Exception as e:
+        logger.error(f"Embedding cache prune failed: {e}", exc_info=True)
+
+
+def start_embedding_jobs(scheduler):
+    """
+    Register the embedding backfill and cache prune with the scheduler
+
+    Args:
+        scheduler: APScheduler instance from main.py
+    """
+    if get_embedding_service().is_configured():
+        scheduler.add_job(
+            func='app.services.embedding_backfill:embedding_backfill_job',
+            trigger='interval',
+            minutes=get_settings().embedding_backfill_interval_minutes,
+            id='embedding_backfill',
+            name='Alert Embedding Backfill',
+            replace_existing=True,
+            max_instances=1  # Prevent overlapping runs
+        )
+    else:
+        logger.info("Embeddings not configured - alert embedding backfill not scheduled")
+
+    if get_settings().embedding_cache_persist:
+        scheduler.add_job(
+            func='app.services.embedding_backfill:embedding_cache_prune_job',
+            trigger='cron',
+            hour=3,
+            minute=0,
+            id='embedding_cache_prune',
+            name='Prune Embedding Cache',
+            replace_existing=True,
+            max_instances=1
+        )
+
+
+class AlertEmbedder:
+    """
+    Embeds newly ingested alerts in the background.
+
+    Alerts handed over by the webhook are collected for ``flush_interval``
+    seconds, then embedded together (distinct texts only) and written with
+    one UPDATE. Whatever is lost on a crash is picked up by the backfill.
+    """
+
+    def __init__(self, session_factory=None, flush_interval: Optional[float] = None):
+        settings = get_settings()
+        if session_factory is None:
+            from app.database import async_session_factory
+            session_factory = async_session_factory
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval or settings.embedding_ingest_flush_interval
+        self.max_batch = settings.embedding_backfill_chunk_size
+
+        self._pending: List[Tuple[uuid.UUID, str]] = []
+        self._running = False
+        self._task: Optional[asyncio.Task] = None
+
+    def submit(self, rows: Iterable[Dict[str, Any]]) -> None:
+        """Queue ingest rows (see alert_ingestion_service.build_alert_row)."""
+        for row in rows:
+            self._pending.append((row["id"], alert_embedding_text(SimpleNamespace(**row))))
+
+    async def flush(self) -> int:
+        """Embed and write the queued alerts. Returns the number embedded."""
+        total = 0
+        while self._pending:
+            batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+            texts, index = dedup_texts([text for _, text in batch])
+            embeddings = await get_embedding_service().embed_many(texts)
+            embedded = sum(1 for i in index if embeddings[i])
+            if embedded:
+                async with self.session_factory() as db:
+                    await db.execute(embedding_update([alert_id for alert_id, _ in batch], index, texts, embeddings))
+                    await db.commit()
+            total += embedded
+            ALERT_EMBEDDINGS.labels(source='ingest', result='embedded').inc(embedded)
+            ALERT_EMBEDDINGS.labels(source='ingest', result='failed').inc(len(batch) - embedded)
+        return total
+
+    async def start(self) -> None:
+        self._running = True
+        self._task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self) -> None:
+        """Stop the loop and embed what is left."""
+        self._running = False
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Final alert embedding flush failed: {e}")
+
+    async def _flush_loop(self) -> None:
+        while self._running:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.exception(f"Error embedding ingested alerts: {e}")
+
+
+# Global embedder instance
+_embedder: Optional[AlertEmbedder] = None
+
+
+def embed_new_alerts(rows: Iterable[Dict[str, Any]]) -> None:
+    """Hand freshly stored alerts to the embedder, if it is running."""
+    if _embedder is None:
+        return
+    try:
+        _embedder.submit(rows)
+    except Exception as e:
+        # Never fail ingestion; the backfill embeds whatever is missed
+        logger.exception(f"Queueing alert embeddings failed: {e}")
+
+
+async def start_alert_embedder() -> None:
+    """Start the global embedder if embeddings are configured."""
+    global _embedder
+    if _embedder is None and get_embedding_service().is_configured():
+        _embedder = AlertEmbedder()
+        await _embedder.start()
+
+
+async def stop_alert_embedder() -> None:
+    """Stop the global embedder after a final flush."""
+    global _embedder
+    if _embedder is not None:
+        embedder, _embedder = _embedder, None
+        await embedder.stop()
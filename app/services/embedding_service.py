@@ -1,198 +1,561 @@
 """
 Embedding Service
-Generates vector embeddings using OpenAI API
+Generates vector embeddings through a pluggable backend
+
+- Backends: OpenAI (shared clients per API key) or a local hashing model
+  that runs on the CPU, needs no network and is deterministic
+- Cache: content-hash keyed, in-memory LRU in front of the
+  ``embedding_cache`` table, shared by every caller in the process
+- AsyncEmbeddingService: for request paths. Concurrent callers asking for
+  the same text share one in-flight request, and misses from all callers
+  are micro-batched into one backend call
+- EmbeddingService: synchronous facade for indexing jobs
 """
+import asyncio
+import hashlib
 import os
-from typing import List, Optional
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
 import logging
 
+from app.config import get_settings
+
 logger = logging.getLogger(__name__)
 
+# Approximate token limit of the OpenAI embedding models
+MAX_TEXT_CHARS = 8000
+
+
+def _clean(text: Optional[str]) -> str:
+    return text.strip()[:MAX_TEXT_CHARS] if text else ""
+
+
+def content_hash(model: str, text: str) -> str:
+    """Cache key for ``text`` embedded by ``model``."""
+    return hashlib.sha256(f"{model}\0{text}".encode()).hexdigest()
+
+
+def alert_embedding_text(alert) -> str:
+    """
+    Text representation of an alert for similarity search.
+
+    Combines alert name, severity, labels, the description from the
+    annotations and the instance.
+    """
+    parts = [
+        f"Alert: {alert.alert_name}",
+        f"Severity: {alert.severity or 'unknown'}",
+    ]
+
+    # Add labels if present
+    labels = alert.labels_json if isinstance(alert.labels_json, dict) else {}
+    if labels:
+        labels_str = ', '.join(f"{k}={v}" for k, v in labels.items())
+        parts.append(f"Labels: {labels_str}")
+
+    # Add description from annotations
+    annotations = alert.annotations_json if isinstance(alert.annotations_json, dict) else {}
+    description = annotations.get('description') or annotations.get('summary')
+    if description:
+        parts.append(f"Description: {description}")
+
+    # Add instance if present
+    if alert.instance:
+        parts.append(f"Instance: {alert.instance}")
+
+    return '\n'.join(parts)
+
+
+# ========== BACKENDS ==========
+
+class EmbeddingBackend(ABC):
+    """Turns a batch of non-empty texts into vectors, in order."""
+
+    model: str = ""
+    dimensions: int = 0
+
+    @abstractmethod
+    def embed_sync(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts on the calling thread."""
+
+    @abstractmethod
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts without blocking the event loop."""
+
+
+_client_lock = threading.Lock()
+_sync_clients: Dict[str, object] = {}
+_async_clients: Dict[str, object] = {}
+
+
+def _openai_client(api_key: str, asynchronous: bool):
+    """Shared OpenAI client per API key, so connections are reused."""
+    clients = _async_clients if asynchronous else _sync_clients
+    with _client_lock:
+        client = clients.get(api_key)
+        if client is None:
+            from openai import AsyncOpenAI, OpenAI
+            client = (AsyncOpenAI if asynchronous else OpenAI)(api_key=api_key)
+            clients[api_key] = client
+        return client
+
+
+class OpenAIEmbeddingBackend(EmbeddingBackend):
+    """OpenAI embeddings API."""
+
+    def __init__(self, api_key: str, model: str, dimensions: int):
+        self.api_key = api_key
+        self.model = model
+        self.dimensions = dimensions
+
+    def _vectors(self, response) -> List[List[float]]:
+        embeddings = [data.embedding for data in response.data]
+        if embeddings and len(embeddings[0]) != self.dimensions:
+            logger.warning(
+                f"Embedding dimension mismatch: expected {self.dimensions}, "
+                f"got {len(embeddings[0])}"
+            )
+        return embeddings
+
+    def embed_sync(self, texts: List[str]) -> List[List[float]]:
+        response = _openai_client(self.api_key, asynchronous=False).embeddings.create(
+            model=self.model,
+            input=texts,
+            encoding_format="float"
+        )
+        return self._vectors(response)
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        response = await _openai_client(self.api_key, asynchronous=True).embeddings.create(
+            model=self.model,
+            input=texts,
+            encoding_format="float"
+        )
+        return self._vectors(response)
+
+
+class HashingEmbeddingBackend(EmbeddingBackend):
+    """
+    Local CPU embeddings: hashed word 1-2 grams, L2-normalized.
+
+    Lexical rather than semantic, but deterministic, offline and fast, and
+    the same width as the vector columns.
+    """
+
+    def __init__(self, dimensions: int):
+        from sklearn.feature_extraction.text import HashingVectorizer
+
+        self.model = f"local-hashing-{dimensions}"
+        self.dimensions = dimensions
+        self._vectorizer = HashingVectorizer(
+            n_features=dimensions,
+            ngram_range=(1, 2),
+            alternate_sign=True,
+            norm='l2'
+        )
+
+    def embed_sync(self, texts: List[str]) -> List[List[float]]:
+        return self._vectorizer.transform(texts).toarray().tolist()
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        return await asyncio.to_thread(self.embed_sync, texts)
+
+
+def get_embedding_backend(api_key: Optional[str] = None) -> Optional[EmbeddingBackend]:
+    """
+    Backend selected by ``embedding_backend`` ('openai' or 'local').
+
+    Returns None when OpenAI is selected but no API key is available.
+    """
+    dimensions = int(os.getenv('EMBEDDING_DIMENSIONS', '1536'))
+    if get_settings().embedding_backend == 'local':
+        return HashingEmbeddingBackend(dimensions)
+
+    api_key = api_key or os.getenv('OPENAI_API_KEY')
+    if not api_key:
+        return None
+    model = os.getenv('EMBEDDING_MODEL', 'text-embedding-3-small')
+    return OpenAIEmbeddingBackend(api_key, model, dimensions)
+
+
+# ========== CACHE ==========
+
+class EmbeddingCache:
+    """
+    In-memory LRU in front of the ``embedding_cache`` table.
+
+    Database errors are logged and treated as misses, so a missing table
+    or an unavailable database only costs recomputation.
+    """
+
+    def __init__(self, max_entries: int, persist: bool):
+        self.max_entries = max_entries
+        self.persist = persist
+        self._entries: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is not None:
+                self._entries.move_to_end(key)
+            return embedding
+
+    def put(self, key: str, embedding: List[float]) -> None:
+        with self._lock:
+            self._entries[key] = embedding
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _lookup_stmt(keys: Sequence[str]):
+        from sqlalchemy import select
+        from app.models_knowledge import EmbeddingCacheEntry
+
+        return select(EmbeddingCacheEntry.content_hash, EmbeddingCacheEntry.embedding).where(
+            EmbeddingCacheEntry.content_hash.in_(list(keys))
+        )
+
+    @staticmethod
+    def _store_stmt(model: str, entries: Dict[str, List[float]]):
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+        from app.models_knowledge import EmbeddingCacheEntry
+
+        return pg_insert(EmbeddingCacheEntry).values([
+            {"content_hash": key, "model": model, "embedding": embedding}
+            for key, embedding in entries.items()
+        ]).on_conflict_do_nothing(index_elements=["content_hash"])
+
+    def _remember(self, rows) -> Dict[str, List[float]]:
+        found = {key: [float(x) for x in embedding] for key, embedding in rows}
+        for key, embedding in found.items():
+            self.put(key, embedding)
+        return found
+
+    def lookup_sync(self, keys: Sequence[str]) -> Dict[str, List[float]]:
+        if not self.persist or not keys:
+            return {}
+        from app.database import SessionLocal
+        try:
+            with SessionLocal() as db:
+                return self._remember(db.execute(self._lookup_stmt(keys)).all())
+        except Exception as e:
+            logger.warning(f"Embedding cache lookup failed: {e}")
+            return {}
+
+    def store_sync(self, model: str, entries: Dict[str, List[float]]) -> None:
+        if not self.persist or not entries:
+            return
+        from app.database import SessionLocal
+        try:
+            with SessionLocal() as db:
+                db.execute(self._store_stmt(model, entries))
+                db.commit()
+        except Exception as e:
+            logger.warning(f"Embedding cache store failed: {e}")
+
+    async def lookup(self, keys: Sequence[str]) -> Dict[str, List[float]]:
+        if not self.persist or not keys:
+            return {}
+        from app.database import async_session_factory
+        try:
+            async with async_session_factory() as db:
+                return self._remember((await db.execute(self._lookup_stmt(keys))).all())
+        except Exception as e:
+            logger.warning(f"Embedding cache lookup failed: {e}")
+            return {}
+
+    async def store(self, model: str, entries: Dict[str, List[float]]) -> None:
+        if not self.persist or not entries:
+            return
+        from app.database import async_session_factory
+        try:
+            async with async_session_factory() as db:
+                await db.execute(self._store_stmt(model, entries))
+                await db.commit()
+        except Exception as e:
+            logger.warning(f"Embedding cache store failed: {e}")
+
+
+_cache: Optional[EmbeddingCache] = None
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Process-wide embedding cache."""
+    global _cache
+    with _client_lock:
+        if _cache is None:
+            settings = get_settings()
+            _cache = EmbeddingCache(settings.embedding_cache_size, settings.embedding_cache_persist)
+        return _cache
+
+
+# ========== ASYNC SERVICE ==========
+
+class AsyncEmbeddingService:
+    """
+    Embeddings for request paths.
+
+    Each distinct text is embedded at most once at a time: callers asking
+    for a text that is already queued or in flight await the same future.
+    Queued texts are flushed as one backend call when ``batch_size`` are
+    waiting or ``batch_wait`` seconds after the first one arrived.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[EmbeddingBackend],
+        cache: EmbeddingCache,
+        batch_size: int = 100,
+        batch_wait: float = 0.01
+    ):
+        self.backend = backend
+        self.cache = cache
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._queue: List[Tuple[str, str]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()
+
+    def is_configured(self) -> bool:
+        return self.backend is not None
+
+    async def embed(self, text: str) -> Optional[List[float]]:
+        """Embedding of one text, or None if empty or the backend failed."""
+        return (await self.embed_many([text]))[0]
+
+    async def embed_many(self, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """Embeddings in input order; None for empty texts and failures."""
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        if self.backend is None:
+            return results
+
+        loop = asyncio.get_running_loop()
+        if self._loop is None:
+            self._loop = loop
+        elif self._loop is not loop:
+            # Futures belong to one loop; callers on another loop (e.g. a
+            # worker thread running asyncio.run) are served without coalescing
+            return await self._embed_direct(texts)
+
+        waiting = []
+        for i, text in enumerate(texts):
+            text = _clean(text)
+            if not text:
+                continue
+            key = content_hash(self.backend.model, text)
+            cached = self.cache.get(key)
+            if cached is not None:
+                results[i] = cached
+                continue
+            future = self._inflight.get(key)
+            if future is None:
+                future = loop.create_future()
+                self._inflight[key] = future
+                self._queue.append((key, text))
+            waiting.append((i, future))
+
+        if self._queue:
+            self._schedule_flush(loop)
+
+        for i, future in waiting:
+            # Shielded so a cancelled caller does not fail the others
+            results[i] = await asyncio.shield(future)
+        return results
+
+    def _schedule_flush(self, loop: asyncio.AbstractEventLoop) -> None:
+        if len(self._queue) >= self.batch_size:
+            self._start_flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_wait, self._start_flush)
+
+    def _start_flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        while self._queue:
+            batch, self._queue = self._queue[:self.batch_size], self._queue[self.batch_size:]
+            task = asyncio.get_running_loop().create_task(self._flush(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _flush(self, batch: List[Tuple[str, str]]) -> None:
+        try:
+            embeddings = await self._resolve(batch)
+        except Exception as e:
+            logger.error(f"Embedding batch failed: {e}")
+            embeddings = {}
+        for key, _ in batch:
+            future = self._inflight.pop(key, None)
+            if future is not None and not future.done():
+                future.set_result(embeddings.get(key))
+
+    async def _resolve(self, batch: List[Tuple[str, str]]) -> Dict[str, List[float]]:
+        """Embeddings for (key, text) pairs: database cache first, then the backend."""
+        found = await self.cache.lookup([key for key, _ in batch])
+        missing = [(key, text) for key, text in batch if key not in found]
+        if missing:
+            vectors = await self.backend.embed([text for _, text in missing])
+            computed = dict(zip((key for key, _ in missing), vectors))
+            for key, embedding in computed.items():
+                self.cache.put(key, embedding)
+            await self.cache.store(self.backend.model, computed)
+            found.update(computed)
+        return found
+
+    async def _embed_direct(self, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        cleaned = [_clean(text) for text in texts]
+        pairs = {content_hash(self.backend.model, text): text for text in cleaned if text}
+        try:
+            found = await self._resolve(list(pairs.items()))
+        except Exception as e:
+            logger.error(f"Embedding batch failed: {e}")
+            found = {}
+        return [found.get(content_hash(self.backend.model, text)) if text else None for text in cleaned]
+
+
+_services: Dict[Optional[str], AsyncEmbeddingService] = {}
+
+
+def get_embedding_service(api_key: Optional[str] = None) -> AsyncEmbeddingService:
+    """Shared async service, one per API key (None: the environment's)."""
+    with _client_lock:
+        service = _services.get(api_key)
+    if service is None:
+        settings = get_settings()
+        service = AsyncEmbeddingService(
+            get_embedding_backend(api_key),
+            get_embedding_cache(),
+            batch_size=settings.embedding_batch_size,
+            batch_wait=settings.embedding_batch_wait_ms / 1000
+        )
+        with _client_lock:
+            service = _services.setdefault(api_key, service)
+    return service
+
+
+# ========== SYNC FACADE ==========
 
 class EmbeddingService:
-    """Service for generating text embeddings using OpenAI."""
-    
+    """Synchronous embeddings for indexing jobs, sharing the backend clients and cache."""
+
     def __init__(self, api_key: Optional[str] = None):
-        self.model = os.getenv('EMBEDDING_MODEL', 'text-embedding-3-small')
+        self.backend = get_embedding_backend(api_key)
+        self.cache = get_embedding_cache()
+        self.model = self.backend.model if self.backend else os.getenv('EMBEDDING_MODEL', 'text-embedding-3-small')
         self.dimensions = int(os.getenv('EMBEDDING_DIMENSIONS', '1536'))
         self.api_key = api_key or os.getenv('OPENAI_API_KEY')
-        
-        if not self.api_key:
+
+        if not self.backend:
             logger.warning("OPENAI_API_KEY not set - embeddings will not work")
-    
+
     def generate_embedding(self, text: str) -> Optional[List[float]]:
         """
         Generate embedding for a single text.
-        
+
         Args:
             text: Text to generate embedding for
-            
+
         Returns:
             List of floats (1536 dimensions) or None if failed
         """
-        if not self.api_key:
+        if not self.backend:
             logger.error("Cannot generate embedding - OPENAI_API_KEY not configured")
             return None
-        
-        if not text or len(text.strip()) == 0:
+
+        if not _clean(text):
             logger.warning("Empty text provided for embedding")
             return None
-        
-        try:
-            from openai import OpenAI
-            
-            client = OpenAI(api_key=self.api_key)
-            
-            # Clean and truncate text if needed (OpenAI has token limits)
-            text = text.strip()
-            if len(text) > 8000:  # Approximate token limit
-                text = text[:8000]
-            
-            response = client.embeddings.create(
-                model=self.model,
-                input=text,
-                encoding_format="float"
-            )
-            
-            embedding = response.data[0].embedding
-            
-            # Verify dimensions
-            if len(embedding) != self.dimensions:
-                logger.warning(
-                    f"Embedding dimension mismatch: expected {self.dimensions}, "
-                    f"got {len(embedding)}"
-                )
-            
-            return embedding
-            
-        except Exception as e:
-            logger.error(f"Failed to generate embedding: {e}")
-            return None
-    
+
+        return self.generate_embeddings_batch([text])[0]
+
     def generate_embeddings_batch(
-        self, 
+        self,
         texts: List[str],
         batch_size: int = 100
     ) -> List[Optional[List[float]]]:
         """
         Generate embeddings for multiple texts in batches.
-        
+
+        Cached texts are not sent to the backend.
+
         Args:
             texts: List of texts to generate embeddings for
             batch_size: Number of texts to process per API call
-            
+
         Returns:
             List of embeddings (same order as input texts)
         """
-        if not self.api_key:
+        if not self.backend:
             logger.error("Cannot generate embeddings - OPENAI_API_KEY not configured")
             return [None] * len(texts)
-        
+
         if not texts:
             return []
-        
-        try:
-            from openai import OpenAI
-            
-            client = OpenAI(api_key=self.api_key)
-            all_embeddings = []
-            
-            # Process in batches
-            for i in range(0, len(texts), batch_size):
-                batch = texts[i:i + batch_size]
-                
-                # Clean texts
-                cleaned_batch = [
-                    text.strip()[:8000] if text else "" 
-                    for text in batch
-                ]
-                
-                try:
-                    response = client.embeddings.create(
-                        model=self.model,
-                        input=cleaned_batch,
-                        encoding_format="float"
-                    )
-                    
-                    # Extract embeddings in order
-                    batch_embeddings = [
-                        data.embedding for data in response.data
-                    ]
-                    all_embeddings.extend(batch_embeddings)
-                    
-                except Exception as e:
-                    logger.error(f"Batch embedding failed: {e}")
-                    # Add None for failed batch
-                    all_embeddings.extend([None] * len(batch))
-            
-            return all_embeddings
-            
-        except Exception as e:
-            logger.error(f"Failed to generate batch embeddings: {e}")
-            return [None] * len(texts)
-    
+
+        cleaned = [_clean(text) for text in texts]
+        keys = [content_hash(self.backend.model, text) if text else None for text in cleaned]
+
+        found: Dict[str, List[float]] = {}
+        for key in keys:
+            if key and key not in found:
+                cached = self.cache.get(key)
+                if cached is not None:
+                    found[key] = cached
+
+        pending = {key: text for key, text in zip(keys, cleaned) if key and key not in found}
+        found.update(self.cache.lookup_sync(list(pending)))
+        missing = [(key, text) for key, text in pending.items() if key not in found]
+
+        # Process in batches
+        for i in range(0, len(missing), batch_size):
+            batch = missing[i:i + batch_size]
+            try:
+                vectors = self.backend.embed_sync([text for _, text in batch])
+            except Exception as e:
+                logger.error(f"Batch embedding failed: {e}")
+                continue
+            computed = dict(zip((key for key, _ in batch), vectors))
+            for key, embedding in computed.items():
+                self.cache.put(key, embedding)
+            self.cache.store_sync(self.backend.model, computed)
+            found.update(computed)
+
+        return [found.get(key) if key else None for key in keys]
+
     def get_embedding_model(self) -> str:
         """Get the current embedding model name."""
         return self.model
-    
+
     def get_dimensions(self) -> int:
         """Get embedding dimensions."""
         return self.dimensions
-    
+
     def is_configured(self) -> bool:
         """Check if the service is properly configured."""
-        return self.api_key is not None and len(self.api_key) > 0
-    
+        return self.backend is not None
+
     def generate_for_alert(self, alert) -> Optional[List[float]]:
         """
         Generate embedding optimized for alert similarity search.
-        
-        Combines alert metadata into a single text representation:
-        - Alert name
-        - Severity
-        - Labels (JSON)
-        - Description from annotations
-        
+
         Args:
             alert: Alert model instance
-            
+
         Returns:
             List of floats (embedding vector) or None if failed
         """
         try:
-            # Build text representation of alert
-            parts = [
-                f"Alert: {alert.alert_name}",
-                f"Severity: {alert.severity or 'unknown'}",
-            ]
-            
-            # Add labels if present
-            if alert.labels_json:
-                import json
-                labels = alert.labels_json if isinstance(alert.labels_json, dict) else {}
-                if labels:
-                    labels_str = ', '.join(f"{k}={v}" for k, v in labels.items())
-                    parts.append(f"Labels: {labels_str}")
-            
-            # Add description from annotations
-            if alert.annotations_json:
-                annotations = alert.annotations_json if isinstance(alert.annotations_json, dict) else {}
-                description = annotations.get('description') or annotations.get('summary')
-                if description:
-                    parts.append(f"Description: {description}")
-            
-            # Add instance if present
-            if alert.instance:
-                parts.append(f"Instance: {alert.instance}")
-            
-            # Combine all parts
-            embedding_text = '\n'.join(parts)
-            
-            # Generate embedding
-            embedding = self.generate_embedding(embedding_text)
-            
-            return embedding
-            
+            return self.generate_embedding(alert_embedding_text(alert))
         except Exception as e:
             logger.error(f"Failed to generate alert embedding: {e}")
             return None
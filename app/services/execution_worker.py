@@ -1,228 +1,600 @@
-"""
-Execution Worker Service
-
-Background worker that processes pending and approved runbook executions.
-Runs as an asyncio background task within the FastAPI application.
-"""
-
-import asyncio
-import logging
-from datetime import datetime, timezone, timedelta
-from typing import Optional
-
-from sqlalchemy import select, and_
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
-
-from ..database import async_session_factory
-from ..models_remediation import RunbookExecution, Runbook
-from ..config import get_settings
-from .runbook_executor import RunbookExecutor
-
-logger = logging.getLogger(__name__)
-settings = get_settings()
-
-
-class ExecutionWorker:
-    """
-    Background worker that polls for and executes pending/approved runbook executions.
-    
-    Features:
-    - Polls database for ready-to-execute jobs
-    - Handles approval timeouts
-    - Processes one execution at a time (can be extended for parallel)
-    - Graceful shutdown support
-    """
-    
-    def __init__(self, poll_interval: int = 5):
-        """
-        Initialize the execution worker.
-        
-        Args:
-            poll_interval: Seconds between database polls
-        """
-        self.poll_interval = poll_interval
-        self._running = False
-        self._task: Optional[asyncio.Task] = None
-        self.fernet_key = settings.encryption_key if settings.encryption_key else None
-    
-    async def start(self):
-        """Start the background worker."""
-        if self._running:
-            logger.warning("Execution worker is already running")
-            return
-        
-        self._running = True
-        self._task = asyncio.create_task(self._worker_loop())
-        logger.info("Execution worker started")
-    
-    async def stop(self):
-        """Stop the background worker gracefully."""
-        self._running = False
-        if self._task:
-            self._task.cancel()
-            try:
-                await self._task
-            except asyncio.CancelledError:
-                pass
-        logger.info("Execution worker stopped")
-    
-    async def _worker_loop(self):
-        """Main worker loop - polls for and processes executions."""
-        while self._running:
-            try:
-                await self._process_pending_executions()
-                await self._check_approval_timeouts()
-            except Exception as e:
-                logger.exception(f"Error in execution worker loop: {e}")
-            
-            await asyncio.sleep(self.poll_interval)
-    
-    async def _process_pending_executions(self):
-        """Find and process executions that are ready to run."""
-        async with async_session_factory() as db:
-            try:
-                # Find executions that are:
-                # 1. Status = 'approved' (approved and ready to run)
-                # 2. Status = 'running' but not yet started (initial state for non-approval runbooks)
-                result = await db.execute(
-                    select(RunbookExecution)
-                    .options(
-                        selectinload(RunbookExecution.runbook).selectinload(Runbook.steps),
-                        selectinload(RunbookExecution.server)
-                    )
-                    .where(
-                        RunbookExecution.status.in_(["approved", "running", "queued"])
-                    )
-                    .where(
-                        # Only pick up executions that haven't actually started
-                        # (started_at is None or very recent for 'running' initial state)
-                        RunbookExecution.completed_at.is_(None)
-                    )
-                    .order_by(RunbookExecution.queued_at)
-                    .limit(5)  # Process up to 5 at a time
-                )
-                executions = result.scalars().all()
-                
-                for execution in executions:
-                    if not self._running:
-                        break
-                    
-                    await self._execute_runbook(db, execution)
-                    
-            except Exception as e:
-                logger.exception(f"Error processing pending executions: {e}")
-    
-    async def _execute_runbook(self, db: AsyncSession, execution: RunbookExecution):
-        """Execute a single runbook."""
-        logger.info(f"Starting execution {execution.id} for runbook {execution.runbook.name if execution.runbook else 'Unknown'}")
-        
-        try:
-            # Update status to running
-            execution.status = "running"
-            execution.started_at = datetime.now(timezone.utc)
-            await db.commit()
-            
-            # Check if we have required data
-            if not execution.runbook:
-                execution.status = "failed"
-                execution.error_message = "Runbook not found"
-                execution.completed_at = datetime.now(timezone.utc)
-                await db.commit()
-                return
-            
-            if not execution.server_id:
-                execution.status = "failed"
-                execution.error_message = "No target server specified"
-                execution.completed_at = datetime.now(timezone.utc)
-                await db.commit()
-                return
-            
-            # Create executor and run
-            executor = RunbookExecutor(db=db, fernet_key=self.fernet_key)
-            
-            # Define callbacks for logging
-            def on_step_start(step_order: int, step_name: str):
-                logger.info(f"  Step {step_order}: {step_name} - Starting")
-            
-            def on_step_complete(step_order: int, step_name: str, success: bool):
-                status = "Success" if success else "Failed"
-                logger.info(f"  Step {step_order}: {step_name} - {status}")
-            
-            def on_output(line: str):
-                logger.debug(f"    Output: {line[:200]}")  # Truncate long lines
-            
-            # Execute the runbook
-            result = await executor.execute_runbook(
-                execution=execution,
-                on_step_start=on_step_start,
-                on_step_complete=on_step_complete,
-                on_output=on_output
-            )
-            
-            logger.info(f"Execution {execution.id} completed with status: {result.status}")
-            
-        except Exception as e:
-            logger.exception(f"Error executing runbook {execution.id}: {e}")
-            execution.status = "failed"
-            execution.error_message = f"Execution error: {str(e)}"
-            execution.completed_at = datetime.now(timezone.utc)
-            await db.commit()
-    
-    async def _check_approval_timeouts(self):
-        """Check for and timeout expired pending approvals."""
-        async with async_session_factory() as db:
-            try:
-                now = datetime.now(timezone.utc)
-                
-                # Find pending executions that have expired
-                result = await db.execute(
-                    select(RunbookExecution)
-                    .where(
-                        and_(
-                            RunbookExecution.status == "pending",
-                            RunbookExecution.approval_expires_at.isnot(None),
-                            RunbookExecution.approval_expires_at < now
-                        )
-                    )
-                )
-                expired_executions = result.scalars().all()
-                
-                for execution in expired_executions:
-                    logger.info(f"Timing out execution {execution.id} - approval expired")
-                    execution.status = "timeout"
-                    execution.completed_at = now
-                    execution.error_message = "Approval timeout - no response within allowed window"
-                
-                if expired_executions:
-                    await db.commit()
-                    logger.info(f"Timed out {len(expired_executions)} pending executions")
-                    
-            except Exception as e:
-                logger.exception(f"Error checking approval timeouts: {e}")
-
-
-# Global worker instance
-_worker: Optional[ExecutionWorker] = None
-
-
-def get_execution_worker() -> ExecutionWorker:
-    """Get or create the global execution worker instance."""
-    global _worker
-    if _worker is None:
-        _worker = ExecutionWorker()
-    return _worker
-
-
-async def start_execution_worker():
-    """Start the global execution worker."""
-    worker = get_execution_worker()
-    await worker.start()
-
-
-async def stop_execution_worker():
-    """Stop the global execution worker."""
-    global _worker
-    if _worker:
-        await _worker.stop()
-        _worker = None
+"""
+Execution Worker Service
+
+Background worker that processes pending and approved runbook executions.
+Runs as an asyncio background task within the FastAPI application.
+
+Executions are claimed with SELECT ... FOR UPDATE SKIP LOCKED and held with a
+lease that a heartbeat keeps renewing, so several app replicas can share the
+table without running the same execution twice. An execution whose lease
+expires (its worker crashed) is picked up again by the next claim.
+
+Code that makes an execution ready calls notify_execution_ready() before
+committing; the resulting Postgres NOTIFY wakes every listening worker at
+once, so polling is only a slow safety net.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from collections import Counter
+from datetime import datetime, timezone, timedelta
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import asyncpg
+from sqlalchemy import event, select, update, and_, or_, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from ..database import async_session_factory
+from ..models_remediation import RunbookExecution, Runbook
+from ..config import get_settings
+from ..metrics import EXECUTIONS_IN_FLIGHT, EXECUTION_CLAIMS, EXECUTION_LEASES_LOST
+from .runbook_executor import RunbookExecutor
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+READY_STATUSES = ("approved", "running", "queued")
+
+# NOTIFY channel signalling that an execution became ready or a slot freed up
+EXECUTION_READY_CHANNEL = "runbook_execution_ready"
+
+# Serializes claims across replicas so per-server/per-runbook caps hold cluster-wide
+EXECUTION_CLAIM_LOCK_KEY = 7_420_001
+
+# Candidates scanned per free slot, so capped servers/runbooks don't starve the rest
+CLAIM_SCAN_FACTOR = 4
+
+SHUTDOWN_GRACE_SECONDS = 30
+
+Candidate = Tuple[uuid.UUID, Optional[uuid.UUID], uuid.UUID]
+
+
+def select_within_caps(
+    candidates: Sequence[Candidate],
+    limit: int,
+    active_per_server: Dict[uuid.UUID, int],
+    active_per_runbook: Dict[uuid.UUID, int],
+    max_per_server: int,
+    max_per_runbook: int
+) -> List[uuid.UUID]:
+    """
+    Pick up to ``limit`` (execution_id, server_id, runbook_id) candidates, in
+    order, without exceeding the per-server and per-runbook concurrency caps.
+    Executions without a server only count against their runbook.
+    """
+    per_server = Counter(active_per_server)
+    per_runbook = Counter(active_per_runbook)
+    chosen = []
+
+    for execution_id, server_id, runbook_id in candidates:
+        if len(chosen) >= limit:
+            break
+        if server_id is not None and per_server[server_id] >= max_per_server:
+            continue
+        if per_runbook[runbook_id] >= max_per_runbook:
+            continue
+        if server_id is not None:
+            per_server[server_id] += 1
+        per_runbook[runbook_id] += 1
+        chosen.append(execution_id)
+
+    return chosen
+
+
+def _claimable(now: datetime):
+    """Ready executions that no live worker holds a lease on."""
+    return and_(
+        RunbookExecution.status.in_(READY_STATUSES),
+        RunbookExecution.completed_at.is_(None),
+        or_(
+            RunbookExecution.lease_expires_at.is_(None),
+            RunbookExecution.lease_expires_at < now
+        )
+    )
+
+
+async def claim_executions(
+    db: AsyncSession,
+    limit: int,
+    worker_id: str,
+    lease_seconds: int,
+    max_per_server: int,
+    max_per_runbook: int,
+    max_claims: int
+) -> List[uuid.UUID]:
+    """
+    Lease up to ``limit`` ready executions to ``worker_id`` and commit.
+
+    Executions that were already claimed ``max_claims`` times (their workers
+    kept dying) are failed instead of being run again.
+    """
+    now = datetime.now(timezone.utc)
+
+    await db.execute(select(func.pg_advisory_xact_lock(EXECUTION_CLAIM_LOCK_KEY)))
+
+    result = await db.execute(
+        select(
+            RunbookExecution.id,
+            RunbookExecution.server_id,
+            RunbookExecution.runbook_id,
+            RunbookExecution.claim_count
+        )
+        .where(_claimable(now))
+        .order_by(RunbookExecution.queued_at)
+        .limit(limit * CLAIM_SCAN_FACTOR)
+        .with_for_update(skip_locked=True)
+    )
+    rows = result.all()
+    if not rows:
+        await db.commit()
+        return []
+
+    abandoned = [row.id for row in rows if (row.claim_count or 0) >= max_claims]
+    if abandoned:
+        await db.execute(
+            update(RunbookExecution)
+            .where(RunbookExecution.id.in_(abandoned))
+            .values(
+                status="failed",
+                completed_at=now,
+                error_message=f"Execution abandoned: worker lease expired {max_claims} time(s)",
+                worker_id=None,
+                lease_expires_at=None
+            )
+            .execution_options(synchronize_session=False)
+        )
+        EXECUTION_CLAIMS.labels(kind="abandoned").inc(len(abandoned))
+        logger.error(f"Failed {len(abandoned)} execution(s) orphaned too many times: {abandoned}")
+
+    rows = [row for row in rows if (row.claim_count or 0) < max_claims]
+
+    # Executions currently leased by any worker count against the caps
+    active = await db.execute(
+        select(RunbookExecution.server_id, RunbookExecution.runbook_id, func.count())
+        .where(
+            and_(
+                RunbookExecution.completed_at.is_(None),
+                RunbookExecution.lease_expires_at >= now
+            )
+        )
+        .group_by(RunbookExecution.server_id, RunbookExecution.runbook_id)
+    )
+    active_per_server: Dict[uuid.UUID, int] = Counter()
+    active_per_runbook: Dict[uuid.UUID, int] = Counter()
+    for server_id, runbook_id, count in active:
+        if server_id is not None:
+            active_per_server[server_id] += count
+        active_per_runbook[runbook_id] += count
+
+    chosen = select_within_caps(
+        [(row.id, row.server_id, row.runbook_id) for row in rows],
+        limit,
+        active_per_server,
+        active_per_runbook,
+        max_per_server,
+        max_per_runbook
+    )
+
+    if chosen:
+        await db.execute(
+            update(RunbookExecution)
+            .where(RunbookExecution.id.in_(chosen))
+            .values(
+                worker_id=worker_id,
+                lease_expires_at=now + timedelta(seconds=lease_seconds),
+                claim_count=func.coalesce(RunbookExecution.claim_count, 0) + 1
+            )
+            .execution_options(synchronize_session=False)
+        )
+        chosen_ids = set(chosen)
+        recovered = sum(1 for row in rows if row.id in chosen_ids and row.claim_count)
+        EXECUTION_CLAIMS.labels(kind="new").inc(len(chosen) - recovered)
+        if recovered:
+            EXECUTION_CLAIMS.labels(kind="recovered").inc(recovered)
+            logger.warning(f"Recovered {recovered} execution(s) whose worker lease expired")
+
+    await db.commit()
+    return chosen
+
+
+async def renew_lease(
+    db: AsyncSession,
+    execution_id: uuid.UUID,
+    worker_id: str,
+    lease_seconds: int
+) -> bool:
+    """Extend a lease this worker still holds. Returns False if it was lost."""
+    result = await db.execute(
+        update(RunbookExecution)
+        .where(
+            and_(
+                RunbookExecution.id == execution_id,
+                RunbookExecution.worker_id == worker_id
+            )
+        )
+        .values(lease_expires_at=datetime.now(timezone.utc) + timedelta(seconds=lease_seconds))
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount > 0
+
+
+async def notify_execution_ready(db: AsyncSession) -> None:
+    """
+    Wake execution workers once the caller's transaction commits.
+
+    Issues a Postgres NOTIFY, which is delivered on commit to every listening
+    replica. A worker in this process without a live listener (notify
+    disabled, or listener reconnecting) is woken directly after commit.
+    """
+    if settings.execution_notify_enabled:
+        await db.execute(select(func.pg_notify(EXECUTION_READY_CHANNEL, "")))
+
+    worker = _worker
+    if worker is not None and not worker.listening:
+        event.listen(db.sync_session, "after_commit", lambda session: worker.wake(), once=True)
+
+
+async def release_lease(db: AsyncSession, execution_id: uuid.UUID, worker_id: str) -> None:
+    """Drop this worker's lease on a finished execution, freeing its slot."""
+    await db.execute(
+        update(RunbookExecution)
+        .where(
+            and_(
+                RunbookExecution.id == execution_id,
+                RunbookExecution.worker_id == worker_id
+            )
+        )
+        .values(worker_id=None, lease_expires_at=None)
+        .execution_options(synchronize_session=False)
+    )
+    # Executions held back by per-server/per-runbook caps may now fit
+    await notify_execution_ready(db)
+    await db.commit()
+
+
+class ExecutionWorker:
+    """
+    Background worker that polls for and executes pending/approved runbook executions.
+
+    Features:
+    - Polls database for ready-to-execute jobs
+    - Handles approval timeouts
+    - Runs up to ``concurrency`` executions in parallel, with per-server and
+      per-runbook caps
+    - Lease + heartbeat ownership; recovers executions of crashed workers
+    - Wakes on Postgres NOTIFY, polling only as a safety net
+    - Graceful shutdown support
+    """
+
+    def __init__(
+        self,
+        poll_interval: Optional[float] = None,
+        concurrency: Optional[int] = None,
+        max_per_server: Optional[int] = None,
+        max_per_runbook: Optional[int] = None,
+        lease_seconds: Optional[int] = None,
+        session_factory=async_session_factory,
+        notify_enabled: Optional[bool] = None
+    ):
+        """
+        Initialize the execution worker.
+
+        Args:
+            poll_interval: Seconds between database polls while no NOTIFY listener is connected
+            concurrency: Max executions running at once on this replica
+            max_per_server: Max concurrent executions against one server (cluster-wide)
+            max_per_runbook: Max concurrent executions of one runbook (cluster-wide)
+            lease_seconds: Lease length; renewed every third of it while running
+            session_factory: Async session factory
+            notify_enabled: LISTEN for execution-ready notifications
+        """
+        self.poll_interval = poll_interval if poll_interval is not None else settings.execution_worker_poll_interval
+        self.concurrency = concurrency or settings.execution_worker_concurrency
+        self.max_per_server = max_per_server or settings.execution_worker_max_per_server
+        self.max_per_runbook = max_per_runbook or settings.execution_worker_max_per_runbook
+        self.lease_seconds = lease_seconds or settings.execution_lease_seconds
+        self.session_factory = session_factory
+        self.notify_enabled = settings.execution_notify_enabled if notify_enabled is None else notify_enabled
+        self.safety_poll_interval = max(self.poll_interval, settings.execution_worker_safety_poll_interval)
+        self.listening = False
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._running = False
+        self._task: Optional[asyncio.Task] = None
+        self._listener_task: Optional[asyncio.Task] = None
+        self._in_flight: Set[asyncio.Task] = set()
+        self._wakeup = asyncio.Event()
+        self._last_timeout_check = 0.0
+        self.fernet_key = settings.encryption_key if settings.encryption_key else None
+
+    async def start(self):
+        """Start the background worker."""
+        if self._running:
+            logger.warning("Execution worker is already running")
+            return
+
+        self._running = True
+        self._task = asyncio.create_task(self._worker_loop())
+        if self.notify_enabled:
+            self._listener_task = asyncio.create_task(self._listen_loop())
+        logger.info(
+            f"Execution worker {self.worker_id} started "
+            f"(concurrency={self.concurrency}, per_server={self.max_per_server}, "
+            f"per_runbook={self.max_per_runbook})"
+        )
+
+    async def stop(self):
+        """
+        Stop the background worker gracefully.
+
+        In-flight executions get SHUTDOWN_GRACE_SECONDS to finish; anything
+        still running is cancelled and left for another worker to recover
+        once its lease expires.
+        """
+        self._running = False
+        for task in (self._task, self._listener_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+
+        if self._in_flight:
+            _, pending = await asyncio.wait(self._in_flight, timeout=SHUTDOWN_GRACE_SECONDS)
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        logger.info("Execution worker stopped")
+
+    def wake(self):
+        """Claim work now instead of waiting for the next poll."""
+        self._wakeup.set()
+
+    async def _worker_loop(self):
+        """Main worker loop - claims executions whenever there is spare capacity."""
+        loop = asyncio.get_running_loop()
+        while self._running:
+            try:
+                await self._process_pending_executions()
+                if loop.time() - self._last_timeout_check >= self.poll_interval:
+                    self._last_timeout_check = loop.time()
+                    await self._check_approval_timeouts()
+            except Exception as e:
+                logger.exception(f"Error in execution worker loop: {e}")
+
+            timeout = self.safety_poll_interval if self.listening else self.poll_interval
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    def _on_notify(self, connection, pid, channel, payload):
+        self.wake()
+
+    async def _listen_loop(self):
+        """Hold a LISTEN connection, reconnecting with backoff when it drops."""
+        backoff = 1
+        while self._running:
+            connection = None
+            try:
+                connection = await asyncpg.connect(settings.database_url)
+                await connection.add_listener(EXECUTION_READY_CHANNEL, self._on_notify)
+                self.listening = True
+                backoff = 1
+                logger.info(f"Execution worker listening on '{EXECUTION_READY_CHANNEL}'")
+                # Pick up anything that became ready while we were not listening
+                self.wake()
+                while self._running and not connection.is_closed():
+                    await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Execution notify listener unavailable, polling every {self.poll_interval}s: {e}")
+            finally:
+                self.listening = False
+                if connection is not None and not connection.is_closed():
+                    connection.terminate()
+
+            if self._running:
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 60)
+
+    async def _process_pending_executions(self):
+        """Claim ready executions up to the free capacity and start them."""
+        free = self.concurrency - len(self._in_flight)
+        if free <= 0:
+            return
+
+        try:
+            async with self.session_factory() as db:
+                claimed = await claim_executions(
+                    db,
+                    free,
+                    self.worker_id,
+                    self.lease_seconds,
+                    self.max_per_server,
+                    self.max_per_runbook,
+                    settings.execution_max_claims
+                )
+        except Exception as e:
+            logger.exception(f"Error claiming pending executions: {e}")
+            return
+
+        for execution_id in claimed:
+            task = asyncio.create_task(self._run_claimed(execution_id))
+            self._in_flight.add(task)
+            task.add_done_callback(self._on_execution_done)
+        EXECUTIONS_IN_FLIGHT.set(len(self._in_flight))
+
+        # A full batch suggests more work is waiting
+        if claimed and len(claimed) == free:
+            self.wake()
+
+    def _on_execution_done(self, task: asyncio.Task):
+        self._in_flight.discard(task)
+        EXECUTIONS_IN_FLIGHT.set(len(self._in_flight))
+        if self._running:
+            self.wake()
+
+    async def _run_claimed(self, execution_id: uuid.UUID):
+        """Run one leased execution in its own session, heartbeating its lease."""
+        heartbeat = asyncio.create_task(self._heartbeat(execution_id, asyncio.current_task()))
+        try:
+            async with self.session_factory() as db:
+                result = await db.execute(
+                    select(RunbookExecution)
+                    .options(
+                        selectinload(RunbookExecution.runbook).selectinload(Runbook.steps),
+                        selectinload(RunbookExecution.server)
+                    )
+                    .where(RunbookExecution.id == execution_id)
+                )
+                execution = result.scalar_one_or_none()
+                if execution is not None:
+                    await self._execute_runbook(db, execution)
+        finally:
+            heartbeat.cancel()
+            try:
+                async with self.session_factory() as db:
+                    await release_lease(db, execution_id, self.worker_id)
+            except Exception as e:
+                logger.warning(f"Could not release lease on execution {execution_id}: {e}")
+
+    async def _heartbeat(self, execution_id: uuid.UUID, runner: asyncio.Task):
+        """Renew the lease until cancelled; cancel the run if the lease is lost."""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                async with self.session_factory() as db:
+                    held = await renew_lease(db, execution_id, self.worker_id, self.lease_seconds)
+            except Exception as e:
+                # Transient DB trouble: keep running, the lease still has time left
+                logger.warning(f"Lease heartbeat failed for execution {execution_id}: {e}")
+                continue
+
+            if not held:
+                logger.error(f"Lost lease on execution {execution_id}; cancelling local run")
+                EXECUTION_LEASES_LOST.inc()
+                runner.cancel()
+                return
+
+    async def _execute_runbook(self, db: AsyncSession, execution: RunbookExecution):
+        """Execute a single runbook."""
+        logger.info(f"Starting execution {execution.id} for runbook {execution.runbook.name if execution.runbook else 'Unknown'}")
+        
+        try:
+            # Update status to running
+            execution.status = "running"
+            execution.started_at = datetime.now(timezone.utc)
+            await db.commit()
+            
+            # Check if we have required data
+            if not execution.runbook:
+                execution.status = "failed"
+                execution.error_message = "Runbook not found"
+                execution.completed_at = datetime.now(timezone.utc)
+                await db.commit()
+                return
+            
+            if not execution.server_id:
+                execution.status = "failed"
+                execution.error_message = "No target server specified"
+                execution.completed_at = datetime.now(timezone.utc)
+                await db.commit()
+                return
+            
+            # Create executor and run
+            executor = RunbookExecutor(db=db, fernet_key=self.fernet_key)
+            
+            # Define callbacks for logging
+            def on_step_start(step_order: int, step_name: str):
+                logger.info(f"  Step {step_order}: {step_name} - Starting")
+            
+            def on_step_complete(step_order: int, step_name: str, success: bool):
+                status = "Success" if success else "Failed"
+                logger.info(f"  Step {step_order}: {step_name} - {status}")
+            
+            def on_output(line: str):
+                logger.debug(f"    Output: {line[:200]}")  # Truncate long lines
+            
+            # Execute the runbook
+            result = await executor.execute_runbook(
+                execution=execution,
+                on_step_start=on_step_start,
+                on_step_complete=on_step_complete,
+                on_output=on_output
+            )
+            
+            logger.info(f"Execution {execution.id} completed with status: {result.status}")
+            
+        except Exception as e:
+            logger.exception(f"Error executing runbook {execution.id}: {e}")
+            execution.status = "failed"
+            execution.error_message = f"Execution error: {str(e)}"
+            execution.completed_at = datetime.now(timezone.utc)
+            await db.commit()
+    
+    async def _check_approval_timeouts(self):
+        """Check for and timeout expired pending approvals."""
+        async with self.session_factory() as db:
+            try:
+                now = datetime.now(timezone.utc)
+                
+                # Find pending executions that have expired
+                result = await db.execute(
+                    select(RunbookExecution)
+                    .where(
+                        and_(
+                            RunbookExecution.status == "pending",
+                            RunbookExecution.approval_expires_at.isnot(None),
+                            RunbookExecution.approval_expires_at < now
+                        )
+                    )
+                )
+                expired_executions = result.scalars().all()
+                
+                for execution in expired_executions:
+                    logger.info(f"Timing out execution {execution.id} - approval expired")
+                    execution.status = "timeout"
+                    execution.completed_at = now
+                    execution.error_message = "Approval timeout - no response within allowed window"
+                
+                if expired_executions:
+                    await db.commit()
+                    logger.info(f"Timed out {len(expired_executions)} pending executions")
+                    
+            except Exception as e:
+                logger.exception(f"Error checking approval timeouts: {e}")
+
+
+# Global worker instance
+_worker: Optional[ExecutionWorker] = None
+
+
+def get_execution_worker() -> ExecutionWorker:
+    """Get or create the global execution worker instance."""
+    global _worker
+    if _worker is None:
+        _worker = ExecutionWorker()
+    return _worker
+
+
+async def start_execution_worker():
+    """Start the global execution worker."""
+    worker = get_execution_worker()
+    await worker.start()
+
+
+async def stop_execution_worker():
+    """Stop the global execution worker."""
+    global _worker
+    if _worker:
+        await _worker.stop()
+        _worker = None
@@ -8,11 +8,16 @@ Supports multiple protocols (SSH, WinRM) with a unified interface.
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Optional, List, Dict, Any, AsyncIterator
+from collections import deque
+from typing import Optional, List, Dict, Any, AsyncIterator, Awaitable, Callable
 from enum import Enum
 import asyncio
 
 
+# Receives (stream, text) as a command produces output; stream is "stdout" or "stderr"
+OutputCallback = Callable[[str, str], Awaitable[None]]
+
+
 class ErrorType(str, Enum):
     """Types of execution errors."""
     TIMEOUT = "timeout"
@@ -77,6 +82,49 @@ class ExecutionResult:
         }
 
 
+class HeadTailBuffer:
+    """
+    Keeps the first and last ``limit // 2`` characters written to it.
+
+    Memory stays bounded however much output a command produces; the
+    omitted middle is replaced by a marker in ``getvalue()``.
+    """
+
+    def __init__(self, limit: int):
+        self.head_limit = limit // 2
+        self.tail_limit = limit - self.head_limit
+        self.total = 0
+        self._head: List[str] = []
+        self._head_len = 0
+        self._tail: deque = deque()
+        self._tail_len = 0
+
+    def write(self, text: str) -> None:
+        self.total += len(text)
+        if self._head_len < self.head_limit:
+            take = text[:self.head_limit - self._head_len]
+            self._head.append(take)
+            self._head_len += len(take)
+            text = text[len(take):]
+        if not text:
+            return
+        text = text[-self.tail_limit:] if self.tail_limit else ""
+        self._tail.append(text)
+        self._tail_len += len(text)
+        while self._tail and self._tail_len - len(self._tail[0]) >= self.tail_limit:
+            self._tail_len -= len(self._tail.popleft())
+
+    def getvalue(self) -> str:
+        head = "".join(self._head)
+        tail = "".join(self._tail)
+        if self.tail_limit:
+            tail = tail[-self.tail_limit:]
+        omitted = self.total - len(head) - len(tail)
+        if omitted > 0:
+            return f"{head}\n... [{omitted} characters omitted] ...\n{tail}"
+        return head + tail
+
+
 @dataclass
 class ServerInfo:
     """Information about a remote server."""
@@ -290,6 +338,38 @@ class BaseExecutor(ABC):
         if result.stderr:
             yield f"[STDERR] {result.stderr}"
     
+    async def execute_streaming(
+        self,
+        command: str,
+        on_output: OutputCallback,
+        timeout: Optional[int] = None,
+        with_elevation: bool = False,
+        env: Optional[Dict[str, str]] = None,
+        working_directory: Optional[str] = None
+    ) -> ExecutionResult:
+        """
+        Execute a command, passing output to ``on_output`` as it arrives.
+        
+        Override in subclasses that can stream; the default runs execute()
+        and replays its output once the command has finished.
+        
+        Returns:
+            ExecutionResult; implementations that stream may hold only the
+            head and tail of very large output in stdout/stderr.
+        """
+        result = await self.execute(
+            command=command,
+            timeout=timeout,
+            with_elevation=with_elevation,
+            env=env,
+            working_directory=working_directory
+        )
+        if result.stdout:
+            await on_output("stdout", result.stdout)
+        if result.stderr:
+            await on_output("stderr", result.stderr)
+        return result
+    
     async def upload_file(
         self,
         local_path: str,
@@ -15,6 +15,7 @@ from ..config import get_settings
 from ..models import ServerCredential, APICredentialProfile
 from .executor_base import BaseExecutor, ExecutionResult, ErrorType
 from .executor_ssh import SSHExecutor
+from .ssh_pool import get_ssh_pool, close_ssh_pool
 from .executor_api import APIExecutor
 from .executor_winrm import WinRMExecutor
 
@@ -28,7 +29,10 @@ class ExecutorFactory:
     Handles:
     - Executor type selection based on server OS/protocol
     - Credential decryption
-    - Connection pooling (optional)
+    - SSH connection pooling (see ssh_pool)
+    
+    Executors are cheap, per-use objects; SSH executors lease a shared
+    connection from the pool on connect() and return it on disconnect().
     """
     
     # Registry of executor classes
@@ -38,9 +42,6 @@ class ExecutorFactory:
         "winrm": WinRMExecutor,
     }
     
-    # Connection pool for reuse
-    _pool: Dict[str, BaseExecutor] = {}
-    
     @classmethod
     def register_executor(cls, protocol: str, executor_class: Type[BaseExecutor]):
         """Register a new executor type."""
@@ -56,6 +57,9 @@ class ExecutorFactory:
         """
         Create an executor for the given server.
         
+        A new instance is returned on every call so concurrent executions
+        never share connect/disconnect state.
+        
         Args:
             server: ServerCredential with connection details.
             fernet_key: Encryption key for credentials.
@@ -71,13 +75,7 @@ class ExecutorFactory:
         
         if not key:
             raise ValueError("Encryption key not configured")
-        
-        # Check pool first
-        cache_key = str(server.id) if getattr(server, 'id', None) else f"{server.hostname}:{server.username}"
-        if cache_key in cls._pool:
-            # Check if we should update credentials... for now simplicity
-            # Actually, if we reuse the executor, we assume credentials are same
-            return cls._pool[cache_key]
+
 
         fernet = Fernet(key.encode() if isinstance(key, str) else key)
         
@@ -155,7 +153,10 @@ class ExecutorFactory:
                 private_key_passphrase=None,
                 sudo_password=sudo_password,
                 timeout=60,
-                host_key_checking=False
+                host_key_checking=False,
+                keepalive_interval=settings.ssh_keepalive_interval,
+                keepalive_count_max=settings.ssh_keepalive_count_max,
+                pool=get_ssh_pool() if settings.ssh_pool_enabled else None
             )
         
         elif protocol == "winrm":
@@ -191,7 +192,6 @@ class ExecutorFactory:
         if not executor:
              raise ValueError(f"Unknown protocol: {protocol}")
 
-        cls._pool[cache_key] = executor
         return executor
 
     @classmethod
@@ -251,41 +251,25 @@ class ExecutorFactory:
         fernet_key: Optional[str] = None
     ) -> BaseExecutor:
         """
-        Get an executor from the connection pool, creating if needed.
+        Get a connected executor; SSH executors reuse a pooled connection.
+        
+        Callers must disconnect() it to return the connection to the pool.
         
         Args:
             server: ServerCredential with connection details.
             fernet_key: Encryption key.
         
         Returns:
-            Connected executor from pool.
+            Connected executor.
         """
-        pool_key = f"{server.hostname}:{server.port or 22}"
-        
-        if pool_key in cls._pool:
-            executor = cls._pool[pool_key]
-            if executor.is_connected:
-                return executor
-            else:
-                # Remove stale connection
-                del cls._pool[pool_key]
-        
-        # Create new executor
         executor = cls.get_executor(server, fernet_key)
         await executor.connect()
-        cls._pool[pool_key] = executor
-        
         return executor
     
     @classmethod
     async def close_all(cls):
         """Close all pooled connections."""
-        for key, executor in list(cls._pool.items()):
-            try:
-                await executor.disconnect()
-            except Exception as e:
-                logger.warning(f"Error closing executor {key}: {e}")
-        cls._pool.clear()
+        await close_ssh_pool()
     
     @classmethod
     async def test_server_connection(
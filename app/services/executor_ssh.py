@@ -7,19 +7,32 @@ Uses AsyncSSH for async, non-blocking operations.
 
 import asyncio
 import time
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
-from typing import Optional, Dict, AsyncIterator
+from typing import Optional, Dict, AsyncIterator, TYPE_CHECKING
 import logging
 import uuid
 
 import asyncssh
 
+from ..config import get_settings
 from .executor_base import (
-    BaseExecutor, ExecutionResult, ServerInfo, ErrorType
+    BaseExecutor, ExecutionResult, ServerInfo, ErrorType, HeadTailBuffer, OutputCallback
 )
+from .ssh_pool import pool_key
+
+if TYPE_CHECKING:
+    from .ssh_pool import SSHConnectionPool, PooledConnection
 
 logger = logging.getLogger(__name__)
 
+STREAM_READ_SIZE = 8192  # characters per read when streaming output
+
+# Interactive processes outlive the executor that started them (each API call
+# builds a fresh executor), so they are tracked per process, not per instance.
+_interactive_processes: Dict[str, asyncssh.SSHClientProcess] = {}
+_interactive_leases: Dict[str, "PooledConnection"] = {}
+
 
 class SSHExecutor(BaseExecutor):
     """
@@ -32,6 +45,7 @@ class SSHExecutor(BaseExecutor):
     - Command streaming
     - Interactive command execution with stdin
     - File transfer (SCP/SFTP)
+    - Shared, pooled connections (optional)
     """
     
     def __init__(
@@ -45,7 +59,10 @@ class SSHExecutor(BaseExecutor):
         sudo_password: Optional[str] = None,
         timeout: int = 60,
         known_hosts: Optional[str] = None,
-        host_key_checking: bool = False
+        host_key_checking: bool = False,
+        keepalive_interval: int = 0,
+        keepalive_count_max: int = 3,
+        pool: Optional["SSHConnectionPool"] = None
     ):
         """
         Initialize SSH executor.
@@ -61,6 +78,9 @@ class SSHExecutor(BaseExecutor):
             timeout: Default command timeout.
             known_hosts: Path to known_hosts file.
             host_key_checking: Verify host keys.
+            keepalive_interval: Seconds between SSH keepalives (0 disables).
+            keepalive_count_max: Unanswered keepalives before disconnecting.
+            pool: Connection pool to lease a shared connection from.
         """
         super().__init__(hostname, port, username, timeout)
         self.password = password
@@ -69,8 +89,12 @@ class SSHExecutor(BaseExecutor):
         self.sudo_password = sudo_password
         self.known_hosts = known_hosts
         self.host_key_checking = host_key_checking
+        self.keepalive_interval = keepalive_interval
+        self.keepalive_count_max = keepalive_count_max
+        self.pool = pool
         self._conn: Optional[asyncssh.SSHClientConnection] = None
-        self._active_processes: Dict[str, asyncssh.SSHClientProcess] = {}  # Track running processes
+        self._pooled: Optional["PooledConnection"] = None
+        self._active_processes = _interactive_processes  # Track running processes
     
     @property
     def protocol(self) -> str:
@@ -80,8 +104,27 @@ class SSHExecutor(BaseExecutor):
     def supports_elevation(self) -> bool:
         return True
     
+    @property
+    def pool_key(self) -> str:
+        """Connections are shared only between identical host and credentials."""
+        return pool_key(
+            self.hostname, self.port, self.username,
+            self.password, self.private_key, self.private_key_passphrase,
+            str(self.host_key_checking), self.known_hosts
+        )
+
     async def connect(self) -> bool:
-        """Establish SSH connection."""
+        """Establish SSH connection, leasing it from the pool if one is set."""
+        if self.pool is None:
+            self._conn = await self._open_connection()
+        elif self._pooled is None:
+            self._pooled = await self.pool.acquire(self.pool_key, self._open_connection)
+            self._conn = self._pooled.conn
+        self._connected = True
+        return True
+
+    async def _open_connection(self) -> asyncssh.SSHClientConnection:
+        """Handshake and authenticate a new SSH connection."""
         try:
             connect_options = {
                 "host": self.hostname,
@@ -89,6 +132,9 @@ class SSHExecutor(BaseExecutor):
                 "username": self.username,
                 "known_hosts": None if not self.host_key_checking else self.known_hosts,
             }
+            if self.keepalive_interval:
+                connect_options["keepalive_interval"] = self.keepalive_interval
+                connect_options["keepalive_count_max"] = self.keepalive_count_max
             
             # Authentication method
             if self.private_key:
@@ -102,10 +148,9 @@ class SSHExecutor(BaseExecutor):
                 # Password auth
                 connect_options["password"] = self.password
             
-            self._conn = await asyncssh.connect(**connect_options)
-            self._connected = True
+            conn = await asyncssh.connect(**connect_options)
             logger.info(f"SSH connected to {self.hostname}:{self.port}")
-            return True
+            return conn
             
         except asyncssh.DisconnectError as e:
             logger.error(f"SSH disconnect error: {e}")
@@ -121,14 +166,71 @@ class SSHExecutor(BaseExecutor):
             raise ConnectionError(f"SSH connection failed: {e}")
     
     async def disconnect(self) -> None:
-        """Close SSH connection."""
-        if self._conn:
+        """Close SSH connection, or return it to the pool."""
+        if self._pooled is not None:
+            pooled, self._pooled = self._pooled, None
+            self._conn = None
+            self._connected = False
+            await self.pool.release(pooled)
+        elif self._conn:
             self._conn.close()
             await self._conn.wait_closed()
             self._conn = None
             self._connected = False
             logger.info(f"SSH disconnected from {self.hostname}")
     
+    @asynccontextmanager
+    async def _channel(self):
+        """Hold a session slot on a pooled connection for one command."""
+        if self._pooled is None:
+            yield
+        else:
+            async with self.pool.channel(self._pooled):
+                yield
+
+    def _build_command(
+        self,
+        command: str,
+        with_elevation: bool = False,
+        env: Optional[Dict[str, str]] = None,
+        working_directory: Optional[str] = None
+    ) -> str:
+        """Wrap a command with working directory, environment and sudo."""
+        # Build command with working directory if specified
+        full_command = command
+        if working_directory:
+            full_command = f"cd {working_directory} && {command}"
+        
+        # Add environment variables
+        if env:
+            env_prefix = " ".join(f'{k}="{v}"' for k, v in env.items())
+            full_command = f"{env_prefix} {full_command}"
+        
+        # Handle sudo
+        if with_elevation:
+            if self.sudo_password:
+                # Sudo with password via stdin
+                full_command = f"echo '{self.sudo_password}' | sudo -S {full_command}"
+            else:
+                # Passwordless sudo
+                full_command = f"sudo {full_command}"
+        
+        return full_command
+    
+    def _not_connected_result(self, command: str) -> ExecutionResult:
+        return ExecutionResult(
+            success=False,
+            exit_code=-1,
+            stdout="",
+            stderr="Not connected",
+            duration_ms=0,
+            command=command,
+            server_hostname=self.hostname,
+            error_type=ErrorType.CONNECTION,
+            error_message="SSH connection not established",
+            retryable=True
+        )
+    
     async def execute(
         self,
         command: str,
@@ -151,47 +253,20 @@ class SSHExecutor(BaseExecutor):
             ExecutionResult with command output.
         """
         if not self._conn or not self._connected:
-            return ExecutionResult(
-                success=False,
-                exit_code=-1,
-                stdout="",
-                stderr="Not connected",
-                duration_ms=0,
-                command=command,
-                server_hostname=self.hostname,
-                error_type=ErrorType.CONNECTION,
-                error_message="SSH connection not established",
-                retryable=True
-            )
+            return self._not_connected_result(command)
         
         effective_timeout = timeout or self.timeout
         start_time = time.time()
         
         try:
-            # Build command with working directory if specified
-            full_command = command
-            if working_directory:
-                full_command = f"cd {working_directory} && {command}"
-            
-            # Add environment variables
-            if env:
-                env_prefix = " ".join(f'{k}="{v}"' for k, v in env.items())
-                full_command = f"{env_prefix} {full_command}"
-            
-            # Handle sudo
-            if with_elevation:
-                if self.sudo_password:
-                    # Sudo with password via stdin
-                    full_command = f"echo '{self.sudo_password}' | sudo -S {full_command}"
-                else:
-                    # Passwordless sudo
-                    full_command = f"sudo {full_command}"
+            full_command = self._build_command(command, with_elevation, env, working_directory)
             
             # Execute command
-            result = await asyncio.wait_for(
-                self._conn.run(full_command, check=False),
-                timeout=effective_timeout
-            )
+            async with self._channel():
+                result = await asyncio.wait_for(
+                    self._conn.run(full_command, check=False),
+                    timeout=effective_timeout
+                )
             
             duration_ms = int((time.time() - start_time) * 1000)
             
@@ -258,6 +333,104 @@ class SSHExecutor(BaseExecutor):
                 retryable=False
             )
     
+    async def execute_streaming(
+        self,
+        command: str,
+        on_output: OutputCallback,
+        timeout: Optional[int] = None,
+        with_elevation: bool = False,
+        env: Optional[Dict[str, str]] = None,
+        working_directory: Optional[str] = None
+    ) -> ExecutionResult:
+        """
+        Execute a command via SSH, passing stdout/stderr to ``on_output`` as
+        they arrive. Only the head and tail of very large output are kept in
+        the returned result.
+        """
+        if not self._conn or not self._connected:
+            return self._not_connected_result(command)
+        
+        effective_timeout = timeout or self.timeout
+        start_time = time.time()
+        limit = get_settings().step_output_result_chars
+        stdout, stderr = HeadTailBuffer(limit), HeadTailBuffer(limit)
+        
+        async def pump(reader, stream: str, buffer: HeadTailBuffer):
+            while True:
+                data = await reader.read(STREAM_READ_SIZE)
+                if not data:
+                    return
+                buffer.write(data)
+                await on_output(stream, data)
+        
+        def result(**fields) -> ExecutionResult:
+            return ExecutionResult(
+                stdout=stdout.getvalue(),
+                stderr=stderr.getvalue(),
+                duration_ms=int((time.time() - start_time) * 1000),
+                command=command,
+                server_hostname=self.hostname,
+                **fields
+            )
+        
+        try:
+            full_command = self._build_command(command, with_elevation, env, working_directory)
+            
+            async with self._channel():
+                process = await self._conn.create_process(full_command)
+                try:
+                    await asyncio.wait_for(
+                        asyncio.gather(
+                            pump(process.stdout, "stdout", stdout),
+                            pump(process.stderr, "stderr", stderr),
+                        ),
+                        timeout=effective_timeout
+                    )
+                    await process.wait_closed()
+                finally:
+                    if process.exit_status is None:
+                        process.close()
+            
+            exit_code = process.exit_status or 0
+            success = exit_code == 0
+            return result(
+                success=success,
+                exit_code=exit_code,
+                error_type=ErrorType.COMMAND if not success else None,
+                error_message=stderr.getvalue() if not success and stderr.total else None,
+                retryable=False
+            )
+            
+        except asyncio.TimeoutError:
+            logger.warning(f"Command timeout on {self.hostname}: {command}")
+            return result(
+                success=False,
+                exit_code=-1,
+                error_type=ErrorType.TIMEOUT,
+                error_message=f"Command timed out after {effective_timeout}s",
+                retryable=True
+            )
+            
+        except asyncssh.ChannelOpenError as e:
+            logger.error(f"SSH channel error on {self.hostname}: {e}")
+            return result(
+                success=False,
+                exit_code=-1,
+                error_type=ErrorType.CONNECTION,
+                error_message=f"SSH channel error: {e}",
+                retryable=True
+            )
+            
+        except Exception as e:
+            logger.error(f"SSH execution error on {self.hostname}: {e}")
+            return result(
+                success=False,
+                exit_code=-1,
+                error_type=ErrorType.UNKNOWN,
+                error_message=str(e),
+                retryable=False
+            )
+    
     async def stream_execute(
         self,
         command: str,
@@ -289,7 +462,7 @@ class SSHExecutor(BaseExecutor):
                 full_command = f"sudo {full_command}"
         
         try:
-            async with self._conn.create_process(full_command) as process:
+            async with self._channel(), self._conn.create_process(full_command) as process:
                 async for line in process.stdout:
                     yield line.rstrip('\n')
                 
@@ -358,7 +531,7 @@ class SSHExecutor(BaseExecutor):
             return False
         
         try:
-            async with self._conn.start_sftp_client() as sftp:
+            async with self._channel(), self._conn.start_sftp_client() as sftp:
                 await sftp.put(local_path, remote_path)
             logger.info(f"Uploaded {local_path} to {self.hostname}:{remote_path}")
             return True
@@ -372,7 +545,7 @@ class SSHExecutor(BaseExecutor):
             return False
         
         try:
-            async with self._conn.start_sftp_client() as sftp:
+            async with self._channel(), self._conn.start_sftp_client() as sftp:
                 await sftp.get(remote_path, local_path)
             logger.info(f"Downloaded {self.hostname}:{remote_path} to {local_path}")
             return True
@@ -406,9 +579,11 @@ class SSHExecutor(BaseExecutor):
                 - exit_code: int - Exit code (if completed)
                 - process_id: str - ID to reference this process later
         """
+        connected_here = False
         if not self._conn or not self._connected:
             try:
                 await self.connect()
+                connected_here = True
             except Exception as e:
                 return {
                     "completed": False,
@@ -431,6 +606,11 @@ class SSHExecutor(BaseExecutor):
             
             # Store process for later stdin handling
             self._active_processes[process_id] = process
+            if connected_here and self._pooled is not None:
+                # The process keeps the pooled connection leased until it ends
+                _interactive_leases[process_id] = self._pooled
+                self._pooled = None
+                self._connected = False
             
             # Wait briefly to see if it completes quickly
             try:
@@ -452,7 +632,7 @@ class SSHExecutor(BaseExecutor):
                         stderr_data = data if isinstance(data, str) else data.decode('utf-8', errors='ignore')
                 
                 # Clean up
-                del self._active_processes[process_id]
+                await self._forget_process(process_id)
                 
                 return {
                     "completed": True,
@@ -490,6 +670,8 @@ class SSHExecutor(BaseExecutor):
                     
         except Exception as e:
             logger.error(f"Interactive execution error: {e}")
+            if connected_here:
+                await self.disconnect()
             return {
                 "completed": False,
                 "error": str(e),
@@ -548,7 +730,7 @@ class SSHExecutor(BaseExecutor):
                         stderr_data = data if isinstance(data, str) else data.decode('utf-8', errors='ignore')
                 
                 # Clean up
-                del self._active_processes[process_id]
+                await self._forget_process(process_id)
                 
                 return {
                     "completed": True,
@@ -583,8 +765,7 @@ class SSHExecutor(BaseExecutor):
         except Exception as e:
             logger.error(f"Error sending input to process: {e}")
             # Clean up on error
-            if process_id in self._active_processes:
-                del self._active_processes[process_id]
+            await self._forget_process(process_id)
             return {
                 "completed": False,
                 "error": str(e),
@@ -608,10 +789,17 @@ class SSHExecutor(BaseExecutor):
                 process.kill()
             
             # Clean up
-            del self._active_processes[process_id]
+            await self._forget_process(process_id)
             logger.info(f"Cancelled interactive process {process_id}")
             return True
             
         except Exception as e:
             logger.error(f"Error cancelling process: {e}")
             return False
+
+    async def _forget_process(self, process_id: str) -> None:
+        """Drop a finished interactive process and return its pooled lease."""
+        self._active_processes.pop(process_id, None)
+        pooled = _interactive_leases.pop(process_id, None)
+        if pooled is not None and self.pool is not None:
+            await self.pool.release(pooled)
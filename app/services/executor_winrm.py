@@ -2,13 +2,14 @@
 WinRM Executor Implementation
 
 Provides command execution on Windows servers via WinRM protocol.
-Wraps synchronous pywinrm calls in executor threads to avoid blocking the event loop.
+Blocking pywinrm calls run on the dedicated WinRM thread pool (see
+winrm_session), and one remote shell is reused for every step run through
+the same executor.
 """
 import logging
 import asyncio
+import time
 from typing import Optional, Dict, List, Any
-import base64
-from functools import partial
 
 try:
     import winrm
@@ -16,6 +17,7 @@ except ImportError:
     winrm = None
 
 from .executor_base import BaseExecutor, ExecutionResult, ErrorType, ServerInfo
+from .winrm_session import WinRMShell
 
 logger = logging.getLogger(__name__)
 
@@ -45,7 +47,7 @@ class WinRMExecutor(BaseExecutor):
         self.transport = transport
         self.use_ssl = use_ssl
         self.cert_validation = cert_validation
-        self._session = None
+        self._shell: Optional[WinRMShell] = None
         
     @property
     def protocol(self) -> str:
@@ -55,59 +57,47 @@ class WinRMExecutor(BaseExecutor):
     def supports_elevation(self) -> bool:
         return False 
 
-    def _create_session_sync(self):
-        """Synchronous session creation"""
-        scheme = 'https' if self.use_ssl else 'http'
-        endpoint = f"{scheme}://{self.hostname}:{self.port}/wsman"
-        
-        # read_timeout_sec must be greater than operation_timeout_sec
-        operation_timeout = max(self.timeout, 30)
-        read_timeout = operation_timeout + 10
-        
-        self._session = winrm.Session(
-            endpoint,
-            auth=(self.username, self.password or ""),
-            transport=self.transport,
-            server_cert_validation='validate' if self.cert_validation else 'ignore',
-            read_timeout_sec=read_timeout,
-            operation_timeout_sec=operation_timeout
-        )
-        self._connected = True
+    def _get_shell(self) -> WinRMShell:
+        """The executor's remote shell, created on first use."""
+        if self._shell is None:
+            scheme = 'https' if self.use_ssl else 'http'
+            self._shell = WinRMShell(
+                f"{scheme}://{self.hostname}:{self.port}/wsman",
+                username=self.username,
+                password=self.password,
+                transport=self.transport,
+                cert_validation=self.cert_validation
+            )
+        return self._shell
 
     async def connect(self) -> bool:
-        """Establish WinRM session (async wrapper)."""
+        """Open the remote shell that subsequent commands reuse."""
         try:
-            loop = asyncio.get_running_loop()
-            await loop.run_in_executor(None, self._create_session_sync)
+            await self._get_shell().open()
+            self._connected = True
             return True
         except Exception as e:
             logger.error(f"Failed to create WinRM session for {self.hostname}: {e}")
+            self._shell = None
             raise ConnectionError(f"WinRM connection failure: {e}")
 
     async def disconnect(self) -> None:
-        """Close connection."""
-        self._session = None
+        """Close the remote shell."""
+        shell, self._shell = self._shell, None
         self._connected = False
+        if shell is not None:
+            await shell.close()
 
-    def _run_cmd_sync(self, command: str):
-        """Run command synchronously using pywinrm"""
-        if not self._connected or not self._session:
-            self._create_session_sync()
-            
-        # Detect if this is likely a CMD command (starts with cmd /c or similar)
-        # Otherwise default to PowerShell for better experience and consistency
+    async def _run(self, command: str, timeout: float) -> tuple:
+        """Run a command, defaulting to PowerShell unless it is clearly CMD."""
+        shell = self._get_shell()
         cmd_lower = command.lower().strip()
         use_cmd = cmd_lower.startswith("cmd") or cmd_lower.startswith("dir") and not cmd_lower.startswith("gci")
         
         if use_cmd:
-             return self._session.run_cmd(command)
-        else:
-             # Use PowerShell by default
-             # Prepend progress suppression to avoid CLIXML garbage in stderr
-             ps_command = f"$ProgressPreference = 'SilentlyContinue'; {command}"
-             # Encode command to avoid issues with special chars if needed, but pywinrm handles basic strings well
-             # We rely on run_ps which handles wrapping
-             return self._session.run_ps(ps_command)
+            return await shell.run(command, timeout)
+        # Prepend progress suppression to avoid CLIXML garbage in stderr
+        return await shell.run_ps(f"$ProgressPreference = 'SilentlyContinue'; {command}", timeout)
 
     async def execute(
         self,
@@ -118,23 +108,18 @@ class WinRMExecutor(BaseExecutor):
         working_directory: Optional[str] = None
     ) -> ExecutionResult:
         effective_timeout = timeout or self.timeout or 60
+        start_time = time.time()
         try:
-            loop = asyncio.get_running_loop()
+            stdout, stderr, status_code = await self._run(command, effective_timeout)
             
-            # Offload to thread pool with asyncio timeout
-            result = await asyncio.wait_for(
-                loop.run_in_executor(None, partial(self._run_cmd_sync, command)),
-                timeout=effective_timeout
-            )
-            
-            success = result.status_code == 0
+            success = status_code == 0
             
             return ExecutionResult(
                 success=success,
-                exit_code=result.status_code,
-                stdout=result.std_out.decode('utf-8') if isinstance(result.std_out, bytes) else str(result.std_out),
-                stderr=result.std_err.decode('utf-8') if isinstance(result.std_err, bytes) else str(result.std_err),
-                duration_ms=0,
+                exit_code=status_code,
+                stdout=stdout.decode('utf-8', errors='replace'),
+                stderr=stderr.decode('utf-8', errors='replace'),
+                duration_ms=int((time.time() - start_time) * 1000),
                 command=command,
                 server_hostname=self.hostname
             )
@@ -160,7 +145,7 @@ class WinRMExecutor(BaseExecutor):
                 exit_code=-1,
                 stdout="",
                 stderr=str(e),
-                duration_ms=0,
+                duration_ms=int((time.time() - start_time) * 1000),
                 command=command,
                 server_hostname=self.hostname,
                 error_type=ErrorType.CONNECTION,
@@ -171,19 +156,8 @@ class WinRMExecutor(BaseExecutor):
     async def test_connection(self) -> bool:
         """Test connectivity with timeout."""
         try:
-            loop = asyncio.get_running_loop()
-            # Wrap specific check
-            def _check():
-                if not self._connected:
-                     self._create_session_sync()
-                res = self._session.run_cmd("echo OK")
-                return res.status_code == 0
-            
-            # Apply asyncio timeout to prevent hanging
-            return await asyncio.wait_for(
-                loop.run_in_executor(None, _check),
-                timeout=30  # 30 second timeout for test
-            )
+            _, _, status_code = await self._get_shell().run("echo OK", timeout=30)
+            return status_code == 0
         except asyncio.TimeoutError:
             logger.error(f"WinRM connection test timed out for {self.hostname}")
             return False
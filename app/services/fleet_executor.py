@@ -0,0 +1,727 @@
+"""
+Fleet Executor Service
+
+Fans a runbook out across a server group or label selector. Every targeted
+host gets its own RunbookExecution, run through the regular RunbookExecutor
+(so ExecutorFactory, step retries and rollback all apply per host).
+
+Hosts are processed in rolling batches with bounded parallelism. After each
+batch the failure ratio so far is checked and the rollout stops once it
+exceeds the fleet's max_failure_ratio; hosts never reached are counted as
+skipped. Cancelled hosts count as skipped, not failed.
+
+The coordinator only enqueues host executions; the execution worker claims
+and runs them like any other execution, so its per-server and per-runbook
+caps apply to fleets too. All coordinator state lives in the database: a
+FleetWorker on any replica leases the fleet row, renews the lease while it
+coordinates, and a fleet whose coordinator died is resumed by the next
+claim (or failed after execution_max_claims attempts). Cancellation is a
+flag on the fleet row, so it works from any replica.
+"""
+
+import asyncio
+import logging
+import math
+import os
+import socket
+import uuid
+from datetime import datetime, timezone, timedelta
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import select, update, and_, or_, cast, func
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import async_session_factory
+from ..models import ServerCredential, ServerGroup
+from ..models_remediation import FleetExecution, RunbookExecution, Runbook
+from ..config import get_settings
+from .execution_worker import notify_execution_ready
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# ServerCredential columns a label selector may match on exactly
+SELECTOR_COLUMNS = ("environment", "os_type", "protocol")
+
+SUCCESS_STATUSES = ("success",)
+
+# Host outcomes that are neither success nor failure
+CANCELLED_STATUSES = ("cancelled",)
+
+ACTIVE_FLEET_STATUSES = ("pending", "running")
+
+
+def plan_batches(
+    server_ids: Sequence[uuid.UUID],
+    batch_size: Optional[int] = None,
+    batch_percent: Optional[int] = None
+) -> List[List[uuid.UUID]]:
+    """
+    Split targets into rolling batches.
+
+    ``batch_size`` wins over ``batch_percent``; with neither, everything is one batch.
+    Percentages round up so every batch has at least one host.
+    """
+    total = len(server_ids)
+    if total == 0:
+        return []
+
+    if batch_size:
+        size = batch_size
+    elif batch_percent:
+        size = math.ceil(total * batch_percent / 100)
+    else:
+        size = total
+    size = max(1, min(size, total))
+
+    return [list(server_ids[i:i + size]) for i in range(0, total, size)]
+
+
+def failure_ratio_exceeded(failed: int, finished: int, max_ratio: Optional[float]) -> bool:
+    """True once failed/finished hosts exceeds the allowed ratio."""
+    if max_ratio is None or finished == 0:
+        return False
+    return failed / finished > max_ratio
+
+
+def host_outcome_counts(status_counts: Mapping[str, int]) -> Tuple[int, int]:
+    """
+    (succeeded, failed) from the statuses of finished host executions.
+
+    Cancelled hosts never ran to an outcome, so they count towards neither
+    (and end up skipped).
+    """
+    succeeded = sum(count for status, count in status_counts.items() if status in SUCCESS_STATUSES)
+    failed = sum(
+        count for status, count in status_counts.items()
+        if status not in SUCCESS_STATUSES and status not in CANCELLED_STATUSES
+    )
+    return succeeded, failed
+
+
+def fleet_outcome(succeeded: int, failed: int, stopped: bool, cancelled: bool) -> str:
+    """Final fleet status from the per-host outcome counts."""
+    if cancelled:
+        return "cancelled"
+    if stopped:
+        return "stopped"
+    if failed == 0:
+        return "success"
+    if succeeded == 0:
+        return "failed"
+    return "partial"
+
+
+async def _group_and_descendants(db: AsyncSession, group_id: uuid.UUID) -> List[uuid.UUID]:
+    """Ids of a server group and all of its subgroups."""
+    tree = (
+        select(ServerGroup.id)
+        .where(ServerGroup.id == group_id)
+        .cte("group_tree", recursive=True)
+    )
+    tree = tree.union_all(
+        select(ServerGroup.id).where(ServerGroup.parent_id == tree.c.id)
+    )
+    result = await db.execute(select(tree.c.id))
+    return list(result.scalars().all())
+
+
+async def resolve_fleet_targets(
+    db: AsyncSession,
+    server_group_id: Optional[uuid.UUID],
+    label_selector: Optional[Dict[str, Any]],
+    os_filter: Optional[Sequence[str]] = None
+) -> List[ServerCredential]:
+    """
+    Servers targeted by a group and/or label selector, ordered by name.
+
+    Selector keys ``environment``, ``os_type`` and ``protocol`` match columns
+    exactly; ``tags`` (a list) requires every listed tag to be present.
+    """
+    conditions = []
+
+    if server_group_id:
+        conditions.append(
+            ServerCredential.group_id.in_(await _group_and_descendants(db, server_group_id))
+        )
+
+    for key, value in (label_selector or {}).items():
+        if key == "tags":
+            tags = value if isinstance(value, list) else [value]
+            conditions.append(cast(ServerCredential.tags, JSONB).contains(tags))
+        elif key in SELECTOR_COLUMNS:
+            conditions.append(getattr(ServerCredential, key) == value)
+        else:
+            raise ValueError(f"Unsupported label selector key: {key}")
+
+    if os_filter:
+        conditions.append(ServerCredential.os_type.in_(list(os_filter)))
+
+    result = await db.execute(
+        select(ServerCredential)
+        .where(and_(*conditions))
+        .order_by(ServerCredential.name)
+    )
+    return list(result.scalars().all())
+
+
+class FleetLeaseLost(Exception):
+    """Another coordinator took over the fleet (our lease expired)."""
+
+
+async def cancel_unstarted_hosts(db: AsyncSession, fleet_id: uuid.UUID, reason: str) -> int:
+    """
+    Cancel a fleet's host executions that no worker has claimed yet.
+
+    Claimed ones are left to finish. The caller commits.
+    """
+    now = datetime.now(timezone.utc)
+    result = await db.execute(
+        update(RunbookExecution)
+        .where(
+            and_(
+                RunbookExecution.fleet_execution_id == fleet_id,
+                RunbookExecution.status == "queued",
+                RunbookExecution.completed_at.is_(None),
+                or_(
+                    RunbookExecution.lease_expires_at.is_(None),
+                    RunbookExecution.lease_expires_at < now
+                )
+            )
+        )
+        .values(status="cancelled", error_message=reason, completed_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount or 0
+
+
+async def request_fleet_cancel(db: AsyncSession, fleet_id: uuid.UUID) -> None:
+    """
+    Cancel a fleet from any replica and commit.
+
+    Hosts not yet claimed are cancelled right away; the coordinator stops
+    enqueueing and finishes the fleet once claimed hosts are done. A fleet
+    no coordinator has picked up yet is finished here.
+    """
+    now = datetime.now(timezone.utc)
+    await db.execute(
+        update(FleetExecution)
+        .where(and_(FleetExecution.id == fleet_id, FleetExecution.status.in_(ACTIVE_FLEET_STATUSES)))
+        .values(cancel_requested=True)
+        .execution_options(synchronize_session=False)
+    )
+    await cancel_unstarted_hosts(db, fleet_id, "Fleet execution cancelled")
+    await db.execute(
+        update(FleetExecution)
+        .where(
+            and_(
+                FleetExecution.id == fleet_id,
+                FleetExecution.status == "pending",
+                or_(FleetExecution.lease_expires_at.is_(None), FleetExecution.lease_expires_at < now)
+            )
+        )
+        .values(
+            status="cancelled",
+            stop_reason="Cancelled by user",
+            servers_skipped=FleetExecution.servers_total,
+            completed_at=now
+        )
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+
+
+class FleetExecutor:
+    """
+    Coordinates one fleet execution while holding its lease.
+
+    Features:
+    - Rolling batches (fixed size or percentage of targets)
+    - Bounded parallelism within a batch
+    - Stop-on-failure-ratio between batches
+    - Aggregated per-host counts on the FleetExecution row
+    - Resumable: progress is read back from the host executions, so a new
+      coordinator continues where a dead one stopped
+    """
+
+    def __init__(
+        self,
+        fleet_id: uuid.UUID,
+        worker_id: str,
+        session_factory=async_session_factory,
+        lease_seconds: Optional[int] = None,
+        poll_interval: Optional[float] = None
+    ):
+        """
+        Initialize the fleet executor.
+
+        Args:
+            fleet_id: FleetExecution to run, already leased to ``worker_id``
+            worker_id: Coordinator holding the fleet lease
+            session_factory: Async session factory
+            lease_seconds: Length of the fleet lease, renewed on every poll
+            poll_interval: Seconds between checks on the running batch
+        """
+        self.fleet_id = fleet_id
+        self.worker_id = worker_id
+        self.session_factory = session_factory
+        self.lease_seconds = lease_seconds or settings.execution_lease_seconds
+        self.poll_interval = poll_interval if poll_interval is not None else settings.fleet_poll_interval
+
+    async def run(self) -> None:
+        """Coordinate the fleet to completion; the fleet always ends in a terminal status."""
+        try:
+            await self._run()
+        except FleetLeaseLost:
+            logger.warning(f"Lost lease on fleet execution {self.fleet_id}; another coordinator continues it")
+        except Exception as e:
+            logger.exception(f"Fleet execution {self.fleet_id} failed: {e}")
+            async with self.session_factory() as db:
+                await self._fail_fleet(db, f"Fleet coordinator error: {e}")
+
+    async def _run(self) -> None:
+        """Resolve targets and run the rolling batches."""
+        async with self.session_factory() as db:
+            fleet = await db.get(FleetExecution, self.fleet_id)
+            if fleet is None:
+                logger.error(f"Fleet execution {self.fleet_id} not found")
+                return
+
+            server_ids = await self._targets(db, fleet)
+            if server_ids is None:
+                return
+
+            batches = plan_batches(server_ids, fleet.batch_size, fleet.batch_percent)
+            if fleet.status == "pending":
+                fleet.status = "running"
+                fleet.started_at = datetime.now(timezone.utc)
+            fleet.servers_total = len(server_ids)
+            fleet.batches_total = len(batches)
+            await db.commit()
+
+            parallelism = max(1, min(fleet.parallelism or 1, settings.fleet_max_parallelism))
+            max_failure_ratio = fleet.max_failure_ratio
+            logger.info(
+                f"Fleet execution {fleet.id}: runbook {fleet.runbook_id} on {len(server_ids)} host(s) "
+                f"in {len(batches)} batch(es), parallelism {parallelism}"
+            )
+
+        cancelled = stopped = False
+        stop_reason = None
+        for batch_index, batch in enumerate(batches):
+            cancelled = await self._run_batch(batch_index, batch, parallelism)
+            if cancelled:
+                break
+
+            succeeded, failed = await self._record_progress(batch_index + 1)
+            remaining = batch_index + 1 < len(batches)
+            if remaining and failure_ratio_exceeded(failed, succeeded + failed, max_failure_ratio):
+                stopped = True
+                stop_reason = (
+                    f"Failure ratio {failed}/{succeeded + failed} exceeded "
+                    f"{max_failure_ratio:.0%} after batch {batch_index + 1}"
+                )
+                break
+
+        await self._finish(len(server_ids), stopped, cancelled, stop_reason)
+
+    async def _targets(self, db: AsyncSession, fleet: FleetExecution) -> Optional[List[uuid.UUID]]:
+        """Target servers in rollout order, resolved once and stored on the fleet."""
+        if fleet.target_server_ids is not None:
+            return [uuid.UUID(str(server_id)) for server_id in fleet.target_server_ids]
+
+        runbook = await db.get(Runbook, fleet.runbook_id)
+        try:
+            servers = await resolve_fleet_targets(
+                db,
+                fleet.server_group_id,
+                fleet.label_selector_json,
+                runbook.target_os_filter if runbook else None
+            )
+        except ValueError as e:
+            fleet.status = "failed"
+            fleet.stop_reason = str(e)
+            fleet.completed_at = datetime.now(timezone.utc)
+            fleet.coordinator_id = None
+            fleet.lease_expires_at = None
+            await db.commit()
+            return None
+
+        fleet.target_server_ids = [str(server.id) for server in servers]
+        return [server.id for server in servers]
+
+    async def _run_batch(self, batch_index: int, server_ids: List[uuid.UUID], parallelism: int) -> bool:
+        """
+        Enqueue this batch's host executions, at most ``parallelism``
+        unfinished at a time, and wait for all of them to finish.
+
+        Returns:
+            True if the fleet was cancelled (once its claimed hosts finished)
+        """
+        while True:
+            async with self.session_factory() as db:
+                cancel_requested = await self._renew_lease(db)
+                result = await db.execute(
+                    select(RunbookExecution.server_id, RunbookExecution.completed_at)
+                    .where(
+                        and_(
+                            RunbookExecution.fleet_execution_id == self.fleet_id,
+                            RunbookExecution.fleet_batch == batch_index
+                        )
+                    )
+                )
+                rows = result.all()
+                started: Set[uuid.UUID] = {row.server_id for row in rows}
+                unfinished = sum(1 for row in rows if row.completed_at is None)
+
+                if cancel_requested:
+                    unfinished -= await cancel_unstarted_hosts(db, self.fleet_id, "Fleet execution cancelled")
+                    await db.commit()
+                    if unfinished <= 0:
+                        return True
+                else:
+                    pending = [server_id for server_id in server_ids if server_id not in started]
+                    if not pending and unfinished == 0:
+                        await db.commit()
+                        return False
+
+                    slots = parallelism - unfinished
+                    if pending and slots > 0:
+                        fleet = await db.get(FleetExecution, self.fleet_id)
+                        db.add_all([self._host_execution(fleet, batch_index, server_id) for server_id in pending[:slots]])
+                        await notify_execution_ready(db)
+                    await db.commit()
+
+            await asyncio.sleep(self.poll_interval)
+
+    @staticmethod
+    def _host_execution(fleet: FleetExecution, batch_index: int, server_id: uuid.UUID) -> RunbookExecution:
+        """Queued host execution, claimed by the execution worker within its caps."""
+        return RunbookExecution(
+            runbook_id=fleet.runbook_id,
+            runbook_version=fleet.runbook_version,
+            alert_id=fleet.alert_id,
+            server_id=server_id,
+            status="queued",
+            execution_mode="manual" if fleet.triggered_by else "auto",
+            dry_run=fleet.dry_run,
+            triggered_by=fleet.triggered_by,
+            triggered_by_system=fleet.triggered_by is None,
+            variables_json=fleet.variables_json,
+            fleet_execution_id=fleet.id,
+            fleet_batch=batch_index,
+            queued_at=datetime.now(timezone.utc),
+        )
+
+    async def _host_counts(self, db: AsyncSession) -> Tuple[int, int]:
+        """(succeeded, failed) over the fleet's finished host executions."""
+        result = await db.execute(
+            select(RunbookExecution.status, func.count())
+            .where(
+                and_(
+                    RunbookExecution.fleet_execution_id == self.fleet_id,
+                    RunbookExecution.completed_at.isnot(None)
+                )
+            )
+            .group_by(RunbookExecution.status)
+        )
+        return host_outcome_counts(dict(result.all()))
+
+    async def _record_progress(self, batches_completed: int) -> Tuple[int, int]:
+        """Store the host counts after a finished batch."""
+        async with self.session_factory() as db:
+            await self._renew_lease(db)
+            succeeded, failed = await self._host_counts(db)
+            await db.execute(
+                update(FleetExecution)
+                .where(FleetExecution.id == self.fleet_id)
+                .values(servers_succeeded=succeeded, servers_failed=failed, batches_completed=batches_completed)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            return succeeded, failed
+
+    async def _finish(self, total: int, stopped: bool, cancelled: bool, stop_reason: Optional[str]) -> None:
+        """Write the final status and release the fleet lease."""
+        async with self.session_factory() as db:
+            await self._renew_lease(db)
+            succeeded, failed = await self._host_counts(db)
+            status = fleet_outcome(succeeded, failed, stopped, cancelled)
+            if cancelled and not stop_reason:
+                stop_reason = "Cancelled by user"
+            await db.execute(
+                update(FleetExecution)
+                .where(FleetExecution.id == self.fleet_id)
+                .values(
+                    status=status,
+                    stop_reason=stop_reason,
+                    servers_succeeded=succeeded,
+                    servers_failed=failed,
+                    servers_skipped=total - succeeded - failed,
+                    completed_at=datetime.now(timezone.utc),
+                    coordinator_id=None,
+                    lease_expires_at=None
+                )
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+
+        logger.info(
+            f"Fleet execution {self.fleet_id} finished {status}: "
+            f"{succeeded} succeeded, {failed} failed, {total - succeeded - failed} skipped"
+        )
+
+    async def _renew_lease(self, db: AsyncSession) -> bool:
+        """
+        Extend our lease on the fleet.
+
+        Returns:
+            Whether cancellation was requested
+
+        Raises:
+            FleetLeaseLost: if another coordinator holds the fleet now
+        """
+        result = await db.execute(
+            update(FleetExecution)
+            .where(
+                and_(
+                    FleetExecution.id == self.fleet_id,
+                    FleetExecution.coordinator_id == self.worker_id
+                )
+            )
+            .values(lease_expires_at=datetime.now(timezone.utc) + timedelta(seconds=self.lease_seconds))
+            .returning(FleetExecution.cancel_requested)
+            .execution_options(synchronize_session=False)
+        )
+        row = result.first()
+        if row is None:
+            await db.rollback()
+            raise FleetLeaseLost(self.fleet_id)
+        return bool(row.cancel_requested)
+
+    async def _fail_fleet(self, db: AsyncSession, reason: str) -> None:
+        """Fail the fleet and cancel host executions nobody claimed yet (best effort)."""
+        try:
+            await fail_fleet(db, self.fleet_id, reason)
+        except Exception as e:
+            logger.error(f"Could not mark fleet execution {self.fleet_id} failed: {e}")
+
+
+async def fail_fleet(db: AsyncSession, fleet_id: uuid.UUID, reason: str) -> None:
+    """
+    Fail a fleet and cancel its unclaimed host executions, then commit.
+
+    Host executions already claimed belong to the execution worker and run
+    to completion.
+    """
+    await db.rollback()
+    await cancel_unstarted_hosts(db, fleet_id, reason)
+    await db.execute(
+        update(FleetExecution)
+        .where(FleetExecution.id == fleet_id)
+        .values(
+            status="failed",
+            stop_reason=reason,
+            completed_at=datetime.now(timezone.utc),
+            coordinator_id=None,
+            lease_expires_at=None
+        )
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+
+
+async def claim_fleets(
+    db: AsyncSession,
+    limit: int,
+    worker_id: str,
+    lease_seconds: int,
+    max_claims: int
+) -> List[uuid.UUID]:
+    """
+    Lease up to ``limit`` active fleets without a live coordinator and commit.
+
+    Covers new fleets and fleets whose coordinator died. Fleets already
+    claimed ``max_claims`` times are failed instead of being resumed again.
+    """
+    now = datetime.now(timezone.utc)
+    result = await db.execute(
+        select(FleetExecution.id, FleetExecution.claim_count)
+        .where(
+            and_(
+                FleetExecution.status.in_(ACTIVE_FLEET_STATUSES),
+                FleetExecution.completed_at.is_(None),
+                or_(
+                    FleetExecution.lease_expires_at.is_(None),
+                    FleetExecution.lease_expires_at < now
+                )
+            )
+        )
+        .order_by(FleetExecution.created_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    rows = result.all()
+
+    abandoned = [row.id for row in rows if (row.claim_count or 0) >= max_claims]
+    for fleet_id in abandoned:
+        reason = f"Fleet abandoned: coordinator lease expired {max_claims} time(s)"
+        await cancel_unstarted_hosts(db, fleet_id, reason)
+        await db.execute(
+            update(FleetExecution)
+            .where(FleetExecution.id == fleet_id)
+            .values(status="failed", stop_reason=reason, completed_at=now, coordinator_id=None, lease_expires_at=None)
+            .execution_options(synchronize_session=False)
+        )
+        logger.error(f"Failed fleet execution {fleet_id}: orphaned too many times")
+
+    chosen = [row.id for row in rows if (row.claim_count or 0) < max_claims]
+    if chosen:
+        await db.execute(
+            update(FleetExecution)
+            .where(FleetExecution.id.in_(chosen))
+            .values(
+                coordinator_id=worker_id,
+                lease_expires_at=now + timedelta(seconds=lease_seconds),
+                claim_count=func.coalesce(FleetExecution.claim_count, 0) + 1
+            )
+            .execution_options(synchronize_session=False)
+        )
+        chosen_ids = set(chosen)
+        resumed = sum(1 for row in rows if row.id in chosen_ids and row.claim_count)
+        if resumed:
+            logger.warning(f"Resuming {resumed} fleet execution(s) whose coordinator lease expired")
+
+    await db.commit()
+    return chosen
+
+
+class FleetWorker:
+    """
+    Background worker that claims fleet executions and coordinates them.
+
+    Runs on every replica; the fleet lease makes sure each fleet has one
+    coordinator, and fleets of a dead replica are picked up once their
+    lease expires.
+    """
+
+    def __init__(
+        self,
+        poll_interval: Optional[float] = None,
+        concurrency: Optional[int] = None,
+        lease_seconds: Optional[int] = None,
+        session_factory=async_session_factory
+    ):
+        """
+        Initialize the fleet worker.
+
+        Args:
+            poll_interval: Seconds between claims, and between batch checks
+            concurrency: Max fleets coordinated at once on this replica
+            lease_seconds: Fleet lease length
+            session_factory: Async session factory
+        """
+        self.poll_interval = poll_interval if poll_interval is not None else settings.fleet_poll_interval
+        self.concurrency = concurrency or settings.fleet_worker_concurrency
+        self.lease_seconds = lease_seconds or settings.execution_lease_seconds
+        self.session_factory = session_factory
+        self.worker_id = f"fleet:{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._running = False
+        self._task: Optional[asyncio.Task] = None
+        self._fleets: Dict[uuid.UUID, asyncio.Task] = {}
+        self._wakeup = asyncio.Event()
+
+    async def start(self):
+        """Start the background worker."""
+        if self._running:
+            return
+        self._running = True
+        self._task = asyncio.create_task(self._worker_loop())
+        logger.info(f"Fleet worker {self.worker_id} started (concurrency={self.concurrency})")
+
+    async def stop(self):
+        """Stop coordinating; held fleets are released for another replica to resume."""
+        self._running = False
+        tasks = [task for task in (self._task, *self._fleets.values()) if task]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        try:
+            async with self.session_factory() as db:
+                await db.execute(
+                    update(FleetExecution)
+                    .where(FleetExecution.coordinator_id == self.worker_id)
+                    .values(coordinator_id=None, lease_expires_at=None)
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+        except Exception as e:
+            logger.warning(f"Could not release fleet leases of {self.worker_id}: {e}")
+        logger.info("Fleet worker stopped")
+
+    def wake(self):
+        """Claim new fleets now instead of waiting for the next poll."""
+        self._wakeup.set()
+
+    async def _worker_loop(self):
+        while self._running:
+            try:
+                await self._claim()
+            except Exception as e:
+                logger.exception(f"Error claiming fleet executions: {e}")
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def _claim(self):
+        free = self.concurrency - len(self._fleets)
+        if free <= 0:
+            return
+
+        async with self.session_factory() as db:
+            claimed = await claim_fleets(
+                db, free, self.worker_id, self.lease_seconds, settings.execution_max_claims
+            )
+
+        for fleet_id in claimed:
+            executor = FleetExecutor(
+                fleet_id,
+                self.worker_id,
+                session_factory=self.session_factory,
+                lease_seconds=self.lease_seconds,
+                poll_interval=self.poll_interval
+            )
+            task = asyncio.create_task(executor.run())
+            self._fleets[fleet_id] = task
+            task.add_done_callback(lambda _, fleet_id=fleet_id: self._fleets.pop(fleet_id, None))
+
+
+# Global worker instance
+_worker: Optional[FleetWorker] = None
+
+
+def wake_fleet_worker() -> None:
+    """Have this replica's fleet worker claim new fleets now."""
+    if _worker is not None:
+        _worker.wake()
+
+
+async def start_fleet_worker():
+    """Start the global fleet worker."""
+    global _worker
+    if _worker is None:
+        _worker = FleetWorker()
+    await _worker.start()
+
+
+async def stop_fleet_worker():
+    """Stop the global fleet worker."""
+    global _worker
+    if _worker:
+        await _worker.stop()
+        _worker = None
@@ -3,18 +3,21 @@ Git Sync Service with Authentication Support
 Syncs documentation and code from Git repositories
 """
 import os
-import shutil
+import fnmatch
+import hashlib
 import tempfile
 import logging
-from typing import Optional, Dict, Any, List
-from pathlib import Path
+import threading
+from typing import Optional, Dict, Any, List, Set, Tuple, Callable
+from pathlib import Path, PurePosixPath
 from uuid import UUID
 from datetime import datetime, timezone
 import subprocess
 
 from sqlalchemy.orm import Session
 
-from app.models_knowledge import DesignDocument, DesignChunk
+from app.config import get_settings
+from app.models_knowledge import DesignDocument, DesignChunk, GitSyncState
 from app.services. document_service import DocumentService
 from app.services.embedding_service import EmbeddingService
 
@@ -103,17 +106,124 @@ class GitSyncConfig:
         self.generate_embeddings = generate_embeddings
 
 
+class GitMirror:
+    """
+    Persistent local checkout of one repository branch.
+    
+    Each sync fetches only the branch tip (depth 1). Objects the mirror
+    already has are not transferred again, and the previously synced
+    commit stays in the object store, so the two trees can be diffed
+    locally. Credentials are passed on each fetch and never written to
+    the mirror's config.
+    """
+    
+    _locks: Dict[str, threading.Lock] = {}
+    _locks_guard = threading.Lock()
+    
+    def __init__(self, repo_url: str, branch: str, root: Optional[str] = None):
+        self.repo_url = repo_url
+        self.branch = branch
+        key = hashlib.sha256(f"{repo_url}#{branch}".encode()).hexdigest()[:16]
+        self.path = Path(root or get_settings().git_sync_mirror_dir) / key
+    
+    def lock(self) -> threading.Lock:
+        """Lock serializing syncs that share this mirror."""
+        with self._locks_guard:
+            return self._locks.setdefault(str(self.path), threading.Lock())
+    
+    def update(self, clone_url: str, env: Dict[str, str], timeout: int = 300) -> str:
+        """
+        Fetch the branch tip and check it out.
+        
+        Returns:
+            The commit now checked out
+        """
+        if not (self.path / ".git").is_dir():
+            self.path.mkdir(parents=True, exist_ok=True)
+            self._git("init", "--quiet")
+        
+        logger.info(f"Fetching repository: {self.repo_url} (branch: {self.branch})")
+        self._git(
+            "fetch", "--depth", "1", "--no-tags",
+            clone_url, f"+refs/heads/{self.branch}:{self._ref}",
+            options=("-c", "core.askpass=false", "-c", "credential.helper="),
+            env=env, timeout=timeout
+        )
+        commit = self._git("rev-parse", self._ref).strip()
+        self._git(
+            "checkout", "--force", "--detach", commit,
+            options=("-c", "advice.detachedHead=false")
+        )
+        return commit
+    
+    def has_commit(self, commit: str) -> bool:
+        """Whether the tree of ``commit`` is available locally."""
+        try:
+            self._git("cat-file", "-e", f"{commit}^{{tree}}")
+            return True
+        except Exception:
+            return False
+    
+    def files(self, commit: str) -> List[str]:
+        """All file paths in ``commit``."""
+        return self._paths(self._git("ls-tree", "-r", "-z", "--name-only", commit))
+    
+    def changes(self, since: str, until: str) -> Tuple[List[str], List[str]]:
+        """
+        Files that differ between two commits.
+        
+        Returns:
+            Tuple of (added or modified paths, deleted paths); a rename
+            is a deletion plus an addition
+        """
+        output = self._git("diff", "--name-status", "-z", "--no-renames", since, until)
+        fields = self._paths(output)
+        changed, deleted = [], []
+        for status, path in zip(fields[::2], fields[1::2]):
+            (deleted if status == "D" else changed).append(path)
+        return changed, deleted
+    
+    @property
+    def _ref(self) -> str:
+        return f"refs/remotes/origin/{self.branch}"
+    
+    @staticmethod
+    def _paths(output: str) -> List[str]:
+        return [field for field in output.split("\0") if field]
+    
+    def _git(
+        self,
+        *args: str,
+        options: Tuple[str, ...] = (),
+        env: Optional[Dict[str, str]] = None,
+        timeout: int = 60
+    ) -> str:
+        result = subprocess.run(
+            ["git", *options, *args],
+            cwd=self.path,
+            capture_output=True,
+            text=True,
+            env=env,
+            timeout=timeout
+        )
+        if result.returncode != 0:
+            raise Exception(f"git {args[0]} failed: {result.stderr}")
+        return result.stdout
+
+
 class GitSyncService:
     """
     Service for syncing knowledge from Git repositories. 
     
     Features:
-    - Clone/pull repositories
+    - Persistent mirror per repository, updated by fetch
     - Multiple auth methods (token, SSH, basic)
     - Sync documentation files
     - Sync code files with indexing
     - Auto-chunking with embeddings
-    - Incremental updates
+    - Incremental updates: only files changed since the last synced
+      commit are read, unchanged content is skipped by hash, and
+      unchanged chunks keep their embeddings
     """
     
     def __init__(self, db: Session):
@@ -128,7 +238,8 @@ class GitSyncService:
         branch: str = "main",
         user_id: Optional[UUID] = None,
         credentials: Optional[GitCredentials] = None,
-        config: Optional[GitSyncConfig] = None
+        config: Optional[GitSyncConfig] = None,
+        incremental: bool = True
     ) -> Dict[str, Any]:
         """
         Sync a Git repository to the knowledge base.
@@ -140,6 +251,11 @@ class GitSyncService:
             user_id: User performing the sync
             credentials: Authentication credentials
             config:  Sync configuration
+            incremental: Only process files changed since the last synced
+                commit. A full sync lists every file; unchanged ones are
+                still skipped by content hash. The synced commit only
+                advances when every file was stored and embedded, so
+                failed files are picked up again by the next sync.
             
         Returns: 
             Sync statistics
@@ -148,134 +264,205 @@ class GitSyncService:
         config = config or GitSyncConfig()
         
         stats = {
+            "mode": "full",
+            "commit": None,
             "docs_synced": 0,
             "docs_updated": 0,
             "docs_skipped": 0,
+            "docs_deleted": 0,
             "code_synced": 0,
+            "unchanged": 0,
             "chunks_created": 0,
             "embeddings_generated": 0,
+            "embeddings_reused": 0,
+            "failed_files": [],
             "errors": []
         }
         
-        # Create temp directory
-        temp_dir = tempfile.mkdtemp(prefix="git_sync_")
+        mirror = GitMirror(repo_url, branch)
         
         try:
-            # Clone repository
-            clone_url = credentials. get_clone_url(repo_url)
-            env = credentials.get_env()
-            
-            logger.info(f"Cloning repository: {repo_url} (branch: {branch})")
-            
-            # Construct command
-            cmd = [
-                    "git", 
-                    "-c", "core.askpass=false", 
-                    "-c", "credential.helper=", 
-                    "clone", 
-                    "--depth", "1", 
-                    "--branch", branch, 
-                    clone_url, 
-                    temp_dir
-                ]
-            
-            # Debug logging
-            safe_env = {k: v for k, v in env.items() if k in ['GIT_TERMINAL_PROMPT', 'GIT_ASKPASS', 'SSH_ASKPASS', 'GIT_SSH_COMMAND']}
-            logger.info(f"Executing Git Command: {' '.join(cmd)}")
-            logger.info(f"Git Env Vars: {safe_env}")
-            
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                env=env,
-                timeout=300
-            )
-            
-            if result. returncode != 0:
-                raise Exception(f"Git clone failed: {result.stderr}")
-            
-            repo_path = Path(temp_dir)
-            
-            # Sync documentation
-            if config.sync_docs:
-                doc_stats = self._sync_docs(repo_path, app_id, user_id, config, repo_url)
-                stats["docs_synced"] = doc_stats["synced"]
-                stats["docs_updated"] = doc_stats["updated"]
-                stats["docs_skipped"] = doc_stats["skipped"]
-                stats["chunks_created"] += doc_stats["chunks"]
-                stats["embeddings_generated"] += doc_stats["embeddings"]
-            
-            # Sync code (optional)
-            if config.sync_code:
-                code_stats = self._sync_code(repo_path, app_id, user_id, config, repo_url)
-                stats["code_synced"] = code_stats["synced"]
-                stats["chunks_created"] += code_stats["chunks"]
-                stats["embeddings_generated"] += code_stats["embeddings"]
-            
-            self. db.commit()
+            with mirror.lock():
+                commit = mirror.update(credentials.get_clone_url(repo_url), credentials.get_env())
+                stats["commit"] = commit
+                
+                state = self.db.query(GitSyncState).filter(
+                    GitSyncState.repo_url == repo_url,
+                    GitSyncState.branch == branch
+                ).first()
+                if state is None:
+                    state = GitSyncState(repo_url=repo_url, branch=branch)
+                    self.db.add(state)
+                
+                since = state.last_commit if incremental else None
+                if since and mirror.has_commit(since):
+                    stats["mode"] = "incremental"
+                    changed, deleted = mirror.changes(since, commit) if since != commit else ([], [])
+                else:
+                    changed = mirror.files(commit)
+                    deleted = sorted(self._synced_paths(repo_url) - set(changed))
+                
+                logger.info(
+                    f"Git sync of {repo_url}@{commit[:12]} ({stats['mode']}): "
+                    f"{len(changed)} changed, {len(deleted)} deleted files"
+                )
+                
+                doc_paths, code_paths = self._classify(changed, config)
+                
+                # Sync documentation
+                if doc_paths:
+                    doc_stats = self._sync_docs(mirror.path, doc_paths, app_id, user_id, config, repo_url)
+                    stats["docs_synced"] = doc_stats["synced"]
+                    stats["docs_updated"] = doc_stats["updated"]
+                    stats["docs_skipped"] = doc_stats["skipped"]
+                    self._add_file_stats(stats, doc_stats)
+                
+                # Sync code (optional)
+                if code_paths:
+                    code_stats = self._sync_code(mirror.path, code_paths, app_id, user_id, config, repo_url)
+                    stats["code_synced"] = code_stats["synced"]
+                    self._add_file_stats(stats, code_stats)
+                
+                stats["docs_deleted"] = self._remove_documents(repo_url, deleted)
+                
+                if stats["failed_files"]:
+                    # Keep the previous commit so the next incremental
+                    # sync diffs from it and retries the failed files
+                    stats["errors"].append(
+                        f"{len(stats['failed_files'])} files failed and will be retried on the next sync"
+                    )
+                else:
+                    state.last_commit = commit
+                state.last_synced_at = datetime.now(timezone.utc)
+                self. db.commit()
             logger.info(f"Git sync complete: {stats}")
             
         except subprocess.TimeoutExpired: 
-            stats["errors"].append("Clone timed out after 5 minutes")
-            logger.error("Git clone timed out")
+            stats["errors"].append("Git fetch timed out")
+            logger.error("Git fetch timed out")
+            self.db.rollback()
         except Exception as e:
             stats["errors"].append(str(e))
             logger.error(f"Git sync failed:  {e}")
             self.db.rollback()
-        finally:
-            # Cleanup temp directory
-            shutil.rmtree(temp_dir, ignore_errors=True)
         
         return stats
     
+    @staticmethod
+    def _add_file_stats(stats: Dict[str, Any], file_stats: Dict[str, Any]) -> None:
+        stats["unchanged"] += file_stats["unchanged"]
+        stats["chunks_created"] += file_stats["chunks"]
+        stats["embeddings_generated"] += file_stats["embeddings"]
+        stats["embeddings_reused"] += file_stats["reused"]
+        stats["failed_files"].extend(file_stats["failed"])
+    
+    @staticmethod
+    def _matches(rel_path: str, patterns: List[str]) -> bool:
+        """
+        Whether a repository path matches any of the patterns.
+        
+        Same semantics as the former ``rglob(pattern)`` scan: a pattern
+        matches the trailing path components ("docs/**/*" matches files
+        directly under any docs directory).
+        """
+        path = PurePosixPath(rel_path)
+        return any(path.match(pattern.replace("**/*", "*")) for pattern in patterns)
+    
+    def _classify(self, paths: List[str], config: GitSyncConfig) -> Tuple[List[str], List[str]]:
+        """Split paths into documentation and code files to sync."""
+        doc_paths, code_paths = [], []
+        for rel_path in paths:
+            if any(fnmatch.fnmatch(rel_path, exc) for exc in config.exclude_patterns):
+                continue
+            if config.sync_docs and self._matches(rel_path, config.doc_patterns):
+                doc_paths.append(rel_path)
+            elif config.sync_code and self._matches(rel_path, config.code_patterns):
+                code_paths.append(rel_path)
+        return doc_paths, code_paths
+    
+    @staticmethod
+    def _file_source_url(source_url: str, rel_path: str) -> str:
+        return f"{source_url}/blob/main/{rel_path}"
+    
+    def _synced_paths(self, source_url: str) -> Set[str]:
+        """Repository paths that have a document from an earlier sync."""
+        prefix = self._file_source_url(source_url, "")
+        rows = self.db.query(DesignDocument.source_url).filter(
+            DesignDocument.source_type == 'git',
+            DesignDocument.source_url.startswith(prefix, autoescape=True)
+        ).all()
+        return {row.source_url[len(prefix):] for row in rows}
+    
+    def _remove_documents(self, source_url: str, rel_paths: List[str]) -> int:
+        """Delete the documents and chunks of files removed from the repository."""
+        if not rel_paths:
+            return 0
+        
+        documents = self.db.query(DesignDocument).filter(
+            DesignDocument.source_type == 'git',
+            DesignDocument.source_url.in_([self._file_source_url(source_url, p) for p in rel_paths])
+        ).all()
+        if not documents:
+            return 0
+        
+        self.db.query(DesignChunk).filter(
+            DesignChunk.source_type == 'document',
+            DesignChunk.source_id.in_([document.id for document in documents])
+        ).delete(synchronize_session=False)
+        for document in documents:
+            self.db.delete(document)
+        
+        logger.info(f"Removed {len(documents)} documents deleted from {source_url}")
+        return len(documents)
+    
     def _sync_docs(
         self,
         repo_path: Path,
+        rel_paths: List[str],
         app_id: Optional[UUID],
         user_id: Optional[UUID],
         config: GitSyncConfig,
         source_url: str
-    ) -> Dict[str, int]:
+    ) -> Dict[str, Any]:
         """Sync documentation files."""
-        import fnmatch
-        
-        stats = {"synced": 0, "updated": 0, "skipped": 0, "chunks": 0, "embeddings": 0}
+        stats = {
+            "synced": 0, "updated": 0, "skipped": 0, "unchanged": 0,
+            "chunks": 0, "embeddings": 0, "reused": 0, "failed": []
+        }
         
-        # Find matching files
-        for pattern in config.doc_patterns:
-            for file_path in repo_path.rglob(pattern. replace("**/*", "*")):
-                if not file_path.is_file():
-                    continue
-                
-                # Check exclusions
-                rel_path = str(file_path. relative_to(repo_path))
-                if any(fnmatch.fnmatch(rel_path, exc) for exc in config.exclude_patterns):
-                    continue
-                
-                # Check file size
-                if file_path.stat().st_size > config.max_file_size_kb * 1024:
-                    stats["skipped"] += 1
-                    continue
-                
-                try: 
-                    logger.debug(f"Processing file: {rel_path}")
-                    result = self._process_doc_file(
-                        file_path, rel_path, app_id, user_id, config, source_url
-                    )
-                    if result["new"]:
-                        stats["synced"] += 1
-                        logger.info(f"Synced new document: {rel_path}")
-                    else:
-                        stats["updated"] += 1
-                    stats["chunks"] += result["chunks"]
-                    stats["embeddings"] += result["embeddings"]
-                except Exception as e: 
-                    logger.error(f"Failed to process {rel_path}: {e}")
-                    stats["skipped"] += 1
+        for rel_path in rel_paths:
+            file_path = repo_path / rel_path
+            if not file_path.is_file():
+                continue
+            
+            # Check file size
+            if file_path.stat().st_size > config.max_file_size_kb * 1024:
+                stats["skipped"] += 1
+                continue
+            
+            try: 
+                logger.debug(f"Processing file: {rel_path}")
+                result = self._process_doc_file(
+                    file_path, rel_path, app_id, user_id, config, source_url
+                )
+                self._count_result(stats, result, rel_path)
+                if result["status"] == "new":
+                    logger.info(f"Synced new document: {rel_path}")
+            except Exception as e: 
+                logger.error(f"Failed to process {rel_path}: {e}")
+                stats["failed"].append(rel_path)
         
         return stats
     
+    @staticmethod
+    def _count_result(stats: Dict[str, Any], result: Dict[str, Any], rel_path: str) -> None:
+        stats[{"new": "synced", "updated": "updated", "unchanged": "unchanged"}[result["status"]]] += 1
+        stats["chunks"] += result["chunks"]
+        stats["embeddings"] += result["embeddings"]
+        stats["reused"] += result["reused"]
+        if not result["complete"]:
+            stats["failed"].append(rel_path)
+    
     def _process_doc_file(
         self,
         file_path:  Path,
@@ -286,24 +473,59 @@ class GitSyncService:
         source_url:  str
     ) -> Dict[str, Any]:
         """Process a single documentation file."""
-        import hashlib
-        
         # Read content
         content = file_path. read_text(encoding='utf-8', errors='ignore')
-        content_hash = hashlib. sha256(content. encode()).hexdigest()[:16]
         
-        # Determine doc type from path
-        doc_type = self._infer_doc_type(rel_path, content)
+        return self._upsert_document(
+            content,
+            self._file_source_url(source_url, rel_path),
+            config,
+            lambda: self. doc_service.create_document(
+                title=file_path.stem. replace("-", " ").replace("_", " ").title(),
+                doc_type=self._infer_doc_type(rel_path, content),
+                content=content,
+                format='markdown' if file_path.suffix in ['.md', '. markdown'] else 'text',
+                app_id=app_id,
+                user_id=user_id,
+                source_url=self._file_source_url(source_url, rel_path),
+                source_type='git'
+            )
+        )
+    
+    def _upsert_document(
+        self,
+        content: str,
+        file_source_url: str,
+        config: GitSyncConfig,
+        create: Callable[[], DesignDocument]
+    ) -> Dict[str, Any]:
+        """
+        Create or update the document for one file, then chunk and embed it.
+        
+        A document whose stored hash matches is left as it is: no version
+        bump, no re-chunking, no embedding calls. The hash is only stored
+        once every chunk has its embedding, so a document left incomplete
+        by a failed embedding call is processed again on the next sync.
+        """
+        content_hash = hashlib.sha256(content.encode()).hexdigest()
         
         # Check if document exists (by source URL + path)
-        file_source_url = f"{source_url}/blob/main/{rel_path}"
         existing = self.db.query(DesignDocument).filter(
             DesignDocument.source_url == file_source_url
         ).first()
         
-        is_new = existing is None
+        if existing and existing.content_hash == content_hash:
+            return {"status": "unchanged", "chunks": 0, "embeddings": 0, "reused": 0, "complete": True}
         
-        if existing:
+        same_content = existing is not None and existing.raw_content == content
+        if same_content and not self._missing_embeddings(existing, config):
+            existing.content_hash = content_hash
+            return {"status": "unchanged", "chunks": 0, "embeddings": 0, "reused": 0, "complete": True}
+        
+        if same_content:
+            # Content is unchanged but some chunks have no embedding yet
+            document = existing
+        elif existing:
             # Update existing document
             existing.raw_content = content
             existing.updated_at = datetime. now(timezone.utc)
@@ -311,125 +533,142 @@ class GitSyncService:
             document = existing
         else:
             # Create new document
-            document = self. doc_service.create_document(
-                title=file_path.stem. replace("-", " ").replace("_", " ").title(),
-                doc_type=doc_type,
-                content=content,
-                format='markdown' if file_path.suffix in ['.md', '. markdown'] else 'text',
-                app_id=app_id,
-                user_id=user_id,
-                source_url=file_source_url,
-                source_type='git'
-            )
+            document = create()
         
-        # Create chunks
-        chunks_created = 0
-        embeddings_generated = 0
-        
-        if config.auto_chunk:
-            chunks = self. doc_service.create_chunks_for_document(document)
-            chunks_created = len(chunks)
-            
-            # Generate embeddings in batch (much faster than individual calls)
-            if config.generate_embeddings and self.embedding_service. is_configured() and chunks:
-                chunk_texts = [chunk.content for chunk in chunks]
-                embeddings = self.embedding_service.generate_embeddings_batch(chunk_texts)
-                for chunk, embedding in zip(chunks, embeddings):
-                    if embedding:
-                        chunk.embedding = embedding
-                        embeddings_generated += 1
+        chunks, embeddings, reused, missing = self._chunk_and_embed(document, config, reuse=existing is not None)
+        document.content_hash = content_hash if not missing else None
         
         return {
-            "new": is_new,
-            "chunks": chunks_created,
-            "embeddings": embeddings_generated
+            "status": "updated" if existing else "new",
+            "chunks": chunks,
+            "embeddings": embeddings,
+            "reused": reused,
+            "complete": not missing
         }
     
+    def _embeddings_expected(self, config: GitSyncConfig) -> bool:
+        return config.auto_chunk and config.generate_embeddings and self.embedding_service.is_configured()
+    
+    def _missing_embeddings(self, document: DesignDocument, config: GitSyncConfig) -> bool:
+        """Whether the document has chunks still waiting for an embedding."""
+        if not self._embeddings_expected(config):
+            return False
+        return self.db.query(DesignChunk.id).filter(
+            DesignChunk.source_id == document.id,
+            DesignChunk.source_type == 'document',
+            DesignChunk.embedding.is_(None)
+        ).first() is not None
+    
+    def _chunk_and_embed(
+        self,
+        document: DesignDocument,
+        config: GitSyncConfig,
+        reuse: bool
+    ) -> Tuple[int, int, int, int]:
+        """
+        Re-chunk a document and embed chunks whose text is new.
+        
+        Returns:
+            Tuple of (chunks created, embeddings generated, embeddings
+            reused, chunks still missing an embedding)
+        """
+        if not config.auto_chunk:
+            return 0, 0, 0, 0
+        
+        # Embeddings of the document's current chunks, by text, before
+        # re-chunking replaces them
+        previous = {}
+        if reuse:
+            previous = dict(
+                self.db.query(DesignChunk.content, DesignChunk.embedding).filter(
+                    DesignChunk.source_id == document.id,
+                    DesignChunk.source_type == 'document',
+                    DesignChunk.embedding.isnot(None)
+                ).all()
+            )
+        
+        chunks = self. doc_service.create_chunks_for_document(document)
+        
+        pending = []
+        for chunk in chunks:
+            if chunk.content in previous:
+                chunk.embedding = previous[chunk.content]
+            else:
+                pending.append(chunk)
+        reused = len(chunks) - len(pending)
+        
+        # Generate embeddings in batch (much faster than individual calls)
+        embeddings_generated = 0
+        missing = 0
+        if self._embeddings_expected(config) and pending:
+            chunk_texts = [chunk.content for chunk in pending]
+            embeddings = self.embedding_service.generate_embeddings_batch(chunk_texts)
+            for chunk, embedding in zip(pending, embeddings):
+                if embedding:
+                    chunk.embedding = embedding
+                    embeddings_generated += 1
+            missing = len(pending) - embeddings_generated
+        
+        return len(chunks), embeddings_generated, reused, missing
+    
     def _sync_code(
         self,
         repo_path: Path,
+        rel_paths: List[str],
         app_id: Optional[UUID],
         user_id: Optional[UUID],
         config: GitSyncConfig,
         source_url: str
-    ) -> Dict[str, int]:
+    ) -> Dict[str, Any]:
         """Sync code files with documentation extraction."""
-        import fnmatch
-        
-        stats = {"synced": 0, "updated": 0, "skipped": 0, "chunks": 0, "embeddings": 0}
+        stats = {
+            "synced": 0, "updated": 0, "skipped": 0, "unchanged": 0,
+            "chunks": 0, "embeddings": 0, "reused": 0, "failed": []
+        }
         
-        # Find matching files
-        for pattern in config.code_patterns:
-            for file_path in repo_path.rglob(pattern.replace("**/*", "*")):
-                if not file_path.is_file():
-                    continue
+        for rel_path in rel_paths:
+            file_path = repo_path / rel_path
+            if not file_path.is_file():
+                continue
+            
+            # Check file size (stricter limit for code to avoid huge generated files)
+            if file_path.stat().st_size > config.max_file_size_kb * 1024:
+                stats["skipped"] += 1
+                continue
+            
+            try:
+                # Treat code as a document for now, mapping to 'design_doc'
+                # In the future we might want a dedicated 'code' doc_type
                 
-                # Check exclusions
-                rel_path = str(file_path.relative_to(repo_path))
-                if any(fnmatch.fnmatch(rel_path, exc) for exc in config.exclude_patterns):
-                    continue
+                # Read content
+                content = file_path.read_text(encoding='utf-8', errors='ignore')
                 
-                # Check file size (stricter limit for code to avoid huge generated files)
-                if file_path.stat().st_size > config.max_file_size_kb * 1024:
-                    stats["skipped"] += 1
-                    continue
+                # Wrap code in markdown block for better rendering/chunking
+                extension = file_path.suffix.lstrip('.')
+                formatted_content = f"``` {extension}\n{content}\n```"
                 
-                try:
-                    # Treat code as a document for now, mapping to 'design_doc'
-                    # In the future we might want a dedicated 'code' doc_type
-                    
-                    # Read content
-                    content = file_path.read_text(encoding='utf-8', errors='ignore')
-                    
-                    # Wrap code in markdown block for better rendering/chunking
-                    extension = file_path.suffix.lstrip('.')
-                    formatted_content = f"``` {extension}\n{content}\n```"
-                    
-                    # Create/Update document
-                    file_source_url = f"{source_url}/blob/main/{rel_path}"
-                    
-                    existing = self.db.query(DesignDocument).filter(
-                        DesignDocument.source_url == file_source_url
-                    ).first()
-                    
-                    is_new = existing is None
-                    
-                    if existing:
-                        existing.raw_content = formatted_content
-                        existing.updated_at = datetime.now(timezone.utc)
-                        existing.version += 1
-                        document = existing
-                        stats["updated"] += 1
-                    else:
-                        document = self.doc_service.create_document(
-                            title=rel_path, # Use relative path as title for code
-                            doc_type='design_doc', # Generic type for now
-                            content=formatted_content,
-                            format='markdown',
-                            app_id=app_id,
-                            user_id=user_id,
-                            source_url=file_source_url,
-                            source_type='git'
-                        )
-                        stats["synced"] += 1
-                    
-                    # Chunk and Embed
-                    if config.auto_chunk:
-                        chunks = self.doc_service.create_chunks_for_document(document)
-                        stats["chunks"] += len(chunks)
-                        
-                        # Generate embeddings in batch (much faster than individual calls)
-                        if config.generate_embeddings and self.embedding_service.is_configured() and chunks:
-                            chunk_texts = [chunk.content for chunk in chunks]
-                            embeddings = self.embedding_service.generate_embeddings_batch(chunk_texts)
-                            for chunk, embedding in zip(chunks, embeddings):
-                                if embedding:
-                                    chunk.embedding = embedding
-                                    stats["embeddings"] += 1
+                # Create/Update document, chunk and embed
+                file_source_url = self._file_source_url(source_url, rel_path)
+                result = self._upsert_document(
+                    formatted_content,
+                    file_source_url,
+                    config,
+                    lambda: self.doc_service.create_document(
+                        title=rel_path, # Use relative path as title for code
+                        doc_type='design_doc', # Generic type for now
+                        content=formatted_content,
+                        format='markdown',
+                        app_id=app_id,
+                        user_id=user_id,
+                        source_url=file_source_url,
+                        source_type='git'
+                    )
+                )
+                self._count_result(stats, result, rel_path)
                                     
-                except Exception as e:
-                    logger.error(f"Failed to process code file {rel_path}: {e}")
-                    stats["skipped"] += 1
+            except Exception as e:
+                logger.error(f"Failed to process code file {rel_path}: {e}")
+                stats["failed"].append(rel_path)
         
         return stats
     
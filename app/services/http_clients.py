@@ -0,0 +1,199 @@
+"""
+HTTP Client Registry
+
+Shared, pooled httpx clients for the observability backends (Prometheus,
+Loki, Tempo, Grafana, Alertmanager and user-defined datasources).
+
+Creating an ``httpx.AsyncClient`` per call pays a TCP (and TLS) handshake
+on every request. The registry keeps one client per backend and origin,
+so requests to the same server reuse keep-alive connections:
+
+- Connection limits, keep-alive expiry and timeouts come from settings
+- HTTP/2 is negotiated over TLS when the ``h2`` package is installed
+- Clients belong to the event loop that created them; another loop (a
+  worker thread running ``asyncio.run``) gets its own
+- Per-backend request latency, in-flight requests and pool saturation
+  are exported through ``app/metrics.py``
+
+Callers pass per-request options (timeout, auth, headers) on each call;
+the shared client carries none, so datasources with different
+credentials can share a pool. For the same reason the shared clients
+never store cookies: a session cookie set on a response to one user
+(e.g. Grafana auth-proxy requests) must not be sent for the next.
+"""
+
+import asyncio
+import http.cookiejar
+import importlib.util
+import logging
+import time
+import weakref
+from typing import Dict, Optional, Tuple
+
+import httpx
+
+from ..config import get_settings
+from ..metrics import (
+    HTTP_CLIENT_REQUESTS,
+    HTTP_CLIENT_DURATION,
+    HTTP_CLIENT_IN_FLIGHT,
+    HTTP_CLIENT_POOL_SATURATION,
+)
+
+logger = logging.getLogger(__name__)
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class _RejectAllCookiesPolicy(http.cookiejar.DefaultCookiePolicy):
+    """Cookie policy that stores no cookies from responses."""
+
+    def set_ok(self, cookie, request) -> bool:
+        return False
+
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """
+    Pooled transport that records request metrics.
+
+    Latency is measured up to the response headers; streamed bodies are
+    read afterwards by the caller.
+    """
+
+    def __init__(self, backend: str, host: str, transport: httpx.AsyncBaseTransport, max_connections: int):
+        self.backend = backend
+        self.host = host
+        self.max_connections = max_connections
+        self.in_flight = 0
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self._track(1)
+        start = time.perf_counter()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except Exception:
+            HTTP_CLIENT_REQUESTS.labels(backend=self.backend, status='error').inc()
+            raise
+        finally:
+            self._track(-1)
+            HTTP_CLIENT_DURATION.labels(backend=self.backend).observe(time.perf_counter() - start)
+
+        HTTP_CLIENT_REQUESTS.labels(backend=self.backend, status=f"{response.status_code // 100}xx").inc()
+        return response
+
+    def _track(self, delta: int) -> None:
+        self.in_flight += delta
+        HTTP_CLIENT_IN_FLIGHT.labels(backend=self.backend, host=self.host).inc(delta)
+        HTTP_CLIENT_POOL_SATURATION.labels(backend=self.backend, host=self.host).set(
+            min(self.in_flight / self.max_connections, 1.0)
+        )
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+class HTTPClientRegistry:
+    """Pooled AsyncClients keyed by event loop, backend and origin."""
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 30.0,
+        connect_timeout: float = 5.0,
+        http2: bool = True
+    ):
+        """
+        Initialize the registry.
+
+        Args:
+            max_connections: Open connections per backend origin
+            max_keepalive_connections: Idle connections kept per backend origin
+            keepalive_expiry: Seconds an idle connection is kept
+            timeout: Default read/write/pool timeout in seconds
+            connect_timeout: Connect timeout in seconds
+            http2: Negotiate HTTP/2 over TLS (needs the h2 package)
+        """
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[str, str], httpx.AsyncClient]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def get(self, backend: str, base_url: str) -> httpx.AsyncClient:
+        """
+        Get the shared client for a backend server.
+
+        Args:
+            backend: Metrics label (prometheus, loki, tempo, grafana, ...)
+            base_url: Any URL on the server; only the origin is used
+
+        Returns:
+            A pooled client for the current event loop
+        """
+        url = httpx.URL(base_url)
+        origin = f"{url.scheme}://{url.netloc.decode('ascii')}"
+        clients = self._clients.setdefault(asyncio.get_running_loop(), {})
+
+        client = clients.get((backend, origin))
+        if client is None or client.is_closed:
+            transport = InstrumentedTransport(
+                backend,
+                origin,
+                httpx.AsyncHTTPTransport(limits=self.limits, http2=self.http2),
+                self.limits.max_connections
+            )
+            client = httpx.AsyncClient(
+                transport=transport,
+                timeout=self.timeout,
+                cookies=http.cookiejar.CookieJar(policy=_RejectAllCookiesPolicy())
+            )
+            clients[(backend, origin)] = client
+            logger.debug(f"Opened pooled HTTP client for {backend} at {origin}")
+        return client
+
+    async def close_all(self) -> None:
+        """Close the current event loop's clients and their connections."""
+        clients = self._clients.pop(asyncio.get_running_loop(), {})
+        for client in clients.values():
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning(f"Error closing HTTP client: {e}")
+
+
+_registry: Optional[HTTPClientRegistry] = None
+
+
+def get_http_client_registry() -> HTTPClientRegistry:
+    """Get the shared HTTP client registry, creating it from settings."""
+    global _registry
+    if _registry is None:
+        settings = get_settings()
+        _registry = HTTPClientRegistry(
+            max_connections=settings.http_client_max_connections,
+            max_keepalive_connections=settings.http_client_max_keepalive,
+            keepalive_expiry=settings.http_client_keepalive_expiry,
+            timeout=settings.http_client_timeout,
+            connect_timeout=settings.http_client_connect_timeout,
+            http2=settings.http_client_http2,
+        )
+    return _registry
+
+
+def get_http_client(backend: str, base_url: str) -> httpx.AsyncClient:
+    """Get the pooled client for a backend server (see HTTPClientRegistry.get)."""
+    return get_http_client_registry().get(backend, base_url)
+
+
+async def close_http_clients() -> None:
+    """Close pooled HTTP clients on shutdown."""
+    if _registry is not None:
+        await _registry.close_all()
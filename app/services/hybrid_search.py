@@ -0,0 +1,86 @@
+"""
+Hybrid Search
+
+Ranked full-text (lexical) retrieval and reciprocal-rank fusion with
+vector results.
+
+Lexical queries match ``to_tsvector(TS_CONFIG, <text>)`` against
+``websearch_to_tsquery(TS_CONFIG, :query)``. The tsvector expressions
+below are the exact expressions of the GIN indexes in migration 050, so
+Postgres can serve the match from the index instead of scanning every
+row. Change them together or the index stops being used.
+
+Matches are ranked with ``ts_rank_cd`` normalized by document length
+(BM25-style: a term in a short chunk counts more than in a long one) and
+scaled to [0, 1).
+
+Reciprocal-rank fusion scores each item by ``sum(1 / (k + rank))`` over
+the rankings it appears in. It needs no score calibration between the
+cosine similarities and the text ranks, and an item found by both
+retrievers rises above items found by only one.
+"""
+
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence
+
+from app.config import get_settings
+
+# Text search configuration; a constant, not a bind parameter, so the
+# query expression matches the index expression
+TS_CONFIG = 'english'
+
+# Indexed document expressions (see migration 050)
+DESIGN_CHUNK_TSVECTOR = f"to_tsvector('{TS_CONFIG}', c.content)"
+RUNBOOK_TSVECTOR = (
+    f"(setweight(to_tsvector('{TS_CONFIG}', coalesce(r.name, '')), 'A') || "
+    f"setweight(to_tsvector('{TS_CONFIG}', coalesce(r.description, '')), 'B'))"
+)
+
+# Free-form user input: quoted phrases, OR and -term; never raises on syntax
+TSQUERY = f"websearch_to_tsquery('{TS_CONFIG}', :query)"
+
+# ts_rank_cd normalization: 1 divides by 1 + log(document length),
+# 32 maps the rank into [0, 1) as rank / (rank + 1)
+RANK_NORMALIZATION = 1 | 32
+
+
+def lexical_rank(tsvector: str) -> str:
+    """SQL for the rank of ``tsvector`` against :query."""
+    return f"ts_rank_cd({tsvector}, {TSQUERY}, {RANK_NORMALIZATION})"
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[Any]],
+    key: Callable[[Any], Hashable] = lambda item: item,
+    k: Optional[int] = None,
+    limit: Optional[int] = None
+) -> List[Any]:
+    """
+    Merge several best-first rankings into one.
+
+    Args:
+        rankings: Result lists, each ordered best first
+        key: Identity of an item across rankings
+        k: Rank damping constant (default hybrid_search_rrf_k); larger
+            values flatten the gap between top and lower ranks
+        limit: Maximum items returned
+
+    Returns:
+        Distinct items, best fused score first. Where an item appears in
+        several rankings, the instance from the earliest ranking is kept.
+    """
+    if k is None:
+        k = get_settings().hybrid_search_rrf_k
+
+    scores: Dict[Hashable, float] = {}
+    items: Dict[Hashable, Any] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, start=1):
+            item_key = key(item)
+            scores[item_key] = scores.get(item_key, 0.0) + 1.0 / (k + rank)
+            items.setdefault(item_key, item)
+
+    # sorted() is stable, so ties keep first-seen order
+    fused = sorted(items, key=lambda item_key: scores[item_key], reverse=True)
+    if limit is not None:
+        fused = fused[:limit]
+    return [items[item_key] for item_key in fused]
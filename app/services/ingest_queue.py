@@ -0,0 +1,449 @@
+"""
+Ingest Queue Service
+
+Durable, Postgres-backed work queue between the Alertmanager webhook and
+downstream processing. The webhook appends jobs in the same transaction
+that stores the alerts; a pool of consumers drains them with bounded
+concurrency per stage, retrying failures with exponential backoff.
+
+Jobs are claimed with SELECT ... FOR UPDATE SKIP LOCKED, so any number of
+app replicas can consume the same table without double-processing.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timezone, timedelta
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import select, update, delete, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import async_session_factory
+from ..models_ingest_queue import IngestQueueJob
+from ..config import get_settings
+from ..metrics import (
+    INGEST_QUEUE_DEPTH, INGEST_QUEUE_LAG, INGEST_QUEUE_IN_FLIGHT,
+    INGEST_QUEUE_JOBS, INGEST_QUEUE_JOB_DURATION
+)
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+STAGE_ANALYSIS = "analysis"
+STAGE_REMEDIATION = "remediation"
+STAGES = (STAGE_ANALYSIS, STAGE_REMEDIATION)
+
+StageHandler = Callable[[str], Awaitable[None]]
+
+
+def retry_delay(attempts: int, base: int, maximum: int) -> int:
+    """Exponential backoff in seconds for a job that has failed ``attempts`` times."""
+    if attempts < 1:
+        return 0
+    return min(base * (2 ** (attempts - 1)), maximum)
+
+
+async def enqueue_jobs(
+    db: AsyncSession,
+    jobs: Iterable[Tuple[str, uuid.UUID]],
+    max_attempts: Optional[int] = None
+) -> int:
+    """
+    Append (stage, alert_id) jobs with one multi-row INSERT.
+    Does not commit, so callers can enqueue atomically with their own writes.
+    """
+    now = datetime.now(timezone.utc)
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "stage": stage,
+            "alert_id": alert_id,
+            "status": "pending",
+            "attempts": 0,
+            "max_attempts": max_attempts or settings.ingest_queue_max_attempts,
+            "available_at": now,
+            "created_at": now,
+        }
+        for stage, alert_id in jobs
+    ]
+    if rows:
+        await db.execute(pg_insert(IngestQueueJob).values(rows))
+    return len(rows)
+
+
+async def claim_jobs(db: AsyncSession, stage: str, limit: int, worker_id: str) -> List[Tuple[uuid.UUID, uuid.UUID, int, int]]:
+    """
+    Atomically claim up to ``limit`` ready jobs for a stage.
+
+    Returns a list of (job_id, alert_id, attempts, max_attempts).
+    """
+    now = datetime.now(timezone.utc)
+    ready = (
+        select(IngestQueueJob.id)
+        .where(
+            IngestQueueJob.stage == stage,
+            IngestQueueJob.status == "pending",
+            IngestQueueJob.available_at <= now
+        )
+        .order_by(IngestQueueJob.available_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    result = await db.execute(
+        update(IngestQueueJob)
+        .where(IngestQueueJob.id.in_(ready.scalar_subquery()))
+        .values(
+            status="processing",
+            locked_by=worker_id,
+            locked_at=now,
+            attempts=IngestQueueJob.attempts + 1
+        )
+        .returning(
+            IngestQueueJob.id,
+            IngestQueueJob.alert_id,
+            IngestQueueJob.attempts,
+            IngestQueueJob.max_attempts
+        )
+        .execution_options(synchronize_session=False)
+    )
+    claimed = [tuple(row) for row in result]
+    await db.commit()
+    return claimed
+
+
+async def complete_job(db: AsyncSession, job_id: uuid.UUID) -> None:
+    """Remove a successfully processed job."""
+    await db.execute(delete(IngestQueueJob).where(IngestQueueJob.id == job_id))
+    await db.commit()
+
+
+async def fail_job(
+    db: AsyncSession,
+    job_id: uuid.UUID,
+    attempts: int,
+    max_attempts: int,
+    error: str
+) -> bool:
+    """
+    Record a failed attempt. Reschedules with backoff, or marks the job
+    dead once it has used all its attempts.
+
+    Returns True if the job will be retried.
+    """
+    retry = attempts < max_attempts
+    values = {
+        "locked_by": None,
+        "locked_at": None,
+        "last_error": error[:2000],
+    }
+    if retry:
+        delay = retry_delay(
+            attempts,
+            settings.ingest_queue_retry_base_seconds,
+            settings.ingest_queue_retry_max_seconds
+        )
+        values["status"] = "pending"
+        values["available_at"] = datetime.now(timezone.utc) + timedelta(seconds=delay)
+    else:
+        values["status"] = "dead"
+
+    await db.execute(
+        update(IngestQueueJob)
+        .where(IngestQueueJob.id == job_id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return retry
+
+
+async def renew_job_lock(db: AsyncSession, job_id: uuid.UUID, worker_id: str) -> bool:
+    """Heartbeat: keep a running job from being reclaimed. False if it was lost."""
+    result = await db.execute(
+        update(IngestQueueJob)
+        .where(
+            IngestQueueJob.id == job_id,
+            IngestQueueJob.status == "processing",
+            IngestQueueJob.locked_by == worker_id
+        )
+        .values(locked_at=datetime.now(timezone.utc))
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return (result.rowcount or 0) > 0
+
+
+async def reclaim_stale_jobs(db: AsyncSession, visibility_timeout: int) -> int:
+    """
+    Return jobs stuck in 'processing' (their consumer died) to the pending
+    state, with backoff.
+
+    The lost run already counted as an attempt when it was claimed, so jobs
+    that have used all their attempts are dead-lettered instead; a job that
+    crashes its consumer every time stops after max_attempts.
+    """
+    now = datetime.now(timezone.utc)
+    cutoff = now - timedelta(seconds=visibility_timeout)
+    stale = (
+        IngestQueueJob.status == "processing",
+        IngestQueueJob.locked_at < cutoff
+    )
+
+    dead = await db.execute(
+        update(IngestQueueJob)
+        .where(*stale, IngestQueueJob.attempts >= IngestQueueJob.max_attempts)
+        .values(
+            status="dead",
+            locked_by=None,
+            locked_at=None,
+            last_error="Consumer lost the job (no heartbeat) on its last attempt"
+        )
+        .execution_options(synchronize_session=False)
+    )
+    reclaimed = await db.execute(
+        update(IngestQueueJob)
+        .where(*stale)
+        .values(
+            status="pending",
+            locked_by=None,
+            locked_at=None,
+            available_at=now + timedelta(seconds=settings.ingest_queue_retry_base_seconds),
+            last_error="Consumer lost the job (no heartbeat)"
+        )
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+
+    if dead.rowcount:
+        logger.error(f"Dead-lettered {dead.rowcount} ingest queue job(s) lost on their last attempt")
+    return (reclaimed.rowcount or 0) + (dead.rowcount or 0)
+
+
+async def get_queue_stats(db: AsyncSession) -> Dict[str, Dict[str, float]]:
+    """
+    Return per-stage depth and lag with one grouped query.
+    Lag is the age in seconds of the oldest job that is ready to run.
+    """
+    now = datetime.now(timezone.utc)
+    result = await db.execute(
+        select(
+            IngestQueueJob.stage,
+            IngestQueueJob.status,
+            func.count(IngestQueueJob.id),
+            func.min(IngestQueueJob.available_at)
+        )
+        .group_by(IngestQueueJob.stage, IngestQueueJob.status)
+    )
+
+    stats = {stage: {"pending": 0, "processing": 0, "dead": 0, "lag_seconds": 0.0} for stage in STAGES}
+    for stage, status, count, oldest in result:
+        entry = stats.setdefault(stage, {"pending": 0, "processing": 0, "dead": 0, "lag_seconds": 0.0})
+        entry[status] = count
+        if status == "pending" and oldest is not None and oldest <= now:
+            entry["lag_seconds"] = (now - oldest).total_seconds()
+    return stats
+
+
+class IngestQueueWorker:
+    """
+    Pool of consumers draining the ingest queue.
+
+    Features:
+    - One dispatcher per stage, each with its own concurrency cap
+    - Retry with exponential backoff, dead-lettering after max attempts
+    - Heartbeats running jobs; reclaims jobs whose consumer died mid-flight
+    - Publishes queue depth/lag gauges
+    - Graceful shutdown support
+    """
+
+    def __init__(
+        self,
+        handlers: Dict[str, StageHandler],
+        concurrency: Optional[Dict[str, int]] = None,
+        poll_interval: Optional[float] = None,
+        session_factory=async_session_factory,
+        visibility_timeout: Optional[int] = None
+    ):
+        """
+        Initialize the ingest queue worker.
+
+        Args:
+            handlers: Coroutine per stage, called with the alert id. Raising retries the job.
+            concurrency: Max in-flight jobs per stage
+            poll_interval: Seconds to wait when a stage has nothing to claim
+            session_factory: Async session factory used for queue bookkeeping
+            visibility_timeout: Seconds without a heartbeat before a job is
+                reclaimed; running jobs heartbeat every third of it
+        """
+        self.handlers = handlers
+        self.concurrency = concurrency or {
+            STAGE_ANALYSIS: settings.ingest_queue_analysis_concurrency,
+            STAGE_REMEDIATION: settings.ingest_queue_remediation_concurrency,
+        }
+        self.poll_interval = poll_interval if poll_interval is not None else settings.ingest_queue_poll_interval
+        self.session_factory = session_factory
+        self.visibility_timeout = visibility_timeout or settings.ingest_queue_visibility_timeout
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._running = False
+        self._tasks: List[asyncio.Task] = []
+        self._in_flight: Dict[str, Set[asyncio.Task]] = {stage: set() for stage in handlers}
+
+    async def start(self):
+        """Start one dispatcher per stage plus the housekeeping loop."""
+        if self._running:
+            logger.warning("Ingest queue worker is already running")
+            return
+
+        self._running = True
+        for stage in self.handlers:
+            self._tasks.append(asyncio.create_task(self._stage_loop(stage)))
+        self._tasks.append(asyncio.create_task(self._housekeeping_loop()))
+        logger.info(f"Ingest queue worker {self.worker_id} started ({self.concurrency})")
+
+    async def stop(self):
+        """Stop dispatching and wait for in-flight jobs to finish."""
+        self._running = False
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+        in_flight = [task for tasks in self._in_flight.values() for task in tasks]
+        if in_flight:
+            await asyncio.gather(*in_flight, return_exceptions=True)
+        logger.info("Ingest queue worker stopped")
+
+    async def _stage_loop(self, stage: str):
+        """Claim jobs for one stage whenever there is spare capacity."""
+        in_flight = self._in_flight[stage]
+        limit = self.concurrency.get(stage, 1)
+
+        while self._running:
+            free = limit - len(in_flight)
+            if free <= 0:
+                await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                continue
+
+            try:
+                async with self.session_factory() as db:
+                    jobs = await claim_jobs(db, stage, free, self.worker_id)
+            except Exception as e:
+                logger.exception(f"Error claiming {stage} jobs: {e}")
+                jobs = []
+
+            for job in jobs:
+                task = asyncio.create_task(self._run_job(stage, *job))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+            INGEST_QUEUE_IN_FLIGHT.labels(stage=stage).set(len(in_flight))
+
+            if not jobs:
+                await asyncio.sleep(self.poll_interval)
+
+    async def _run_job(self, stage: str, job_id: uuid.UUID, alert_id: uuid.UUID, attempts: int, max_attempts: int):
+        """Run a single job and record its outcome."""
+        start = asyncio.get_running_loop().time()
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        try:
+            await self.handlers[stage](str(alert_id))
+        except Exception as e:
+            heartbeat.cancel()
+            logger.warning(f"{stage} job for alert {alert_id} failed (attempt {attempts}/{max_attempts}): {e}")
+            try:
+                async with self.session_factory() as db:
+                    retried = await fail_job(db, job_id, attempts, max_attempts, str(e))
+                INGEST_QUEUE_JOBS.labels(stage=stage, outcome="retry" if retried else "dead").inc()
+            except Exception as db_error:
+                logger.exception(f"Could not record failure for job {job_id}: {db_error}")
+        else:
+            heartbeat.cancel()
+            try:
+                async with self.session_factory() as db:
+                    await complete_job(db, job_id)
+                INGEST_QUEUE_JOBS.labels(stage=stage, outcome="success").inc()
+            except Exception as db_error:
+                logger.exception(f"Could not complete job {job_id}: {db_error}")
+        finally:
+            heartbeat.cancel()
+            INGEST_QUEUE_JOB_DURATION.labels(stage=stage).observe(
+                asyncio.get_running_loop().time() - start
+            )
+
+    async def _heartbeat(self, job_id: uuid.UUID):
+        """Refresh the job's lock until cancelled, so long runs are not reclaimed."""
+        while True:
+            await asyncio.sleep(self.visibility_timeout / 3)
+            try:
+                async with self.session_factory() as db:
+                    held = await renew_job_lock(db, job_id, self.worker_id)
+            except Exception as e:
+                # Transient DB trouble: the lock still has time left
+                logger.warning(f"Heartbeat failed for ingest queue job {job_id}: {e}")
+                continue
+            if not held:
+                logger.error(f"Lost ingest queue job {job_id} to reclaim; it may run twice")
+                return
+
+    async def _housekeeping_loop(self):
+        """Reclaim stale jobs and refresh depth/lag gauges."""
+        while self._running:
+            try:
+                async with self.session_factory() as db:
+                    reclaimed = await reclaim_stale_jobs(db, self.visibility_timeout)
+                    if reclaimed:
+                        logger.warning(f"Reclaimed {reclaimed} stale ingest queue job(s)")
+                    stats = await get_queue_stats(db)
+
+                for stage, entry in stats.items():
+                    INGEST_QUEUE_DEPTH.labels(stage=stage, status="pending").set(entry["pending"])
+                    INGEST_QUEUE_DEPTH.labels(stage=stage, status="processing").set(entry["processing"])
+                    INGEST_QUEUE_DEPTH.labels(stage=stage, status="dead").set(entry["dead"])
+                    INGEST_QUEUE_LAG.labels(stage=stage).set(entry["lag_seconds"])
+            except Exception as e:
+                logger.exception(f"Error in ingest queue housekeeping: {e}")
+
+            await asyncio.sleep(15)
+
+
+# Global worker instance
+_worker: Optional[IngestQueueWorker] = None
+
+
+def _default_handlers() -> Dict[str, StageHandler]:
+    """Stage handlers for webhook follow-up work."""
+    from ..routers.webhook import perform_auto_analysis, perform_auto_remediation
+
+    return {
+        STAGE_ANALYSIS: perform_auto_analysis,
+        STAGE_REMEDIATION: perform_auto_remediation,
+    }
+
+
+def get_ingest_queue_worker() -> IngestQueueWorker:
+    """Get or create the global ingest queue worker instance."""
+    global _worker
+    if _worker is None:
+        _worker = IngestQueueWorker(_default_handlers())
+    return _worker
+
+
+async def start_ingest_queue_worker():
+    """Start the global ingest queue worker."""
+    worker = get_ingest_queue_worker()
+    await worker.start()
+
+
+async def stop_ingest_queue_worker():
+    """Stop the global ingest queue worker."""
+    global _worker
+    if _worker:
+        await _worker.stop()
+        _worker = None
@@ -1,6 +1,7 @@
 """
 Knowledge Search Service
-Semantic search across design documents using vector similarity
+Hybrid search across design documents: vector similarity fused with
+ranked full-text matches
 """
 from typing import List, Optional, Dict, Any
 from uuid import UUID
@@ -9,20 +10,32 @@ import logging
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 
-from app.models_knowledge import DesignChunk, DesignDocument, DesignImage
-from app.services.embedding_service import EmbeddingService
+from app.config import get_settings
+from app.services.embedding_service import get_embedding_service
+from app.services.hybrid_search import (
+    DESIGN_CHUNK_TSVECTOR, TSQUERY, lexical_rank, reciprocal_rank_fusion
+)
+from app.services.vector_search import candidate_count, tune_vector_search
+from app.services.source_metadata import load_source_metadata
 
 logger = logging.getLogger(__name__)
 
+# Source metadata copied into each search result, per source kind
+_RESULT_FIELDS = {
+    'document': ('source_title', 'source_url', 'doc_type', 'app_id'),
+    'image': ('source_title', 'image_type', 'app_id'),
+    'runbook': ('source_title', 'doc_type', 'view_url'),
+}
+
 
 class KnowledgeSearchService:
-    """Service for searching knowledge base using vector similarity."""
+    """Service for searching knowledge base using vector and full-text search."""
     
     def __init__(self, db: Session):
         self.db = db
-        self.embedding_service = EmbeddingService()
+        self.embedding_service = get_embedding_service()
     
-    def search_similar(
+    async def search_similar(
         self,
         query: str,
         app_id: Optional[UUID] = None,
@@ -32,7 +45,13 @@ class KnowledgeSearchService:
         min_similarity: float = 0.3  # Lowered from 0.7 for better recall
     ) -> List[Dict[str, Any]]:
         """
-        Search for similar knowledge chunks using semantic search.
+        Search for similar knowledge chunks.
+        
+        Vector results and ranked full-text matches are merged with
+        reciprocal-rank fusion (hybrid_search_enabled), so exact terms
+        such as hostnames and error codes are found even when their
+        embeddings are not close. Without embeddings, only the full-text
+        search runs.
         
         Args:
             query: Search query text
@@ -40,29 +59,50 @@ class KnowledgeSearchService:
             doc_types: Filter by document types
             content_types: Filter by content types
             limit: Maximum number of results
-            min_similarity: Minimum similarity threshold (0-1)
+            min_similarity: Minimum similarity threshold (0-1) for vector matches
             
         Returns:
             List of search results with similarity scores
         """
         if not self.embedding_service.is_configured():
             logger.warning("Embedding service not configured - falling back to text search")
-            return self._text_search(query, app_id, doc_types, limit)
+            return self._text_search(query, app_id, doc_types, limit, content_types)
         
         # Generate embedding for query
-        query_embedding = self.embedding_service.generate_embedding(query)
+        query_embedding = await self.embedding_service.embed(query)
         if not query_embedding:
             logger.error("Failed to generate query embedding")
-            return self._text_search(query, app_id, doc_types, limit)
+            return self._text_search(query, app_id, doc_types, limit, content_types)
+        
+        if not get_settings().hybrid_search_enabled:
+            return self.search_by_embedding(
+                query_embedding,
+                app_id=app_id,
+                doc_types=doc_types,
+                content_types=content_types,
+                limit=limit,
+                min_similarity=min_similarity
+            )
+        
+        try:
+            vector_chunks = self._vector_search(
+                query_embedding, app_id, content_types, limit, min_similarity
+            )
+        except Exception as e:
+            logger.error(f"Vector search failed: {e}")
+            vector_chunks = []
+        
+        try:
+            text_chunks = self._lexical_search(query, app_id, content_types, limit)
+        except Exception as e:
+            logger.error(f"Text search failed: {e}")
+            text_chunks = []
         
-        return self.search_by_embedding(
-            query_embedding,
-            app_id=app_id,
-            doc_types=doc_types,
-            content_types=content_types,
-            limit=limit,
-            min_similarity=min_similarity
+        # Chunks found by both keep their vector similarity
+        chunks = reciprocal_rank_fusion(
+            [vector_chunks, text_chunks], key=lambda chunk: chunk.id, limit=limit
         )
+        return self._enrich(chunks)
     
     def search_by_embedding(
         self,
@@ -71,7 +111,9 @@ class KnowledgeSearchService:
         doc_types: Optional[List[str]] = None,
         content_types: Optional[List[str]] = None,
         limit: int = 10,
-        min_similarity: float = 0.7
+        min_similarity: float = 0.7,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None
     ) -> List[Dict[str, Any]]:
         """
         Search using a pre-computed embedding vector.
@@ -83,29 +125,92 @@ class KnowledgeSearchService:
             content_types: Filter by content types
             limit: Maximum number of results
             min_similarity: Minimum similarity threshold
+            ef_search: HNSW search breadth for this query (recall vs latency)
+            probes: ivfflat lists scanned for this query
             
         Returns:
             List of search results with similarity scores
         """
-        # Build SQL query with vector similarity
+        try:
+            chunks = self._vector_search(
+                embedding, app_id, content_types, limit, min_similarity,
+                ef_search=ef_search, probes=probes
+            )
+            return self._enrich(chunks)
+            
+        except Exception as e:
+            logger.error(f"Vector search failed: {e}")
+            return []
+    
+    def _vector_search(
+        self,
+        embedding: List[float],
+        app_id: Optional[UUID],
+        content_types: Optional[List[str]],
+        limit: int,
+        min_similarity: float,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None
+    ) -> list:
+        """Nearest chunks by cosine similarity, best first."""
         # Using cosine distance: 1 - (embedding <=> query_embedding)
-        
-        filters = []
         params = {
             'query_embedding': embedding,
             'limit': limit,
             'min_similarity': min_similarity
         }
+        where_clause = self._filters(params, app_id, content_types)
+        params['candidates'] = candidate_count(limit, filtered=where_clause != "1=1")
         
-        if app_id:
-            filters.append("c.app_id = :app_id")
-            params['app_id'] = str(app_id)
+        # Index-driven top-k first, similarity threshold on the candidates
+        # (a threshold in the inner WHERE would bypass the vector index)
+        sql = text(f"""
+            SELECT 
+                nearest.id,
+                nearest.source_type,
+                nearest.source_id,
+                nearest.content,
+                nearest.content_type,
+                nearest.chunk_metadata,
+                1 - nearest.distance as similarity
+            FROM (
+                SELECT 
+                    c.id,
+                    c.source_type,
+                    c.source_id,
+                    c.content,
+                    c.content_type,
+                    c.chunk_metadata,
+                    c.embedding <=> CAST(:query_embedding AS vector) as distance
+                FROM design_chunks c
+                WHERE {where_clause}
+                    AND c.embedding IS NOT NULL
+                ORDER BY distance
+                LIMIT :candidates
+            ) nearest
+            WHERE 1 - nearest.distance >= :min_similarity
+            ORDER BY nearest.distance
+            LIMIT :limit
+        """)
         
-        if content_types:
-            filters.append("c.content_type = ANY(:content_types)")
-            params['content_types'] = content_types
+        tune_vector_search(self.db, params['candidates'], ef_search=ef_search, probes=probes)
+        return self.db.execute(sql, params).fetchall()
+    
+    def _lexical_search(
+        self,
+        query: str,
+        app_id: Optional[UUID],
+        content_types: Optional[List[str]],
+        limit: int
+    ) -> list:
+        """
+        Chunks matching the query's terms, best ranked first.
         
-        where_clause = " AND ".join(filters) if filters else "1=1"
+        The match is served by the full-text GIN index; the rank (0-1)
+        is returned as the similarity.
+        """
+        params = {'query': query, 'limit': limit}
+        where_clause = self._filters(params, app_id, content_types)
         
         sql = text(f"""
             SELECT 
@@ -115,165 +220,112 @@ class KnowledgeSearchService:
                 c.content,
                 c.content_type,
                 c.chunk_metadata,
-                1 - (c.embedding <=> CAST(:query_embedding AS vector)) as similarity
+                {lexical_rank(DESIGN_CHUNK_TSVECTOR)} as similarity
             FROM design_chunks c
             WHERE {where_clause}
-                AND c.embedding IS NOT NULL
-                AND 1 - (c.embedding <=> CAST(:query_embedding AS vector)) >= :min_similarity
-            ORDER BY c.embedding <=> CAST(:query_embedding AS vector)
+                AND {DESIGN_CHUNK_TSVECTOR} @@ {TSQUERY}
+            ORDER BY similarity DESC
             LIMIT :limit
         """)
         
-        try:
-            result = self.db.execute(sql, params)
-            chunks = result.fetchall()
-            
-            # Enrich results with source information
-            enriched_results = []
-            for chunk in chunks:
-                result_dict = {
-                    'chunk_id': chunk.id,
-                    'source_type': chunk.source_type,
-                    'source_id': chunk.source_id,
-                    'content': chunk.content,
-                    'content_type': chunk.content_type,
-                    'similarity': float(chunk.similarity),
-                    'metadata': chunk.chunk_metadata or {}
-                }
-                
-                # Get source object details
-                if chunk.source_type == 'document':
-                    # Check for runbook disguised as document (metadata)
-                    is_runbook = chunk.chunk_metadata and chunk.chunk_metadata.get('doc_type') == 'runbook'
-                    
-                    if is_runbook:
-                        from app.models_remediation import Runbook
-                        runbook = self.db.query(Runbook).filter(Runbook.id == chunk.source_id).first()
-                        if runbook:
-                            result_dict['source_title'] = runbook.name
-                            result_dict['doc_type'] = 'runbook'
-                            result_dict['view_url'] = f"/runbooks/{runbook.id}/view"
-                    else:
-                        doc = self.db.query(DesignDocument).filter(
-                            DesignDocument.id == chunk.source_id
-                        ).first()
-                        if doc:
-                            result_dict['source_title'] = doc.title
-                            result_dict['source_url'] = doc.source_url
-                            result_dict['doc_type'] = doc.doc_type
-                            result_dict['app_id'] = doc.app_id
-                
-                elif chunk.source_type == 'image':
-                    img = self.db.query(DesignImage).filter(
-                        DesignImage.id == chunk.source_id
-                    ).first()
-                    if img:
-                        result_dict['source_title'] = img.title
-                        result_dict['image_type'] = img.image_type
-                        result_dict['image_type'] = img.image_type
-                        result_dict['app_id'] = img.app_id
-                
-                elif chunk.source_type == 'runbook':
-                    from app.models_remediation import Runbook
-                    runbook = self.db.query(Runbook).filter(Runbook.id == chunk.source_id).first()
-                    if runbook:
-                        result_dict['source_title'] = runbook.name
-                        result_dict['doc_type'] = 'runbook'
-                        result_dict['view_url'] = f"/runbooks/{runbook.id}/view"
-                
-                enriched_results.append(result_dict)
+        return self.db.execute(sql, params).fetchall()
+    
+    @staticmethod
+    def _filters(
+        params: Dict[str, Any],
+        app_id: Optional[UUID],
+        content_types: Optional[List[str]]
+    ) -> str:
+        """WHERE clause for the chunk filters; adds their bind values to params."""
+        filters = []
+        
+        if app_id:
+            filters.append("c.app_id = :app_id")
+            params['app_id'] = str(app_id)
+        
+        if content_types:
+            filters.append("c.content_type = ANY(:content_types)")
+            params['content_types'] = content_types
+        
+        return " AND ".join(filters) if filters else "1=1"
+    
+    @staticmethod
+    def _source_kind(chunk) -> Optional[str]:
+        """Which source table a chunk's source_id points into."""
+        if chunk.source_type == 'document':
+            # Check for runbook disguised as document (metadata)
+            is_runbook = chunk.chunk_metadata and chunk.chunk_metadata.get('doc_type') == 'runbook'
+            return 'runbook' if is_runbook else 'document'
+        if chunk.source_type in ('image', 'runbook'):
+            return chunk.source_type
+        return None
+    
+    def _enrich(self, chunks) -> List[Dict[str, Any]]:
+        """
+        Add source titles and URLs to search results.
+        
+        Sources are looked up once per kind for the whole result set
+        (cached for a short time), not once per chunk.
+        """
+        ids_by_kind: Dict[str, List[UUID]] = {}
+        for chunk in chunks:
+            kind = self._source_kind(chunk)
+            if kind:
+                ids_by_kind.setdefault(kind, []).append(chunk.source_id)
+        
+        sources = {
+            kind: load_source_metadata(self.db, kind, ids)
+            for kind, ids in ids_by_kind.items()
+        }
+        
+        enriched_results = []
+        for chunk in chunks:
+            result_dict = {
+                'chunk_id': chunk.id,
+                'source_type': chunk.source_type,
+                'source_id': chunk.source_id,
+                'content': chunk.content,
+                'content_type': chunk.content_type,
+                'similarity': float(chunk.similarity),
+                'metadata': chunk.chunk_metadata or {}
+            }
             
-            return enriched_results
+            kind = self._source_kind(chunk)
+            source = sources.get(kind, {}).get(chunk.source_id)
+            if source:
+                for field in _RESULT_FIELDS[kind]:
+                    result_dict[field] = source[field]
             
-        except Exception as e:
-            logger.error(f"Vector search failed: {e}")
-            return []
+            enriched_results.append(result_dict)
+        
+        return enriched_results
     
     def _text_search(
         self,
         query: str,
         app_id: Optional[UUID] = None,
         doc_types: Optional[List[str]] = None,
-        limit: int = 10
+        limit: int = 10,
+        content_types: Optional[List[str]] = None
     ) -> List[Dict[str, Any]]:
         """
         Fallback text-based search when embeddings are not available.
-        Uses PostgreSQL full-text search.
+        Uses PostgreSQL full-text search, ranked by relevance.
         
         Args:
             query: Search query
             app_id: Filter by application
             doc_types: Filter by document types
             limit: Maximum results
+            content_types: Filter by content types
             
         Returns:
-            List of search results
+            List of search results; similarity is the text rank (0-1)
         """
-        # Build query
-        chunks_query = self.db.query(DesignChunk)
-        
-        if app_id:
-            chunks_query = chunks_query.filter(DesignChunk.app_id == app_id)
-        
-        # Simple text search using ILIKE
-        chunks_query = chunks_query.filter(
-            DesignChunk.content.ilike(f'%{query}%')
-        )
-        
-        chunks = chunks_query.limit(limit).all()
-        
-        # Format and enrich results
-        results = []
-        for chunk in chunks:
-            result = {
-                'chunk_id': chunk.id,
-                'source_type': chunk.source_type,
-                'source_id': chunk.source_id,
-                'content': chunk.content,
-                'content_type': chunk.content_type,
-                'similarity': 0.5,  # Placeholder score for text search
-                'metadata': chunk.chunk_metadata or {}
-            }
-            
-            # Enrich with source information
-            if chunk.source_type == 'document':
-                # Check for runbook disguised as document
-                is_runbook = chunk.chunk_metadata and chunk.chunk_metadata.get('doc_type') == 'runbook'
-                
-                if is_runbook:
-                    from app.models_remediation import Runbook
-                    runbook = self.db.query(Runbook).filter(Runbook.id == chunk.source_id).first()
-                    if runbook:
-                        result['source_title'] = runbook.name
-                        result['doc_type'] = 'runbook'
-                        result['view_url'] = f"/runbooks/{runbook.id}/view"
-                else:
-                    doc = self.db.query(DesignDocument).filter(
-                        DesignDocument.id == chunk.source_id
-                    ).first()
-                    if doc:
-                        result['source_title'] = doc.title
-                        result['source_url'] = doc.source_url
-                        result['doc_type'] = doc.doc_type
-                        result['app_id'] = doc.app_id
-            
-            elif chunk.source_type == 'image':
-                img = self.db.query(DesignImage).filter(
-                    DesignImage.id == chunk.source_id
-                ).first()
-                if img:
-                    result['source_title'] = img.title
-                    result['image_type'] = img.image_type
-                    result['app_id'] = img.app_id
-                    
-            elif chunk.source_type == 'runbook':
-                from app.models_remediation import Runbook
-                runbook = self.db.query(Runbook).filter(Runbook.id == chunk.source_id).first()
-                if runbook:
-                    result['source_title'] = runbook.name
-                    result['doc_type'] = 'runbook'
-                    result['view_url'] = f"/runbooks/{runbook.id}/view"
-            
-            results.append(result)
+        try:
+            chunks = self._lexical_search(query, app_id, content_types, limit)
+        except Exception as e:
+            logger.error(f"Text search failed: {e}")
+            return []
         
-        return results
+        return self._enrich(chunks)
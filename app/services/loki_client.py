@@ -12,6 +12,8 @@ from typing import List, Dict, Optional, Any
 from pydantic import BaseModel
 import logging
 
+from app.services.http_clients import get_http_client
+
 logger = logging.getLogger(__name__)
 
 
@@ -57,6 +59,11 @@ class LokiClient:
         self.timeout = timeout
         self.base_url = self.url.rstrip("/")
 
+    @property
+    def _http(self) -> httpx.AsyncClient:
+        """Pooled HTTP client shared by all clients of this Loki server"""
+        return get_http_client("loki", self.base_url)
+
     async def query(
         self,
         logql: str,
@@ -91,8 +98,7 @@ class LokiClient:
         url = f"{self.base_url}/loki/api/v1/query"
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(url, params=params)
+            response = await self._http.get(url, params=params, timeout=self.timeout)
 
             if response.status_code >= 400:
                 raise Exception(f"Loki query failed: {response.status_code}")
@@ -175,8 +181,7 @@ class LokiClient:
         url = f"{self.base_url}/loki/api/v1/query_range"
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(url, params=params)
+            response = await self._http.get(url, params=params, timeout=self.timeout)
 
             if response.status_code >= 400:
                 raise Exception(f"Loki query_range failed: {response.status_code}")
@@ -237,8 +242,7 @@ class LokiClient:
         url = f"{self.base_url}/loki/api/v1/labels"
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(url, params=params)
+            response = await self._http.get(url, params=params, timeout=self.timeout)
 
             if response.status_code >= 400:
                 raise Exception(f"Loki get_labels failed: {response.status_code}")
@@ -289,8 +293,7 @@ class LokiClient:
         url = f"{self.base_url}/loki/api/v1/label/{label}/values"
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(url, params=params)
+            response = await self._http.get(url, params=params, timeout=self.timeout)
 
             if response.status_code >= 400:
                 raise Exception(f"Loki get_label_values failed: {response.status_code}")
@@ -320,9 +323,8 @@ class LokiClient:
         url = f"{self.base_url}/ready"
 
         try:
-            async with httpx.AsyncClient(timeout=5) as client:
-                response = await client.get(url)
-                return response.status_code == 200
+            response = await self._http.get(url, timeout=5)
+            return response.status_code == 200
         except Exception as e:
             logger.error(f"Loki connection test failed: {str(e)}")
             return False
@@ -0,0 +1,626 @@
+"""
+Online Alert Clustering
+
+Assigns each alert to a cluster as it is ingested instead of re-clustering
+the last hour from scratch every few minutes. The layers are the same as
+in AlertClusteringService, applied one alert at a time:
+
+- Exact: hash map from the (name, instance, job) key to the cluster that
+  key's alerts go to, or to the single alert waiting for a partner
+- Temporal: one sliding window per alert name; an alert within
+  ``clustering_temporal_window_minutes`` of the window joins its storm
+- Semantic: alerts matching neither are compared with recent unclustered
+  alerts and semantic cluster centroids (shared hashed TF-IDF, cosine)
+
+Assignments are final. Cluster state lives in memory and a checkpoint loop
+writes new clusters and alert links to Postgres every few seconds with a
+handful of set-based statements. State idle for longer than
+``clustering_state_horizon_minutes`` is evicted; alerts the engine never
+saw (ingested while it was down, or on another replica) are picked up by
+the batch job in repair mode once they are older than that horizon.
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from sklearn.preprocessing import normalize
+from scipy.sparse import vstack
+from sqlalchemy import select, func, and_
+
+from ..config import get_settings
+from ..database import async_session_factory
+from ..models import Alert, AlertCluster
+from ..metrics import (
+    CLUSTERS_CREATED, ALERTS_CLUSTERED, CLUSTERING_ASSIGNMENTS,
+    CLUSTERING_CHECKPOINT_DURATION, CLUSTERING_ENGINE_STATE
+)
+from . import cluster_store
+from .alert_clustering_service import (
+    SEVERITY_ORDER, exact_cluster_key, temporal_cluster_key, alert_text
+)
+from .semantic_clustering import get_semantic_vectorizer
+
+logger = logging.getLogger(__name__)
+
+# Clusters get an AI summary once they reach this many alerts
+SUMMARY_MIN_ALERTS = 3
+
+# Affected instances listed in cluster metadata
+METADATA_MAX_INSTANCES = 10
+
+
+@dataclass
+class AlertEvent:
+    """The fields of an alert the engine clusters on."""
+    id: uuid.UUID
+    alert_name: str
+    instance: str
+    job: str
+    severity: Optional[str]
+    timestamp: datetime
+    labels: Dict[str, Any] = field(default_factory=dict)
+    annotations: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "AlertEvent":
+        """Build from an ingest row (see alert_ingestion_service.build_alert_row)."""
+        return cls(
+            id=row["id"],
+            alert_name=row["alert_name"],
+            instance=row["instance"],
+            job=row["job"],
+            severity=row["severity"],
+            timestamp=row["timestamp"],
+            labels=row["labels_json"] or {},
+            annotations=row["annotations_json"] or {},
+        )
+
+    @classmethod
+    def from_alert(cls, alert: Alert) -> "AlertEvent":
+        return cls(
+            id=alert.id,
+            alert_name=alert.alert_name,
+            instance=alert.instance,
+            job=alert.job,
+            severity=alert.severity,
+            timestamp=alert.timestamp,
+            labels=alert.labels_json or {},
+            annotations=alert.annotations_json or {},
+        )
+
+    @property
+    def exact_key(self) -> str:
+        return exact_cluster_key(self.alert_name, self.instance, self.job)
+
+    @property
+    def text(self) -> str:
+        return alert_text(self.alert_name, self.instance, self.job, self.annotations)
+
+
+class ClusterState:
+    """In-memory view of one cluster plus the alerts not yet checkpointed."""
+
+    __slots__ = (
+        "cluster_key", "cluster_type", "cluster_id", "alert_count",
+        "first_seen", "last_seen", "severity", "common_labels",
+        "services", "instances", "exact_keys", "centroid",
+        "pending", "touched", "summarized",
+    )
+
+    def __init__(self, cluster_key: str, cluster_type: str, touched: float):
+        self.cluster_key = cluster_key
+        self.cluster_type = cluster_type
+        self.cluster_id: Optional[uuid.UUID] = None
+        self.alert_count = 0
+        self.first_seen: Optional[datetime] = None
+        self.last_seen: Optional[datetime] = None
+        self.severity: Optional[str] = None
+        self.common_labels: Optional[Dict[str, Any]] = None
+        self.services: Set[str] = set()
+        self.instances: Set[str] = set()
+        self.exact_keys: Set[str] = set()
+        self.centroid = None  # semantic clusters: sum of member vectors
+        self.pending: List[uuid.UUID] = []
+        self.touched = touched
+        self.summarized = False
+
+    def add(self, alert: AlertEvent, touched: float) -> None:
+        """Fold an alert into the cluster's statistics and metadata."""
+        self.alert_count += 1
+        self.pending.append(alert.id)
+        self.touched = touched
+        self.exact_keys.add(alert.exact_key)
+
+        if self.first_seen is None or alert.timestamp < self.first_seen:
+            self.first_seen = alert.timestamp
+        if self.last_seen is None or alert.timestamp > self.last_seen:
+            self.last_seen = alert.timestamp
+        if alert.severity and (
+            self.severity is None
+            or SEVERITY_ORDER.get(alert.severity, 0) > SEVERITY_ORDER.get(self.severity, 0)
+        ):
+            self.severity = alert.severity
+
+        if self.common_labels is None:
+            self.common_labels = dict(alert.labels)
+        else:
+            for key in [k for k, v in self.common_labels.items() if k not in alert.labels or alert.labels[k] != v]:
+                del self.common_labels[key]
+        if alert.job:
+            self.services.add(alert.job)
+        if alert.instance:
+            self.instances.add(alert.instance)
+
+    def metadata(self) -> Dict[str, Any]:
+        """Same shape as AlertClusteringService._extract_metadata."""
+        return {
+            'common_labels': self.common_labels or {},
+            'affected_services': list(self.services),
+            'affected_instances': list(self.instances)[:METADATA_MAX_INSTANCES],
+            'unique_instances_count': len(self.instances),
+        }
+
+
+class _Window:
+    """The current temporal window of one alert name."""
+
+    __slots__ = ("first", "last", "single", "cluster")
+
+    def __init__(
+        self,
+        first: datetime,
+        last: datetime,
+        single: Optional[AlertEvent] = None,
+        cluster: Optional[ClusterState] = None
+    ):
+        self.first = first
+        self.last = last
+        self.single = single
+        self.cluster = cluster
+
+    def covers(self, timestamp: datetime, window: timedelta) -> bool:
+        return self.first - window <= timestamp <= self.last + window
+
+    def extend(self, timestamp: datetime) -> None:
+        self.first = min(self.first, timestamp)
+        self.last = max(self.last, timestamp)
+
+
+class OnlineClusteringEngine:
+    """
+    Incremental alert clusterer with periodic checkpointing.
+
+    ``observe`` is synchronous and does no I/O, so it can be called from the
+    webhook right after the alerts are committed.
+    """
+
+    def __init__(
+        self,
+        session_factory=async_session_factory,
+        temporal_window_minutes: Optional[int] = None,
+        horizon_minutes: Optional[int] = None,
+        semantic_threshold: Optional[float] = None,
+        max_candidates: Optional[int] = None,
+        checkpoint_interval: Optional[float] = None,
+        clock=time.monotonic
+    ):
+        """
+        Initialize the engine.
+
+        Args:
+            session_factory: Async session factory used for checkpoints and warm start
+            temporal_window_minutes: Gap that still counts as the same alert storm
+            horizon_minutes: Idle time after which clusters and unpaired alerts are evicted
+            semantic_threshold: Cosine similarity needed to join on text alone
+            max_candidates: Recent alerts/centroids kept for semantic matching
+            checkpoint_interval: Seconds between checkpoints
+            clock: Monotonic clock, for tests
+        """
+        settings = get_settings()
+        self.session_factory = session_factory
+        self.temporal_window = timedelta(
+            minutes=temporal_window_minutes or settings.clustering_temporal_window_minutes
+        )
+        self.horizon = 60 * (horizon_minutes or settings.clustering_state_horizon_minutes)
+        self.semantic_threshold = semantic_threshold or settings.clustering_semantic_threshold
+        self.max_candidates = max_candidates or settings.clustering_semantic_max_candidates
+        self.checkpoint_interval = checkpoint_interval or settings.clustering_checkpoint_interval
+        self.clock = clock
+
+        self._vectorizer = get_semantic_vectorizer()
+
+        self._clusters: Dict[str, ClusterState] = {}
+        # exact key -> cluster its alerts join, or the alert waiting for a partner
+        self._exact: Dict[str, Union[ClusterState, AlertEvent]] = {}
+        self._windows: Dict[str, _Window] = {}
+        # alert id / cluster key -> (normalized vector, target), oldest first
+        self._candidates: "OrderedDict[Any, Tuple[Any, Union[ClusterState, AlertEvent]]]" = OrderedDict()
+        self._matrix = None
+        self._matrix_targets: List[Union[ClusterState, AlertEvent]] = []
+        self._singles: Dict[uuid.UUID, Tuple[AlertEvent, float]] = {}
+        self._dirty: Set[str] = set()
+        # Placements made by the current observe() call
+        self._assigned: Dict[uuid.UUID, Optional[str]] = {}
+
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+
+    # ------------------------------------------------------------------
+    # Assignment
+    # ------------------------------------------------------------------
+
+    def observe(self, alerts: Iterable[AlertEvent]) -> Dict[uuid.UUID, Optional[str]]:
+        """
+        Assign alerts to clusters.
+
+        Returns {alert id: cluster key}, with None for alerts left unclustered
+        (they wait for a partner until evicted).
+        """
+        self._assigned = {}
+        for alert in alerts:
+            self._assigned[alert.id] = None
+            if self._assign_exact(alert) or self._assign_temporal(alert):
+                continue
+            self._assign_semantic(alert, self._vectorizer.update_transform([alert.text]))
+
+        self._publish_state()
+        assigned, self._assigned = self._assigned, {}
+        return assigned
+
+    def _assign_exact(self, alert: AlertEvent) -> Optional[ClusterState]:
+        target = self._exact.get(alert.exact_key)
+        if target is None:
+            return None
+        if isinstance(target, AlertEvent):
+            target = self._start(alert.exact_key, 'exact', target)
+        self._join(target, alert)
+        CLUSTERING_ASSIGNMENTS.labels(layer='exact').inc()
+        return target
+
+    def _assign_temporal(self, alert: AlertEvent) -> Optional[ClusterState]:
+        window = self._windows.get(alert.alert_name)
+        if window is None or not window.covers(alert.timestamp, self.temporal_window):
+            return None
+        if window.cluster is None:
+            partner, window.single = window.single, None
+            window.cluster = self._start(
+                temporal_cluster_key(partner.alert_name, partner.timestamp), 'temporal', partner
+            )
+        window.extend(alert.timestamp)
+        self._join(window.cluster, alert)
+        CLUSTERING_ASSIGNMENTS.labels(layer='temporal').inc()
+        return window.cluster
+
+    def _assign_semantic(self, alert: AlertEvent, vector) -> Optional[ClusterState]:
+        target = self._nearest(vector)
+
+        if target is None:
+            # Unclustered for now: wait for a partner on every layer
+            now = self.clock()
+            self._singles[alert.id] = (alert, now)
+            self._exact[alert.exact_key] = alert
+            window = self._windows.get(alert.alert_name)
+            if window is None or not window.covers(alert.timestamp, self.temporal_window):
+                self._windows[alert.alert_name] = _Window(alert.timestamp, alert.timestamp, single=alert)
+            self._set_candidate(alert.id, vector, alert)
+            CLUSTERING_ASSIGNMENTS.labels(layer='unclustered').inc()
+            return None
+
+        if isinstance(target, AlertEvent):
+            partner_vector = self._candidates[target.id][0]
+            cluster = self._start(semantic_cluster_key(target), 'semantic', target)
+            cluster.centroid = partner_vector
+            target = cluster
+
+        self._join(target, alert)
+        target.centroid = target.centroid + vector
+        self._set_candidate(target.cluster_key, normalize(target.centroid), target)
+        CLUSTERING_ASSIGNMENTS.labels(layer='semantic').inc()
+        return target
+
+    def _nearest(self, vector) -> Optional[Union[ClusterState, AlertEvent]]:
+        """Most similar candidate at or above the threshold."""
+        if not self._candidates:
+            return None
+        if self._matrix is None:
+            self._matrix = vstack([v for v, _ in self._candidates.values()]).tocsr()
+            self._matrix_targets = [t for _, t in self._candidates.values()]
+
+        similarities = (self._matrix @ vector.T).toarray().ravel()
+        best = int(similarities.argmax())
+        if similarities[best] < self.semantic_threshold:
+            return None
+        return self._matrix_targets[best]
+
+    def _set_candidate(self, key, vector, target) -> None:
+        self._candidates.pop(key, None)
+        self._candidates[key] = (vector, target)
+        while len(self._candidates) > self.max_candidates:
+            self._candidates.popitem(last=False)
+        self._matrix = None
+
+    def _drop_candidate(self, key) -> None:
+        if self._candidates.pop(key, None) is not None:
+            self._matrix = None
+
+    def _start(self, cluster_key: str, cluster_type: str, partner: AlertEvent) -> ClusterState:
+        """Create (or revive) a cluster seeded with a waiting single alert."""
+        cluster = self._clusters.get(cluster_key)
+        if cluster is None:
+            cluster = ClusterState(cluster_key, cluster_type, self.clock())
+            self._clusters[cluster_key] = cluster
+        self._consume(partner)
+        self._join(cluster, partner)
+        return cluster
+
+    def _join(self, cluster: ClusterState, alert: AlertEvent) -> None:
+        cluster.add(alert, self.clock())
+        self._dirty.add(cluster.cluster_key)
+        if alert.id in self._assigned:
+            self._assigned[alert.id] = cluster.cluster_key
+        if not isinstance(self._exact.get(alert.exact_key), ClusterState):
+            self._exact[alert.exact_key] = cluster
+
+    def _consume(self, single: AlertEvent) -> None:
+        """Remove a waiting alert from every layer once it joins a cluster."""
+        self._singles.pop(single.id, None)
+        if self._exact.get(single.exact_key) is single:
+            del self._exact[single.exact_key]
+        window = self._windows.get(single.alert_name)
+        if window is not None and window.single is single:
+            del self._windows[single.alert_name]
+        self._drop_candidate(single.id)
+
+    # ------------------------------------------------------------------
+    # Eviction
+    # ------------------------------------------------------------------
+
+    def evict(self) -> int:
+        """Forget clusters and waiting alerts idle past the horizon; returns the count."""
+        cutoff = self.clock() - self.horizon
+        evicted = 0
+
+        for alert, seen in list(self._singles.values()):
+            if seen < cutoff:
+                self._consume(alert)
+                evicted += 1
+
+        for key, cluster in list(self._clusters.items()):
+            if cluster.touched >= cutoff or cluster.pending:
+                continue
+            del self._clusters[key]
+            for exact_key in cluster.exact_keys:
+                if self._exact.get(exact_key) is cluster:
+                    del self._exact[exact_key]
+            self._drop_candidate(key)
+            evicted += 1
+
+        for name, window in list(self._windows.items()):
+            if window.cluster is not None and window.cluster.cluster_key not in self._clusters:
+                del self._windows[name]
+
+        self._publish_state()
+        return evicted
+
+    def _publish_state(self) -> None:
+        CLUSTERING_ENGINE_STATE.labels(kind='clusters').set(len(self._clusters))
+        CLUSTERING_ENGINE_STATE.labels(kind='unclustered').set(len(self._singles))
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    async def warm_start(self) -> int:
+        """Load active clusters touched within the horizon, so restarts keep joining them."""
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.horizon)
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(AlertCluster, func.min(Alert.alert_name))
+                .join(Alert, Alert.cluster_id == AlertCluster.id)
+                .where(and_(AlertCluster.is_active == True, AlertCluster.last_seen >= cutoff))
+                .group_by(AlertCluster.id)
+            )
+            rows = result.all()
+
+        now = self.clock()
+        for row, alert_name in rows:
+            cluster = ClusterState(row.cluster_key, row.cluster_type, now)
+            cluster.cluster_id = row.id
+            cluster.alert_count = row.alert_count
+            cluster.first_seen = row.first_seen
+            cluster.last_seen = row.last_seen
+            cluster.severity = row.severity
+            cluster.summarized = bool(row.summary)
+            metadata = row.cluster_metadata or {}
+            cluster.common_labels = dict(metadata.get('common_labels') or {})
+            cluster.services = set(metadata.get('affected_services') or [])
+            cluster.instances = set(metadata.get('affected_instances') or [])
+            self._clusters[row.cluster_key] = cluster
+
+            if row.cluster_type == 'exact':
+                self._exact[row.cluster_key] = cluster
+                cluster.exact_keys.add(row.cluster_key)
+            elif row.cluster_type == 'temporal' and alert_name:
+                window = self._windows.get(alert_name)
+                if window is None or window.last < row.last_seen:
+                    self._windows[alert_name] = _Window(row.first_seen, row.last_seen, cluster=cluster)
+
+        self._publish_state()
+        logger.info(f"Online clustering warm start: {len(rows)} active cluster(s) loaded")
+        return len(rows)
+
+    async def checkpoint(self) -> int:
+        """
+        Write clusters with new alerts to the database.
+
+        One multi-row upsert for the clusters, one UPDATE ... FROM (VALUES ...)
+        linking their alerts, and one grouped recount. Returns the number of
+        alerts linked; on failure the work is kept for the next checkpoint.
+        """
+        dirty = [self._clusters[key] for key in self._dirty if key in self._clusters]
+        self._dirty.clear()
+        if not dirty:
+            return 0
+
+        taken = [(cluster, cluster.pending) for cluster in dirty]
+        for cluster in dirty:
+            cluster.pending = []
+
+        start = time.perf_counter()
+        try:
+            async with self.session_factory() as db:
+                saved = await self._upsert_clusters(db, dirty)
+                now = datetime.now(timezone.utc)
+                links = [
+                    (alert_id, saved[cluster.cluster_key][0])
+                    for cluster, alert_ids in taken
+                    for alert_id in alert_ids
+                ]
+                await self._link_alerts(db, links, now)
+                counts = await self._recount(db, [cluster_id for cluster_id, _ in saved.values()])
+                await db.commit()
+        except Exception as e:
+            logger.warning(f"Clustering checkpoint failed, will retry: {e}")
+            for cluster, alert_ids in taken:
+                cluster.pending = alert_ids + cluster.pending
+                self._dirty.add(cluster.cluster_key)
+            return 0
+        finally:
+            CLUSTERING_CHECKPOINT_DURATION.observe(time.perf_counter() - start)
+
+        summarize = []
+        for cluster, alert_ids in taken:
+            cluster_id, inserted = saved[cluster.cluster_key]
+            cluster.cluster_id = cluster_id
+            cluster.alert_count = counts.get(cluster_id, cluster.alert_count)
+            if inserted:
+                CLUSTERS_CREATED.labels(cluster_type=cluster.cluster_type).inc()
+            ALERTS_CLUSTERED.labels(cluster_type=cluster.cluster_type).inc(len(alert_ids))
+            if not cluster.summarized and cluster.alert_count >= SUMMARY_MIN_ALERTS:
+                cluster.summarized = True
+                summarize.append(cluster_id)
+
+        if summarize:
+            from .clustering_worker import schedule_summaries
+            schedule_summaries(summarize)
+
+        return len(links)
+
+    async def _upsert_clusters(self, db, clusters: List[ClusterState]) -> Dict[str, Tuple[uuid.UUID, bool]]:
+        """Insert or refresh cluster rows; returns {cluster key: (id, inserted)}."""
+        saved: Dict[str, Tuple[uuid.UUID, bool]] = {}
+        for chunk in cluster_store.chunked(clusters):
+            result = await db.execute(cluster_store.upsert_clusters([
+                cluster_store.cluster_row(
+                    cluster.cluster_key,
+                    cluster.cluster_type,
+                    cluster.alert_count,
+                    cluster.first_seen,
+                    cluster.last_seen,
+                    cluster.severity or 'info',
+                    cluster.metadata(),
+                    cluster_id=cluster.cluster_id
+                )
+                for cluster in chunk
+            ]))
+            for row in result:
+                saved[row.cluster_key] = (row.id, bool(row.inserted))
+        return saved
+
+    async def _link_alerts(self, db, links: List[Tuple[uuid.UUID, uuid.UUID]], now: datetime) -> None:
+        """Point alerts at their clusters, leaving alerts clustered elsewhere alone."""
+        for chunk in cluster_store.chunked(links):
+            await db.execute(cluster_store.link_alerts(chunk, now))
+
+    async def _recount(self, db, cluster_ids: List[uuid.UUID]) -> Dict[uuid.UUID, int]:
+        """Set alert_count from the linked alerts; exact even with several writers."""
+        counts: Dict[uuid.UUID, int] = {}
+        for chunk in cluster_store.chunked(cluster_ids):
+            result = await db.execute(cluster_store.recount_clusters(chunk))
+            counts.update({row.id: row.alert_count for row in result})
+        return counts
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def start(self) -> None:
+        """Warm start and begin checkpointing."""
+        if self._running:
+            return
+        try:
+            await self.warm_start()
+        except Exception as e:
+            logger.warning(f"Online clustering warm start failed, starting empty: {e}")
+        self._running = True
+        self._task = asyncio.create_task(self._checkpoint_loop())
+
+    async def stop(self) -> None:
+        """Stop the loop and write what is left."""
+        self._running = False
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.checkpoint()
+
+    async def _checkpoint_loop(self) -> None:
+        while self._running:
+            await asyncio.sleep(self.checkpoint_interval)
+            try:
+                await self.checkpoint()
+                self.evict()
+            except Exception as e:
+                logger.exception(f"Error in clustering checkpoint loop: {e}")
+
+
+def semantic_cluster_key(first_alert: AlertEvent) -> str:
+    """Cluster key for a semantic cluster, unique per seeding alert."""
+    key_string = '|'.join(['semantic', first_alert.alert_name or '', str(first_alert.id)])
+    return hashlib.md5(key_string.encode()).hexdigest()
+
+
+# Global engine instance
+_engine: Optional[OnlineClusteringEngine] = None
+
+
+def get_clustering_engine() -> Optional[OnlineClusteringEngine]:
+    """The running engine, or None when online clustering is off."""
+    return _engine
+
+
+def observe_alerts(rows: Iterable[Dict[str, Any]]) -> None:
+    """Hand freshly stored firing alerts to the engine, if it is running."""
+    if _engine is None:
+        return
+    try:
+        _engine.observe(AlertEvent.from_row(row) for row in rows if row.get("status") == "firing")
+    except Exception as e:
+        # Never fail ingestion; the repair job clusters whatever is missed
+        logger.exception(f"Online clustering failed: {e}")
+
+
+async def start_clustering_engine() -> None:
+    """Start the global online clustering engine."""
+    global _engine
+    if _engine is None:
+        _engine = OnlineClusteringEngine()
+        await _engine.start()
+
+
+async def stop_clustering_engine() -> None:
+    """Stop the global engine after a final checkpoint."""
+    global _engine
+    if _engine is not None:
+        engine, _engine = _engine, None
+        await engine.stop()
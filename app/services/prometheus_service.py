@@ -7,14 +7,55 @@ and infrastructure health information.
 This enables the AIOps platform to fetch real-time and historical metrics
 directly from Prometheus without requiring users to switch to Grafana.
 """
+import asyncio
 import httpx
-from typing import List, Dict, Any, Optional
+import time
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
 import logging
 from app.config import get_settings
+from app.services.http_clients import get_http_client
 
 logger = logging.getLogger(__name__)
 
+INFRASTRUCTURE_METRICS = ("cpu", "memory", "disk")
+
+# Instance health per Prometheus base URL: (expires_at, instances)
+_health_cache: Dict[str, Tuple[float, List[Dict[str, Any]]]] = {}
+
+
+def _selector(*matchers: str) -> str:
+    """Label selector for the given matchers ("" when there are none)"""
+    return "{" + ",".join(matchers) + "}" if matchers else ""
+
+
+def infrastructure_queries(instance: Optional[str] = None) -> Dict[str, str]:
+    """
+    PromQL for CPU, memory and root disk usage in percent
+
+    Every query returns one series per instance label, so without an
+    instance the same queries cover the whole fleet in one vector each.
+
+    Args:
+        instance: Restrict to one instance (default: all instances)
+
+    Returns:
+        Dict mapping metric (cpu, memory, disk) -> PromQL
+    """
+    scope = []
+    if instance:
+        escaped = instance.replace("\\", "\\\\").replace('"', '\\"')
+        scope.append(f'instance="{escaped}"')
+    idle = _selector('mode="idle"', *scope)
+    node = _selector(*scope)
+    root = _selector(*scope, 'mountpoint="/"')
+
+    return {
+        "cpu": f'100 - (avg by (instance) (rate(node_cpu_seconds_total{idle}[5m])) * 100)',
+        "memory": f'max by (instance) ((1 - (node_memory_MemAvailable_bytes{node} / node_memory_MemTotal_bytes{node})) * 100)',
+        "disk": f'max by (instance) ((1 - (node_filesystem_avail_bytes{root} / node_filesystem_size_bytes{root})) * 100)',
+    }
+
 
 class PrometheusClient:
     """Client for querying Prometheus API"""
@@ -30,12 +71,15 @@ class PrometheusClient:
         settings = get_settings()
         self.base_url = (base_url or settings.prometheus_url).rstrip('/')
         self.timeout = timeout
-        self.client = httpx.AsyncClient(timeout=timeout)
         logger.info(f"Initialized PrometheusClient with base_url: {self.base_url}")
 
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Pooled HTTP client shared by all clients of this Prometheus server"""
+        return get_http_client("prometheus", self.base_url)
+
     async def close(self):
-        """Close HTTP client"""
-        await self.client.aclose()
+        """Release the client (the pooled connections stay open for reuse)"""
 
     async def __aenter__(self):
         return self
@@ -68,7 +112,7 @@ class PrometheusClient:
             params["time"] = time.timestamp()
 
         try:
-            response = await self.client.get(url, params=params)
+            response = await self.client.get(url, params=params, timeout=self.timeout)
             response.raise_for_status()
             data = response.json()
 
@@ -120,7 +164,7 @@ class PrometheusClient:
         }
 
         try:
-            response = await self.client.get(url, params=params)
+            response = await self.client.get(url, params=params, timeout=self.timeout)
             response.raise_for_status()
             data = response.json()
 
@@ -153,7 +197,7 @@ class PrometheusClient:
         url = f"{self.base_url}/api/v1/targets"
 
         try:
-            response = await self.client.get(url)
+            response = await self.client.get(url, timeout=self.timeout)
             response.raise_for_status()
             data = response.json()
 
@@ -178,7 +222,7 @@ class PrometheusClient:
         url = f"{self.base_url}/api/v1/label/{label}/values"
 
         try:
-            response = await self.client.get(url)
+            response = await self.client.get(url, timeout=self.timeout)
             response.raise_for_status()
             data = response.json()
 
@@ -255,61 +299,116 @@ class PrometheusClient:
         Returns:
             Dict with cpu_percent, memory_percent, disk_percent
         """
-        queries = {
-            "cpu": f'''100 - (avg by (instance) (rate(node_cpu_seconds_total{{mode="idle",instance="{instance}"}}[5m])) * 100)''',
-            "memory": f'''(1 - (node_memory_MemAvailable_bytes{{instance="{instance}"}} / node_memory_MemTotal_bytes{{instance="{instance}"}})) * 100''',
-            "disk": f'''(1 - (node_filesystem_avail_bytes{{instance="{instance}",mountpoint="/"}} / node_filesystem_size_bytes{{instance="{instance}",mountpoint="/"}})) * 100'''
-        }
-
-        results = {}
-        for metric, query in queries.items():
-            try:
-                data = await self.query(query)
-                results[f"{metric}_percent"] = self._parse_single_value(data)
-            except Exception as e:
-                logger.warning(f"Failed to get {metric} for {instance}: {e}")
-                results[f"{metric}_percent"] = None
-
-        return results
+        queries = infrastructure_queries(instance)
+        values = await asyncio.gather(*(
+            self._query_instance_metric(metric, queries[metric], instance)
+            for metric in INFRASTRUCTURE_METRICS
+        ))
+        return {f"{metric}_percent": value for metric, value in zip(INFRASTRUCTURE_METRICS, values)}
 
     async def get_all_instances_health(self) -> List[Dict[str, Any]]:
         """
         Get health metrics for all monitored instances
 
+        The targets and one fleet-wide query per metric run concurrently,
+        and the vectors are joined by instance, so the cost does not grow
+        with the number of instances. A metric whose fleet-wide query fails
+        falls back to per-instance queries, at most
+        prometheus_health_concurrency at a time. Results are cached for
+        prometheus_health_cache_ttl seconds.
+
         Returns:
             List of instance health data
         """
-        try:
-            targets_data = await self.get_targets()
-            active_targets = targets_data.get("activeTargets", [])
+        settings = get_settings()
+        cached = _health_cache.get(self.base_url)
+        if cached and cached[0] > time.monotonic():
+            return [dict(instance) for instance in cached[1]]
 
-            instances = []
-            seen_instances = set()
+        try:
+            queries = infrastructure_queries()
+            targets_data, *vectors = await asyncio.gather(
+                self.get_targets(),
+                *(self._query_by_instance(queries[metric]) for metric in INFRASTRUCTURE_METRICS),
+                return_exceptions=True
+            )
+            if isinstance(targets_data, Exception):
+                raise targets_data
 
-            for target in active_targets:
+            targets = {}
+            for target in targets_data.get("activeTargets", []):
                 instance = target["labels"].get("instance")
-                if not instance or instance in seen_instances:
-                    continue
+                if instance and instance not in targets:
+                    targets[instance] = target
 
-                seen_instances.add(instance)
-
-                # Get metrics for this instance
-                metrics = await self.get_infrastructure_metrics(instance)
+            semaphore = asyncio.Semaphore(settings.prometheus_health_concurrency)
+            for i, metric in enumerate(INFRASTRUCTURE_METRICS):
+                if isinstance(vectors[i], Exception):
+                    logger.warning(f"Fleet-wide {metric} query failed, querying per instance: {vectors[i]}")
+                    vectors[i] = await self._fan_out(metric, list(targets), semaphore)
 
+            instances = []
+            for instance, target in targets.items():
                 instances.append({
                     "instance": instance,
                     "job": target["labels"].get("job", "unknown"),
                     "status": target.get("health", "unknown"),
                     "last_scrape": target.get("lastScrape"),
                     "scrape_duration": target.get("lastScrapeDuration"),
-                    **metrics
+                    **{
+                        f"{metric}_percent": vector.get(instance)
+                        for metric, vector in zip(INFRASTRUCTURE_METRICS, vectors)
+                    }
                 })
 
+            if settings.prometheus_health_cache_ttl > 0:
+                _health_cache[self.base_url] = (
+                    time.monotonic() + settings.prometheus_health_cache_ttl,
+                    [dict(instance) for instance in instances]
+                )
             return instances
         except Exception as e:
             logger.error(f"Failed to get instance health: {e}")
             return []
 
+    async def _query_by_instance(self, promql: str) -> Dict[str, Optional[float]]:
+        """
+        Execute an instant query and key the samples by instance label
+
+        Raises:
+            PrometheusError: If the query fails
+        """
+        data = await self.query(promql)
+        values = {}
+        for sample in data.get("result", []):
+            instance = sample.get("metric", {}).get("instance")
+            if instance:
+                values[instance] = self._parse_sample_value(sample)
+        return values
+
+    async def _query_instance_metric(self, metric: str, promql: str, instance: str) -> Optional[float]:
+        """Execute one per-instance query, returning None on failure"""
+        try:
+            return self._parse_single_value(await self.query(promql))
+        except Exception as e:
+            logger.warning(f"Failed to get {metric} for {instance}: {e}")
+            return None
+
+    async def _fan_out(
+        self,
+        metric: str,
+        instances: List[str],
+        semaphore: asyncio.Semaphore
+    ) -> Dict[str, Optional[float]]:
+        """Query one metric per instance with bounded concurrency"""
+        async def query_instance(instance: str) -> Optional[float]:
+            async with semaphore:
+                promql = infrastructure_queries(instance)[metric]
+                return await self._query_instance_metric(metric, promql, instance)
+
+        values = await asyncio.gather(*(query_instance(instance) for instance in instances))
+        return dict(zip(instances, values))
+
     # =========================================================================
     # Alert Context Enrichment
     # =========================================================================
@@ -432,13 +531,29 @@ class PrometheusClient:
                 return None
 
             # Get first result's value
-            value = results[0].get("value", [None, None])
+            return self._parse_sample_value(results[0])
+        except (IndexError, AttributeError) as e:
+            logger.debug(f"Failed to parse single value: {e}")
+            return None
+
+    def _parse_sample_value(self, sample: Dict[str, Any]) -> Optional[float]:
+        """
+        Extract the numeric value of one instant vector sample
+
+        Args:
+            sample: Item of an instant query result
+
+        Returns:
+            Value rounded to 2 decimals, or None
+        """
+        try:
+            value = sample.get("value", [None, None])
             if len(value) >= 2:
                 return round(float(value[1]), 2)
 
             return None
-        except (IndexError, ValueError, TypeError) as e:
-            logger.debug(f"Failed to parse single value: {e}")
+        except (ValueError, TypeError) as e:
+            logger.debug(f"Failed to parse sample value: {e}")
             return None
 
     def _format_time_series(self, range_result: Dict[str, Any]) -> List[Dict]:
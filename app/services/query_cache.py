@@ -1,94 +1,162 @@
 """
 Query Result Cache
 
-Simple in-memory cache for observability query results.
+In-memory cache for observability query results.
 Reduces load on backends by caching recent query results.
+
+- LRU order is kept in an OrderedDict, so lookups, inserts and evictions
+  are O(1); expired entries are swept from an expiry heap on insert
+- The cache is bounded by entry count and by the encoded size of results
+- Concurrent identical queries that miss share a single backend call
+- Relative ranges ("last 1h") are keyed by wall-clock bucket, so repeated
+  queries within a bucket hit and the key rolls over as the window moves
+- An optional shared backend (Redis) lets replicas reuse each other's
+  results; values read from it come back JSON-decoded
+
+Hits, misses and evictions are exported through ``app/metrics.py``.
 """
 
-from typing import Dict, Optional, Any
-from datetime import datetime, timedelta
-from pydantic import BaseModel
+import asyncio
 import hashlib
+import heapq
 import json
 import logging
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.config import get_settings
+from app.metrics import QUERY_CACHE_REQUESTS, QUERY_CACHE_EVICTIONS, QUERY_CACHE_ENTRIES, QUERY_CACHE_BYTES
+
+try:
+    import redis.asyncio as redis_asyncio
+except ImportError:
+    redis_asyncio = None
 
 logger = logging.getLogger(__name__)
 
+_MISSING = object()
+
+_RANGE_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
 
-class CacheEntry(BaseModel):
+# Relative ranges are bucketed to this fraction of their length (1h -> 1m)
+_BUCKETS_PER_RANGE = 60
+
+
+@dataclass
+class CacheEntry:
     """A cached query result"""
     key: str
     result: Any
-    created_at: datetime
-    expires_at: datetime
+    size: int
+    created_at: float
+    expires_at: float
     hit_count: int = 0
 
 
+class RedisCacheBackend:
+    """Shared cache tier in Redis, so replicas reuse each other's results."""
+
+    def __init__(self, url: str, prefix: str = "aiops:query_cache:"):
+        """
+        Initialize the backend.
+
+        Args:
+            url: Redis URL (redis://host:6379/0)
+            prefix: Key prefix for cache entries
+        """
+        if redis_asyncio is None:
+            raise RuntimeError("The redis package is required for a shared query cache")
+        self.prefix = prefix
+        self._redis = redis_asyncio.from_url(url)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._redis.get(self.prefix + key)
+
+    async def set(self, key: str, value: bytes, ttl_seconds: float):
+        await self._redis.set(self.prefix + key, value, px=max(int(ttl_seconds * 1000), 1))
+
+
 class QueryCache:
     """
-    In-memory cache for observability query results.
+    In-memory LRU/TTL cache for observability query results.
 
     Features:
     - TTL-based expiration
-    - LRU-style eviction when cache is full
+    - LRU eviction by entry count and total result size
+    - Single-flight loading of concurrent identical queries
+    - Time-bucketed keys for relative time ranges
+    - Optional shared backend
     - Cache hit/miss tracking
     """
 
-    def __init__(self, max_size: int = 1000, default_ttl_seconds: int = 300):
+    def __init__(
+        self,
+        max_size: int = 1000,
+        default_ttl_seconds: int = 300,
+        max_bytes: int = 64 * 1024 * 1024,
+        bucket_seconds: int = 30,
+        backend: Optional[RedisCacheBackend] = None
+    ):
         """
         Initialize query cache.
 
         Args:
             max_size: Maximum number of entries to cache
             default_ttl_seconds: Default TTL in seconds (5 minutes)
+            max_bytes: Maximum total size of cached results (JSON-encoded)
+            bucket_seconds: Shortest time bucket for relative time ranges
+            backend: Optional shared cache tier
         """
         self.max_size = max_size
+        self.max_bytes = max_bytes
         self.default_ttl = timedelta(seconds=default_ttl_seconds)
-        self._cache: Dict[str, CacheEntry] = {}
+        self.bucket_seconds = bucket_seconds
+        self.backend = backend
+        self._cache: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._expiry: List[Tuple[float, str]] = []
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._bytes = 0
         self._hits = 0
         self._misses = 0
+        self._coalesced = 0
+        self._evictions = 0
 
-    def get(self, query: str, app_context: Optional[Dict[str, Any]] = None) -> Optional[Any]:
+    def get(
+        self,
+        query: str,
+        app_context: Optional[Dict[str, Any]] = None,
+        time_range: Optional[str] = None
+    ) -> Optional[Any]:
         """
         Get cached result for a query.
 
         Args:
             query: Natural language query
             app_context: Optional application context
+            time_range: Relative time range of the query (e.g. "1h")
 
         Returns:
             Cached result or None if not found/expired
         """
-        key = self._generate_key(query, app_context)
-
-        # Check if key exists
-        if key not in self._cache:
-            self._misses += 1
+        key, _ = self._key(query, app_context, time_range)
+        result = self._lookup(key)
+        if result is _MISSING:
+            self._record_miss()
             logger.debug(f"Cache miss for query: {query}")
             return None
-
-        entry = self._cache[key]
-
-        # Check if expired
-        if datetime.now() > entry.expires_at:
-            del self._cache[key]
-            self._misses += 1
-            logger.debug(f"Cache expired for query: {query}")
-            return None
-
-        # Cache hit
-        entry.hit_count += 1
-        self._hits += 1
-        logger.debug(f"Cache hit for query: {query} (hits: {entry.hit_count})")
-
-        return entry.result
+        return result
 
     def set(
         self,
         query: str,
         result: Any,
         app_context: Optional[Dict[str, Any]] = None,
-        ttl: Optional[timedelta] = None
+        ttl: Optional[timedelta] = None,
+        time_range: Optional[str] = None
     ):
         """
         Cache a query result.
@@ -98,45 +166,103 @@ class QueryCache:
             result: Query result to cache
             app_context: Optional application context
             ttl: Optional TTL override
+            time_range: Relative time range of the query (e.g. "1h")
         """
-        key = self._generate_key(query, app_context)
+        key, bucket_left = self._key(query, app_context, time_range)
+        self._store(key, result, self._ttl_seconds(ttl, bucket_left), _encode(result))
+        logger.debug(f"Cached result for query: {query}")
 
-        # Evict oldest entry if cache is full
-        if len(self._cache) >= self.max_size:
-            self._evict_lru()
+    async def get_or_load(
+        self,
+        query: str,
+        loader: Callable[[], Awaitable[Any]],
+        app_context: Optional[Dict[str, Any]] = None,
+        ttl: Optional[timedelta] = None,
+        time_range: Optional[str] = None
+    ) -> Any:
+        """
+        Get a cached result, or load and cache it.
 
-        # Create cache entry
-        ttl = ttl or self.default_ttl
-        entry = CacheEntry(
-            key=key,
-            result=result,
-            created_at=datetime.now(),
-            expires_at=datetime.now() + ttl
-        )
+        Concurrent calls for the same key while a load is running wait for
+        that load instead of starting their own. Errors are not cached;
+        they propagate to every waiting caller.
 
-        self._cache[key] = entry
-        logger.debug(f"Cached result for query: {query} (TTL: {ttl.total_seconds()}s)")
+        Args:
+            query: Natural language query
+            loader: Coroutine function producing the result on a miss
+            app_context: Optional application context
+            ttl: Optional TTL override
+            time_range: Relative time range of the query (e.g. "1h")
 
-    def invalidate(self, query: str, app_context: Optional[Dict[str, Any]] = None):
+        Returns:
+            Cached or freshly loaded result
+        """
+        key, bucket_left = self._key(query, app_context, time_range)
+        result = self._lookup(key)
+        if result is not _MISSING:
+            return result
+
+        pending = self._pending.get(key)
+        if pending is not None:
+            self._coalesced += 1
+            QUERY_CACHE_REQUESTS.labels(result='coalesced').inc()
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            ttl_seconds = self._ttl_seconds(ttl, bucket_left)
+            result = await self._load_shared(key, ttl_seconds)
+            if result is _MISSING:
+                self._record_miss()
+                result = await loader()
+                encoded = _encode(result)
+                self._store(key, result, ttl_seconds, encoded)
+                await self._store_shared(key, encoded, ttl_seconds)
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved: there may be no other waiter
+            future.exception()
+            raise
+        finally:
+            del self._pending[key]
+
+    def invalidate(
+        self,
+        query: str,
+        app_context: Optional[Dict[str, Any]] = None,
+        time_range: Optional[str] = None
+    ):
         """
         Invalidate a cached query.
 
         Args:
             query: Natural language query
             app_context: Optional application context
+            time_range: Relative time range of the query (e.g. "1h")
         """
-        key = self._generate_key(query, app_context)
+        key, _ = self._key(query, app_context, time_range)
 
         if key in self._cache:
-            del self._cache[key]
+            self._remove(key)
             logger.debug(f"Invalidated cache for query: {query}")
 
     def clear(self):
-        """Clear all cached entries."""
+        """Clear all locally cached entries (shared entries expire by TTL)."""
         count = len(self._cache)
         self._cache.clear()
+        self._expiry.clear()
+        self._bytes = 0
         self._hits = 0
         self._misses = 0
+        self._coalesced = 0
+        self._evictions = 0
+        self._update_gauges()
         logger.info(f"Cleared cache ({count} entries)")
 
     def get_stats(self) -> Dict[str, Any]:
@@ -146,46 +272,186 @@ class QueryCache:
         Returns:
             Dictionary with cache stats
         """
-        total_requests = self._hits + self._misses
-        hit_rate = (self._hits / total_requests * 100) if total_requests > 0 else 0
+        self._sweep()
+        total_requests = self._hits + self._misses + self._coalesced
+        hit_rate = ((self._hits + self._coalesced) / total_requests * 100) if total_requests > 0 else 0
 
         return {
             "size": len(self._cache),
             "max_size": self.max_size,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
             "hits": self._hits,
             "misses": self._misses,
+            "coalesced": self._coalesced,
+            "evictions": self._evictions,
             "hit_rate_pct": round(hit_rate, 2),
-            "total_requests": total_requests
+            "total_requests": total_requests,
+            "shared_backend": self.backend is not None
         }
 
-    def _generate_key(self, query: str, app_context: Optional[Dict[str, Any]] = None) -> str:
-        """Generate cache key from query and context."""
-        # Normalize query (lowercase, strip whitespace)
-        normalized_query = query.lower().strip()
+    def _key(
+        self,
+        query: str,
+        app_context: Optional[Dict[str, Any]],
+        time_range: Optional[str]
+    ) -> Tuple[str, Optional[float]]:
+        """Cache key and seconds until its time bucket rolls over."""
+        bucket, bucket_left = self._time_bucket(time_range)
+        return self._generate_key(query, app_context, bucket), bucket_left
+
+    def _generate_key(
+        self,
+        query: str,
+        app_context: Optional[Dict[str, Any]] = None,
+        bucket: str = ""
+    ) -> str:
+        """Generate cache key from query, context and time bucket."""
+        # Normalize query (lowercase, collapse whitespace)
+        normalized_query = " ".join(query.lower().split())
 
         # Include app context in key if provided
         context_str = ""
         if app_context:
             # Sort keys for consistent hashing
-            context_str = json.dumps(app_context, sort_keys=True)
+            context_str = json.dumps(app_context, sort_keys=True, default=str)
 
         # Create hash
-        combined = f"{normalized_query}:{context_str}"
+        combined = f"{normalized_query}:{context_str}:{bucket}"
         return hashlib.sha256(combined.encode()).hexdigest()
 
-    def _evict_lru(self):
-        """Evict least recently used entry."""
-        if not self._cache:
+    def _time_bucket(self, time_range: Optional[str]) -> Tuple[str, Optional[float]]:
+        """
+        Wall-clock bucket for a relative time range.
+
+        A range is bucketed to 1/60 of its length, but no finer than
+        bucket_seconds, so "last 1h" results are reused for a minute.
+        Buckets are aligned to the epoch, so replicas agree on them.
+        """
+        if not time_range:
+            return "", None
+
+        match = re.fullmatch(r"(\d+)([smhdw])", time_range.strip().lower())
+        if not match:
+            return time_range, None
+
+        range_seconds = int(match.group(1)) * _RANGE_UNITS[match.group(2)]
+        width = max(self.bucket_seconds, range_seconds // _BUCKETS_PER_RANGE)
+        now = time.time()
+        index = int(now // width)
+        return f"{time_range}@{index * width}", (index + 1) * width - now
+
+    def _ttl_seconds(self, ttl: Optional[timedelta], bucket_left: Optional[float]) -> float:
+        """TTL, capped where the key's time bucket ends (it is unreachable after)."""
+        ttl_seconds = (ttl or self.default_ttl).total_seconds()
+        if bucket_left is not None:
+            ttl_seconds = min(ttl_seconds, bucket_left)
+        return ttl_seconds
+
+    def _lookup(self, key: str) -> Any:
+        """Return a live local entry's result (refreshing its LRU position) or _MISSING."""
+        entry = self._cache.get(key)
+        if entry is None:
+            return _MISSING
+
+        if time.monotonic() >= entry.expires_at:
+            self._remove(key, reason='expired')
+            return _MISSING
+
+        self._cache.move_to_end(key)
+        entry.hit_count += 1
+        self._hits += 1
+        QUERY_CACHE_REQUESTS.labels(result='hit').inc()
+        return entry.result
+
+    def _record_miss(self):
+        self._misses += 1
+        QUERY_CACHE_REQUESTS.labels(result='miss').inc()
+
+    def _store(self, key: str, result: Any, ttl_seconds: float, encoded: bytes):
+        """Insert an entry, evicting expired and least recently used ones to fit."""
+        size = len(encoded)
+        if ttl_seconds <= 0 or size > self.max_bytes:
             return
 
-        # Find entry with lowest hit count and oldest created_at
-        lru_key = min(
-            self._cache.keys(),
-            key=lambda k: (self._cache[k].hit_count, self._cache[k].created_at)
-        )
+        if key in self._cache:
+            self._remove(key)
+        self._sweep()
 
-        logger.debug(f"Evicting LRU entry: {lru_key}")
-        del self._cache[lru_key]
+        while self._cache and len(self._cache) >= self.max_size:
+            self._remove(next(iter(self._cache)), reason='lru')
+        while self._cache and self._bytes + size > self.max_bytes:
+            self._remove(next(iter(self._cache)), reason='size')
+
+        now = time.monotonic()
+        entry = CacheEntry(key=key, result=result, size=size, created_at=now, expires_at=now + ttl_seconds)
+        self._cache[key] = entry
+        self._bytes += size
+        heapq.heappush(self._expiry, (entry.expires_at, key))
+        self._update_gauges()
+
+    def _remove(self, key: str, reason: Optional[str] = None):
+        entry = self._cache.pop(key)
+        self._bytes -= entry.size
+        if reason:
+            self._evictions += 1
+            QUERY_CACHE_EVICTIONS.labels(reason=reason).inc()
+            logger.debug(f"Evicted cache entry {key} ({reason})")
+        self._update_gauges()
+
+    def _sweep(self):
+        """Drop expired entries in expiry order."""
+        now = time.monotonic()
+        while self._expiry and self._expiry[0][0] <= now:
+            expires_at, key = heapq.heappop(self._expiry)
+            entry = self._cache.get(key)
+            # The heap keeps stale items for replaced or evicted entries
+            if entry is not None and entry.expires_at == expires_at:
+                self._remove(key, reason='expired')
+
+        if len(self._expiry) > 2 * len(self._cache) + 64:
+            self._expiry = [(entry.expires_at, key) for key, entry in self._cache.items()]
+            heapq.heapify(self._expiry)
+
+    def _update_gauges(self):
+        QUERY_CACHE_ENTRIES.set(len(self._cache))
+        QUERY_CACHE_BYTES.set(self._bytes)
+
+    async def _load_shared(self, key: str, ttl_seconds: float) -> Any:
+        """Read an entry from the shared backend into the local tier."""
+        if self.backend is None:
+            return _MISSING
+
+        try:
+            encoded = await self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"Shared query cache read failed: {e}")
+            return _MISSING
+
+        if encoded is None:
+            return _MISSING
+
+        result = json.loads(encoded)
+        self._store(key, result, ttl_seconds, encoded)
+        self._hits += 1
+        QUERY_CACHE_REQUESTS.labels(result='shared_hit').inc()
+        return result
+
+    async def _store_shared(self, key: str, encoded: bytes, ttl_seconds: float):
+        if self.backend is None or ttl_seconds <= 0:
+            return
+
+        try:
+            await self.backend.set(key, encoded, ttl_seconds)
+        except Exception as e:
+            logger.warning(f"Shared query cache write failed: {e}")
+
+
+def _encode(result: Any) -> bytes:
+    """JSON encoding of a result; its length is the entry's size."""
+    if hasattr(result, "model_dump_json"):
+        return result.model_dump_json().encode()
+    return json.dumps(result, default=str).encode()
 
 
 # Global cache instance
@@ -201,5 +467,18 @@ def get_query_cache() -> QueryCache:
     """
     global _query_cache
     if _query_cache is None:
-        _query_cache = QueryCache()
+        settings = get_settings()
+        backend = None
+        if settings.query_cache_redis_url:
+            if redis_asyncio is None:
+                logger.warning("query_cache_redis_url is set but the redis package is not installed")
+            else:
+                backend = RedisCacheBackend(settings.query_cache_redis_url)
+        _query_cache = QueryCache(
+            max_size=settings.query_cache_max_entries,
+            default_ttl_seconds=settings.query_cache_ttl,
+            max_bytes=settings.query_cache_max_bytes,
+            bucket_seconds=settings.query_cache_bucket_seconds,
+            backend=backend
+        )
     return _query_cache
@@ -0,0 +1,274 @@
+"""
+Range Query Cache
+
+Incremental cache for Prometheus range queries behind dashboard panels,
+in the style of the Cortex/Thanos query frontends.
+
+A panel showing the last 24h and refreshing every 30s asks for almost
+the same samples each time. Requests are aligned to their step, so the
+sample timestamps of consecutive refreshes coincide, and the cache keeps
+the samples per series. A refresh only queries Prometheus for the tail
+after the cached range and splices it in; samples that scrolled out of
+the window are dropped.
+
+- Samples newer than ``freshness`` seconds are returned but not cached,
+  since late scrapes and rule evaluations can still change them
+- Each series is stored as an ``array('d')`` of values at the step grid
+  plus a ``bytearray`` marking which steps have a sample (gaps are
+  legitimate in range results), about 9 bytes per point
+- Entries are evicted least recently used first when the estimated size
+  of all entries exceeds the memory budget
+
+Only successful ``matrix`` results are cached; anything else is passed
+through untouched.
+"""
+
+import logging
+import math
+import re
+import time
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from app.config import get_settings
+from app.metrics import PANEL_CACHE_REQUESTS, PANEL_CACHE_EVICTIONS, PANEL_CACHE_BYTES
+
+logger = logging.getLogger(__name__)
+
+_STEP_UNITS = {"": 1, "ms": 0.001, "s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+# Rough per-object overheads for the memory estimate
+_ENTRY_OVERHEAD = 256
+_SERIES_OVERHEAD = 128
+_LABEL_OVERHEAD = 100
+
+SeriesKey = Tuple[Tuple[str, str], ...]
+Fetch = Callable[[float, float], Awaitable[Dict[str, Any]]]
+
+
+def parse_step_seconds(step: str) -> Optional[float]:
+    """
+    Convert a Prometheus step ("15s", "1m", "30") to seconds.
+
+    Returns:
+        Step in seconds, or None if it cannot be parsed
+    """
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)(ms|[smhdw]?)", step.strip())
+    if not match:
+        return None
+    seconds = float(match.group(1)) * _STEP_UNITS[match.group(2)]
+    return seconds if seconds > 0 else None
+
+
+@dataclass
+class CachedSeries:
+    """Samples of one series on the step grid of its entry"""
+    metric: Dict[str, str]
+    values: array = field(default_factory=lambda: array('d'))
+    present: bytearray = field(default_factory=bytearray)
+
+    def size(self) -> int:
+        labels = sum(len(k) + len(v) + _LABEL_OVERHEAD for k, v in self.metric.items())
+        return _SERIES_OVERHEAD + labels + len(self.values) * self.values.itemsize + len(self.present)
+
+
+@dataclass
+class CachedRange:
+    """Cached samples for one query and step, covering [start, end]"""
+    start: float
+    end: float
+    step: float
+    series: Dict[SeriesKey, CachedSeries]
+    size: int = 0
+
+
+class RangeQueryCache:
+    """Step-aligned, incrementally extended cache of range query results."""
+
+    def __init__(self, max_bytes: int = 128 * 1024 * 1024, freshness: float = 60.0):
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes: Memory budget for all entries (estimated)
+            freshness: Samples newer than this many seconds are not cached
+        """
+        self.max_bytes = max_bytes
+        self.freshness = freshness
+        self._entries: "OrderedDict[Hashable, CachedRange]" = OrderedDict()
+        self._bytes = 0
+
+    async def query_range(
+        self,
+        key: Hashable,
+        fetch: Fetch,
+        start: float,
+        end: float,
+        step: float
+    ) -> Tuple[Dict[str, Any], float, float]:
+        """
+        Run a range query, reusing cached samples.
+
+        Args:
+            key: Identity of the query (datasource, PromQL, ...), without the range
+            fetch: Coroutine function running the range query for (start, end)
+                as Unix timestamps and returning the Prometheus JSON response
+            start: Range start (Unix timestamp)
+            end: Range end (Unix timestamp)
+            step: Step in seconds
+
+        Returns:
+            (response, aligned_start, aligned_end); the response is in
+            Prometheus API format
+        """
+        start = math.floor(start / step) * step
+        end = math.floor(end / step) * step
+        cacheable_end = min(end, math.floor((time.time() - self.freshness) / step) * step)
+
+        entry = self._entries.get(key)
+        if entry is not None and (entry.step != step or not entry.start <= start <= entry.end + step):
+            entry = None
+
+        fetch_start = start if entry is None else max(entry.end + step, start)
+        fresh: List[Dict[str, Any]] = []
+        if fetch_start <= end:
+            response = await fetch(fetch_start, end)
+            data = response.get("data") or {}
+            if response.get("status") != "success" or data.get("resultType") != "matrix":
+                return response, start, end
+            fresh = data.get("result", [])
+
+        if entry is None:
+            PANEL_CACHE_REQUESTS.labels(result='miss').inc()
+        elif fetch_start <= end:
+            PANEL_CACHE_REQUESTS.labels(result='partial').inc()
+        else:
+            PANEL_CACHE_REQUESTS.labels(result='hit').inc()
+
+        series = self._splice(entry, fresh, start, end, step)
+        if cacheable_end >= start:
+            self._store(key, series, start, cacheable_end, step)
+
+        result = []
+        for cached in series.values():
+            values = [
+                [_format_timestamp(start + i * step), _format_value(value)]
+                for i, (value, present) in enumerate(zip(cached.values, cached.present))
+                if present
+            ]
+            if values:
+                result.append({"metric": cached.metric, "values": values})
+
+        response = {"status": "success", "data": {"resultType": "matrix", "result": result}}
+        return response, start, end
+
+    def clear(self):
+        """Drop all cached ranges."""
+        self._entries.clear()
+        self._bytes = 0
+        PANEL_CACHE_BYTES.set(0)
+
+    def _splice(
+        self,
+        entry: Optional[CachedRange],
+        fresh: List[Dict[str, Any]],
+        start: float,
+        end: float,
+        step: float
+    ) -> Dict[SeriesKey, CachedSeries]:
+        """Samples of [start, end] on the step grid from the cached entry and the fetched tail."""
+        points = int(round((end - start) / step)) + 1
+        series: Dict[SeriesKey, CachedSeries] = {}
+
+        if entry is not None:
+            offset = int(round((start - entry.start) / step))
+            for series_key, cached in entry.series.items():
+                values = cached.values[offset:offset + points]
+                present = cached.present[offset:offset + points]
+                series[series_key] = CachedSeries(cached.metric, values, present)
+
+        for item in fresh:
+            metric = item.get("metric", {})
+            series_key = tuple(sorted(metric.items()))
+            cached = series.get(series_key)
+            if cached is None:
+                cached = series[series_key] = CachedSeries(metric)
+
+            for timestamp, value in item.get("values", []):
+                i = int(round((float(timestamp) - start) / step))
+                if not 0 <= i < points:
+                    continue
+                if i >= len(cached.values):
+                    gap = i + 1 - len(cached.values)
+                    cached.values.extend([0.0] * gap)
+                    cached.present.extend(bytes(gap))
+                cached.values[i] = float(value)
+                cached.present[i] = 1
+
+        return series
+
+    def _store(
+        self,
+        key: Hashable,
+        series: Dict[SeriesKey, CachedSeries],
+        start: float,
+        end: float,
+        step: float
+    ):
+        """Cache the samples up to ``end`` and evict entries over the memory budget."""
+        points = int(round((end - start) / step)) + 1
+        stored = {}
+        for series_key, cached in series.items():
+            present = cached.present[:points]
+            if any(present):
+                stored[series_key] = CachedSeries(cached.metric, cached.values[:points], present)
+
+        entry = CachedRange(start=start, end=end, step=step, series=stored)
+        entry.size = _ENTRY_OVERHEAD + len(repr(key)) + sum(s.size() for s in stored.values())
+
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= previous.size
+        if entry.size > self.max_bytes:
+            PANEL_CACHE_BYTES.set(self._bytes)
+            return
+
+        while self._entries and self._bytes + entry.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.size
+            PANEL_CACHE_EVICTIONS.inc()
+
+        self._entries[key] = entry
+        self._bytes += entry.size
+        PANEL_CACHE_BYTES.set(self._bytes)
+
+
+def _format_timestamp(timestamp: float) -> float:
+    return int(timestamp) if timestamp == int(timestamp) else timestamp
+
+
+def _format_value(value: float) -> str:
+    """Sample value in the Prometheus API string format."""
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    text = repr(value)
+    return text[:-2] if text.endswith(".0") else text
+
+
+_range_query_cache: Optional[RangeQueryCache] = None
+
+
+def get_range_query_cache() -> RangeQueryCache:
+    """Get the shared panel range query cache."""
+    global _range_query_cache
+    if _range_query_cache is None:
+        settings = get_settings()
+        _range_query_cache = RangeQueryCache(
+            max_bytes=settings.panel_cache_max_bytes,
+            freshness=settings.panel_cache_freshness_seconds
+        )
+    return _range_query_cache
@@ -2,9 +2,14 @@
 Rules Engine - Match alerts against auto-analyze rules
 """
 import fnmatch
+import heapq
 import re
-from typing import Optional, Tuple, Dict, Any
+import time
+from operator import attrgetter
+from typing import Optional, Tuple, Dict, Any, List, Sequence, Iterable, Callable
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 try:
     from json_logic import jsonLogic
@@ -93,6 +98,373 @@ def match_rule(rule: AutoAnalyzeRule, alert_name: str, severity: str, instance:
     return True
 
 
+# =============================================================================
+# Compiled Rule Index
+# =============================================================================
+
+RULE_INDEX_TTL_SECONDS = 30  # Safety net for edits made through another replica
+
+PatternMatcher = Optional[Callable[[str], bool]]
+
+
+def compile_pattern(pattern: Optional[str]) -> PatternMatcher:
+    """
+    Compile a wildcard pattern once, with the same semantics as match_pattern().
+    Returns None for '*' (matches everything).
+    """
+    if pattern is None or pattern == "*":
+        return None
+
+    if "*" not in pattern and "?" not in pattern:
+        literal = pattern.lower()
+        return lambda value: bool(value) and value.lower() == literal
+
+    regex_pattern = re.escape(pattern)
+    regex_pattern = regex_pattern.replace(r'\*', '.*')
+    regex_pattern = regex_pattern.replace(r'\?', '.')
+    try:
+        regex = re.compile(f'^{regex_pattern}$', re.IGNORECASE)
+    except re.error:
+        lowered = pattern.lower()
+        return lambda value: bool(value) and fnmatch.fnmatch(value.lower(), lowered)
+    return lambda value: bool(value) and regex.match(value) is not None
+
+
+def _json_logic_var(path, not_found, data):
+    for key in str(path).split("."):
+        if isinstance(data, dict):
+            data = data.get(key, not_found)
+        elif isinstance(data, (list, tuple)) and key.lstrip("-").isdigit():
+            data = data[int(key)]
+        else:
+            return not_found
+    return data
+
+
+def _to_number(value: Any) -> Optional[float]:
+    """Numeric value of a JSON-logic operand, or None if it has none."""
+    if isinstance(value, bool):
+        return float(value)
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        text = value.strip()
+        if not text:
+            return 0.0
+        try:
+            return float(text)
+        except ValueError:
+            return None
+    return None
+
+
+def _soft_equals(a: Any, b: Any) -> bool:
+    """JSON-logic ``==``: numbers, numeric strings and booleans compare by value."""
+    if a is None or b is None:
+        return a is None and b is None
+    if isinstance(a, str) and isinstance(b, str):
+        return a == b
+    if isinstance(a, (bool, int, float)) or isinstance(b, (bool, int, float)):
+        x, y = _to_number(a), _to_number(b)
+        return x is not None and x == y
+    return a == b
+
+
+def _json_type(value: Any) -> type:
+    """JSON type of a value (ints and floats are both numbers)."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float
+    return type(value)
+
+
+def _hard_equals(a: Any, b: Any) -> bool:
+    """JSON-logic ``===``: same JSON type and value."""
+    return _json_type(a) is _json_type(b) and a == b
+
+
+def _compare(a: Any, b: Any, numeric: Callable[[float, float], bool], text: Callable[[str, str], bool]) -> bool:
+    """
+    Relational comparison: numerically when both operands convert to
+    numbers, as strings when both are non-numeric strings, else False.
+    """
+    x, y = _to_number(a), _to_number(b)
+    if x is not None and y is not None:
+        return numeric(x, y)
+    if isinstance(a, str) and isinstance(b, str):
+        return text(a, b)
+    return False
+
+
+def _less(a: Any, b: Any, c: Any = None) -> bool:
+    result = _compare(a, b, lambda x, y: x < y, lambda x, y: x < y)
+    return result if c is None else result and _less(b, c)
+
+
+def _less_or_equal(a: Any, b: Any, c: Any = None) -> bool:
+    result = _compare(a, b, lambda x, y: x <= y, lambda x, y: x <= y)
+    return result if c is None else result and _less_or_equal(b, c)
+
+
+def _truthy(value: Any) -> bool:
+    """JSON-logic truthiness: empty arrays are false as well."""
+    if isinstance(value, (list, tuple)):
+        return len(value) > 0
+    return bool(value)
+
+
+def _in(a: Any, b: Any) -> bool:
+    if isinstance(b, str):
+        return a is not None and str(a) in b
+    if isinstance(b, (list, tuple)):
+        return any(_hard_equals(a, item) for item in b)
+    return False
+
+
+# Loose semantics of json-logic: operands are converted rather than
+# compared with Python's strict operators, and mismatched types never raise
+_JSON_LOGIC_OPS: Dict[str, Callable[..., Any]] = {
+    "==": _soft_equals,
+    "!=": lambda a, b: not _soft_equals(a, b),
+    "===": _hard_equals,
+    "!==": lambda a, b: not _hard_equals(a, b),
+    ">": lambda a, b: _less(b, a),
+    ">=": lambda a, b: _less_or_equal(b, a),
+    "<": _less,
+    "<=": _less_or_equal,
+    "!": lambda a: not _truthy(a),
+    "!!": _truthy,
+    "in": _in,
+}
+
+
+def compile_json_logic(logic: Any) -> Callable[[Dict[str, Any]], Any]:
+    """
+    Compile a JSON-logic expression into a closure over the alert data.
+
+    The expression tree is parsed once; evaluating the closure only walks
+    pre-bound callables. Comparisons follow json-logic's loose semantics
+    (numeric strings compare as numbers, missing vars are null). Operators
+    outside the common set are delegated to the json_logic library for that
+    sub-expression.
+    """
+    if isinstance(logic, list):
+        items = [compile_json_logic(item) for item in logic]
+        return lambda data: [item(data) for item in items]
+
+    if not isinstance(logic, dict) or len(logic) != 1:
+        return lambda data: logic
+
+    op, values = next(iter(logic.items()))
+    if not isinstance(values, (list, tuple)):
+        values = [values]
+    args = [compile_json_logic(value) for value in values]
+
+    if op == "var":
+        path_arg = args[0] if args else (lambda data: "")
+        default_arg = args[1] if len(args) > 1 else (lambda data: None)
+        return lambda data: _json_logic_var(path_arg(data), default_arg(data), data)
+
+    if op == "and":
+        def _and(data):
+            value = True
+            for arg in args:
+                value = arg(data)
+                if not _truthy(value):
+                    return value
+            return value
+        return _and
+
+    if op == "or":
+        def _or(data):
+            value = False
+            for arg in args:
+                value = arg(data)
+                if _truthy(value):
+                    return value
+            return value
+        return _or
+
+    if op in ("if", "?:"):
+        def _if(data):
+            for i in range(0, len(args) - 1, 2):
+                if _truthy(args[i](data)):
+                    return args[i + 1](data)
+            return args[-1](data) if len(args) % 2 else None
+        return _if
+
+    func = _JSON_LOGIC_OPS.get(op)
+    if func is not None:
+        return lambda data: func(*[arg(data) for arg in args])
+
+    if jsonLogic is None:
+        raise ValueError(f"Unsupported JSON logic operation: {op}")
+    return lambda data: jsonLogic(logic, data)
+
+
+class CompiledRule:
+    """Immutable, precompiled snapshot of an AutoAnalyzeRule."""
+
+    __slots__ = ("rule_id", "name", "action", "priority", "position",
+                 "alert_name_literal", "_matchers", "_logic")
+
+    def __init__(self, rule: AutoAnalyzeRule, position: int):
+        self.rule_id = rule.id
+        self.name = rule.name
+        self.action = rule.action
+        self.priority = rule.priority
+        self.position = position
+        self._logic = None
+        self._matchers: Tuple[Tuple[int, Callable[[str], bool]], ...] = ()
+        self.alert_name_literal: Optional[str] = None
+
+        if rule.condition_json:
+            if jsonLogic is None:
+                # Same as match_rule(): JSON-logic rules never match without the library
+                self._logic = lambda data: False
+            else:
+                try:
+                    self._logic = compile_json_logic(rule.condition_json)
+                except Exception:
+                    self._logic = lambda data: False
+            return
+
+        patterns = (rule.alert_name_pattern, rule.severity_pattern, rule.instance_pattern, rule.job_pattern)
+        self._matchers = tuple(
+            (i, matcher) for i, matcher in enumerate(compile_pattern(p) for p in patterns)
+            if matcher is not None
+        )
+
+        name_pattern = rule.alert_name_pattern
+        if name_pattern and name_pattern != "*" and "*" not in name_pattern and "?" not in name_pattern:
+            self.alert_name_literal = name_pattern.lower()
+
+    def matches(self, alert_name: str, severity: str, instance: str, job: str) -> bool:
+        if self._logic is not None:
+            data = flatten_alert(alert_name, severity, instance, job)
+            try:
+                return _truthy(self._logic(data))
+            except Exception:
+                return False
+
+        values = (alert_name or "", severity or "", instance or "", job or "")
+        for i, matcher in self._matchers:
+            if not matcher(values[i]):
+                return False
+        return True
+
+
+class RuleIndex:
+    """
+    In-process index over enabled rules.
+
+    Rules with a literal alert_name_pattern are bucketed by (case-folded) alert
+    name, so an alert only evaluates its own bucket plus the wildcard/JSON-logic
+    rules. Candidates are merged in priority order, so the first match is the
+    same rule find_matching_rule() would have returned.
+    """
+
+    def __init__(self, rules: Sequence[AutoAnalyzeRule]):
+        self.rules = [CompiledRule(rule, position) for position, rule in enumerate(rules)]
+        self._by_alert_name: Dict[str, List[CompiledRule]] = {}
+        self._scan: List[CompiledRule] = []
+        for compiled in self.rules:
+            if compiled.alert_name_literal is not None:
+                self._by_alert_name.setdefault(compiled.alert_name_literal, []).append(compiled)
+            else:
+                self._scan.append(compiled)
+        self.built_at = time.monotonic()
+
+    def __len__(self):
+        return len(self.rules)
+
+    def match(
+        self,
+        alert_name: str,
+        severity: str,
+        instance: str,
+        job: str
+    ) -> Tuple[Optional[CompiledRule], str]:
+        """
+        Find the first matching rule for an alert.
+
+        Returns:
+            Tuple of (compiled_rule, action), or (None, 'manual') if nothing matches
+        """
+        bucket = self._by_alert_name.get((alert_name or "").lower())
+        candidates = heapq.merge(bucket, self._scan, key=attrgetter("position")) if bucket else self._scan
+
+        for compiled in candidates:
+            if compiled.matches(alert_name, severity, instance, job):
+                return (compiled, compiled.action)
+        return (None, "manual")
+
+    def match_many(
+        self,
+        alerts: Iterable[Tuple[str, str, str, str]]
+    ) -> List[Tuple[Optional[CompiledRule], str]]:
+        """
+        Match a whole webhook payload in one pass.
+        Identical (alert_name, severity, instance, job) tuples are matched once.
+        """
+        seen: Dict[Tuple[str, str, str, str], Tuple[Optional[CompiledRule], str]] = {}
+        results = []
+        for key in alerts:
+            if key not in seen:
+                seen[key] = self.match(*key)
+            results.append(seen[key])
+        return results
+
+
+_rule_index: Optional[RuleIndex] = None
+
+
+def invalidate_rule_index() -> None:
+    """Drop the cached rule index. Call after any rule create/update/delete."""
+    global _rule_index
+    _rule_index = None
+
+
+def _cached_rule_index() -> Optional[RuleIndex]:
+    index = _rule_index
+    if index is not None and time.monotonic() - index.built_at < RULE_INDEX_TTL_SECONDS:
+        return index
+    return None
+
+
+def _enabled_rules_query():
+    return (
+        select(AutoAnalyzeRule)
+        .where(AutoAnalyzeRule.enabled == True)
+        .order_by(AutoAnalyzeRule.priority.asc(), AutoAnalyzeRule.created_at.asc())
+    )
+
+
+def get_rule_index(db: Session) -> RuleIndex:
+    """Return the cached rule index, rebuilding it with a sync session if stale."""
+    global _rule_index
+    index = _cached_rule_index()
+    if index is None:
+        index = RuleIndex(db.execute(_enabled_rules_query()).scalars().all())
+        _rule_index = index
+    return index
+
+
+async def load_enabled_rules(db: AsyncSession) -> List[AutoAnalyzeRule]:
+    """Load all enabled rules in priority order using an async session."""
+    result = await db.execute(_enabled_rules_query())
+    return list(result.scalars().all())
+
+
+async def get_rule_index_async(db: AsyncSession) -> RuleIndex:
+    """Return the cached rule index, rebuilding it with an async session if stale."""
+    global _rule_index
+    index = _cached_rule_index()
+    if index is None:
+        index = RuleIndex(await load_enabled_rules(db))
+        _rule_index = index
+    return index
+
+
 def find_matching_rule(
     db: Session,
     alert_name: str,
@@ -102,23 +474,19 @@ def find_matching_rule(
 ) -> Tuple[Optional[AutoAnalyzeRule], str]:
     """
     Find the first matching rule for an alert.
-    Rules are evaluated in priority order (lower number = higher priority).
+    Rules are evaluated in priority order (lower number = higher priority)
+    using the cached compiled rule index.
     
     Returns:
         Tuple of (matched_rule, action)
         If no rule matches, returns (None, 'manual')
     """
-    # Get all enabled rules ordered by priority
-    rules = db.query(AutoAnalyzeRule).filter(
-        AutoAnalyzeRule.enabled == True
-    ).order_by(AutoAnalyzeRule.priority.asc()).all()
-    
-    for rule in rules:
-        if match_rule(rule, alert_name, severity, instance, job):
-            return (rule, rule.action)
+    compiled, action = get_rule_index(db).match(alert_name, severity, instance, job)
+    if compiled is None:
+        # Default to manual if no rule matches
+        return (None, "manual")
     
-    # Default to manual if no rule matches
-    return (None, "manual")
+    return (db.get(AutoAnalyzeRule, compiled.rule_id), action)
 
 
 def evaluate_alert(db: Session, alert: Alert) -> Tuple[Optional[AutoAnalyzeRule], str]:
@@ -24,6 +24,7 @@ from ..models_remediation import (
 )
 from .executor_base import ExecutionResult, ErrorType
 from .executor_factory import ExecutorFactory
+from .step_output import StepOutputWriter
 
 logger = logging.getLogger(__name__)
 
@@ -256,15 +257,23 @@ class RunbookExecutor:
 
                     step_exec.command_executed = rendered_command
 
-                    # Execute with retries
-                    result = await self._execute_with_retries(
-                        executor=executor,
-                        command=rendered_command,
-                        step=step,
-                        step_exec=step_exec,
-                        execution=execution,
-                        on_output=on_output
-                    )
+                    # Execute with retries, streaming command output to the output store
+                    output_writer = None
+                    if step.step_type != "api" and not execution.dry_run:
+                        output_writer = StepOutputWriter(step_exec.id, execution.id)
+                    try:
+                        result = await self._execute_with_retries(
+                            executor=executor,
+                            command=rendered_command,
+                            step=step,
+                            step_exec=step_exec,
+                            execution=execution,
+                            on_output=on_output,
+                            output_writer=output_writer
+                        )
+                    finally:
+                        if output_writer:
+                            step_exec.output_chars, step_exec.output_dropped_chars = await output_writer.close()
 
                     # Update step execution based on step type
                     if step.step_type == "api":
@@ -847,9 +856,15 @@ class RunbookExecutor:
         step: RunbookStep,
         step_exec: StepExecution,
         execution: RunbookExecution,
-        on_output: Optional[Callable[[str], None]] = None
+        on_output: Optional[Callable[[str], None]] = None,
+        output_writer: Optional[StepOutputWriter] = None
     ) -> ExecutionResult:
-        """Execute a command with retry logic."""
+        """
+        Execute a command with retry logic.
+        
+        With an output_writer, output is streamed into the step's output store
+        as the command runs (every attempt, separated by a marker line).
+        """
         max_retries = step.retry_count or 0
         retry_delay = step.retry_delay_seconds or 5
         
@@ -870,19 +885,37 @@ class RunbookExecutor:
                     server_hostname=executor.hostname
                 )
             
-            # Execute command
-            result = await executor.execute(
-                command=command,
-                timeout=step.timeout_seconds or 60,
-                with_elevation=step.requires_elevation,
-                env=step.environment_json,
-                working_directory=step.working_directory
-            )
-            
-            # Stream output
-            if on_output and result.stdout:
-                for line in result.stdout.splitlines():
-                    on_output(line)
+            if output_writer is not None:
+                async def stream_output(stream: str, text: str):
+                    await output_writer.write(stream, text)
+                    if on_output and stream == "stdout":
+                        for line in text.splitlines():
+                            on_output(line)
+                
+                if attempt:
+                    await output_writer.write("stdout", f"\n--- retry attempt {attempt} ---\n")
+                result = await executor.execute_streaming(
+                    command=command,
+                    on_output=stream_output,
+                    timeout=step.timeout_seconds or 60,
+                    with_elevation=step.requires_elevation,
+                    env=step.environment_json,
+                    working_directory=step.working_directory
+                )
+            else:
+                # Execute command
+                result = await executor.execute(
+                    command=command,
+                    timeout=step.timeout_seconds or 60,
+                    with_elevation=step.requires_elevation,
+                    env=step.environment_json,
+                    working_directory=step.working_directory
+                )
+                
+                # Stream output
+                if on_output and result.stdout:
+                    for line in result.stdout.splitlines():
+                        on_output(line)
             
             last_result = result
             
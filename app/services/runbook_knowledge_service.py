@@ -10,7 +10,9 @@ from sqlalchemy. orm import Session
 
 from app.models_remediation import Runbook, RunbookStep
 from app.models_knowledge import DesignChunk
-from app.services.embedding_service import EmbeddingService
+from app.services.embedding_service import EmbeddingService, get_embedding_service
+from app.services.vector_search import candidate_count, tune_vector_search
+from app.services.source_metadata import load_source_metadata
 from app.services. document_service import DocumentService
 
 logger = logging.getLogger(__name__)
@@ -46,6 +48,7 @@ class RunbookKnowledgeService:
         except Exception as e:
             logger.error(f"Failed to fetch OpenAI key from DB: {e}")
             
+        self.api_key = api_key
         self.embedding_service = EmbeddingService(api_key=api_key)
         self.doc_service = DocumentService(db)
     
@@ -166,12 +169,14 @@ class RunbookKnowledgeService:
         
         return stats
     
-    def search_relevant_runbooks(
+    async def search_relevant_runbooks(
         self,
         query: str,
         alert_context: Optional[Dict] = None,
         limit: int = 5,
-        min_similarity: float = 0.5
+        min_similarity: float = 0.5,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None
     ) -> List[Dict[str, Any]]: 
         """
         Search for relevant runbooks based on query and optional alert context.
@@ -181,6 +186,8 @@ class RunbookKnowledgeService:
             alert_context: Optional alert information for better matching
             limit: Maximum results
             min_similarity:  Minimum similarity threshold
+            ef_search: HNSW search breadth for this query (recall vs latency)
+            probes: ivfflat lists scanned for this query
             
         Returns: 
             List of matching runbooks with relevance scores
@@ -189,7 +196,7 @@ class RunbookKnowledgeService:
         enhanced_query = self._enhance_query(query, alert_context)
         
         # Generate embedding for query
-        query_embedding = self. embedding_service.generate_embedding(enhanced_query)
+        query_embedding = await get_embedding_service(self.api_key).embed(enhanced_query)
         if not query_embedding: 
             logger.warning("Failed to generate query embedding")
             return []
@@ -197,51 +204,69 @@ class RunbookKnowledgeService:
         # Search using vector similarity
         from sqlalchemy import text
         
+        # Index-driven top-k first, similarity threshold on the candidates
+        # (a threshold in the inner WHERE would bypass the vector index)
         sql = text("""
             SELECT 
-                c.source_id as runbook_id,
-                c.chunk_metadata->>'runbook_name' as runbook_name,
-                c.content,
-                c. content_type,
-                c.chunk_metadata as metadata,
-                1 - (c.embedding <=> CAST(: query_embedding AS vector)) as similarity
-            FROM design_chunks c
-            WHERE c.source_type = 'document'
-                AND c.chunk_metadata->>'doc_type' = 'runbook'
-                AND c.embedding IS NOT NULL
-                AND 1 - (c.embedding <=> CAST(:query_embedding AS vector)) >= :min_similarity
-            ORDER BY c.embedding <=> CAST(: query_embedding AS vector)
+                nearest.runbook_id,
+                nearest.runbook_name,
+                nearest.content,
+                nearest.content_type,
+                nearest.metadata,
+                1 - nearest.distance as similarity
+            FROM (
+                SELECT 
+                    c.source_id as runbook_id,
+                    c.chunk_metadata->>'runbook_name' as runbook_name,
+                    c.content,
+                    c.content_type,
+                    c.chunk_metadata as metadata,
+                    c.embedding <=> CAST(:query_embedding AS vector) as distance
+                FROM design_chunks c
+                WHERE c.source_type = 'document'
+                    AND c.chunk_metadata->>'doc_type' = 'runbook'
+                    AND c.embedding IS NOT NULL
+                ORDER BY distance
+                LIMIT :candidates
+            ) nearest
+            WHERE 1 - nearest.distance >= :min_similarity
+            ORDER BY nearest.distance
             LIMIT :limit
         """)
         
         try:
+            candidates = candidate_count(limit * 2, filtered=True)
+            tune_vector_search(self.db, candidates, ef_search=ef_search, probes=probes)
             result = self.db.execute(sql, {
                 "query_embedding": query_embedding,
                 "min_similarity": min_similarity,
+                "candidates": candidates,
                 "limit": limit * 2  # Get more for deduplication
             })
             rows = result.fetchall()
             
+            # Runbook details for all matches in one query (cached briefly)
+            runbooks = load_source_metadata(self.db, 'runbook', [row.runbook_id for row in rows])
+            
             # Deduplicate by runbook_id, keeping highest score
             seen = {}
             for row in rows:
-                runbook_id = str(row. runbook_id)
+                runbook_id = str(row.runbook_id)
                 if runbook_id not in seen or row.similarity > seen[runbook_id]["similarity"]:
-                    # Load full runbook
-                    runbook = self.db.query(Runbook).filter(Runbook.id == row.runbook_id).first()
-                    if runbook and runbook.enabled:
+                    runbook = runbooks.get(row.runbook_id)
+                    if runbook and runbook["enabled"]:
                         seen[runbook_id] = {
                             "runbook_id": runbook_id,
-                            "runbook_name": runbook.name,
-                            "description": runbook.description,
-                            "category": runbook.category,
-                            "tags": runbook. tags or [],
+                            "runbook_name": runbook["source_title"],
+                            "description": runbook["description"],
+                            "category": runbook["category"],
+                            "tags": list(runbook["tags"]),
                             "similarity": float(row.similarity),
                             "matched_content_type": row.content_type,
-                            "auto_execute": runbook.auto_execute,
-                            "approval_required": runbook.approval_required,
-                            "view_url": f"/runbooks/{runbook_id}/view",
-                            "steps_count": len(runbook.steps)
+                            "auto_execute": runbook["auto_execute"],
+                            "approval_required": runbook["approval_required"],
+                            "view_url": runbook["view_url"],
+                            "steps_count": runbook["steps_count"]
                         }
             
             # Sort by similarity and limit
@@ -4,10 +4,11 @@ Runbook Search Service
 import logging
 from typing import List, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy import or_, text
 
 from app.models_remediation import Runbook
 from app.database import get_db
+from app.services.hybrid_search import RUNBOOK_TSVECTOR, TSQUERY, lexical_rank
 
 logger = logging.getLogger(__name__)
 
@@ -19,16 +20,34 @@ class RunbookSearchService:
     def search(self, db: Session, query_text: str, limit: int = 5) -> List[Runbook]:
         """
         Search for runbooks matching the query text.
-        Uses exact tag matching and fuzzy text matching on name/description.
+        
+        Ranked full-text search over name and description, served by the
+        runbooks full-text index; name matches rank above description
+        matches. Falls back to substring matching on name/description
+        when no whole word matches (e.g. a partial name).
         """
         if not query_text:
             return []
+        
+        ranked = text(f"""
+            SELECT r.id
+            FROM runbooks r
+            WHERE r.enabled = true
+                AND {RUNBOOK_TSVECTOR} @@ {TSQUERY}
+            ORDER BY {lexical_rank(RUNBOOK_TSVECTOR)} DESC, r.name
+            LIMIT :limit
+        """)
+        ids = [row.id for row in db.execute(ranked, {"query": query_text, "limit": limit})]
+        
+        if ids:
+            runbooks = {
+                runbook.id: runbook
+                for runbook in db.query(Runbook).filter(Runbook.id.in_(ids)).all()
+            }
+            return [runbooks[runbook_id] for runbook_id in ids if runbook_id in runbooks]
             
         search_term = f"%{query_text}%"
         
-        # Basic search strategy:
-        # 1. Match name or description
-        # 2. Filter by enabled=True
         results = db.query(Runbook).filter(
             Runbook.enabled == True,
             or_(
@@ -23,6 +23,7 @@ from ..config import get_settings
 from ..database import get_async_db
 from ..models_scheduler import ScheduledJob, ScheduleExecutionHistory
 from ..models_remediation import RunbookExecution
+from .execution_worker import notify_execution_ready
 from sqlalchemy import select, update
 
 logger = logging.getLogger(__name__)
@@ -291,6 +292,8 @@ async def _execute_scheduled_runbook(
                 queued_at=now_utc
             )
             db.add(execution)
+            if initial_status == "running":
+                await notify_execution_ready(db)
             await db.commit()
             await db.refresh(execution)
             
@@ -0,0 +1,185 @@
+"""
+Semantic Alert Clustering
+
+Near-linear text similarity grouping for the semantic clustering layer.
+
+The old approach fit a TfidfVectorizer per run and built a dense N x N
+cosine matrix. Here:
+
+- Vocabulary: word 1-2 grams are hashed into a fixed feature space, so
+  there is nothing to refit; inverse document frequencies are updated
+  incrementally from every batch seen by the process
+- Neighbours: each alert gets a random-hyperplane signature (signs of a
+  128 fixed projections of its TF-IDF vector). Alerts are sorted
+  by signature under several block rotations and compared only with their
+  nearest neighbours in each ordering, using sparse row-wise dot products
+- Grouping: pairs that pass the cosine threshold are merged with union-find
+  (connected components of the pair graph)
+
+Memory and time grow with the number of alerts times the number of
+orderings scanned, instead of with its square.
+"""
+
+import logging
+import threading
+from typing import List, Sequence
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+
+logger = logging.getLogger(__name__)
+
+N_FEATURES = 2 ** 18
+
+# Random-hyperplane signature: BLOCKS x BITS_PER_BLOCK bits
+BLOCKS = 16
+BITS_PER_BLOCK = 8
+
+# Orderings of the signature scanned, and neighbours compared in each
+PERMUTATIONS = 8
+WINDOW = 3
+
+_MIX_1 = np.uint64(0x9E3779B97F4A7C15)
+_MIX_2 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX_3 = np.uint64(0x94D049BB133111EB)
+
+
+class SemanticVectorizer:
+    """
+    Hashed TF-IDF with document frequencies accumulated across calls.
+
+    Thread-safe: the batch job runs on a scheduler thread while the online
+    engine runs on the event loop.
+    """
+
+    def __init__(self, n_features: int = N_FEATURES):
+        self.n_features = n_features
+        self._hasher = HashingVectorizer(
+            n_features=n_features,
+            ngram_range=(1, 2),
+            stop_words='english',
+            alternate_sign=False,
+            norm=None
+        )
+        self._df = np.zeros(n_features, dtype=np.int64)
+        self._docs = 0
+        self._lock = threading.Lock()
+
+    def update_transform(self, texts: Sequence[str]) -> csr_matrix:
+        """Count ``texts`` into the document frequencies, then return their L2-normalized TF-IDF rows."""
+        counts = self._hasher.transform(texts).tocsr()
+        with self._lock:
+            # Each (row, feature) is stored once, so this counts documents per feature
+            features, documents = np.unique(counts.indices, return_counts=True)
+            self._df[features] += documents
+            self._docs += len(texts)
+            idf = np.log((1 + self._docs) / (1 + self._df[counts.indices])) + 1.0
+
+        counts.data = counts.data * idf
+        return normalize(counts, copy=False)
+
+
+_vectorizer = None
+_vectorizer_lock = threading.Lock()
+
+
+def get_semantic_vectorizer() -> SemanticVectorizer:
+    """Process-wide vectorizer, so document frequencies build up over time."""
+    global _vectorizer
+    with _vectorizer_lock:
+        if _vectorizer is None:
+            _vectorizer = SemanticVectorizer()
+        return _vectorizer
+
+
+def _hyperplane_signs(features: np.ndarray, first_bit: int, n_bits: int) -> np.ndarray:
+    """+1/-1 per (feature, bit), from a fixed hash so it is the same in every process."""
+    bits = np.arange(first_bit, first_bit + n_bits, dtype=np.uint64)
+    x = features.astype(np.uint64)[:, None] * _MIX_1 + bits[None, :] * _MIX_2
+    x ^= x >> np.uint64(31)
+    x *= _MIX_3
+    x ^= x >> np.uint64(29)
+    return np.where(x & np.uint64(1), np.float32(1.0), np.float32(-1.0))
+
+
+def signature_blocks(vectors: csr_matrix, blocks: int = BLOCKS, bits_per_block: int = BITS_PER_BLOCK) -> np.ndarray:
+    """Random-hyperplane signature of each row, packed into ``blocks`` integers, shape (n, blocks)."""
+    # Only features that occur need hyperplane coordinates
+    features, columns = np.unique(vectors.indices, return_inverse=True)
+    compact = csr_matrix(
+        (vectors.data.astype(np.float32), columns, vectors.indptr),
+        shape=(vectors.shape[0], len(features))
+    )
+    weights = 1 << np.arange(bits_per_block, dtype=np.int64)
+
+    # One block of hyperplanes at a time keeps memory at features x bits_per_block
+    packed = np.empty((vectors.shape[0], blocks), dtype=np.int64)
+    for block in range(blocks):
+        signs = _hyperplane_signs(features, block * bits_per_block, bits_per_block)
+        packed[:, block] = ((compact @ signs) > 0) @ weights
+    return packed
+
+
+def _rowwise_cosine(vectors: csr_matrix, rows: np.ndarray, others: np.ndarray) -> np.ndarray:
+    """Cosine of vectors[rows[i]] and vectors[others[i]] (rows are L2-normalized)."""
+    return np.asarray(vectors[rows].multiply(vectors[others]).sum(axis=1)).ravel()
+
+
+def semantic_groups(
+    vectors: csr_matrix,
+    threshold: float,
+    permutations: int = PERMUTATIONS,
+    window: int = WINDOW
+) -> List[List[int]]:
+    """
+    Group L2-normalized rows whose cosine similarity reaches ``threshold``.
+
+    Rows are sorted by their signature, starting from a different block
+    each time; similar rows share long signature prefixes and end up next
+    to each other, so each row is only compared with its ``window``
+    neighbours. Returns lists of row indices, groups of two or more only.
+
+    Grouping is transitive (single linkage), and a pair just above the
+    threshold can be missed; both are acceptable for noise reduction.
+    """
+    n = vectors.shape[0]
+    if n < 2:
+        return []
+
+    packed = signature_blocks(vectors)
+    blocks = packed.shape[1]
+    pair_rows: List[np.ndarray] = []
+    pair_cols: List[np.ndarray] = []
+
+    for p in range(min(permutations, blocks)):
+        first = p * blocks // min(permutations, blocks)
+        # np.lexsort sorts by its last key first
+        columns = [(first + i) % blocks for i in range(blocks)]
+        order = np.lexsort([packed[:, c] for c in reversed(columns)])
+
+        for offset in range(1, min(window, n - 1) + 1):
+            rows, others = order[:-offset], order[offset:]
+            similar = _rowwise_cosine(vectors, rows, others) >= threshold
+            pair_rows.append(rows[similar])
+            pair_cols.append(others[similar])
+
+    rows = np.concatenate(pair_rows)
+    cols = np.concatenate(pair_cols)
+    if not len(rows):
+        return []
+
+    # Union-find over the matched pairs
+    graph = csr_matrix((np.ones(len(rows), dtype=np.int8), (rows, cols)), shape=(n, n))
+    _, labels = connected_components(graph, directed=False)
+
+    order = np.argsort(labels, kind='stable')
+    sorted_labels = labels[order]
+    boundaries = np.flatnonzero(np.r_[True, sorted_labels[1:] != sorted_labels[:-1], True])
+    return [
+        order[start:end].tolist()
+        for start, end in zip(boundaries[:-1], boundaries[1:])
+        if end - start > 1
+    ]
@@ -6,9 +6,10 @@ import logging
 from typing import List, Optional
 from uuid import UUID
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, select
 
 from app.models import Alert
+from app.services.vector_search import candidate_count, tune_vector_search
 from app.models_remediation import RunbookExecution
 from app.models_learning import ExecutionOutcome
 from app.schemas_learning import SimilarIncident, SimilarIncidentsResponse, ResolutionInfo
@@ -29,7 +30,9 @@ class SimilarityService:
         self,
         alert_id: UUID,
         limit: int = DEFAULT_LIMIT,
-        min_similarity: float = DEFAULT_SIMILARITY_THRESHOLD
+        min_similarity: float = DEFAULT_SIMILARITY_THRESHOLD,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None
     ) -> Optional[SimilarIncidentsResponse]:
         """
         Find similar historical alerts using cosine similarity.
@@ -38,6 +41,8 @@ class SimilarityService:
             alert_id: UUID of the alert to find similar incidents for
             limit: Maximum number of similar incidents to return
             min_similarity: Minimum similarity score (0.0-1.0)
+            ef_search: HNSW search breadth for this query (recall vs latency)
+            probes: ivfflat lists scanned for this query
             
         Returns:
             SimilarIncidentsResponse or None if alert not found or has no embedding
@@ -53,22 +58,27 @@ class SimilarityService:
                 logger.warning(f"Alert {alert_id} has no embedding - cannot find similar alerts")
                 return None
             
-            # Find similar alerts using pgvector's cosine similarity
-            # Use ORDER BY embedding <=> target_embedding for cosine distance
-            # Cosine distance = 1 - cosine_similarity, so we convert back to similarity
-            similar_alerts_query = (
-                self.db.query(
-                    Alert,
-                    # Calculate cosine similarity (1 - cosine distance)
-                    (1 - Alert.embedding.cosine_distance(alert.embedding)).label('similarity')
-                )
-                .filter(
+            # Nearest alerts by cosine distance, straight from the vector index;
+            # the similarity threshold is applied to those candidates only
+            # (a threshold in the inner WHERE would bypass the index)
+            candidates = candidate_count(limit)
+            distance = Alert.embedding.cosine_distance(alert.embedding).label('distance')
+            nearest = (
+                select(Alert.id.label('id'), distance)
+                .where(
                     Alert.id != alert_id,  # Exclude the alert itself
-                    Alert.embedding.isnot(None),  # Must have embedding
-                    # Filter for minimum similarity (converted to max distance)
-                    Alert.embedding.cosine_distance(alert.embedding) <= (1 - min_similarity)
+                    Alert.embedding.isnot(None)  # Must have embedding
                 )
-                .order_by(Alert.embedding.cosine_distance(alert.embedding))
+                .order_by(distance)
+                .limit(candidates)
+                .subquery('nearest')
+            )
+            tune_vector_search(self.db, candidates, ef_search=ef_search, probes=probes)
+            similar_alerts_query = (
+                self.db.query(Alert, (1 - nearest.c.distance).label('similarity'))
+                .join(nearest, Alert.id == nearest.c.id)
+                .filter(nearest.c.distance <= (1 - min_similarity))
+                .order_by(nearest.c.distance)
                 .limit(limit)
                 .all()
             )
@@ -151,65 +161,13 @@ class SimilarityService:
             Number of alerts processed
         """
         try:
-            from app.services.embedding_service import EmbeddingService
-            
-            embedding_service = EmbeddingService()
-            
-            if not embedding_service.is_configured():
-                logger.error("Embedding service not configured - cannot generate embeddings")
-                return 0
-            
-            # Get alerts without embeddings (or all if force_regenerate)
-            if force_regenerate:
-                alerts_query = self.db.query(Alert).limit(limit)
-            else:
-                alerts_query = (
-                    self.db.query(Alert)
-                    .filter(Alert.embedding.is_(None))
-                    .limit(limit)
-                )
-            
-            alerts = alerts_query.all()
-            
-            if not alerts:
-                logger.info("No alerts need embedding generation")
-                return 0
-            
-            processed_count = 0
-            for alert in alerts:
-                try:
-                    # Generate embedding
-                    embedding = embedding_service.generate_for_alert(alert)
-                    
-                    if embedding:
-                        # Build embedding text for reference
-                        parts = [
-                            f"Alert: {alert.alert_name}",
-                            f"Severity: {alert.severity or 'unknown'}",
-                        ]
-                        if alert.instance:
-                            parts.append(f"Instance: {alert.instance}")
-                        embedding_text = ', '.join(parts)
-                        
-                        # Update alert with embedding
-                        alert.embedding = embedding
-                        alert.embedding_text = embedding_text
-                        
-                        processed_count += 1
-                    else:
-                        logger.warning(f"Failed to generate embedding for alert {alert.id}")
-                        
-                except Exception as e:
-                    logger.error(f"Error processing alert {alert.id}: {e}")
-                    continue
-            
-            # Commit changes
-            self.db.commit()
-            
-            logger.info(f"Generated embeddings for {processed_count} alerts")
-            return processed_count
-            
+            from app.services.embedding_backfill import backfill_alert_embeddings
+
+            report = backfill_alert_embeddings(limit=limit, force_regenerate=force_regenerate)
+
+            logger.info(f"Generated embeddings for {report.embedded} alerts")
+            return report.embedded
+
         except Exception as e:
             logger.error(f"Error in batch embedding generation: {e}")
-            self.db.rollback()
             return 0
@@ -0,0 +1,170 @@
+"""
+Knowledge Source Metadata
+
+Titles, URLs and other display fields for the sources behind knowledge
+chunks (documents, images, runbooks), loaded for a whole result set at
+once: one ``IN`` query per source type for whatever is not already in a
+small TTL cache. Search result enrichment therefore costs at most one
+round trip per source type, however many results there are.
+
+Routes that create, edit or delete runbooks and documents call
+``invalidate_source_metadata()``, so edits (a runbook being disabled or
+made to require approval) are visible immediately in this process; the
+TTL only bounds staleness across replicas.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+from uuid import UUID
+
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+
+from app.models_knowledge import DesignDocument, DesignImage
+from app.models_remediation import Runbook, RunbookStep
+
+logger = logging.getLogger(__name__)
+
+SOURCE_METADATA_TTL_SECONDS = 30  # Bounds staleness of edits made on other replicas
+SOURCE_METADATA_MAX_ENTRIES = 5000
+
+
+class SourceMetadataCache:
+    """LRU of (kind, id) → metadata dict, entries expiring after ``ttl`` seconds."""
+
+    def __init__(
+        self,
+        ttl: float = SOURCE_METADATA_TTL_SECONDS,
+        max_entries: int = SOURCE_METADATA_MAX_ENTRIES,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries: "OrderedDict[Tuple[str, UUID], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, kind: str, ids: Iterable[UUID]) -> Tuple[Dict[UUID, Dict[str, Any]], List[UUID]]:
+        """Cached metadata by id, and the ids that need loading."""
+        now = self.clock()
+        found, missing = {}, []
+        with self._lock:
+            for source_id in dict.fromkeys(ids):
+                entry = self._entries.get((kind, source_id))
+                if entry is not None and entry[0] > now:
+                    self._entries.move_to_end((kind, source_id))
+                    found[source_id] = entry[1]
+                else:
+                    missing.append(source_id)
+        return found, missing
+
+    def put_many(self, kind: str, metadata: Dict[UUID, Dict[str, Any]]) -> None:
+        expires = self.clock() + self.ttl
+        with self._lock:
+            for source_id, value in metadata.items():
+                self._entries[(kind, source_id)] = (expires, value)
+                self._entries.move_to_end((kind, source_id))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def _load_documents(db: Session, ids: List[UUID]) -> Dict[UUID, Dict[str, Any]]:
+    rows = db.execute(
+        select(
+            DesignDocument.id, DesignDocument.title, DesignDocument.source_url,
+            DesignDocument.doc_type, DesignDocument.app_id
+        ).where(DesignDocument.id.in_(ids))
+    )
+    return {
+        row.id: {
+            'source_title': row.title,
+            'source_url': row.source_url,
+            'doc_type': row.doc_type,
+            'app_id': row.app_id,
+        }
+        for row in rows
+    }
+
+
+def _load_images(db: Session, ids: List[UUID]) -> Dict[UUID, Dict[str, Any]]:
+    rows = db.execute(
+        select(DesignImage.id, DesignImage.title, DesignImage.image_type, DesignImage.app_id)
+        .where(DesignImage.id.in_(ids))
+    )
+    return {
+        row.id: {
+            'source_title': row.title,
+            'image_type': row.image_type,
+            'app_id': row.app_id,
+        }
+        for row in rows
+    }
+
+
+def _load_runbooks(db: Session, ids: List[UUID]) -> Dict[UUID, Dict[str, Any]]:
+    steps = (
+        select(RunbookStep.runbook_id, func.count(RunbookStep.id).label('steps_count'))
+        .where(RunbookStep.runbook_id.in_(ids))
+        .group_by(RunbookStep.runbook_id)
+        .subquery()
+    )
+    rows = db.execute(
+        select(
+            Runbook.id, Runbook.name, Runbook.description, Runbook.category, Runbook.tags,
+            Runbook.enabled, Runbook.auto_execute, Runbook.approval_required,
+            func.coalesce(steps.c.steps_count, 0).label('steps_count')
+        )
+        .outerjoin(steps, steps.c.runbook_id == Runbook.id)
+        .where(Runbook.id.in_(ids))
+    )
+    return {
+        row.id: {
+            'source_title': row.name,
+            'doc_type': 'runbook',
+            'view_url': f"/runbooks/{row.id}/view",
+            'description': row.description,
+            'category': row.category,
+            'tags': row.tags or [],
+            'enabled': row.enabled,
+            'auto_execute': row.auto_execute,
+            'approval_required': row.approval_required,
+            'steps_count': row.steps_count,
+        }
+        for row in rows
+    }
+
+
+_LOADERS = {
+    'document': _load_documents,
+    'image': _load_images,
+    'runbook': _load_runbooks,
+}
+
+_cache = SourceMetadataCache()
+
+
+def invalidate_source_metadata() -> None:
+    """Drop all cached source metadata. Call after any runbook or document edit."""
+    _cache.clear()
+
+
+def load_source_metadata(db: Session, kind: str, ids: Iterable[UUID]) -> Dict[UUID, Dict[str, Any]]:
+    """
+    Metadata for sources of one kind ('document', 'image' or 'runbook').
+
+    Cached entries are reused; the rest are loaded with a single query.
+    Ids that do not exist are absent from the result.
+    """
+    found, missing = _cache.get_many(kind, ids)
+    if missing:
+        loaded = _LOADERS[kind](db, missing)
+        _cache.put_many(kind, loaded)
+        found.update(loaded)
+    return found
@@ -0,0 +1,370 @@
+"""
+SSH Connection Pool
+
+Shares authenticated asyncssh connections between SSHExecutor instances so
+runbook steps and executions against the same host skip the handshake.
+
+- One connection per host/user/credential key, multiplexing sessions
+- Per-connection channel limit (kept below the server's MaxSessions)
+- Global bound on open connections; idle ones are evicted LRU when full
+- Idle TTL and max lifetime, enforced by a background reaper
+- Liveness tracking via wait_closed() plus a probe before reusing a
+  connection that has been idle for a while
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Dict, Optional
+
+import asyncssh
+
+from ..config import get_settings
+from ..metrics import (
+    SSH_POOL_REQUESTS,
+    SSH_HANDSHAKE_DURATION,
+    SSH_POOL_CONNECTIONS,
+    SSH_POOL_CHANNELS_IN_USE,
+    SSH_POOL_EVICTIONS,
+)
+
+logger = logging.getLogger(__name__)
+
+HEALTH_PROBE_TIMEOUT = 5  # seconds
+
+
+def pool_key(
+    hostname: str,
+    port: int,
+    username: str,
+    *secrets: Optional[str]
+) -> str:
+    """
+    Pool key for a connection target.
+
+    Credentials are folded in as a short digest so a changed password or key
+    never reuses a connection authenticated with the old one.
+    """
+    digest = hashlib.sha256("\0".join(s or "" for s in secrets).encode()).hexdigest()[:12]
+    return f"{username}@{hostname}:{port}#{digest}"
+
+
+class PooledConnection:
+    """A pooled asyncssh connection and its bookkeeping."""
+
+    __slots__ = (
+        "key", "conn", "channels", "created_at", "last_used",
+        "last_checked", "leases", "channels_in_use", "closed", "_watcher",
+    )
+
+    def __init__(self, key: str, conn: asyncssh.SSHClientConnection, max_channels: int):
+        now = time.monotonic()
+        self.key = key
+        self.conn = conn
+        self.channels = asyncio.Semaphore(max_channels)
+        self.created_at = now
+        self.last_used = now
+        self.last_checked = now
+        self.leases = 0
+        self.channels_in_use = 0
+        self.closed = False
+        self._watcher: Optional[asyncio.Future] = None
+
+    def watch(self) -> None:
+        """Mark the connection closed as soon as the transport goes away."""
+        self._watcher = asyncio.ensure_future(self.conn.wait_closed())
+        self._watcher.add_done_callback(self._on_closed)
+
+    def _on_closed(self, _future) -> None:
+        self.closed = True
+
+    @property
+    def idle(self) -> bool:
+        return self.leases == 0 and self.channels_in_use == 0
+
+
+class SSHConnectionPool:
+    """
+    Bounded pool of shared SSH connections.
+
+    Executors hold a lease on a connection between connect() and disconnect()
+    and take a channel slot around every command, so any number of executors
+    can share one connection without exceeding its session limit.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 64,
+        max_channels_per_host: int = 8,
+        idle_ttl: float = 300,
+        max_lifetime: float = 3600,
+        health_check_interval: float = 30.0,
+        acquire_timeout: float = 30.0
+    ):
+        """
+        Initialize the pool.
+
+        Args:
+            max_connections: Open connections allowed across all hosts
+            max_channels_per_host: Concurrent sessions per connection
+            idle_ttl: Seconds an unused connection is kept open
+            max_lifetime: Seconds after which an idle connection is recycled
+            health_check_interval: Idle seconds before a connection is probed on reuse
+            acquire_timeout: Seconds to wait for capacity when the pool is full
+        """
+        self.max_connections = max_connections
+        self.max_channels_per_host = max_channels_per_host
+        self.idle_ttl = idle_ttl
+        self.max_lifetime = max_lifetime
+        self.health_check_interval = health_check_interval
+        self.acquire_timeout = acquire_timeout
+
+        # LRU order: least recently used first
+        self._entries: "OrderedDict[str, PooledConnection]" = OrderedDict()
+        self._opening: Dict[str, asyncio.Future] = {}
+        self._capacity: Optional[asyncio.Event] = None
+        self._reaper: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _capacity_event(self) -> asyncio.Event:
+        if self._capacity is None:
+            self._capacity = asyncio.Event()
+        return self._capacity
+
+    def _notify(self) -> None:
+        """Wake callers waiting for pool capacity."""
+        if self._capacity is not None:
+            self._capacity.set()
+            self._capacity = None
+
+    async def acquire(
+        self,
+        key: str,
+        opener: Callable[[], Awaitable[asyncssh.SSHClientConnection]]
+    ) -> PooledConnection:
+        """
+        Lease a connection for ``key``, opening one with ``opener`` if needed.
+
+        Concurrent misses for the same key share a single handshake.
+
+        Raises:
+            ConnectionError: If the handshake fails or no capacity frees up in time.
+        """
+        deadline = time.monotonic() + self.acquire_timeout
+
+        while True:
+            self._evict_expired()
+
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.closed:
+                    self._discard(entry, "closed")
+                    continue
+                if not await self._healthy(entry):
+                    self._discard(entry, "unhealthy")
+                    continue
+                SSH_POOL_REQUESTS.labels(result="hit").inc()
+                entry.leases += 1
+                entry.last_used = time.monotonic()
+                self._entries.move_to_end(key)
+                return entry
+
+            pending = self._opening.get(key)
+            if pending is not None:
+                # Another caller is already handshaking with this host
+                try:
+                    await asyncio.shield(pending)
+                except asyncio.CancelledError:
+                    if not pending.cancelled():
+                        raise
+                continue
+
+            if len(self._entries) + len(self._opening) >= self.max_connections:
+                if self._evict_lru():
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise ConnectionError(
+                        f"SSH connection pool exhausted ({self.max_connections} connections in use)"
+                    )
+                try:
+                    await asyncio.wait_for(self._capacity_event().wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            SSH_POOL_REQUESTS.labels(result="miss").inc()
+            return await self._open(key, opener)
+
+    async def _open(
+        self,
+        key: str,
+        opener: Callable[[], Awaitable[asyncssh.SSHClientConnection]]
+    ) -> PooledConnection:
+        """Handshake a new connection and register it, leased once."""
+        future = asyncio.get_running_loop().create_future()
+        self._opening[key] = future
+        start = time.perf_counter()
+        try:
+            conn = await opener()
+        except asyncio.CancelledError:
+            self._opening.pop(key, None)
+            future.cancel()
+            self._notify()
+            raise
+        except Exception as e:
+            self._opening.pop(key, None)
+            future.set_exception(e)
+            future.exception()  # waiters re-raise it; don't warn when there are none
+            self._notify()
+            raise
+
+        SSH_HANDSHAKE_DURATION.observe(time.perf_counter() - start)
+        entry = PooledConnection(key, conn, self.max_channels_per_host)
+        entry.watch()
+        entry.leases = 1
+        self._entries[key] = entry
+        self._opening.pop(key, None)
+        SSH_POOL_CONNECTIONS.set(len(self._entries))
+        future.set_result(None)
+        self._ensure_reaper()
+        return entry
+
+    async def release(self, entry: PooledConnection, discard: bool = False) -> None:
+        """Return a lease; ``discard`` closes the connection for everyone."""
+        entry.leases = max(0, entry.leases - 1)
+        entry.last_used = time.monotonic()
+        if discard or entry.closed:
+            self._discard(entry, "closed" if entry.closed else "unhealthy")
+        else:
+            self._notify()
+
+    @asynccontextmanager
+    async def channel(self, entry: PooledConnection):
+        """Hold one of the connection's session slots."""
+        async with entry.channels:
+            entry.channels_in_use += 1
+            SSH_POOL_CHANNELS_IN_USE.inc()
+            try:
+                yield entry.conn
+            finally:
+                entry.channels_in_use -= 1
+                entry.last_used = time.monotonic()
+                SSH_POOL_CHANNELS_IN_USE.dec()
+
+    async def _healthy(self, entry: PooledConnection) -> bool:
+        """Probe a connection that has sat idle longer than the check interval."""
+        now = time.monotonic()
+        last_seen = max(entry.last_checked, entry.last_used)
+        if not entry.idle or now - last_seen < self.health_check_interval:
+            return True
+        try:
+            async with self.channel(entry) as conn:
+                result = await asyncio.wait_for(
+                    conn.run("true", check=False), timeout=HEALTH_PROBE_TIMEOUT
+                )
+            healthy = result.exit_status == 0
+        except Exception as e:
+            logger.info(f"SSH pool health probe failed for {entry.key}: {e}")
+            healthy = False
+        entry.last_checked = time.monotonic()
+        return healthy and not entry.closed
+
+    def _evict_expired(self) -> None:
+        """Close idle connections past their idle TTL or lifetime."""
+        now = time.monotonic()
+        for entry in list(self._entries.values()):
+            if not entry.idle:
+                continue
+            if entry.closed:
+                self._discard(entry, "closed")
+            elif now - entry.last_used > self.idle_ttl:
+                self._discard(entry, "idle")
+            elif now - entry.created_at > self.max_lifetime:
+                self._discard(entry, "lifetime")
+
+    def _evict_lru(self) -> bool:
+        """Close the least recently used idle connection to make room."""
+        for entry in self._entries.values():
+            if entry.idle:
+                self._discard(entry, "capacity")
+                return True
+        return False
+
+    def _discard(self, entry: PooledConnection, reason: str) -> None:
+        """Drop a connection from the pool and close it."""
+        if self._entries.get(entry.key) is entry:
+            del self._entries[entry.key]
+            SSH_POOL_EVICTIONS.labels(reason=reason).inc()
+            SSH_POOL_CONNECTIONS.set(len(self._entries))
+            logger.debug(f"SSH pool closed {entry.key} ({reason})")
+        entry.closed = True
+        try:
+            entry.conn.close()
+        except Exception as e:
+            logger.debug(f"Error closing pooled SSH connection {entry.key}: {e}")
+        self._notify()
+
+    def _ensure_reaper(self) -> None:
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.create_task(self._reap())
+
+    async def _reap(self) -> None:
+        """Evict expired connections in the background until the pool is empty."""
+        interval = max(1.0, min(self.idle_ttl, self.max_lifetime) / 2)
+        while self._entries:
+            await asyncio.sleep(interval)
+            try:
+                self._evict_expired()
+            except Exception as e:
+                logger.warning(f"SSH pool reaper error: {e}")
+
+    async def close_all(self) -> None:
+        """Close every pooled connection, including ones still leased."""
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+        for entry in list(self._entries.values()):
+            self._discard(entry, "shutdown")
+
+    def stats(self) -> Dict[str, int]:
+        """Snapshot of pool usage."""
+        return {
+            "connections": len(self._entries),
+            "opening": len(self._opening),
+            "leased": sum(1 for e in self._entries.values() if e.leases),
+            "channels_in_use": sum(e.channels_in_use for e in self._entries.values()),
+        }
+
+
+# Process-wide pool
+_pool: Optional[SSHConnectionPool] = None
+
+
+def get_ssh_pool() -> SSHConnectionPool:
+    """Get the shared SSH connection pool, creating it from settings."""
+    global _pool
+    if _pool is None:
+        settings = get_settings()
+        _pool = SSHConnectionPool(
+            max_connections=settings.ssh_pool_max_connections,
+            max_channels_per_host=settings.ssh_pool_max_channels_per_host,
+            idle_ttl=settings.ssh_pool_idle_ttl_seconds,
+            max_lifetime=settings.ssh_pool_max_lifetime_seconds,
+            health_check_interval=settings.ssh_pool_health_check_interval,
+            acquire_timeout=settings.ssh_pool_acquire_timeout,
+        )
+    return _pool
+
+
+async def close_ssh_pool() -> None:
+    """Close the shared pool's connections."""
+    global _pool
+    if _pool is not None:
+        await _pool.close_all()
+        _pool = None
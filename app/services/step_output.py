@@ -0,0 +1,296 @@
+"""
+Step Output Store
+
+Streams runbook step output into append-only ``step_output_chunks`` rows
+while the command runs, instead of buffering it and writing one huge row
+when the step finishes.
+
+Retention is head + tail: the first ``step_output_head_chars`` of a step's
+output are always kept, and so are the most recent ``step_output_tail_chars``.
+Chunks that fall between the two are deleted as newer output arrives, so
+storage per step is bounded however much a command prints.
+
+Live viewers are woken in-process when a chunk is written; they read the
+chunks themselves from Postgres, so viewers on other replicas still see
+output by polling.
+"""
+
+import asyncio
+import logging
+import uuid
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import select, insert, delete, func, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import get_settings
+from ..database import async_session_factory
+from ..metrics import STEP_OUTPUT_CHARS, STEP_OUTPUT_DROPPED_CHARS
+from ..models_remediation import StepExecution, StepOutputChunk
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched per range read; chunks are at most step_output_chunk_chars long
+RANGE_READ_MAX_CHUNKS = 256
+
+
+class StepOutputWriter:
+    """
+    Buffers one step's output and appends it as chunks.
+
+    Output is flushed when a chunk fills up, when the stream switches
+    between stdout and stderr, and ``flush_interval`` after the first
+    unflushed write, so slow producers still show up promptly.
+    """
+
+    def __init__(
+        self,
+        step_execution_id: uuid.UUID,
+        execution_id: uuid.UUID,
+        session_factory=async_session_factory,
+        head_chars: Optional[int] = None,
+        tail_chars: Optional[int] = None,
+        chunk_chars: Optional[int] = None,
+        flush_interval: Optional[float] = None
+    ):
+        """
+        Initialize the writer.
+
+        Args:
+            step_execution_id: StepExecution the output belongs to
+            execution_id: Parent execution, used to wake live viewers
+            session_factory: Async session factory; each flush is its own transaction
+            head_chars: Characters always kept from the start
+            tail_chars: Characters kept from the end
+            chunk_chars: Maximum characters per chunk
+            flush_interval: Seconds buffered output may wait before being written
+        """
+        settings = get_settings()
+        self.step_execution_id = step_execution_id
+        self.execution_id = execution_id
+        self.session_factory = session_factory
+        self.head_chars = settings.step_output_head_chars if head_chars is None else head_chars
+        self.tail_chars = settings.step_output_tail_chars if tail_chars is None else tail_chars
+        self.chunk_chars = chunk_chars or settings.step_output_chunk_chars
+        self.flush_interval = settings.step_output_flush_interval if flush_interval is None else flush_interval
+
+        self.total = 0
+        self.dropped = 0
+        self._seq = 0
+        self._stream: Optional[str] = None
+        self._pending: List[str] = []
+        self._pending_len = 0
+        # (seq, offset, length) of stored chunks past the head, oldest first
+        self._tail: Deque[Tuple[int, int, int]] = deque()
+        self._lock = asyncio.Lock()
+        self._timer: Optional[asyncio.Task] = None
+
+    async def write(self, stream: str, text: str) -> None:
+        """Append output from ``stream`` ("stdout" or "stderr")."""
+        if not text:
+            return
+        if self._pending and stream != self._stream:
+            await self.flush()
+        self._stream = stream
+
+        while text:
+            room = self.chunk_chars - self._pending_len
+            piece, text = text[:room], text[room:]
+            self._pending.append(piece)
+            self._pending_len += len(piece)
+            if self._pending_len >= self.chunk_chars:
+                await self.flush()
+
+        if self._pending and self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.flush_interval)
+        self._timer = None
+        await self.flush()
+
+    async def flush(self) -> None:
+        """Write buffered output as one chunk and drop chunks that left the tail."""
+        async with self._lock:
+            if not self._pending:
+                return
+            content = "".join(self._pending)
+            stream = self._stream
+            self._pending = []
+            self._pending_len = 0
+
+            # Offsets, seq and the tail only advance once the chunk is stored,
+            # so a failed write leaves no gap and no phantom tail entry
+            offset = self.total
+            seq = self._seq
+            total = offset + len(content)
+
+            tail = list(self._tail)
+            if offset >= self.head_chars:
+                tail.append((seq, offset, len(content)))
+            expired = [
+                (old_seq, old_length) for old_seq, old_offset, old_length in tail
+                if old_offset + old_length <= total - self.tail_chars
+            ]
+
+            try:
+                async with self.session_factory() as db:
+                    await db.execute(
+                        insert(StepOutputChunk).values(
+                            step_execution_id=self.step_execution_id,
+                            seq=seq,
+                            stream=stream,
+                            offset=offset,
+                            length=len(content),
+                            content=content
+                        )
+                    )
+                    if expired:
+                        await db.execute(
+                            delete(StepOutputChunk).where(
+                                and_(
+                                    StepOutputChunk.step_execution_id == self.step_execution_id,
+                                    StepOutputChunk.seq.in_([old_seq for old_seq, _ in expired])
+                                )
+                            )
+                        )
+                    await db.commit()
+            except Exception as e:
+                logger.warning(f"Could not store output for step {self.step_execution_id}: {e}")
+                return
+
+            self.total = total
+            self._seq += 1
+            self._tail = deque(tail[len(expired):])
+            for _, old_length in expired:
+                self.dropped += old_length
+                STEP_OUTPUT_DROPPED_CHARS.inc(old_length)
+            STEP_OUTPUT_CHARS.labels(stream=stream).inc(len(content))
+            publish_output(self.execution_id)
+
+    async def close(self) -> Tuple[int, int]:
+        """Flush what is left; returns (total characters, dropped characters)."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        await self.flush()
+        return self.total, self.dropped
+
+
+# =============================================================================
+# Live viewers
+# =============================================================================
+
+_listeners: Dict[uuid.UUID, Set[asyncio.Event]] = {}
+
+
+def publish_output(execution_id: uuid.UUID) -> None:
+    """Wake viewers of an execution in this process."""
+    for event in _listeners.get(execution_id, ()):
+        event.set()
+
+
+@asynccontextmanager
+async def subscribe_output(execution_id: uuid.UUID):
+    """Yield an Event that is set whenever new output for the execution is stored."""
+    event = asyncio.Event()
+    _listeners.setdefault(execution_id, set()).add(event)
+    try:
+        yield event
+    finally:
+        listeners = _listeners.get(execution_id)
+        if listeners is not None:
+            listeners.discard(event)
+            if not listeners:
+                del _listeners[execution_id]
+
+
+# =============================================================================
+# Reads
+# =============================================================================
+
+async def read_new_chunks(
+    db: AsyncSession,
+    execution_id: uuid.UUID,
+    after_id: int = 0,
+    limit: int = RANGE_READ_MAX_CHUNKS
+) -> List[Tuple[StepOutputChunk, int]]:
+    """Chunks of an execution stored after ``after_id``, with their step order."""
+    result = await db.execute(
+        select(StepOutputChunk, StepExecution.step_order)
+        .join(StepExecution, StepExecution.id == StepOutputChunk.step_execution_id)
+        .where(
+            and_(
+                StepExecution.execution_id == execution_id,
+                StepOutputChunk.id > after_id
+            )
+        )
+        .order_by(StepOutputChunk.id)
+        .limit(limit)
+    )
+    return [(chunk, step_order) for chunk, step_order in result.all()]
+
+
+async def read_output_range(
+    db: AsyncSession,
+    step_execution_id: uuid.UUID,
+    offset: int = 0,
+    limit: int = 65536,
+    stream: Optional[str] = None
+) -> Dict:
+    """
+    Read up to ``limit`` characters of a step's output starting at ``offset``.
+
+    Ranges that start inside the dropped middle resume at the first kept
+    character after it; ``next_offset`` is where the following read starts.
+    ``stored_end`` is the end of all stored output and ``stream_end`` the
+    end of the requested stream's (the same when no stream is given).
+    """
+    conditions = [
+        StepOutputChunk.step_execution_id == step_execution_id,
+        StepOutputChunk.offset + StepOutputChunk.length > offset,
+    ]
+    if stream:
+        conditions.append(StepOutputChunk.stream == stream)
+
+    result = await db.execute(
+        select(StepOutputChunk)
+        .where(and_(*conditions))
+        .order_by(StepOutputChunk.seq)
+        .limit(RANGE_READ_MAX_CHUNKS)
+    )
+
+    chunks = []
+    remaining = limit
+    next_offset = offset
+    for chunk in result.scalars():
+        if remaining <= 0:
+            break
+        start = max(offset, chunk.offset) - chunk.offset
+        content = chunk.content[start:start + remaining]
+        chunks.append({
+            "seq": chunk.seq,
+            "stream": chunk.stream,
+            "offset": chunk.offset + start,
+            "content": content,
+        })
+        remaining -= len(content)
+        next_offset = chunk.offset + start + len(content)
+
+    # Offsets are shared by both streams, so a stream's output ends where
+    # its last stored chunk does
+    chunk_end = StepOutputChunk.offset + StepOutputChunk.length
+    stream_end = func.max(chunk_end).filter(StepOutputChunk.stream == stream) if stream else func.max(chunk_end)
+    end, stream_end = (await db.execute(
+        select(func.max(chunk_end), stream_end)
+        .where(StepOutputChunk.step_execution_id == step_execution_id)
+    )).one()
+
+    return {
+        "chunks": chunks,
+        "next_offset": next_offset,
+        "stored_end": end or 0,
+        "stream_end": stream_end or 0,
+    }
@@ -12,6 +12,8 @@ from typing import List, Dict, Optional, Any
 from pydantic import BaseModel
 import logging
 
+from app.services.http_clients import get_http_client
+
 logger = logging.getLogger(__name__)
 
 
@@ -73,6 +75,11 @@ class TempoClient:
         self.timeout = timeout
         self.base_url = self.url.rstrip("/")
 
+    @property
+    def _http(self) -> httpx.AsyncClient:
+        """Pooled HTTP client shared by all clients of this Tempo server"""
+        return get_http_client("tempo", self.base_url)
+
     async def get_trace(self, trace_id: str) -> Optional[Trace]:
         """
         Retrieve a trace by its ID.
@@ -89,8 +96,7 @@ class TempoClient:
         url = f"{self.base_url}/api/traces/{trace_id}"
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(url)
+            response = await self._http.get(url, timeout=self.timeout)
 
             if response.status_code == 404:
                 logger.info(f"Trace {trace_id} not found")
@@ -190,8 +196,7 @@ class TempoClient:
             params["q"] = "{" + " && ".join(query_parts) + "}"
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(url, params=params)
+            response = await self._http.get(url, params=params, timeout=self.timeout)
 
             if response.status_code >= 400:
                 raise Exception(f"Tempo search_traces failed: {response.status_code}")
@@ -250,8 +255,7 @@ class TempoClient:
             params["end"] = int(end.timestamp())
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(url, params=params)
+            response = await self._http.get(url, params=params, timeout=self.timeout)
 
             if response.status_code >= 400:
                 raise Exception(f"Tempo get_tag_names failed: {response.status_code}")
@@ -300,8 +304,7 @@ class TempoClient:
             params["end"] = int(end.timestamp())
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(url, params=params)
+            response = await self._http.get(url, params=params, timeout=self.timeout)
 
             if response.status_code >= 400:
                 raise Exception(f"Tempo get_tag_values failed: {response.status_code}")
@@ -334,14 +337,13 @@ class TempoClient:
         url = f"{self.base_url}/ready"
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(url)
-                if response.status_code == 200:
-                    logger.info("Tempo connection successful")
-                    return True
-                else:
-                    logger.warning(f"Tempo not ready: {response.status_code}")
-                    return False
+            response = await self._http.get(url, timeout=self.timeout)
+            if response.status_code == 200:
+                logger.info("Tempo connection successful")
+                return True
+            else:
+                logger.warning(f"Tempo not ready: {response.status_code}")
+                return False
         except Exception as e:
             logger.error(f"Tempo connection failed: {str(e)}")
             return False
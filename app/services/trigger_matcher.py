@@ -6,15 +6,17 @@ Handles trigger conditions, execution mode selection, and runbook invocation.
 """
 
 import re
+import time
 import logging
-from typing import List, Optional, Dict, Any, Tuple
+from typing import List, Optional, Dict, Any, Tuple, Sequence, Iterator
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
+from uuid import UUID
 import json
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, and_, or_, func, any_
+from sqlalchemy.orm import selectinload, contains_eager
 
 from ..models import Alert, User
 from ..models_remediation import (
@@ -26,6 +28,7 @@ from ..models_remediation import (
     ExecutionRateLimit
 )
 from ..models import ServerCredential
+from .execution_worker import notify_execution_ready
 
 logger = logging.getLogger(__name__)
 
@@ -51,60 +54,322 @@ class MatchResult:
     blocked: List[Tuple[TriggerMatch, str]]
 
 
+@dataclass
+class RunbookSafetyState:
+    """Circuit breaker, blackout and rate-limit state of one runbook."""
+    circuit_state: Optional[str] = None
+    circuit_closes_at: Optional[datetime] = None
+    blackout_name: Optional[str] = None
+    auto_only_blackout_name: Optional[str] = None
+    recent_executions: int = 0
+    last_queued_at: Optional[datetime] = None
+
+
+TRIGGER_INDEX_TTL_SECONDS = 30  # Safety net for edits made through another replica
+
+# Characters that make a trigger pattern a regex rather than a plain literal
+_REGEX_META = frozenset(".^$*+?{}[]\\|()")
+
+_PATTERN_FIELDS = (
+    ("alert_name", "alert_name_pattern"),
+    ("severity", "severity_pattern"),
+    ("instance", "instance_pattern"),
+    ("job", "job_pattern"),
+)
+
+
+def _literal_key(pattern: Optional[str]) -> Optional[str]:
+    """
+    Return the lowercased pattern if it is a plain literal, else None.
+
+    Patterns are applied with ``re.match`` (anchored at the start only), so a
+    literal pattern matches every value that starts with it, ignoring case.
+    """
+    if not pattern or pattern == '*' or any(c in _REGEX_META for c in pattern):
+        return None
+    return pattern.lower()
+
+
+class CompiledTrigger:
+    """An enabled trigger with its patterns compiled once, detached from any session."""
+
+    __slots__ = (
+        "trigger_id", "runbook_id", "priority", "position",
+        "name_key", "severity_key", "patterns", "label_matchers", "valid",
+    )
+
+    def __init__(self, trigger: RunbookTrigger, position: int):
+        self.trigger_id = trigger.id
+        self.runbook_id = trigger.runbook_id
+        self.priority = trigger.priority if trigger.priority is not None else 100
+        self.position = position
+        self.name_key = _literal_key(trigger.alert_name_pattern)
+        self.severity_key = _literal_key(trigger.severity_pattern)
+        self.label_matchers = dict(trigger.label_matchers_json or {})
+        self.patterns: List[Tuple[str, "re.Pattern"]] = []
+        self.valid = True
+
+        for field, attr in _PATTERN_FIELDS:
+            pattern = getattr(trigger, attr)
+            if not pattern or pattern == '*':
+                continue
+            try:
+                self.patterns.append(
+                    (field, re.compile(pattern.replace('*', '.*'), re.IGNORECASE))
+                )
+            except re.error as e:
+                logger.error(f"Invalid {field} pattern in trigger {trigger.id}: {e}")
+                self.valid = False
+                break
+
+    def evaluate(self, fields: Dict[str, str], labels: Dict[str, Any]) -> Optional[List[str]]:
+        """Return the matched conditions, or None if the trigger does not match."""
+        if not self.valid:
+            return None
+
+        conditions = []
+        for field, regex in self.patterns:
+            value = fields[field]
+            if not regex.match(value):
+                return None
+            conditions.append(f"{field}: {value}")
+
+        if self.label_matchers:
+            for key, value in self.label_matchers.items():
+                if key not in labels:
+                    return None
+                if value != '*' and labels.get(key) != value:
+                    return None
+            conditions.append("labels matched")
+
+        return conditions
+
+
+class TriggerIndex:
+    """
+    Enabled triggers bucketed so an alert only evaluates plausible candidates.
+
+    - Literal alert-name patterns are keyed by name; a lookup probes each
+      prefix of the alert name, so cost depends on name length, not trigger count
+    - Remaining triggers with a literal severity are keyed by severity
+    - Everything else (regex/wildcard name and severity) is scanned per alert
+    """
+
+    def __init__(self, triggers: Sequence[RunbookTrigger]):
+        self.by_name: Dict[str, List[CompiledTrigger]] = {}
+        self.by_severity: Dict[str, List[CompiledTrigger]] = {}
+        self.scan: List[CompiledTrigger] = []
+        self.built_at = time.monotonic()
+
+        for position, trigger in enumerate(triggers):
+            compiled = CompiledTrigger(trigger, position)
+            if not compiled.valid:
+                continue
+            if compiled.name_key:
+                self.by_name.setdefault(compiled.name_key, []).append(compiled)
+            elif compiled.severity_key:
+                self.by_severity.setdefault(compiled.severity_key, []).append(compiled)
+            else:
+                self.scan.append(compiled)
+
+        self._name_key_len = max(map(len, self.by_name), default=0)
+        self._severity_key_len = max(map(len, self.by_severity), default=0)
+
+    def __len__(self):
+        return (
+            sum(map(len, self.by_name.values()))
+            + sum(map(len, self.by_severity.values()))
+            + len(self.scan)
+        )
+
+    @staticmethod
+    def _probe(
+        buckets: Dict[str, List[CompiledTrigger]],
+        max_len: int,
+        value: str
+    ) -> Iterator[CompiledTrigger]:
+        value = value.lower()
+        for end in range(1, min(len(value), max_len) + 1):
+            bucket = buckets.get(value[:end])
+            if bucket:
+                yield from bucket
+
+    def candidates(self, alert_name: str, severity: str) -> List[CompiledTrigger]:
+        """Triggers that could match an alert with this name and severity."""
+        found = list(self._probe(self.by_name, self._name_key_len, alert_name))
+        found.extend(self._probe(self.by_severity, self._severity_key_len, severity))
+        found.extend(self.scan)
+        return found
+
+    def match(
+        self,
+        alert_name: str,
+        severity: str,
+        instance: str,
+        job: str,
+        labels: Dict[str, Any]
+    ) -> List[Tuple[CompiledTrigger, List[str]]]:
+        """Return (trigger, matched_conditions) pairs in priority order."""
+        fields = {
+            "alert_name": alert_name,
+            "severity": severity,
+            "instance": instance,
+            "job": job,
+        }
+        matched = []
+        for compiled in self.candidates(alert_name, severity):
+            conditions = compiled.evaluate(fields, labels)
+            if conditions is not None:
+                matched.append((compiled, conditions))
+        matched.sort(key=lambda m: m[0].position)
+        return matched
+
+
+_trigger_index: Optional[TriggerIndex] = None
+
+
+def invalidate_trigger_index() -> None:
+    """Drop the cached trigger index. Call after any trigger or runbook edit."""
+    global _trigger_index
+    _trigger_index = None
+
+
+async def get_trigger_index(db: AsyncSession) -> TriggerIndex:
+    """Return the cached trigger index, rebuilding it if stale."""
+    global _trigger_index
+    index = _trigger_index
+    if index is None or time.monotonic() - index.built_at >= TRIGGER_INDEX_TTL_SECONDS:
+        result = await db.execute(
+            select(RunbookTrigger)
+            .join(RunbookTrigger.runbook)
+            .where(
+                and_(
+                    RunbookTrigger.enabled == True,
+                    Runbook.enabled == True
+                )
+            )
+            .order_by(RunbookTrigger.priority.asc(), RunbookTrigger.created_at.asc())
+        )
+        index = TriggerIndex(result.scalars().all())
+        _trigger_index = index
+    return index
+
+
+def evaluate_safety_state(
+    runbook: Runbook,
+    state: RunbookSafetyState,
+    now: datetime
+) -> Tuple[bool, Optional[str]]:
+    """
+    Decide whether a runbook may execute given its current safety state.
+
+    Returns:
+        Tuple of (allowed, reason if blocked).
+    """
+    if state.circuit_state == "open":
+        return False, f"Circuit breaker is open until {state.circuit_closes_at}"
+
+    if state.blackout_name:
+        return False, f"Blackout window active: {state.blackout_name}"
+
+    # "auto_only" windows hold back fully automatic runs; runbooks that wait
+    # for approval still go through
+    if state.auto_only_blackout_name and runbook.auto_execute and not runbook.approval_required:
+        return False, f"Blackout window active: {state.auto_only_blackout_name}"
+
+    if runbook.max_executions_per_hour and state.recent_executions >= runbook.max_executions_per_hour:
+        return False, (
+            f"Rate limit exceeded: {state.recent_executions}/{runbook.max_executions_per_hour} "
+            f"executions in the last hour"
+        )
+
+    if runbook.cooldown_minutes and state.last_queued_at:
+        cooldown_end = state.last_queued_at + timedelta(minutes=runbook.cooldown_minutes)
+        if now < cooldown_end:
+            remaining = int((cooldown_end - now).total_seconds() / 60)
+            return False, f"Cooldown period active: {remaining} minutes remaining"
+
+    return True, None
+
+
 class AlertTriggerMatcher:
     """
     Matches incoming alerts to configured runbook triggers.
-    
+
     Handles:
     - Pattern matching (regex, exact, contains, severity-based)
     - Execution mode determination
     - Safety checks (blackout, circuit breaker, rate limiting)
     - Variable extraction from alerts
     """
-    
+
     def __init__(self, db: AsyncSession):
         """
         Initialize the matcher.
-        
+
         Args:
             db: Database session.
         """
         self.db = db
-    
+
     async def match_alert(self, alert: Alert) -> MatchResult:
         """
         Find all matching triggers for an alert.
-        
+
+        Candidates come from the cached trigger index; only the matched
+        triggers are loaded, and their safety state is fetched in one query.
+
         Args:
             alert: The alert to match.
-        
+
         Returns:
             MatchResult with all matching triggers categorized.
         """
+        alert_name = getattr(alert, 'alert_name', alert.name if hasattr(alert, 'name') else '')
+        alert_labels = getattr(alert, 'labels_json', {}) or {}
+
+        index = await get_trigger_index(self.db)
+        matched = index.match(
+            alert_name or '',
+            getattr(alert, 'severity', '') or '',
+            getattr(alert, 'instance', '') or '',
+            getattr(alert, 'job', '') or '',
+            alert_labels
+        )
+
+        # Keep the highest priority (lowest number) trigger per runbook;
+        # index matches are already in priority order
+        best: Dict[UUID, Tuple[CompiledTrigger, List[str]]] = {}
+        for compiled, conditions in matched:
+            best.setdefault(compiled.runbook_id, (compiled, conditions))
+
         matches: List[TriggerMatch] = []
-        
-        # Get all enabled triggers with their runbooks
-        result = await self.db.execute(
-            select(RunbookTrigger)
-            .options(selectinload(RunbookTrigger.runbook))
-            .where(
-                and_(
-                    RunbookTrigger.enabled == True,
-                    RunbookTrigger.runbook.has(enabled=True)
+        if best:
+            # The index may be up to TRIGGER_INDEX_TTL_SECONDS old, so re-check enabled flags
+            result = await self.db.execute(
+                select(RunbookTrigger)
+                .join(RunbookTrigger.runbook)
+                .options(contains_eager(RunbookTrigger.runbook))
+                .where(
+                    and_(
+                        RunbookTrigger.id.in_([c.trigger_id for c, _ in best.values()]),
+                        RunbookTrigger.enabled == True,
+                        Runbook.enabled == True
+                    )
                 )
             )
-        )
-        triggers = result.scalars().all()
-        
-        for trigger in triggers:
-            match_details = self._evaluate_conditions(trigger, alert)
-            
-            if match_details["matched"]:
-                # Check if execution is allowed
-                can_execute, block_reason = await self._check_execution_allowed(
-                    trigger.runbook
-                )
-                
+            triggers = {t.id: t for t in result.scalars().unique().all()}
+            allowed = await self._check_execution_allowed_many(
+                [t.runbook for t in triggers.values()]
+            )
+            variables = self._extract_variables(alert)
+
+            for compiled, conditions in best.values():
+                trigger = triggers.get(compiled.trigger_id)
+                if trigger is None:
+                    continue
+                can_execute, block_reason = allowed[trigger.runbook_id]
+
                 # Determine execution mode from runbook settings
                 if trigger.runbook.auto_execute:
                     execution_mode = "auto"
@@ -112,49 +377,37 @@ class AlertTriggerMatcher:
                     execution_mode = "semi_auto"
                 else:
                     execution_mode = "manual"
-                
-                match = TriggerMatch(
+
+                matches.append(TriggerMatch(
                     trigger=trigger,
                     runbook=trigger.runbook,
-                    match_details=match_details,
+                    match_details={
+                        "matched": True,
+                        "matched_conditions": conditions,
+                        "extracted_variables": dict(variables)
+                    },
                     execution_mode=execution_mode,
                     can_execute=can_execute,
                     block_reason=block_reason
-                )
-                matches.append(match)
-        
-        # Deduplicate matches by runbook_id, picking highest priority (lowest number)
-        unique_matches = {}
-        for m in matches:
-            rb_id = m.runbook.id
-            if rb_id not in unique_matches:
-                unique_matches[rb_id] = m
-            else:
-                # Compare priority (lower is better)
-                curr_p = getattr(m.trigger, 'priority', 100)
-                best_p = getattr(unique_matches[rb_id].trigger, 'priority', 100)
-                if curr_p < best_p:
-                    unique_matches[rb_id] = m
-        
-        matches = list(unique_matches.values())
+                ))
 
         # Categorize matches
         auto_execute = [
-            m for m in matches 
+            m for m in matches
             if m.execution_mode == "auto" and m.can_execute
         ]
-        
+
         needs_approval = [
-            m for m in matches 
+            m for m in matches
             if m.execution_mode == "semi_auto" and m.can_execute
         ]
-        
+
         blocked = [
             (m, m.block_reason or "Unknown reason")
-            for m in matches 
+            for m in matches
             if not m.can_execute
         ]
-        
+
         return MatchResult(
             alert_id=alert.id,
             matches=matches,
@@ -162,208 +415,153 @@ class AlertTriggerMatcher:
             needs_approval=needs_approval,
             blocked=blocked
         )
-    
-    def _evaluate_conditions(
-        self,
-        trigger: RunbookTrigger,
-        alert: Alert
-    ) -> Dict[str, Any]:
+
+    def _extract_variables(self, alert: Alert) -> Dict[str, Any]:
         """
-        Evaluate if trigger conditions match the alert.
-        
+        Extract runbook variables from an alert.
+
         Args:
-            trigger: The trigger to evaluate.
-            alert: The alert to check against.
-        
+            alert: The matched alert.
+
         Returns:
-            Dict with matched status and extracted variables.
+            Dict of variables, including alert labels prefixed with ``alert_label_``.
         """
-        result = {
-            "matched": False,
-            "matched_conditions": [],
-            "extracted_variables": {}
-        }
-        
-        # Get alert fields
-        alert_name = getattr(alert, 'alert_name', alert.name if hasattr(alert, 'name') else '')
-        alert_severity = getattr(alert, 'severity', '')
-        alert_instance = getattr(alert, 'instance', '')
-        alert_job = getattr(alert, 'job', '')
         alert_labels = getattr(alert, 'labels_json', {}) or {}
-        
-        # Check alert name pattern
-        if trigger.alert_name_pattern and trigger.alert_name_pattern != '*':
-            pattern = trigger.alert_name_pattern.replace('*', '.*')
-            try:
-                if not re.match(pattern, alert_name, re.IGNORECASE):
-                    return result
-                result["matched_conditions"].append(f"alert_name: {alert_name}")
-            except re.error as e:
-                logger.error(f"Invalid alert_name pattern in trigger {trigger.id}: {e}")
-                return result
-        
-        # Check severity pattern
-        if trigger.severity_pattern and trigger.severity_pattern != '*':
-            pattern = trigger.severity_pattern.replace('*', '.*')
-            try:
-                if not re.match(pattern, alert_severity, re.IGNORECASE):
-                    return result
-                result["matched_conditions"].append(f"severity: {alert_severity}")
-            except re.error as e:
-                logger.error(f"Invalid severity pattern in trigger {trigger.id}: {e}")
-                return result
-        
-        # Check instance pattern
-        if trigger.instance_pattern and trigger.instance_pattern != '*':
-            pattern = trigger.instance_pattern.replace('*', '.*')
-            try:
-                if not re.match(pattern, alert_instance, re.IGNORECASE):
-                    return result
-                result["matched_conditions"].append(f"instance: {alert_instance}")
-            except re.error as e:
-                logger.error(f"Invalid instance pattern in trigger {trigger.id}: {e}")
-                return result
-        
-        # Check job pattern
-        if trigger.job_pattern and trigger.job_pattern != '*':
-            pattern = trigger.job_pattern.replace('*', '.*')
-            try:
-                if not re.match(pattern, alert_job, re.IGNORECASE):
-                    return result
-                result["matched_conditions"].append(f"job: {alert_job}")
-            except re.error as e:
-                logger.error(f"Invalid job pattern in trigger {trigger.id}: {e}")
-                return result
-        
-        # Check label matchers
-        if trigger.label_matchers_json:
-            for key, value in trigger.label_matchers_json.items():
-                if key not in alert_labels:
-                    return result
-                if value != '*' and alert_labels.get(key) != value:
-                    return result
-            result["matched_conditions"].append(f"labels matched")
-        
-        # If we got here, all patterns matched
-        result["matched"] = True
-        
-        # Extract variables from alert
-        result["extracted_variables"] = {
+        variables = {
             "alert_id": str(alert.id),
-            "alert_name": alert_name,
-            "alert_severity": alert_severity,
-            "alert_instance": alert_instance,
-            "alert_job": alert_job,
+            "alert_name": getattr(alert, 'alert_name', alert.name if hasattr(alert, 'name') else ''),
+            "alert_severity": getattr(alert, 'severity', ''),
+            "alert_instance": getattr(alert, 'instance', ''),
+            "alert_job": getattr(alert, 'job', ''),
             "alert_source": getattr(alert, 'source', ''),
             "alert_timestamp": alert.timestamp.isoformat() if hasattr(alert, 'timestamp') and alert.timestamp else "",
         }
-        
+
         # Add alert labels as variables with prefix
         for key, value in alert_labels.items():
-            result["extracted_variables"][f"alert_label_{key}"] = str(value)
-        
-        return result
-    
+            variables[f"alert_label_{key}"] = str(value)
+
+        return variables
+
     async def _check_execution_allowed(
         self,
         runbook: Runbook
     ) -> Tuple[bool, Optional[str]]:
         """
         Check if runbook execution is currently allowed.
-        
+
+        Args:
+            runbook: The runbook to check.
+
+        Returns:
+            Tuple of (allowed, reason if blocked).
+        """
+        return (await self._check_execution_allowed_many([runbook]))[runbook.id]
+
+    async def _check_execution_allowed_many(
+        self,
+        runbooks: Sequence[Runbook]
+    ) -> Dict[UUID, Tuple[bool, Optional[str]]]:
+        """
+        Check whether each runbook may execute, in a single query.
+
         Checks:
         - Circuit breaker status
         - Blackout windows
         - Rate limiting
-        
+        - Cooldown period
+
         Args:
-            runbook: The runbook to check.
-        
+            runbooks: The runbooks to check.
+
         Returns:
-            Tuple of (allowed, reason if blocked).
+            Dict of runbook id -> (allowed, reason if blocked).
         """
+        if not runbooks:
+            return {}
+
         now = datetime.now(timezone.utc)
-        
-        # Check circuit breaker
-        circuit_result = await self.db.execute(
-            select(CircuitBreaker).where(
-                and_(
-                    CircuitBreaker.scope == "runbook",
-                    CircuitBreaker.scope_id == runbook.id
+        window_start = now - timedelta(hours=1)
+
+        def circuit_column(column):
+            return (
+                select(column)
+                .where(
+                    and_(
+                        CircuitBreaker.scope == "runbook",
+                        CircuitBreaker.scope_id == Runbook.id
+                    )
                 )
+                .limit(1)
+                .scalar_subquery()
             )
-        )
-        circuit = circuit_result.scalar_one_or_none()
-        
-        if circuit and circuit.state == "open":
-            return False, f"Circuit breaker is open until {circuit.closes_at}"
-        
-        # Check blackout windows
-        blackout_result = await self.db.execute(
-            select(BlackoutWindow).where(
+
+        def blackout_column(applies):
+            return (
+                select(BlackoutWindow.name)
+                .where(
+                    and_(
+                        BlackoutWindow.enabled == True,
+                        BlackoutWindow.start_time <= now,
+                        BlackoutWindow.end_time > now,
+                        applies
+                    )
+                )
+                .order_by(BlackoutWindow.end_time.desc())
+                .limit(1)
+                .scalar_subquery()
+            )
+
+        blackout_name = blackout_column(or_(
+            BlackoutWindow.applies_to == "all",
+            Runbook.id == any_(BlackoutWindow.applies_to_runbook_ids)
+        ))
+        auto_only_blackout_name = blackout_column(BlackoutWindow.applies_to == "auto_only")
+        recent_executions = (
+            select(func.count(RunbookExecution.id))
+            .where(
                 and_(
-                    BlackoutWindow.enabled == True,
-                    BlackoutWindow.start_time <= now,
-                    BlackoutWindow.end_time > now
+                    RunbookExecution.runbook_id == Runbook.id,
+                    RunbookExecution.queued_at >= window_start
                 )
             )
+            .scalar_subquery()
         )
-        blackouts = blackout_result.scalars().all()
-        
-        for blackout in blackouts:
-            # Check if this runbook is affected
-            affected = False
-            
-            if blackout.scope == "all":
-                affected = True
-            elif blackout.scope == "category" and blackout.affected_categories:
-                if runbook.category in blackout.affected_categories:
-                    affected = True
-            elif blackout.scope == "runbook" and blackout.affected_runbook_ids:
-                if runbook.id in blackout.affected_runbook_ids:
-                    affected = True
-            
-            if affected:
-                return False, f"Blackout window active: {blackout.name}"
-        
-        # Check rate limiting using runbook's own settings
-        if hasattr(runbook, 'max_executions_per_hour') and runbook.max_executions_per_hour:
-            # Calculate window start (1 hour ago)
-            window_start = now - timedelta(hours=1)
-            
-            # Count recent executions
-            exec_count_result = await self.db.execute(
-                select(RunbookExecution).where(
-                    and_(
-                        RunbookExecution.runbook_id == runbook.id,
-                        RunbookExecution.queued_at >= window_start
-                    )
-                )
+        last_queued_at = (
+            select(func.max(RunbookExecution.queued_at))
+            .where(RunbookExecution.runbook_id == Runbook.id)
+            .scalar_subquery()
+        )
+
+        result = await self.db.execute(
+            select(
+                Runbook.id,
+                circuit_column(CircuitBreaker.state).label("circuit_state"),
+                circuit_column(CircuitBreaker.closes_at).label("circuit_closes_at"),
+                blackout_name.label("blackout_name"),
+                auto_only_blackout_name.label("auto_only_blackout_name"),
+                recent_executions.label("recent_executions"),
+                last_queued_at.label("last_queued_at"),
             )
-            recent_executions = len(exec_count_result.scalars().all())
-            
-            if recent_executions >= runbook.max_executions_per_hour:
-                return False, f"Rate limit exceeded: {recent_executions}/{runbook.max_executions_per_hour} executions in the last hour"
-        
-        # Check cooldown period
-        if hasattr(runbook, 'cooldown_minutes') and runbook.cooldown_minutes:
-            # Get the most recent execution
-            last_exec_result = await self.db.execute(
-                select(RunbookExecution)
-                .where(RunbookExecution.runbook_id == runbook.id)
-                .order_by(RunbookExecution.queued_at.desc())
-                .limit(1)
+            .where(Runbook.id.in_({rb.id for rb in runbooks}))
+        )
+        states = {
+            row.id: RunbookSafetyState(
+                circuit_state=row.circuit_state,
+                circuit_closes_at=row.circuit_closes_at,
+                blackout_name=row.blackout_name,
+                auto_only_blackout_name=row.auto_only_blackout_name,
+                recent_executions=row.recent_executions or 0,
+                last_queued_at=row.last_queued_at,
             )
-            last_execution = last_exec_result.scalar_one_or_none()
-            
-            if last_execution and last_execution.queued_at:
-                cooldown_end = last_execution.queued_at + timedelta(minutes=runbook.cooldown_minutes)
-                if now < cooldown_end:
-                    remaining = int((cooldown_end - now).total_seconds() / 60)
-                    return False, f"Cooldown period active: {remaining} minutes remaining"
-        
-        return True, None
-    
+            for row in result
+        }
+
+        return {
+            rb.id: evaluate_safety_state(rb, states.get(rb.id, RunbookSafetyState()), now)
+            for rb in runbooks
+        }
+
     async def process_alert_for_remediation(
         self,
         alert: Alert,
@@ -532,18 +730,18 @@ class AlertTriggerMatcher:
             trigger_id=match.trigger.id,
             alert_id=alert.id,
             server_id=server_id,
-            status="pending",
+            status="queued",
             execution_mode="auto",
             variables_json=match.match_details.get("extracted_variables", {})
         )
         
         self.db.add(execution)
+        await notify_execution_ready(self.db)
         await self.db.commit()
         await self.db.refresh(execution)
         
-        # Start execution (non-blocking)
-        # In production, this would be queued to a background task
-        logger.info(f"Starting auto-execution {execution.id} for runbook {match.runbook.name}")
+        # The ExecutionWorker is woken by the notification and runs it
+        logger.info(f"Queued auto-execution {execution.id} for runbook {match.runbook.name}")
         
         return execution
     
@@ -647,10 +845,11 @@ class ApprovalService:
         # TODO: Add RBAC check here
         
         # Approve the execution
-        execution.status = "pending"  # Ready for execution
+        execution.status = "approved"  # Ready for execution
         execution.approved_by_id = approver.id
         execution.approved_at = datetime.now(timezone.utc)
         
+        await notify_execution_ready(self.db)
         await self.db.commit()
         
         logger.info(
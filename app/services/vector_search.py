@@ -0,0 +1,71 @@
+"""
+Vector Search
+
+Helpers that keep pgvector similarity queries index-driven.
+
+An HNSW (or ivfflat) index only serves ``ORDER BY embedding <=> q LIMIT k``.
+A similarity threshold in the same WHERE clause turns the query into a
+filter over every row, so queries fetch the nearest candidates first and
+apply the threshold in an outer query:
+
+    SELECT ... FROM (
+        SELECT ..., embedding <=> q AS distance FROM t
+        WHERE <cheap filters> ORDER BY distance LIMIT :candidates
+    ) nearest
+    WHERE distance <= 1 - :min_similarity
+
+Index scans return at most ``hnsw.ef_search`` rows (``ivfflat.probes``
+lists for ivfflat) before the outer filters run, so both are raised per
+query to cover the candidates requested.
+"""
+
+import logging
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+def candidate_count(limit: int, filtered: bool = False) -> int:
+    """
+    Rows to take from the index for a top-``limit`` query.
+
+    Extra filters on the candidates (app, content type, deduplication)
+    discard some of them, so filtered queries over-fetch.
+    """
+    if not filtered:
+        return limit
+    return limit * get_settings().vector_search_overfetch
+
+
+def tune_vector_search(
+    db: Session,
+    candidates: int,
+    ef_search: Optional[int] = None,
+    probes: Optional[int] = None
+) -> None:
+    """
+    Set the index search breadth for the current transaction only.
+
+    Args:
+        db: Session whose transaction runs the vector query
+        candidates: Rows the query takes from the index; ef_search is
+            raised to at least this, or the index returns fewer
+        ef_search: HNSW candidate list size (default vector_search_ef_search)
+        probes: ivfflat lists scanned (default vector_search_probes)
+    """
+    settings = get_settings()
+    ef_search = max(int(ef_search or settings.vector_search_ef_search), int(candidates))
+    probes = int(probes or settings.vector_search_probes)
+    try:
+        # Savepoint, so a failure does not abort the caller's transaction;
+        # SET does not take bind parameters, both values are ints
+        with db.begin_nested():
+            db.execute(text(f"SET LOCAL hnsw.ef_search = {min(ef_search, 1000)}"))
+            db.execute(text(f"SET LOCAL ivfflat.probes = {probes}"))
+    except Exception as e:
+        logger.warning(f"Could not tune vector search: {e}")
@@ -0,0 +1,304 @@
+"""
+WinRM Session Runtime
+
+pywinrm is synchronous, so every WS-Man call runs on a thread. This module
+gives those calls their own bounded, instrumented thread pool (slow Windows
+hosts can't starve the event loop's default executor) and a reusable remote
+shell with cooperative cancellation:
+
+- One WinRM shell is opened per executor and reused for every command
+  (pywinrm's Session.run_cmd opens and closes a shell per call)
+- Output is received in short long-poll rounds, so a timed-out or
+  cancelled command is noticed between rounds and terminated remotely
+  with a WS-Man Signal instead of leaving the thread blocked
+"""
+
+import asyncio
+import logging
+import re
+import threading
+import time
+import xml.etree.ElementTree as ET
+from base64 import b64encode
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Tuple
+
+try:
+    import winrm
+    from winrm.exceptions import WinRMOperationTimeoutError
+except ImportError:
+    winrm = None
+    WinRMOperationTimeoutError = None
+
+from ..config import get_settings
+from ..metrics import (
+    WINRM_THREADS_BUSY,
+    WINRM_CALLS_QUEUED,
+    WINRM_QUEUE_WAIT,
+    WINRM_SHELLS_OPENED,
+    WINRM_COMMANDS_CANCELLED,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class WinRMCommandCancelled(Exception):
+    """Raised on the worker thread once a command has been terminated."""
+
+
+class WinRMThreadPool:
+    """Dedicated thread pool for blocking pywinrm calls."""
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="winrm")
+
+    def run(self, fn: Callable, *args) -> asyncio.Future:
+        """Run ``fn(*args)`` on the pool, tracking queue wait and busy threads."""
+        loop = asyncio.get_running_loop()
+        submitted = time.perf_counter()
+        WINRM_CALLS_QUEUED.inc()
+
+        def call():
+            WINRM_CALLS_QUEUED.dec()
+            WINRM_QUEUE_WAIT.observe(time.perf_counter() - submitted)
+            WINRM_THREADS_BUSY.inc()
+            try:
+                return fn(*args)
+            finally:
+                WINRM_THREADS_BUSY.dec()
+
+        return loop.run_in_executor(self._executor, call)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_pool: Optional[WinRMThreadPool] = None
+
+
+def get_winrm_thread_pool() -> WinRMThreadPool:
+    """Get the process-wide WinRM thread pool."""
+    global _pool
+    if _pool is None:
+        _pool = WinRMThreadPool(get_settings().winrm_max_threads)
+    return _pool
+
+
+def shutdown_winrm_thread_pool() -> None:
+    """Stop the WinRM thread pool; queued calls are cancelled."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
+
+
+def powershell_command(script: str) -> str:
+    """Encode a PowerShell script the way pywinrm's run_ps does."""
+    encoded = b64encode(script.encode("utf_16_le")).decode("ascii")
+    return f"powershell -encodedcommand {encoded}"
+
+
+_CLIXML_HEADER = b"#< CLIXML\r\n"
+_XMLNS = re.compile(rb'xmlns=["\'][^"\']*["\']')
+
+
+def clean_powershell_error(stderr: bytes) -> bytes:
+    """
+    Turn PowerShell's CLIXML error stream into plain text.
+
+    Same result as pywinrm's run_ps; anything that isn't CLIXML (or fails
+    to parse) is returned unchanged.
+    """
+    if not stderr.startswith(_CLIXML_HEADER):
+        return stderr
+    try:
+        root = ET.fromstring(_XMLNS.sub(b"", stderr[len(_CLIXML_HEADER):]))
+    except ET.ParseError:
+        return stderr
+    message = "".join(node.text.replace("_x000D__x000A_", "\n") for node in root.findall("./S") if node.text)
+    return message.strip().encode("utf-8") if message else stderr
+
+
+class WinRMShell:
+    """
+    A reusable remote cmd shell on one Windows host.
+
+    Commands run one at a time (pywinrm's protocol object is not thread-safe);
+    each command still gets a fresh process, so no state leaks between them.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        username: str,
+        password: Optional[str],
+        transport: str = "ntlm",
+        cert_validation: bool = False,
+        operation_timeout: Optional[int] = None,
+        pool: Optional[WinRMThreadPool] = None
+    ):
+        """
+        Initialize the shell (no connection is made until first use).
+
+        Args:
+            endpoint: WS-Man URL, e.g. http://host:5985/wsman
+            username: Windows account
+            password: Account password
+            transport: pywinrm transport (ntlm, kerberos, basic, ...)
+            cert_validation: Validate the server certificate over HTTPS
+            operation_timeout: Seconds per output long-poll; bounds cancellation latency
+            pool: Thread pool for blocking calls (defaults to the shared one)
+        """
+        if winrm is None:
+            raise ImportError("pywinrm module is not installed")
+
+        self.endpoint = endpoint
+        self.username = username
+        self.password = password
+        self.transport = transport
+        self.cert_validation = cert_validation
+        self.operation_timeout = operation_timeout or get_settings().winrm_operation_timeout
+        self.pool = pool or get_winrm_thread_pool()
+
+        self._session = None
+        self._shell_id: Optional[str] = None
+        self._lock = asyncio.Lock()
+        self._closed = False
+
+    @property
+    def is_open(self) -> bool:
+        return self._shell_id is not None
+
+    # ------------------------------------------------------------------
+    # Blocking side (runs on the WinRM thread pool)
+    # ------------------------------------------------------------------
+
+    def _open_sync(self) -> None:
+        if self._session is None:
+            self._session = winrm.Session(
+                self.endpoint,
+                auth=(self.username, self.password or ""),
+                transport=self.transport,
+                server_cert_validation='validate' if self.cert_validation else 'ignore',
+                # read_timeout_sec must be greater than operation_timeout_sec
+                read_timeout_sec=self.operation_timeout + 10,
+                operation_timeout_sec=self.operation_timeout
+            )
+        if self._shell_id is None:
+            self._shell_id = self._session.protocol.open_shell()
+            WINRM_SHELLS_OPENED.inc()
+
+    def _start_command_sync(self, command: str) -> str:
+        reused = self._shell_id is not None
+        self._open_sync()
+        try:
+            return self._session.protocol.run_command(self._shell_id, command)
+        except Exception:
+            # A reused shell may have hit the server's idle timeout; retry once on a new one
+            self._shell_id = None
+            if not reused:
+                raise
+            self._open_sync()
+            return self._session.protocol.run_command(self._shell_id, command)
+
+    def _run_sync(self, command: str, cancel: threading.Event) -> Tuple[bytes, bytes, int]:
+        if cancel.is_set():
+            raise WinRMCommandCancelled(command)
+
+        command_id = self._start_command_sync(command)
+        protocol = self._session.protocol
+        stdout, stderr = [], []
+        try:
+            while True:
+                if cancel.is_set():
+                    raise WinRMCommandCancelled(command)
+                try:
+                    out, err, code, done = protocol.get_command_output_raw(self._shell_id, command_id)
+                except WinRMOperationTimeoutError:
+                    continue  # no output this round; long-running command
+                stdout.append(out)
+                stderr.append(err)
+                if done:
+                    return b"".join(stdout), b"".join(stderr), code
+        except WinRMCommandCancelled:
+            raise
+        except Exception:
+            self._shell_id = None
+            raise
+        finally:
+            if self._shell_id is not None:
+                try:
+                    # Sends a terminate signal if the command is still running
+                    protocol.cleanup_command(self._shell_id, command_id)
+                except Exception as e:
+                    logger.debug(f"WinRM cleanup_command failed on {self.endpoint}: {e}")
+
+    def _close_sync(self) -> None:
+        if self._shell_id is not None:
+            shell_id, self._shell_id = self._shell_id, None
+            try:
+                self._session.protocol.close_shell(shell_id)
+            except Exception as e:
+                logger.debug(f"WinRM close_shell failed on {self.endpoint}: {e}")
+
+    # ------------------------------------------------------------------
+    # Async side
+    # ------------------------------------------------------------------
+
+    async def open(self) -> None:
+        """Open the remote shell now rather than on the first command."""
+        async with self._lock:
+            await self.pool.run(self._open_sync)
+
+    async def run(self, command: str, timeout: float) -> Tuple[bytes, bytes, int]:
+        """
+        Run a cmd command line and return (stdout, stderr, exit code).
+
+        On timeout or task cancellation the remote command is terminated as
+        soon as the current output poll returns; the shell stays reserved
+        until then, so the next command can't interleave with the cleanup.
+
+        Raises:
+            asyncio.TimeoutError: If the command outlives ``timeout``.
+        """
+        cancel = threading.Event()
+        await self._lock.acquire()
+        try:
+            future = self.pool.run(self._run_sync, command, cancel)
+        except BaseException:
+            self._lock.release()
+            raise
+        future.add_done_callback(self._command_done)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout=timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            cancel.set()
+            WINRM_COMMANDS_CANCELLED.inc()
+            raise
+
+    async def run_ps(self, script: str, timeout: float) -> Tuple[bytes, bytes, int]:
+        """Run a PowerShell script; CLIXML error output is made readable."""
+        stdout, stderr, code = await self.run(powershell_command(script), timeout)
+        if stderr:
+            stderr = clean_powershell_error(stderr)
+        return stdout, stderr, code
+
+    def _command_done(self, future: asyncio.Future) -> None:
+        self._lock.release()
+        if not future.cancelled() and future.exception() is not None:
+            # Retrieved here so abandoned (timed-out) commands don't warn
+            logger.debug(f"WinRM command on {self.endpoint} ended with: {future.exception()!r}")
+        if self._closed and self._shell_id is not None:
+            asyncio.ensure_future(self._close_now())
+
+    async def close(self) -> None:
+        """Close the remote shell; deferred until an in-flight command finishes."""
+        self._closed = True
+        if not self._lock.locked():
+            await self._close_now()
+
+    async def _close_now(self) -> None:
+        async with self._lock:
+            if self._shell_id is not None:
+                await self.pool.run(self._close_sync)
@@ -7,6 +7,7 @@ from sqlalchemy.orm import Session
 
 from app.models import ServerCredential
 from app.utils.crypto import decrypt_value, DecryptionError
+from app.services.winrm_session import WinRMShell
 
 try:
     import winrm
@@ -44,47 +45,32 @@ class WinRMTerminal:
         self.transport = transport
         self.use_ssl = use_ssl
         self.cert_validation = cert_validation
-        self._session = None
+        self._shell: Optional[WinRMShell] = None
         self._connected = False
         self._current_dir = "C:\\"
         self._command_queue: asyncio.Queue = asyncio.Queue()
         self._output_queue: asyncio.Queue = asyncio.Queue()
         self._running = False
         
-    def _create_session_sync(self):
-        """Create WinRM session synchronously."""
-        scheme = 'https' if self.use_ssl else 'http'
-        endpoint = f"{scheme}://{self.host}:{self.port}/wsman"
-        
-        self._session = winrm.Session(
-            endpoint,
-            auth=(self.username, self.password or ""),
-            transport=self.transport,
-            server_cert_validation='validate' if self.cert_validation else 'ignore',
-            read_timeout_sec=70,
-            operation_timeout_sec=60
-        )
-        self._connected = True
-        
     async def connect(self) -> bool:
         """Establish WinRM connection."""
         try:
             logger.info(f"Connecting to WinRM server {self.host}:{self.port} as {self.username}")
-            loop = asyncio.get_running_loop()
-            await loop.run_in_executor(None, self._create_session_sync)
+            scheme = 'https' if self.use_ssl else 'http'
+            self._shell = WinRMShell(
+                f"{scheme}://{self.host}:{self.port}/wsman",
+                username=self.username,
+                password=self.password,
+                transport=self.transport,
+                cert_validation=self.cert_validation
+            )
             
             # Test connection with a simple command
-            def _test():
-                result = self._session.run_ps("$env:COMPUTERNAME")
-                return result.status_code == 0, result.std_out.decode('utf-8').strip()
+            stdout, _, status_code = await self._shell.run_ps("$env:COMPUTERNAME", timeout=30)
             
-            success, hostname = await asyncio.wait_for(
-                loop.run_in_executor(None, _test),
-                timeout=30
-            )
-            
-            if success:
-                logger.info(f"WinRM connection established to {self.host} ({hostname})")
+            if status_code == 0:
+                self._connected = True
+                logger.info(f"WinRM connection established to {self.host} ({stdout.decode('utf-8').strip()})")
                 return True
             else:
                 raise ConnectionError("Failed to execute test command")
@@ -96,12 +82,11 @@ class WinRMTerminal:
             logger.error(f"WinRM connection failed: {e}")
             raise ConnectionError(f"WinRM connection failed: {e}")
 
-    def _execute_command_sync(self, command: str) -> tuple:
-        """Execute a command synchronously."""
-        if not self._session:
+    async def execute(self, command: str, timeout: int = 60) -> tuple:
+        """Execute a command asynchronously."""
+        if not self._shell:
             raise ConnectionError("Not connected")
         
-        # Wrap command to get current directory after execution
         ps_command = f"""
 $ProgressPreference = 'SilentlyContinue'
 try {{
@@ -110,27 +95,23 @@ try {{
     Write-Error $_
 }}
 """
-        result = self._session.run_ps(ps_command)
-        stdout = result.std_out.decode('utf-8') if result.std_out else ""
-        stderr = result.std_err.decode('utf-8') if result.std_err else ""
-        return stdout, stderr, result.status_code
-
-    async def execute(self, command: str, timeout: int = 60) -> tuple:
-        """Execute a command asynchronously."""
         try:
-            loop = asyncio.get_running_loop()
-            return await asyncio.wait_for(
-                loop.run_in_executor(None, self._execute_command_sync, command),
-                timeout=timeout
-            )
+            stdout, stderr, status_code = await self._shell.run_ps(ps_command, timeout=timeout)
         except asyncio.TimeoutError:
             return "", f"Command timed out after {timeout} seconds", -1
+        return (
+            stdout.decode('utf-8') if stdout else "",
+            stderr.decode('utf-8') if stderr else "",
+            status_code
+        )
 
     async def close(self):
         """Close the WinRM connection."""
-        self._session = None
+        shell, self._shell = self._shell, None
         self._connected = False
         self._running = False
+        if shell is not None:
+            await shell.close()
         logger.debug("WinRM connection closed")
 
     @property
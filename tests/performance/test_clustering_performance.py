@@ -1,5 +1,7 @@
+import random
 import time
 import pytest
+from types import SimpleNamespace
 from datetime import datetime, timedelta
 from uuid import uuid4
 from app.models import Alert, utc_now
@@ -54,3 +56,43 @@ def test_clustering_performance(test_db_session):
     # Target is < 5 seconds
     assert duration < 5.0, f"Clustering took too long: {duration:.2f}s"
     print("✅ Performance target met!")
+
+
+def _semantic_alerts(count, templates=2000):
+    """Alerts with ``templates`` distinct descriptions, differing only by host."""
+    random.seed(42)
+    words = [f"term{i}" for i in range(5000)]
+    descriptions = [" ".join(random.sample(words, 8)) for _ in range(templates)]
+    return [
+        SimpleNamespace(
+            id=uuid4(),
+            alert_name=f"Alert{i % templates}",
+            instance=f"host-{random.randint(0, 500)}",
+            job="semantic-test",
+            annotations_json={"summary": descriptions[i % templates]}
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.mark.parametrize("count,limit", [(10_000, 5.0), (100_000, 60.0)])
+def test_semantic_clustering_scales(count, limit):
+    """
+    Performance test: semantic layer at 10k and 100k alerts without an N x N matrix
+    """
+    service = AlertClusteringService(db=None)
+    alerts = _semantic_alerts(count)
+
+    start_time = time.time()
+    clusters = service._semantic_clustering(alerts)
+    duration = time.time() - start_time
+
+    print("\nSemantic clustering performance results:")
+    print(f"Total alerts: {count}")
+    print(f"Total clusters: {len(clusters)}")
+    print(f"Total time: {duration:.4f} seconds")
+
+    # Alerts sharing a description end up together, and only with each other
+    assert all(len({a.alert_name for a in cluster}) == 1 for cluster in clusters)
+    assert sum(len(cluster) for cluster in clusters) >= 0.95 * count
+    assert duration < limit, f"Semantic clustering took too long: {duration:.2f}s"
@@ -0,0 +1,103 @@
+"""
+Benchmark: HNSW top-k vector search vs exact search.
+
+Reports recall@k and latency for several ef_search values, and checks
+that the knowledge search query is served by the vector index.
+"""
+import time
+import numpy as np
+import pytest
+from sqlalchemy import text
+from uuid import uuid4
+
+from app.models_knowledge import DesignChunk
+from app.services.knowledge_search_service import KnowledgeSearchService
+from app.services.vector_search import tune_vector_search
+
+DIMENSIONS = 1536
+CHUNKS = 5000
+QUERIES = 30
+K = 10
+
+TOP_K_SQL = text("""
+    SELECT c.id FROM design_chunks c
+    WHERE c.embedding IS NOT NULL
+    ORDER BY c.embedding <=> CAST(:query_embedding AS vector)
+    LIMIT :limit
+""")
+
+
+def _unit(vectors):
+    return vectors / np.linalg.norm(vectors, axis=-1, keepdims=True)
+
+
+@pytest.fixture
+def chunk_vectors(test_db_session):
+    """CHUNKS normalized vectors around 100 topics, stored as design chunks."""
+    rng = np.random.default_rng(7)
+    topics = _unit(rng.normal(size=(100, DIMENSIONS)))
+    vectors = _unit(topics[rng.integers(0, 100, CHUNKS)] + 0.6 * _unit(rng.normal(size=(CHUNKS, DIMENSIONS))))
+
+    test_db_session.add_all([
+        DesignChunk(
+            id=uuid4(),
+            source_type='document',
+            source_id=uuid4(),
+            content=f"benchmark chunk {i}",
+            content_type='text',
+            embedding=vector.tolist()
+        )
+        for i, vector in enumerate(vectors)
+    ])
+    test_db_session.commit()
+    test_db_session.execute(text("ANALYZE design_chunks"))
+
+    queries = _unit(topics[rng.integers(0, 100, QUERIES)] + 0.6 * _unit(rng.normal(size=(QUERIES, DIMENSIONS))))
+    yield [q.tolist() for q in queries]
+
+    test_db_session.execute(text("DELETE FROM design_chunks WHERE content LIKE 'benchmark chunk %'"))
+    test_db_session.commit()
+
+
+def _top_k(db, query, exact, ef_search=None):
+    if exact:
+        db.execute(text("SET LOCAL enable_indexscan = off"))
+    else:
+        tune_vector_search(db, K, ef_search=ef_search)
+    started = time.perf_counter()
+    ids = [row.id for row in db.execute(TOP_K_SQL, {"query_embedding": query, "limit": K})]
+    elapsed = time.perf_counter() - started
+    db.rollback()  # end the transaction, resetting SET LOCAL
+    return ids, elapsed
+
+
+def test_hnsw_recall_and_latency(test_db_session, chunk_vectors):
+    exact = [_top_k(test_db_session, q, exact=True) for q in chunk_vectors]
+    exact_ms = np.median([elapsed for _, elapsed in exact]) * 1000
+    print(f"\nexact: p50 {exact_ms:.1f}ms")
+
+    for ef_search in (40, 100, 200):
+        approx = [_top_k(test_db_session, q, exact=False, ef_search=ef_search) for q in chunk_vectors]
+        recall = np.mean([
+            len(set(ids) & set(truth)) / K
+            for (ids, _), (truth, _) in zip(approx, exact)
+        ])
+        approx_ms = np.median([elapsed for _, elapsed in approx]) * 1000
+        print(f"hnsw ef_search={ef_search}: recall@{K} {recall:.3f}, p50 {approx_ms:.1f}ms")
+
+        if ef_search >= 100:
+            assert recall >= 0.9
+
+
+def test_knowledge_search_uses_vector_index(test_db_session, chunk_vectors):
+    plan = test_db_session.execute(
+        text("EXPLAIN " + TOP_K_SQL.text),
+        {"query_embedding": chunk_vectors[0], "limit": K}
+    ).scalars().all()
+    assert any("design_chunks_embedding_hnsw_idx" in line for line in plan)
+
+    results = KnowledgeSearchService(test_db_session).search_by_embedding(
+        chunk_vectors[0], limit=K, min_similarity=0.0
+    )
+    assert len(results) == K
+    assert [r['similarity'] for r in results] == sorted((r['similarity'] for r in results), reverse=True)
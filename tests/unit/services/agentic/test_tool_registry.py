@@ -333,14 +333,14 @@ class TestToolRegistryIntegration:
         """Test search_knowledge with mocked KnowledgeSearchService"""
         with patch('app.services.knowledge_search_service.KnowledgeSearchService') as MockService:
             mock_service = MagicMock()
-            mock_service.search_similar.return_value = [
+            mock_service.search_similar = AsyncMock(return_value=[
                 {
                     'source_title': 'CPU Troubleshooting Guide',
                     'doc_type': 'runbook',
                     'similarity': 0.85,
                     'content': 'When CPU is high, check process usage...'
                 }
-            ]
+            ])
             MockService.return_value = mock_service
 
             registry = ToolRegistry(mock_db)
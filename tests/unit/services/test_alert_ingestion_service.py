@@ -0,0 +1,167 @@
+"""
+Unit tests for the batched alert ingestion service.
+"""
+import uuid
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.schemas import AlertmanagerAlert
+from app.services.alert_ingestion_service import (
+    parse_alert_timestamp,
+    build_alert_row,
+    build_metrics_row,
+    ingest_alerts,
+)
+from app.services.rules_engine import RuleIndex
+
+
+def make_alert(name="HighCPU", fingerprint="fp-1", status="firing", starts_at="2025-01-15T10:00:00Z"):
+    return AlertmanagerAlert(
+        status=status,
+        labels={"alertname": name, "severity": "critical", "instance": "web-01", "job": "node"},
+        annotations={"summary": "test"},
+        startsAt=starts_at,
+        fingerprint=fingerprint,
+    )
+
+
+def inserted_rows(stmt):
+    """Return the multi-row VALUES of an insert statement keyed by column name."""
+    return [
+        {getattr(col, "key", col): value for col, value in params.items()}
+        for params in stmt._multi_values[0]
+    ]
+
+
+def make_rows_result(rows):
+    result = MagicMock()
+    result.__iter__.return_value = iter(rows)
+    return result
+
+
+class TestRowBuilders:
+    """Test pure row-building helpers."""
+
+    def test_parse_timestamp_zulu(self):
+        ts = parse_alert_timestamp("2025-01-15T10:00:00Z")
+        assert ts == datetime(2025, 1, 15, 10, 0, tzinfo=timezone.utc)
+
+    def test_parse_timestamp_invalid_falls_back_to_now(self):
+        before = datetime.now(timezone.utc)
+        ts = parse_alert_timestamp("not-a-date")
+        assert ts >= before
+
+    def test_build_alert_row(self):
+        alert = make_alert()
+        row = build_alert_row(alert, parse_alert_timestamp(alert.startsAt))
+
+        assert row["alert_name"] == "HighCPU"
+        assert row["severity"] == "critical"
+        assert row["fingerprint"] == "fp-1"
+        assert row["analyzed"] is False
+        assert isinstance(row["id"], uuid.UUID)
+
+    def test_build_metrics_row_uses_job_as_service(self):
+        alert = make_alert()
+        row = build_alert_row(alert, parse_alert_timestamp(alert.startsAt))
+        metrics = build_metrics_row(row)
+
+        assert metrics["alert_id"] == row["id"]
+        assert metrics["service_name"] == "node"
+        assert metrics["time_to_detect"] == 0
+
+
+@pytest.mark.asyncio
+class TestIngestAlerts:
+    """Test statement batching in ingest_alerts."""
+
+    async def test_empty_payload_does_nothing(self):
+        db = AsyncMock()
+        result = await ingest_alerts(db, [])
+
+        assert result.processed == []
+        db.execute.assert_not_called()
+
+    async def test_new_alerts_inserted_in_one_statement(self):
+        alerts = [make_alert(fingerprint=f"fp-{i}") for i in range(20)]
+        db = AsyncMock()
+
+        inserted_ids = []
+
+        async def execute(stmt, *args, **kwargs):
+            result = MagicMock()
+            if stmt.is_select:
+                result.__iter__.return_value = iter([])
+            elif stmt.is_insert and stmt.table.name == "alerts":
+                ids = [row["id"] for row in inserted_rows(stmt)]
+                inserted_ids.extend(ids)
+                result.scalars.return_value.all.return_value = ids
+            return result
+
+        db.execute.side_effect = execute
+
+        with patch(
+            "app.services.alert_ingestion_service.get_rule_index_async",
+            AsyncMock(return_value=RuleIndex([]))
+        ):
+            result = await ingest_alerts(db, alerts)
+
+        # dedup lookup + alerts insert + metrics insert
+        assert db.execute.await_count == 3
+        db.commit.assert_awaited_once()
+        assert len(result.remediate_ids) == 20
+        assert result.analyze_ids == []
+        assert all(entry["action"] == "stored_pending" for entry in result.processed)
+
+    async def test_existing_alert_status_update(self):
+        alert = make_alert(status="resolved")
+        existing_id = uuid.uuid4()
+        db = AsyncMock()
+
+        async def execute(stmt, *args, **kwargs):
+            if stmt.is_select:
+                row = MagicMock(
+                    id=existing_id,
+                    fingerprint="fp-1",
+                    timestamp=parse_alert_timestamp(alert.startsAt),
+                    status="firing",
+                )
+                return make_rows_result([row])
+            return MagicMock()
+
+        db.execute.side_effect = execute
+
+        result = await ingest_alerts(db, [alert])
+
+        # dedup lookup + one status UPDATE, no inserts
+        assert db.execute.await_count == 2
+        assert result.processed == [
+            {"alert_name": "HighCPU", "action": "updated", "id": str(existing_id)}
+        ]
+        assert result.remediate_ids == []
+
+    async def test_duplicates_within_payload_collapse(self):
+        alerts = [make_alert(), make_alert(status="resolved")]
+        db = AsyncMock()
+
+        async def execute(stmt, *args, **kwargs):
+            result = MagicMock()
+            if stmt.is_select:
+                result.__iter__.return_value = iter([])
+            elif stmt.is_insert and stmt.table.name == "alerts":
+                rows = inserted_rows(stmt)
+                assert len(rows) == 1
+                assert rows[0]["status"] == "resolved"
+                result.scalars.return_value.all.return_value = [rows[0]["id"]]
+            return result
+
+        db.execute.side_effect = execute
+
+        with patch(
+            "app.services.alert_ingestion_service.get_rule_index_async",
+            AsyncMock(return_value=RuleIndex([]))
+        ):
+            result = await ingest_alerts(db, alerts)
+
+        assert len(result.processed) == 1
@@ -0,0 +1,72 @@
+"""
+Unit tests for the set-based cluster persistence statements.
+"""
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy.dialects import postgresql
+
+from app.services import cluster_store
+
+NOW = datetime(2026, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def compile_pg(stmt):
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def test_chunked_slices():
+    assert [list(c) for c in cluster_store.chunked(list(range(5)), 2)] == [[0, 1], [2, 3], [4]]
+
+
+def test_upsert_is_one_statement_keyed_on_cluster_key():
+    rows = [
+        cluster_store.cluster_row(f"key-{i}", "exact", 2, NOW, NOW, "warning", {})
+        for i in range(3)
+    ]
+
+    sql = compile_pg(cluster_store.upsert_clusters(rows))
+
+    assert sql.count("INSERT INTO alert_clusters") == 1
+    assert "ON CONFLICT (cluster_key) DO UPDATE" in sql
+    assert "RETURNING" in sql
+
+
+def test_link_alerts_updates_from_values():
+    links = [(uuid.uuid4(), uuid.uuid4()) for _ in range(3)]
+
+    sql = compile_pg(cluster_store.link_alerts(links, NOW))
+
+    assert sql.startswith("UPDATE alerts")
+    assert "FROM (VALUES" in sql
+    assert "alerts.cluster_id IS NULL" in sql
+
+
+def test_cleanup_targets_closed_clusters():
+    unlink = compile_pg(cluster_store.unlink_closed_clusters(NOW))
+    delete = compile_pg(cluster_store.delete_closed_clusters(NOW))
+
+    assert "alert_clusters.closed_at <" in unlink
+    assert delete.startswith("DELETE FROM alert_clusters")
+
+
+def test_compact_counters_is_one_statement():
+    sql = compile_pg(cluster_store.compact_counters())
+
+    assert sql.startswith("WITH moved AS")
+    assert "DELETE FROM clustering_counters RETURNING" in sql
+    assert "INSERT INTO clustering_counters (name, delta)" in sql
+
+
+def test_window_counts_is_a_range_scan():
+    sql = compile_pg(cluster_store.window_counts(NOW))
+
+    assert "alerts.timestamp >=" in sql
+    assert "count(DISTINCT alerts.cluster_id)" in sql
+
+
+def test_noise_reduction_counts_a_cluster_as_one_item():
+    # 10 alerts: one cluster of 4, one of 2, 4 unclustered → 6 items seen
+    assert cluster_store.noise_reduction(10, 6, 2) == 40.0
+    assert cluster_store.noise_reduction(0, 0, 0) == 0.0
+    assert cluster_store.noise_reduction(3, 0, 1) == 0.0
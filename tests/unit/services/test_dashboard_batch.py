@@ -0,0 +1,74 @@
+"""
+Unit tests for batched dashboard queries.
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.dashboard_batch import resolve_variable_values, run_concurrently, substitute_variables
+
+
+def variable(name, current=None, default=None, include_all=False, all_value=None):
+    return SimpleNamespace(
+        name=name,
+        current_value=current,
+        default_value=default,
+        include_all=include_all,
+        all_value=all_value,
+    )
+
+
+class TestVariables:
+    """Test variable resolution and substitution."""
+
+    def test_overrides_then_current_then_default(self):
+        values = resolve_variable_values(
+            [variable("job", current="node", default="x"), variable("env", default="prod"), variable("unset")],
+            {"job": "api"}
+        )
+
+        assert values == {"job": "api", "env": "prod"}
+
+    def test_all_and_multi_select_values(self):
+        values = resolve_variable_values(
+            [variable("instance", current="All", include_all=True), variable("job", current='["a", "b"]')],
+            {}
+        )
+
+        assert values == {"instance": ".*", "job": "a|b"}
+
+    def test_substitution_matches_whole_names(self):
+        query = 'up{instance=~"$instance", name="$instance_name", job="${job}"} and $jobs'
+
+        assert substitute_variables(query, {"instance": "web.*", "instance_name": "web-1", "job": "node"}) == (
+            'up{instance=~"web.*", name="web-1", job="node"} and $jobs'
+        )
+
+
+@pytest.mark.asyncio
+async def test_jobs_run_concurrently_with_a_cap_per_datasource():
+    in_flight = {"prom-a": 0, "prom-b": 0}
+    peak = {"prom-a": 0, "prom-b": 0}
+
+    def job(group, value):
+        async def run():
+            in_flight[group] += 1
+            peak[group] = max(peak[group], in_flight[group])
+            await asyncio.sleep(0.01)
+            in_flight[group] -= 1
+            if value is None:
+                raise RuntimeError("query failed")
+            return value
+        return group, run
+
+    jobs = {i: job("prom-a", i) for i in range(6)}
+    jobs["b"] = job("prom-b", "b")
+    jobs["bad"] = job("prom-b", None)
+
+    results = {key: (outcome, error) async for key, outcome, error in run_concurrently(jobs, concurrency=2)}
+
+    assert peak == {"prom-a": 2, "prom-b": 2}
+    assert results[3] == (3, None)
+    assert results["b"] == ("b", None)
+    assert isinstance(results["bad"][1], RuntimeError)
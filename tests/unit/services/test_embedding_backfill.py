@@ -0,0 +1,112 @@
+"""
+Unit tests for the bulk alert embedding pipeline.
+"""
+import uuid
+import pytest
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+
+from sqlalchemy.dialects import postgresql
+
+from app.services import embedding_backfill
+from app.services.embedding_backfill import (
+    AlertEmbedder, dedup_texts, embedding_cache_prune, embedding_update
+)
+
+
+def make_row(name="HighCPU", instance="web-01"):
+    return {
+        "id": uuid.uuid4(),
+        "alert_name": name,
+        "severity": "warning",
+        "instance": instance,
+        "labels_json": {"env": "prod"},
+        "annotations_json": {"summary": "cpu above 90%"},
+        "timestamp": datetime(2026, 1, 1, tzinfo=timezone.utc),
+    }
+
+
+def test_dedup_texts_keeps_first_seen_order():
+    texts, index = dedup_texts(["b", "a", "b", "b", "c"])
+
+    assert texts == ["b", "a", "c"]
+    assert index == [0, 1, 0, 0, 2]
+
+
+def test_update_sends_each_distinct_text_once():
+    ids = [uuid.uuid4() for _ in range(4)]
+    stmt = embedding_update(ids, [0, 0, 1, 0], ["storm", "other"], [[1.0, 0.0], None])
+
+    params = stmt.compile(dialect=postgresql.dialect()).params
+
+    assert list(params.values()).count("storm") == 1
+    assert "other" not in params.values()
+    assert sum(1 for value in params.values() if value in ids) == 3
+
+
+class FakeEmbeddingService:
+    def __init__(self):
+        self.calls = []
+
+    async def embed_many(self, texts):
+        self.calls.append(list(texts))
+        return [[1.0, 0.0] for _ in texts]
+
+
+@pytest.mark.asyncio
+async def test_embedder_batches_ingested_alerts(monkeypatch):
+    executed = []
+
+    class FakeSession:
+        async def execute(self, stmt):
+            executed.append(stmt)
+
+        async def commit(self):
+            pass
+
+    @asynccontextmanager
+    async def session_factory():
+        yield FakeSession()
+
+    service = FakeEmbeddingService()
+    monkeypatch.setattr(embedding_backfill, "get_embedding_service", lambda: service)
+
+    embedder = AlertEmbedder(session_factory=session_factory, flush_interval=60)
+    embedder.submit([make_row(instance="web-01") for _ in range(5)] + [make_row(instance="web-02")])
+
+    assert await embedder.flush() == 6
+    assert len(service.calls) == 1 and len(service.calls[0]) == 2
+    assert len(executed) == 1
+    assert not embedder._pending
+
+
+def test_cache_prune_bounds_age_and_row_count():
+    cutoff = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    expired, over_cap = [
+        stmt.compile(dialect=postgresql.dialect()) for stmt in embedding_cache_prune(cutoff, 1000)
+    ]
+
+    assert "DELETE FROM embedding_cache" in str(expired)
+    assert cutoff in expired.params.values()
+    assert "ORDER BY embedding_cache.created_at DESC" in str(over_cap)
+    assert 999 in over_cap.params.values()
+
+
+def test_backfill_is_not_scheduled_without_embeddings(monkeypatch):
+    class Unconfigured:
+        def is_configured(self):
+            return False
+
+    class FakeScheduler:
+        def __init__(self):
+            self.jobs = []
+
+        def add_job(self, **kwargs):
+            self.jobs.append(kwargs["id"])
+
+    monkeypatch.setattr(embedding_backfill, "get_embedding_service", lambda: Unconfigured())
+    scheduler = FakeScheduler()
+
+    embedding_backfill.start_embedding_jobs(scheduler)
+
+    assert "embedding_backfill" not in scheduler.jobs
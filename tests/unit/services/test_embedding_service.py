@@ -0,0 +1,121 @@
+"""
+Unit tests for the embedding backends, cache and micro-batching service.
+"""
+import asyncio
+import numpy as np
+import pytest
+
+from app.services.embedding_service import (
+    AsyncEmbeddingService, EmbeddingBackend, EmbeddingCache, HashingEmbeddingBackend, content_hash
+)
+
+
+class CountingBackend(EmbeddingBackend):
+    model = "counting"
+    dimensions = 2
+
+    def __init__(self):
+        self.calls = []
+
+    def embed_sync(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(text)), 1.0] for text in texts]
+
+    async def embed(self, texts):
+        await asyncio.sleep(0)
+        return self.embed_sync(texts)
+
+
+def make_service(backend=None, **kwargs):
+    return AsyncEmbeddingService(backend or CountingBackend(), EmbeddingCache(100, persist=False), **kwargs)
+
+
+def test_incomplete_backend_cannot_be_created():
+    class AsyncOnlyBackend(EmbeddingBackend):
+        async def embed(self, texts):
+            return []
+
+    with pytest.raises(TypeError):
+        AsyncOnlyBackend()
+
+
+class TestHashingBackend:
+    """Test the offline local backend."""
+
+    def test_vectors_are_normalized_and_deterministic(self):
+        backend = HashingEmbeddingBackend(64)
+
+        first, second = backend.embed_sync(["disk full on db-01", "disk full on db-01"])
+
+        assert len(first) == 64
+        assert first == second
+        assert np.isclose(np.linalg.norm(first), 1.0)
+
+    def test_similar_texts_score_higher(self):
+        backend = HashingEmbeddingBackend(1536)
+        disk, disk2, cpu = np.array(backend.embed_sync(
+            ["disk space almost full on db-01", "disk space almost full on db-02", "p99 latency above slo"]
+        ))
+
+        assert disk @ disk2 > disk @ cpu
+
+
+class TestEmbeddingCache:
+    """Test the in-memory LRU."""
+
+    def test_least_recently_used_is_evicted(self):
+        cache = EmbeddingCache(2, persist=False)
+        cache.put("a", [1.0])
+        cache.put("b", [2.0])
+        cache.get("a")
+        cache.put("c", [3.0])
+
+        assert cache.get("b") is None
+        assert cache.get("a") == [1.0] and cache.get("c") == [3.0]
+
+    def test_keys_depend_on_model(self):
+        assert content_hash("m1", "text") != content_hash("m2", "text")
+
+
+@pytest.mark.asyncio
+class TestAsyncEmbeddingService:
+    """Test coalescing, micro-batching and caching."""
+
+    async def test_concurrent_callers_share_one_batch(self):
+        service = make_service()
+
+        results = await asyncio.gather(*(service.embed(text) for text in ["a", "bb", "a", "ccc"]))
+
+        assert results == [[1.0, 1.0], [2.0, 1.0], [1.0, 1.0], [3.0, 1.0]]
+        assert service.backend.calls == [["a", "bb", "ccc"]]
+
+    async def test_cached_texts_skip_the_backend(self):
+        service = make_service()
+        await service.embed("disk full")
+
+        assert await service.embed("  disk full  ") == [9.0, 1.0]
+        assert len(service.backend.calls) == 1
+
+    async def test_full_batch_flushes_without_waiting(self):
+        service = make_service(batch_size=2, batch_wait=60)
+
+        results = await asyncio.wait_for(service.embed_many(["a", "b", "c", "d"]), timeout=1)
+
+        assert [r[0] for r in results] == [1.0, 1.0, 1.0, 1.0]
+        assert [len(call) for call in service.backend.calls] == [2, 2]
+
+    async def test_empty_text_and_backend_failure_give_none(self):
+        class FailingBackend(CountingBackend):
+            async def embed(self, texts):
+                raise ConnectionError("unavailable")
+
+        service = make_service(FailingBackend())
+
+        assert await service.embed_many(["", "text"]) == [None, None]
+        assert not service._inflight
+
+    async def test_unconfigured_service_returns_none(self):
+        service = AsyncEmbeddingService(None, EmbeddingCache(10, persist=False))
+
+        assert not service.is_configured()
+        assert await service.embed("text") is None
@@ -0,0 +1,167 @@
+"""
+Unit tests for the lease-based execution worker.
+"""
+import asyncio
+import uuid
+import pytest
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+from sqlalchemy.orm import Session
+
+from app.services import execution_worker
+from app.services.execution_worker import (
+    ExecutionWorker,
+    notify_execution_ready,
+    select_within_caps,
+)
+
+
+@asynccontextmanager
+async def fake_session():
+    db = AsyncMock()
+    result = MagicMock()
+    result.scalar_one_or_none.return_value = MagicMock()
+    db.execute.return_value = result
+    yield db
+
+
+class TestSelectWithinCaps:
+    """Test per-server and per-runbook concurrency caps."""
+
+    def setup_method(self):
+        self.server_a, self.server_b = uuid.uuid4(), uuid.uuid4()
+        self.runbook_a, self.runbook_b = uuid.uuid4(), uuid.uuid4()
+
+    def test_respects_limit_and_order(self):
+        candidates = [(uuid.uuid4(), uuid.uuid4(), uuid.uuid4()) for _ in range(5)]
+        chosen = select_within_caps(candidates, 3, {}, {}, 1, 1)
+        assert chosen == [c[0] for c in candidates[:3]]
+
+    def test_one_execution_per_server(self):
+        first = (uuid.uuid4(), self.server_a, self.runbook_a)
+        same_server = (uuid.uuid4(), self.server_a, self.runbook_b)
+        other_server = (uuid.uuid4(), self.server_b, self.runbook_b)
+
+        chosen = select_within_caps([first, same_server, other_server], 10, {}, {}, 1, 5)
+
+        assert chosen == [first[0], other_server[0]]
+
+    def test_active_leases_count_against_caps(self):
+        candidate = (uuid.uuid4(), self.server_a, self.runbook_a)
+
+        assert select_within_caps([candidate], 10, {self.server_a: 1}, {}, 1, 5) == []
+        assert select_within_caps([candidate], 10, {}, {self.runbook_a: 2}, 5, 2) == []
+
+    def test_serverless_executions_only_count_per_runbook(self):
+        candidates = [(uuid.uuid4(), None, self.runbook_a) for _ in range(3)]
+        chosen = select_within_caps(candidates, 10, {}, {}, 1, 2)
+        assert len(chosen) == 2
+
+
+@pytest.mark.asyncio
+class TestExecutionWorker:
+    """Test parallel dispatch and lease handling."""
+
+    async def test_runs_executions_in_parallel(self):
+        pending = [uuid.uuid4() for _ in range(6)]
+        running = 0
+        peak = 0
+        finished = []
+        done = asyncio.Event()
+
+        async def claim(db, limit, *args):
+            claimed, pending[:] = pending[:limit], pending[limit:]
+            return claimed
+
+        async def execute(db, execution):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.02)
+            running -= 1
+            finished.append(execution)
+            if len(finished) == 6:
+                done.set()
+
+        worker = ExecutionWorker(
+            poll_interval=0.01,
+            concurrency=3,
+            lease_seconds=60,
+            session_factory=fake_session,
+            notify_enabled=False,
+        )
+        worker._execute_runbook = execute
+
+        with patch("app.services.execution_worker.claim_executions", side_effect=claim), \
+             patch("app.services.execution_worker.release_lease", AsyncMock()) as release:
+            worker._check_approval_timeouts = AsyncMock()
+            await worker.start()
+            await asyncio.wait_for(done.wait(), timeout=2)
+            await worker.stop()
+
+        assert peak == 3
+        assert release.await_count == 6
+
+    async def test_lost_lease_cancels_run(self):
+        execution_id = uuid.uuid4()
+        cancelled = asyncio.Event()
+
+        async def execute(db, execution):
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        worker = ExecutionWorker(lease_seconds=0.03, session_factory=fake_session)
+        worker._execute_runbook = execute
+
+        with patch("app.services.execution_worker.renew_lease", AsyncMock(return_value=False)), \
+             patch("app.services.execution_worker.release_lease", AsyncMock()):
+            task = asyncio.create_task(worker._run_claimed(execution_id))
+            await asyncio.wait_for(cancelled.wait(), timeout=2)
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+
+@pytest.mark.asyncio
+class TestExecutionReadyNotifications:
+    """Test NOTIFY emission and the in-process wakeup fallback."""
+
+    async def test_emits_notify_in_callers_transaction(self):
+        db = AsyncMock()
+        db.sync_session = Session()
+
+        with patch.object(execution_worker, "_worker", None):
+            await notify_execution_ready(db)
+
+        stmt = db.execute.await_args.args[0]
+        assert "pg_notify" in str(stmt)
+
+    async def test_wakes_local_worker_after_commit_without_listener(self):
+        worker = ExecutionWorker(session_factory=fake_session, notify_enabled=False)
+        db = AsyncMock()
+        db.sync_session = Session()
+
+        with patch.object(execution_worker, "_worker", worker):
+            await notify_execution_ready(db)
+
+        assert not worker._wakeup.is_set()
+        db.sync_session.begin()
+        db.sync_session.commit()
+        assert worker._wakeup.is_set()
+
+    async def test_listening_worker_relies_on_notify(self):
+        worker = ExecutionWorker(session_factory=fake_session)
+        worker.listening = True
+        db = AsyncMock()
+        db.sync_session = Session()
+
+        with patch.object(execution_worker, "_worker", worker):
+            await notify_execution_ready(db)
+        db.sync_session.begin()
+        db.sync_session.commit()
+
+        assert not worker._wakeup.is_set()
+        worker._on_notify(None, 1, execution_worker.EXECUTION_READY_CHANNEL, "")
+        assert worker._wakeup.is_set()
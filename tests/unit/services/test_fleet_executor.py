@@ -0,0 +1,287 @@
+"""
+Unit tests for fleet fan-out execution.
+"""
+import uuid
+import pytest
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from fastapi import HTTPException
+
+from app.services.fleet_executor import (
+    FleetExecutor,
+    FleetLeaseLost,
+    failure_ratio_exceeded,
+    fleet_outcome,
+    host_outcome_counts,
+    plan_batches,
+)
+
+
+class TestPlanBatches:
+    """Test rolling batch planning."""
+
+    def test_single_batch_by_default(self):
+        ids = list(range(7))
+        assert plan_batches(ids) == [ids]
+
+    def test_fixed_batch_size(self):
+        assert plan_batches(list(range(5)), batch_size=2) == [[0, 1], [2, 3], [4]]
+
+    def test_percent_rounds_up(self):
+        batches = plan_batches(list(range(200)), batch_percent=10)
+        assert len(batches) == 10
+        assert all(len(b) == 20 for b in batches)
+        assert plan_batches(list(range(3)), batch_percent=10) == [[0], [1], [2]]
+
+    def test_batch_size_wins_over_percent(self):
+        assert len(plan_batches(list(range(10)), batch_size=5, batch_percent=10)) == 2
+
+    def test_no_targets(self):
+        assert plan_batches([]) == []
+
+
+class TestFailurePolicy:
+    """Test stop-on-failure-ratio and final status."""
+
+    def test_ratio(self):
+        assert not failure_ratio_exceeded(1, 10, 0.1)
+        assert failure_ratio_exceeded(2, 10, 0.1)
+        assert not failure_ratio_exceeded(0, 0, 0.0)
+        assert not failure_ratio_exceeded(5, 5, None)
+
+    def test_outcome(self):
+        assert fleet_outcome(10, 0, False, False) == "success"
+        assert fleet_outcome(0, 10, False, False) == "failed"
+        assert fleet_outcome(8, 2, False, False) == "partial"
+        assert fleet_outcome(8, 2, True, False) == "stopped"
+        assert fleet_outcome(8, 0, False, True) == "cancelled"
+
+
+@pytest.mark.asyncio
+class TestFleetExecutorRun:
+    """Test the batch loop with batch runs stubbed out."""
+
+    def make_fleet(self, **overrides):
+        fields = dict(
+            id=uuid.uuid4(),
+            runbook_id=uuid.uuid4(),
+            status="pending",
+            target_server_ids=None,
+            server_group_id=uuid.uuid4(),
+            label_selector_json=None,
+            batch_size=2,
+            batch_percent=None,
+            max_failure_ratio=0.25,
+            parallelism=2,
+        )
+        fields.update(overrides)
+        return SimpleNamespace(**fields)
+
+    async def run(self, fleet, batch_counts, host_count):
+        """Run with (succeeded, failed) totals reported after each batch."""
+        db = AsyncMock()
+        db.get.side_effect = [fleet, SimpleNamespace(target_os_filter=["linux"])]
+
+        @asynccontextmanager
+        async def session():
+            yield db
+
+        servers = [SimpleNamespace(id=uuid.uuid4()) for _ in range(host_count)]
+        executor = FleetExecutor(fleet.id, "coordinator", session_factory=session)
+        batches_run = []
+        finished = {}
+
+        async def run_batch(batch_index, batch, parallelism):
+            batches_run.append(batch)
+            return False
+
+        async def record_progress(batches_completed):
+            return batch_counts[batches_completed - 1]
+
+        async def finish(total, stopped, cancelled, stop_reason):
+            finished.update(total=total, stopped=stopped, cancelled=cancelled, stop_reason=stop_reason)
+
+        with patch("app.services.fleet_executor.resolve_fleet_targets", AsyncMock(return_value=servers)), \
+             patch.object(executor, "_run_batch", side_effect=run_batch), \
+             patch.object(executor, "_record_progress", side_effect=record_progress), \
+             patch.object(executor, "_finish", side_effect=finish):
+            await executor.run()
+        return batches_run, finished
+
+    async def test_all_batches_run(self):
+        fleet = self.make_fleet()
+        batches, finished = await self.run(fleet, [(2, 0), (4, 0), (5, 0)], 5)
+
+        assert len(batches) == 3
+        assert finished == dict(total=5, stopped=False, cancelled=False, stop_reason=None)
+        assert fleet.status == "running"
+        assert len(fleet.target_server_ids) == 5
+
+    async def test_stops_when_failure_ratio_exceeded(self):
+        fleet = self.make_fleet()
+        batches, finished = await self.run(fleet, [(1, 1), (3, 1), (4, 1)], 5)
+
+        assert len(batches) == 1
+        assert finished["stopped"]
+        assert "Failure ratio 1/2" in finished["stop_reason"]
+
+    async def test_last_batch_failures_do_not_stop(self):
+        fleet = self.make_fleet()
+        _, finished = await self.run(fleet, [(2, 0), (2, 2)], 4)
+
+        assert not finished["stopped"]
+
+    async def test_resumed_fleet_keeps_its_stored_targets(self):
+        stored = [str(uuid.uuid4()) for _ in range(3)]
+        fleet = self.make_fleet(status="running", target_server_ids=stored)
+        resolve = AsyncMock()
+
+        with patch("app.services.fleet_executor.resolve_fleet_targets", resolve):
+            batches, _ = await self.run(fleet, [(2, 0), (3, 0)], 0)
+
+        resolve.assert_not_called()
+        assert [str(server_id) for batch in batches for server_id in batch] == stored
+
+    async def test_coordinator_error_ends_the_fleet_failed(self):
+        db = AsyncMock()
+
+        @asynccontextmanager
+        async def session():
+            yield db
+
+        executor = FleetExecutor(uuid.uuid4(), "coordinator", session_factory=session)
+        with patch.object(executor, "_run", AsyncMock(side_effect=TimeoutError("pool timeout"))):
+            await executor.run()
+
+        # Unclaimed host executions are cancelled, then the fleet is failed
+        statements = [str(call.args[0]) for call in db.execute.call_args_list]
+        assert "UPDATE runbook_executions" in statements[0]
+        assert "UPDATE fleet_executions" in statements[1]
+        db.commit.assert_awaited()
+
+    async def test_lost_lease_leaves_the_fleet_to_the_new_coordinator(self):
+        db = AsyncMock()
+
+        @asynccontextmanager
+        async def session():
+            yield db
+
+        executor = FleetExecutor(uuid.uuid4(), "coordinator", session_factory=session)
+        with patch.object(executor, "_run", AsyncMock(side_effect=FleetLeaseLost())):
+            await executor.run()
+
+        db.execute.assert_not_called()
+
+
+class TestHostOutcomes:
+    """Test how finished host executions are counted."""
+
+    def test_cancelled_hosts_are_neither_succeeded_nor_failed(self):
+        counts = {"success": 3, "failed": 1, "timeout": 1, "cancelled": 4}
+
+        assert host_outcome_counts(counts) == (3, 2)
+
+
+@pytest.mark.asyncio
+class TestFleetBatches:
+    """Test that batches are enqueued for the execution worker within the parallelism."""
+
+    def make_executor(self, batch_rows, cancel_flags=None):
+        db = AsyncMock()
+        db.add_all = MagicMock()
+        db.get.return_value = SimpleNamespace(
+            id=uuid.uuid4(), runbook_id=uuid.uuid4(), runbook_version=1, alert_id=None,
+            triggered_by=None, dry_run=False, variables_json=None,
+        )
+        results = []
+        for rows in batch_rows:
+            result = MagicMock()
+            result.all.return_value = rows
+            results.append(result)
+        db.execute.side_effect = results
+
+        @asynccontextmanager
+        async def session():
+            yield db
+
+        executor = FleetExecutor(uuid.uuid4(), "coordinator", session_factory=session, poll_interval=0)
+        flags = iter(cancel_flags or [False] * len(batch_rows))
+        executor._renew_lease = AsyncMock(side_effect=lambda db: next(flags))
+        return executor, db
+
+    async def test_hosts_are_queued_up_to_the_parallelism(self):
+        servers = [uuid.uuid4() for _ in range(3)]
+        running = [SimpleNamespace(server_id=s, completed_at=None) for s in servers]
+        done = [SimpleNamespace(server_id=s, completed_at="now") for s in servers]
+        executor, db = self.make_executor([[], running[:2], done[:2], done[:2] + running[2:], done])
+
+        with patch("app.services.fleet_executor.notify_execution_ready", AsyncMock()) as notify:
+            cancelled = await executor._run_batch(0, servers, parallelism=2)
+
+        assert cancelled is False
+        queued = [call.args[0] for call in db.add_all.call_args_list]
+        assert [len(batch) for batch in queued] == [2, 1]
+        assert all(e.status == "queued" and e.worker_id is None for batch in queued for e in batch)
+        assert notify.await_count == 2
+
+    async def test_cancel_waits_for_claimed_hosts_only(self):
+        servers = [uuid.uuid4() for _ in range(2)]
+        rows = [SimpleNamespace(server_id=s, completed_at=None) for s in servers]
+        executor, db = self.make_executor([rows], cancel_flags=[True])
+
+        with patch("app.services.fleet_executor.cancel_unstarted_hosts", AsyncMock(return_value=2)):
+            assert await executor._run_batch(0, servers, parallelism=2) is True
+
+        db.add_all.assert_not_called()
+
+
+@pytest.mark.asyncio
+class TestFleetRequestGates:
+    """Test that fleet requests pass the same gates as single-host runs."""
+
+    def make_db(self, runbook, circuit=None, blackout=None):
+        result = MagicMock()
+        result.scalar_one_or_none.return_value = circuit
+        result.scalars.return_value.first.return_value = blackout
+        db = AsyncMock()
+        db.get.return_value = runbook
+        db.execute.return_value = result
+        return db
+
+    async def request(self, db, **fields):
+        from app.routers.remediation import execute_runbook_on_fleet
+        from app.schemas_remediation import FleetExecutionRequest
+
+        with pytest.raises(HTTPException) as raised:
+            await execute_runbook_on_fleet(
+                uuid.uuid4(),
+                FleetExecutionRequest(server_group_id=uuid.uuid4(), **fields),
+                db=db,
+                current_user=SimpleNamespace(id=uuid.uuid4())
+            )
+        return raised.value
+
+    async def test_approval_required_runbook_is_refused(self):
+        runbook = SimpleNamespace(id=uuid.uuid4(), enabled=True, approval_required=True)
+
+        error = await self.request(self.make_db(runbook))
+
+        assert error.status_code == 400
+        assert "requires approval" in error.detail
+
+    async def test_open_circuit_breaker_blocks(self):
+        runbook = SimpleNamespace(id=uuid.uuid4(), enabled=True, approval_required=False)
+
+        error = await self.request(self.make_db(runbook, circuit=SimpleNamespace(state="open")))
+
+        assert error.status_code == 503
+
+    async def test_blackout_window_blocks(self):
+        runbook = SimpleNamespace(id=uuid.uuid4(), enabled=True, approval_required=False)
+
+        error = await self.request(self.make_db(runbook, blackout=SimpleNamespace(name="freeze")))
+
+        assert error.status_code == 503
+        assert "freeze" in error.detail
@@ -0,0 +1,143 @@
+"""
+Unit tests for incremental git knowledge sync.
+"""
+import shutil
+import subprocess
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.services.git_sync_service import GitMirror, GitSyncConfig, GitSyncService
+
+
+def git(repo, *args):
+    subprocess.run(["git", "-C", str(repo), *args], check=True, capture_output=True)
+
+
+@pytest.fixture
+def origin(tmp_path):
+    if not shutil.which("git"):
+        pytest.skip("git not installed")
+    repo = tmp_path / "origin"
+    (repo / "docs").mkdir(parents=True)
+    git(repo, "init", "-q", "-b", "main")
+    git(repo, "config", "user.email", "test@example.com")
+    git(repo, "config", "user.name", "Test")
+    (repo / "docs" / "install.md").write_text("install")
+    (repo / "docs" / "old.md").write_text("old")
+    git(repo, "add", "-A")
+    git(repo, "commit", "-qm", "initial")
+    return repo
+
+
+class TestGitMirror:
+    """Test fetch and diff on a persistent mirror."""
+
+    def test_diff_between_synced_commits(self, origin, tmp_path):
+        url = f"file://{origin}"
+        mirror = GitMirror(url, "main", root=str(tmp_path / "mirrors"))
+        first = mirror.update(url, env=None)
+        assert mirror.files(first) == ["docs/install.md", "docs/old.md"]
+
+        (origin / "docs" / "install.md").write_text("install v2")
+        (origin / "docs" / "old.md").unlink()
+        (origin / "docs" / "upgrade guide.md").write_text("upgrade")
+        git(origin, "add", "-A")
+        git(origin, "commit", "-qm", "update")
+
+        second = mirror.update(url, env=None)
+
+        assert mirror.has_commit(first)
+        assert mirror.changes(first, second) == (["docs/install.md", "docs/upgrade guide.md"], ["docs/old.md"])
+        assert (mirror.path / "docs" / "install.md").read_text() == "install v2"
+
+
+def test_classify_uses_trailing_path_matching():
+    service = GitSyncService.__new__(GitSyncService)
+    config = GitSyncConfig(doc_patterns=["*.md", "docs/**/*"], code_patterns=["*.py"], sync_code=True)
+
+    docs, code = service._classify(["docs/api.yaml", "a/b/notes.md", "src/app.py", "web/node_modules/x/y.md", "setup.cfg"], config)
+
+    assert docs == ["docs/api.yaml", "a/b/notes.md"]
+    assert code == ["src/app.py"]
+
+
+def make_service(existing):
+    db = MagicMock()
+    db.query.return_value.filter.return_value.first.return_value = existing
+    with patch("app.services.git_sync_service.DocumentService"), \
+            patch("app.services.git_sync_service.EmbeddingService"):
+        service = GitSyncService(db)
+    service._chunk_and_embed = MagicMock(return_value=(2, 1, 1, 0))
+    service._missing_embeddings = MagicMock(return_value=False)
+    return service
+
+
+def test_unchanged_file_is_not_rechunked():
+    existing = SimpleNamespace(content_hash=None, raw_content="same", version=3)
+    service = make_service(existing)
+
+    result = service._upsert_document("same", "url", GitSyncConfig(), create=MagicMock())
+
+    assert result["status"] == "unchanged"
+    assert existing.version == 3 and existing.content_hash is not None
+    service._chunk_and_embed.assert_not_called()
+
+
+def test_changed_file_bumps_version_and_reuses_embeddings():
+    existing = SimpleNamespace(content_hash="stale", raw_content="before", version=3, updated_at=None)
+    service = make_service(existing)
+
+    result = service._upsert_document("after", "url", GitSyncConfig(), create=MagicMock())
+
+    assert result == {"status": "updated", "chunks": 2, "embeddings": 1, "reused": 1, "complete": True}
+    assert existing.version == 4 and existing.raw_content == "after"
+    assert existing.content_hash not in (None, "stale")
+    assert service._chunk_and_embed.call_args.kwargs == {"reuse": True}
+
+
+def test_missing_embeddings_leave_hash_unset():
+    existing = SimpleNamespace(content_hash="stale", raw_content="before", version=3, updated_at=None)
+    service = make_service(existing)
+    service._chunk_and_embed.return_value = (2, 0, 1, 1)
+
+    result = service._upsert_document("after", "url", GitSyncConfig(), create=MagicMock())
+
+    assert result["complete"] is False
+    assert existing.content_hash is None
+
+
+def test_same_content_with_missing_embeddings_is_reembedded():
+    existing = SimpleNamespace(content_hash=None, raw_content="same", version=3)
+    service = make_service(existing)
+    service._missing_embeddings.return_value = True
+
+    result = service._upsert_document("same", "url", GitSyncConfig(), create=MagicMock())
+
+    assert result["status"] == "updated" and result["complete"] is True
+    assert existing.version == 3 and existing.content_hash is not None
+    service._chunk_and_embed.assert_called_once()
+
+
+def test_failed_file_keeps_last_synced_commit(origin, tmp_path):
+    state = SimpleNamespace(last_commit=None, last_synced_at=None)
+    service = make_service(None)
+    service.db.query.return_value.filter.return_value.first.return_value = state
+    service._synced_paths = MagicMock(return_value=set())
+
+    def upsert(content, file_source_url, config, create):
+        if file_source_url.endswith("old.md"):
+            raise RuntimeError("embedding backend down")
+        return {"status": "new", "chunks": 1, "embeddings": 1, "reused": 0, "complete": True}
+
+    service._upsert_document = MagicMock(side_effect=upsert)
+    mirror = GitMirror(f"file://{origin}", "main", root=str(tmp_path / "mirrors"))
+
+    with patch("app.services.git_sync_service.GitMirror", return_value=mirror):
+        stats = service.sync_repository(f"file://{origin}")
+
+    assert stats["docs_synced"] == 1 and stats["docs_skipped"] == 0
+    assert stats["failed_files"] == ["docs/old.md"]
+    assert state.last_commit is None and state.last_synced_at is not None
+    service.db.commit.assert_called_once()
@@ -0,0 +1,80 @@
+"""
+Unit tests for the pooled observability HTTP clients.
+"""
+import httpx
+import pytest
+
+from app.metrics import HTTP_CLIENT_IN_FLIGHT, HTTP_CLIENT_REQUESTS
+from app.services.http_clients import HTTPClientRegistry, InstrumentedTransport
+
+
+def sample(metric, **labels):
+    return metric.labels(**labels)._value.get()
+
+
+@pytest.mark.asyncio
+async def test_clients_are_shared_per_backend_origin():
+    registry = HTTPClientRegistry()
+
+    loki = registry.get("loki", "http://loki:3100/loki/api/v1/query")
+
+    assert registry.get("loki", "http://loki:3100") is loki
+    assert registry.get("loki", "http://loki-2:3100") is not loki
+    assert registry.get("tempo", "http://loki:3100") is not loki
+
+    await registry.close_all()
+    assert loki.is_closed
+    assert registry.get("loki", "http://loki:3100") is not loki
+    await registry.close_all()
+
+
+@pytest.mark.asyncio
+async def test_transport_records_requests():
+    transport = InstrumentedTransport(
+        "test-backend", "http://test:1",
+        httpx.MockTransport(lambda request: httpx.Response(503)),
+        max_connections=4
+    )
+    before = sample(HTTP_CLIENT_REQUESTS, backend="test-backend", status="5xx")
+
+    async with httpx.AsyncClient(transport=transport) as client:
+        response = await client.get("http://test:1/ready")
+
+    assert response.status_code == 503
+    assert sample(HTTP_CLIENT_REQUESTS, backend="test-backend", status="5xx") == before + 1
+    assert sample(HTTP_CLIENT_IN_FLIGHT, backend="test-backend", host="http://test:1") == 0
+
+
+@pytest.mark.asyncio
+async def test_transport_counts_connection_errors():
+    def refuse(request):
+        raise httpx.ConnectError("refused", request=request)
+
+    transport = InstrumentedTransport("test-errors", "http://test:2", httpx.MockTransport(refuse), max_connections=4)
+
+    async with httpx.AsyncClient(transport=transport) as client:
+        with pytest.raises(httpx.ConnectError):
+            await client.get("http://test:2/ready")
+
+    assert sample(HTTP_CLIENT_REQUESTS, backend="test-errors", status="error") == 1
+    assert transport.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_shared_client_does_not_carry_cookies_between_users():
+    seen = []
+
+    def grafana(request):
+        seen.append((request.headers["X-WEBAUTH-USER"], request.headers.get("cookie")))
+        return httpx.Response(200, headers={"Set-Cookie": f"grafana_session={request.headers['X-WEBAUTH-USER']}"})
+
+    registry = HTTPClientRegistry()
+    client = registry.get("grafana", "http://grafana:3000")
+    client._transport._transport = httpx.MockTransport(grafana)
+
+    await client.get("http://grafana:3000/api/user", headers={"X-WEBAUTH-USER": "alice"})
+    await client.get("http://grafana:3000/api/user", headers={"X-WEBAUTH-USER": "bob"})
+
+    assert seen == [("alice", None), ("bob", None)]
+    assert not client.cookies
+    await registry.close_all()
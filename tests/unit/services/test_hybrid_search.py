@@ -0,0 +1,78 @@
+"""
+Unit tests for full-text retrieval and reciprocal-rank fusion.
+"""
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.services.hybrid_search import DESIGN_CHUNK_TSVECTOR, reciprocal_rank_fusion
+from app.services.knowledge_search_service import KnowledgeSearchService
+
+
+class TestReciprocalRankFusion:
+    """Test merging of best-first rankings."""
+
+    def test_items_in_both_rankings_rise(self):
+        fused = reciprocal_rank_fusion([["a", "b", "c"], ["c", "d"]], k=60)
+
+        assert fused[0] == "c"
+        assert sorted(fused) == ["a", "b", "c", "d"]
+
+    def test_duplicates_keep_the_first_ranking_instance(self):
+        vector = [{"id": 1, "similarity": 0.8}]
+        lexical = [{"id": 2, "similarity": 0.1}, {"id": 1, "similarity": 0.1}]
+
+        fused = reciprocal_rank_fusion([vector, lexical], key=lambda item: item["id"], k=60)
+
+        assert fused == [{"id": 1, "similarity": 0.8}, {"id": 2, "similarity": 0.1}]
+
+    def test_limit(self):
+        assert reciprocal_rank_fusion([[1, 2, 3], [4, 5]], k=60, limit=2) == [1, 4]
+
+
+def chunk(chunk_id, similarity):
+    return SimpleNamespace(
+        id=chunk_id,
+        source_type="component",
+        source_id=uuid.uuid4(),
+        content="text",
+        content_type="text",
+        similarity=similarity,
+        chunk_metadata={},
+    )
+
+
+@pytest.mark.asyncio
+async def test_search_fuses_vector_and_text_results():
+    shared, vector_only, text_only = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    db = MagicMock()
+    db.execute.return_value.fetchall.side_effect = [
+        [chunk(vector_only, 0.9), chunk(shared, 0.8)],
+        [chunk(shared, 0.2), chunk(text_only, 0.1)],
+    ]
+    embedding_service = MagicMock()
+    embedding_service.embed = AsyncMock(return_value=[0.1] * 4)
+
+    with patch("app.services.knowledge_search_service.get_embedding_service", return_value=embedding_service), \
+            patch("app.services.knowledge_search_service.tune_vector_search"):
+        results = await KnowledgeSearchService(db).search_similar("disk full on db01", limit=3)
+
+    assert [r["chunk_id"] for r in results] == [shared, vector_only, text_only]
+    assert results[0]["similarity"] == 0.8
+    text_sql = str(db.execute.call_args_list[1].args[0])
+    assert DESIGN_CHUNK_TSVECTOR in text_sql and "ILIKE" not in text_sql
+
+
+def test_text_search_ranks_with_the_fulltext_index():
+    db = MagicMock()
+    db.execute.return_value.fetchall.return_value = [chunk(uuid.uuid4(), 0.4)]
+
+    with patch("app.services.knowledge_search_service.get_embedding_service"):
+        results = KnowledgeSearchService(db)._text_search("nginx 502", limit=5)
+
+    sql, params = db.execute.call_args.args
+    assert "websearch_to_tsquery('english', :query)" in str(sql)
+    assert params == {"query": "nginx 502", "limit": 5}
+    assert results[0]["similarity"] == 0.4
@@ -0,0 +1,180 @@
+"""
+Unit tests for the durable ingest queue worker.
+"""
+import asyncio
+import uuid
+import pytest
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from sqlalchemy.dialects import postgresql
+
+from app.services.ingest_queue import (
+    IngestQueueWorker,
+    reclaim_stale_jobs,
+    retry_delay,
+    STAGE_ANALYSIS,
+)
+
+
+@asynccontextmanager
+async def fake_session():
+    yield AsyncMock()
+
+
+class TestRetryDelay:
+    """Test exponential backoff."""
+
+    def test_first_failure_uses_base(self):
+        assert retry_delay(1, base=5, maximum=600) == 5
+
+    def test_doubles_per_attempt(self):
+        assert retry_delay(2, base=5, maximum=600) == 10
+        assert retry_delay(4, base=5, maximum=600) == 40
+
+    def test_capped_at_maximum(self):
+        assert retry_delay(20, base=5, maximum=600) == 600
+
+    def test_no_delay_before_first_attempt(self):
+        assert retry_delay(0, base=5, maximum=600) == 0
+
+
+@pytest.mark.asyncio
+class TestIngestQueueWorker:
+    """Test dispatching, concurrency caps and failure handling."""
+
+    async def test_respects_stage_concurrency(self):
+        jobs = [(uuid.uuid4(), uuid.uuid4(), 1, 5) for _ in range(6)]
+        total = len(jobs)
+        running = 0
+        peak = 0
+        done = asyncio.Event()
+        handled = []
+
+        async def handler(alert_id):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            handled.append(alert_id)
+            if len(handled) == total:
+                done.set()
+
+        async def claim(db, stage, limit, worker_id):
+            claimed, jobs[:] = jobs[:limit], jobs[limit:]
+            return claimed
+
+        worker = IngestQueueWorker(
+            {STAGE_ANALYSIS: handler},
+            concurrency={STAGE_ANALYSIS: 2},
+            poll_interval=0.01,
+            session_factory=fake_session,
+        )
+
+        with patch("app.services.ingest_queue.claim_jobs", side_effect=claim), \
+             patch("app.services.ingest_queue.complete_job", AsyncMock()) as complete, \
+             patch("app.services.ingest_queue.reclaim_stale_jobs", AsyncMock(return_value=0)), \
+             patch("app.services.ingest_queue.get_queue_stats", AsyncMock(return_value={})):
+            await worker.start()
+            await asyncio.wait_for(done.wait(), timeout=2)
+            await worker.stop()
+
+        assert len(handled) == 6
+        assert peak <= 2
+        assert complete.await_count == 6
+
+    async def test_failed_job_is_rescheduled(self):
+        job = (uuid.uuid4(), uuid.uuid4(), 1, 5)
+        failed = asyncio.Event()
+
+        async def handler(alert_id):
+            raise RuntimeError("LLM provider unavailable")
+
+        claims = [[job]]
+
+        async def claim(db, stage, limit, worker_id):
+            return claims.pop() if claims else []
+
+        async def fail(db, job_id, attempts, max_attempts, error):
+            failed.set()
+            return True
+
+        worker = IngestQueueWorker(
+            {STAGE_ANALYSIS: handler},
+            concurrency={STAGE_ANALYSIS: 1},
+            poll_interval=0.01,
+            session_factory=fake_session,
+        )
+
+        with patch("app.services.ingest_queue.claim_jobs", side_effect=claim), \
+             patch("app.services.ingest_queue.fail_job", side_effect=fail) as fail_mock, \
+             patch("app.services.ingest_queue.complete_job", AsyncMock()) as complete, \
+             patch("app.services.ingest_queue.reclaim_stale_jobs", AsyncMock(return_value=0)), \
+             patch("app.services.ingest_queue.get_queue_stats", AsyncMock(return_value={})):
+            await worker.start()
+            await asyncio.wait_for(failed.wait(), timeout=2)
+            await worker.stop()
+
+        complete.assert_not_awaited()
+        args = fail_mock.call_args.args
+        assert args[1] == job[0]
+        assert "LLM provider unavailable" in args[4]
+
+    async def test_long_running_job_heartbeats_its_lock(self):
+        job = (uuid.uuid4(), uuid.uuid4(), 1, 5)
+        finished = asyncio.Event()
+
+        async def handler(alert_id):
+            await asyncio.sleep(0.05)
+
+        worker = IngestQueueWorker(
+            {STAGE_ANALYSIS: handler},
+            concurrency={STAGE_ANALYSIS: 1},
+            session_factory=fake_session,
+            visibility_timeout=0.03,
+        )
+
+        with patch("app.services.ingest_queue.renew_job_lock", AsyncMock(return_value=True)) as renew, \
+             patch("app.services.ingest_queue.complete_job", AsyncMock(side_effect=lambda *a: finished.set())):
+            await worker._run_job(STAGE_ANALYSIS, *job)
+
+        assert finished.is_set()
+        assert renew.await_count >= 2
+        assert renew.call_args.args[1:] == (job[0], worker.worker_id)
+
+
+@pytest.mark.asyncio
+async def test_reclaim_dead_letters_jobs_out_of_attempts():
+    db = AsyncMock()
+
+    await reclaim_stale_jobs(db, visibility_timeout=900)
+
+    dead, reclaimed = [call.args[0] for call in db.execute.call_args_list]
+    dead_sql = str(dead.compile(dialect=postgresql.dialect()))
+    assert "ingest_queue_jobs.attempts >= ingest_queue_jobs.max_attempts" in dead_sql
+    assert dead.compile().params["status"] == "dead"
+    assert reclaimed.compile().params["status"] == "pending"
+
+
+@pytest.mark.asyncio
+async def test_remediation_errors_are_raised_for_retry():
+    from app.routers.webhook import perform_auto_remediation
+
+    result = MagicMock()
+    result.scalar_one_or_none.return_value = SimpleNamespace(id=uuid.uuid4(), alert_name="HighCPU")
+    db = AsyncMock()
+    db.execute.return_value = result
+
+    @asynccontextmanager
+    async def session():
+        yield db
+
+    matcher = AsyncMock()
+    matcher.process_alert_for_remediation.return_value = {"error": "database unavailable"}
+
+    with patch("app.database.AsyncSessionLocal", session), \
+         patch("app.services.trigger_matcher.AlertTriggerMatcher", return_value=matcher):
+        with pytest.raises(RuntimeError, match="database unavailable"):
+            await perform_auto_remediation(str(uuid.uuid4()))
@@ -0,0 +1,160 @@
+"""
+Unit tests for the online alert clustering engine.
+"""
+import uuid
+import pytest
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+
+from app.services.alert_clustering_service import exact_cluster_key
+from app.services.online_clustering import AlertEvent, OnlineClusteringEngine
+
+NOW = datetime(2026, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def make_alert(name="HighCPU", instance="web-01", job="node", minutes=0, summary="", severity="warning"):
+    return AlertEvent(
+        id=uuid.uuid4(),
+        alert_name=name,
+        instance=instance,
+        job=job,
+        severity=severity,
+        timestamp=NOW + timedelta(minutes=minutes),
+        labels={"env": "prod", "instance": instance},
+        annotations={"summary": summary},
+    )
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_engine(**kwargs):
+    kwargs.setdefault("temporal_window_minutes", 5)
+    kwargs.setdefault("horizon_minutes", 60)
+    kwargs.setdefault("semantic_threshold", 0.7)
+    kwargs.setdefault("max_candidates", 100)
+    return OnlineClusteringEngine(**kwargs)
+
+
+class TestAssignment:
+    """Test the exact, temporal and semantic layers."""
+
+    def test_exact_pair_forms_cluster(self):
+        engine = make_engine()
+        first, second = make_alert(), make_alert(minutes=30)
+
+        assert engine.observe([first]) == {first.id: None}
+        assigned = engine.observe([second])
+
+        key = exact_cluster_key("HighCPU", "web-01", "node")
+        assert assigned == {second.id: key}
+        cluster = engine._clusters[key]
+        assert cluster.cluster_type == "exact"
+        assert cluster.pending == [first.id, second.id]
+
+    def test_temporal_window_groups_storm(self):
+        engine = make_engine()
+        alerts = [make_alert(instance=f"web-{i}", minutes=i * 3) for i in range(4)]
+        late = make_alert(instance="web-9", minutes=30)
+
+        assigned = engine.observe(alerts + [late])
+
+        keys = {assigned[a.id] for a in alerts}
+        assert len(keys) == 1 and None not in keys
+        assert engine._clusters[keys.pop()].cluster_type == "temporal"
+        assert assigned[late.id] is None
+
+    def test_source_keeps_joining_its_cluster(self):
+        engine = make_engine()
+        first, other = make_alert(instance="web-01"), make_alert(instance="web-02", minutes=1)
+        repeat = make_alert(instance="web-01", minutes=40)
+
+        assigned = engine.observe([first, other])
+        assigned.update(engine.observe([repeat]))
+
+        assert assigned[repeat.id] == assigned[first.id] == assigned[other.id] is not None
+
+    def test_semantic_layer_matches_similar_text(self):
+        engine = make_engine()
+        a = make_alert("DiskFull", "db-01", "node", summary="disk space on /var almost full")
+        b = make_alert("VolumeFull", "db-01", "node", minutes=20, summary="disk space on /var almost full")
+        c = make_alert("LatencyHigh", "api-01", "http", minutes=21, summary="p99 latency above SLO")
+
+        assigned = engine.observe([a, b, c])
+
+        assert assigned[a.id] == assigned[b.id] is not None
+        assert engine._clusters[assigned[a.id]].cluster_type == "semantic"
+        assert assigned[c.id] is None
+
+    def test_clustered_alert_stops_waiting_on_other_layers(self):
+        engine = make_engine()
+        a = make_alert(instance="web-01")
+        engine.observe([a, make_alert(instance="web-01", minutes=1)])
+
+        assert a.id not in engine._singles
+        assert "HighCPU" not in engine._windows
+
+    def test_metadata_and_severity(self):
+        engine = make_engine()
+        engine.observe([
+            make_alert(instance="web-01", severity="warning"),
+            make_alert(instance="web-02", minutes=1, severity="critical"),
+        ])
+
+        cluster = next(iter(engine._clusters.values()))
+        assert cluster.severity == "critical"
+        assert cluster.metadata()["common_labels"] == {"env": "prod"}
+        assert cluster.metadata()["unique_instances_count"] == 2
+
+
+class TestEviction:
+    """Test the state horizon."""
+
+    def test_idle_state_is_evicted(self):
+        clock = FakeClock()
+        engine = make_engine(clock=clock)
+        engine.observe([make_alert(instance="web-01"), make_alert(instance="web-01", minutes=1)])
+        engine.observe([make_alert("DiskFull", "db-01")])
+        for cluster in engine._clusters.values():
+            cluster.pending = []
+
+        clock.now = 3601
+        assert engine.evict() == 2
+        assert not engine._clusters and not engine._singles and not engine._exact
+        assert not engine._windows and not engine._candidates
+
+    def test_clusters_with_unwritten_alerts_are_kept(self):
+        clock = FakeClock()
+        engine = make_engine(clock=clock)
+        engine.observe([make_alert(), make_alert(minutes=1)])
+
+        clock.now = 3601
+        engine.evict()
+
+        assert len(engine._clusters) == 1
+
+
+@pytest.mark.asyncio
+class TestCheckpoint:
+    """Test that failed checkpoints keep their work."""
+
+    async def test_failed_checkpoint_is_retried(self):
+        @asynccontextmanager
+        async def failing_session():
+            raise ConnectionError("database unavailable")
+            yield
+
+        engine = make_engine(session_factory=failing_session)
+        first, second = make_alert(), make_alert(minutes=1)
+        engine.observe([first, second])
+
+        assert await engine.checkpoint() == 0
+
+        cluster = next(iter(engine._clusters.values()))
+        assert cluster.pending == [first.id, second.id]
+        assert engine._dirty == {cluster.cluster_key}
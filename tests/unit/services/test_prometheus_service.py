@@ -0,0 +1,89 @@
+"""
+Unit tests for fleet-wide infrastructure health queries.
+"""
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.services import prometheus_service
+from app.services.prometheus_service import (
+    PrometheusClient,
+    PrometheusConnectionError,
+    infrastructure_queries,
+)
+
+FLEET = infrastructure_queries()
+
+
+def vector(**values):
+    return {"result": [
+        {"metric": {"instance": instance}, "value": [1700000000, str(value)]}
+        for instance, value in values.items()
+    ]}
+
+
+def make_client(query):
+    client = PrometheusClient(base_url="http://prometheus-test:9090")
+    client.get_targets = AsyncMock(return_value={"activeTargets": [
+        {"labels": {"instance": "web-1:9100", "job": "node"}, "health": "up"},
+        {"labels": {"instance": "web-1:9100", "job": "node-dup"}, "health": "up"},
+        {"labels": {"instance": "db-1:9100", "job": "node"}, "health": "down"},
+    ]})
+    client.query = AsyncMock(side_effect=query)
+    return client
+
+
+@pytest.fixture(autouse=True)
+def clear_health_cache():
+    prometheus_service._health_cache.clear()
+    yield
+    prometheus_service._health_cache.clear()
+
+
+def test_instance_queries_escape_the_label_value():
+    queries = infrastructure_queries('we"b')
+
+    assert 'instance="we\\"b"' in queries["cpu"]
+    assert "instance" not in FLEET["memory"].split("by (instance)")[1]
+
+
+@pytest.mark.asyncio
+async def test_health_joins_fleet_vectors_by_instance():
+    results = {
+        FLEET["cpu"]: vector(**{"web-1:9100": 12.345, "db-1:9100": 80}),
+        FLEET["memory"]: vector(**{"web-1:9100": 40}),
+        FLEET["disk"]: vector(**{"db-1:9100": 91.5}),
+    }
+    client = make_client(lambda promql: results[promql])
+
+    instances = await client.get_all_instances_health()
+
+    assert client.query.await_count == 3
+    assert instances == [
+        {"instance": "web-1:9100", "job": "node", "status": "up", "last_scrape": None, "scrape_duration": None,
+         "cpu_percent": 12.35, "memory_percent": 40.0, "disk_percent": None},
+        {"instance": "db-1:9100", "job": "node", "status": "down", "last_scrape": None, "scrape_duration": None,
+         "cpu_percent": 80.0, "memory_percent": None, "disk_percent": 91.5},
+    ]
+
+    assert await client.get_all_instances_health() == instances
+    assert client.query.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_failed_fleet_query_falls_back_per_instance():
+    def query(promql):
+        if promql == FLEET["disk"]:
+            raise PrometheusConnectionError("timeout")
+        if promql in FLEET.values():
+            return vector()
+        instance = "web-1:9100" if "web-1" in promql else "db-1:9100"
+        return vector(**{instance: 50})
+
+    client = make_client(query)
+
+    instances = await client.get_all_instances_health()
+
+    assert [i["disk_percent"] for i in instances] == [50.0, 50.0]
+    assert [i["cpu_percent"] for i in instances] == [None, None]
+    assert client.query.await_count == 5
@@ -0,0 +1,152 @@
+"""
+Unit tests for the observability query result cache.
+"""
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from app.services.query_cache import QueryCache
+
+
+class FakeClock:
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    clock = FakeClock()
+    with patch("app.services.query_cache.time.monotonic", clock), \
+            patch("app.services.query_cache.time.time", clock):
+        yield clock
+
+
+class TestEviction:
+    """Test LRU, size and TTL bounds."""
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = QueryCache(max_size=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+
+        cache.set("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_total_size_is_bounded(self):
+        cache = QueryCache(max_bytes=20)
+        cache.set("a", "x" * 10)
+        cache.set("b", "y" * 10)
+
+        assert cache.get("a") is None
+        assert cache.get("b") == "y" * 10
+        assert cache.get_stats()["bytes"] == 12
+
+        cache.set("huge", "z" * 100)
+        assert cache.get("huge") is None
+
+    def test_expired_entries_are_swept(self, clock):
+        cache = QueryCache(default_ttl_seconds=60)
+        cache.set("a", 1)
+        clock.now += 61
+
+        cache.set("b", 2)
+
+        assert cache.get_stats()["size"] == 1
+        assert cache.get("a") is None
+
+
+class TestTimeBuckets:
+    """Test keys for relative time ranges."""
+
+    def test_relative_range_hits_within_its_bucket(self, clock):
+        clock.now = 3600 * 1000  # bucket boundary
+        cache = QueryCache(bucket_seconds=30)
+        cache.set("errors in the last hour", "result", time_range="1h")
+
+        clock.now += 59
+        assert cache.get("Errors in  the last hour", time_range="1h") == "result"
+
+        clock.now += 1
+        assert cache.get("errors in the last hour", time_range="1h") is None
+
+    def test_ttl_is_capped_at_the_bucket_end(self, clock):
+        clock.now = 3600 * 1000 + 50
+        cache = QueryCache(default_ttl_seconds=300, bucket_seconds=30)
+        cache.set("q", "result", time_range="1h")
+
+        assert next(iter(cache._cache.values())).expires_at == clock.now + 10
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_queries_load_once():
+    cache = QueryCache()
+    release = asyncio.Event()
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return {"rows": 3}
+
+    tasks = [asyncio.create_task(cache.get_or_load("slow query", loader)) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*tasks) == [{"rows": 3}] * 5
+    assert calls == 1
+    assert cache.get_stats()["coalesced"] == 4
+    assert await cache.get_or_load("slow query", loader) == {"rows": 3}
+    assert calls == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_load_is_not_cached():
+    cache = QueryCache()
+
+    async def failing():
+        raise RuntimeError("backend down")
+
+    with pytest.raises(RuntimeError):
+        await cache.get_or_load("q", failing)
+
+    async def working():
+        return "ok"
+
+    assert await cache.get_or_load("q", working) == "ok"
+
+
+class DictBackend:
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ttl_seconds):
+        self.values[key] = value
+
+
+@pytest.mark.asyncio
+async def test_shared_backend_serves_other_replicas():
+    backend = DictBackend()
+
+    async def loader():
+        return {"summary": "ok"}
+
+    await QueryCache(backend=backend).get_or_load("q", loader)
+
+    async def unexpected():
+        raise AssertionError("should have been served from the shared backend")
+
+    replica = QueryCache(backend=backend)
+    assert await replica.get_or_load("q", unexpected) == {"summary": "ok"}
+    assert replica.get("q") == {"summary": "ok"}
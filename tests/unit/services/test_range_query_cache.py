@@ -0,0 +1,100 @@
+"""
+Unit tests for the incremental panel range query cache.
+"""
+from unittest.mock import patch
+
+import pytest
+
+from app.services.range_query_cache import RangeQueryCache, parse_step_seconds
+
+STEP = 60.0
+NOW = 1_700_000_000.0 - 1_700_000_000.0 % STEP
+
+
+class FakePrometheus:
+    """Range query endpoint with one sample per step for two series."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, start, end):
+        self.calls.append((start, end))
+        timestamps = [start + i * STEP for i in range(int((end - start) // STEP) + 1)]
+        return {"status": "success", "data": {"resultType": "matrix", "result": [
+            {"metric": {"instance": name}, "values": [[int(ts), str(ts / STEP + offset)] for ts in timestamps]}
+            for name, offset in (("a", 0), ("b", 0.5))
+        ]}}
+
+
+@pytest.fixture
+def now():
+    clock = {"now": NOW}
+    with patch("app.services.range_query_cache.time.time", lambda: clock["now"]):
+        yield clock
+
+
+def test_parse_step_seconds():
+    assert parse_step_seconds("15s") == 15
+    assert parse_step_seconds("5m") == 300
+    assert parse_step_seconds("30") == 30
+    assert parse_step_seconds("1h30m") is None
+
+
+@pytest.mark.asyncio
+async def test_refresh_only_fetches_the_missing_tail(now):
+    cache = RangeQueryCache(freshness=120)
+    prometheus = FakePrometheus()
+
+    first, start, end = await cache.query_range("panel", prometheus, NOW - 3600 + 5, NOW + 5, STEP)
+    assert (start, end) == (NOW - 3600, NOW)
+    assert prometheus.calls == [(NOW - 3600, NOW)]
+
+    now["now"] += 300
+    second, _, _ = await cache.query_range("panel", prometheus, NOW - 3300, NOW + 300, STEP)
+
+    # Samples older than the freshness window were cached and are not re-read
+    assert prometheus.calls[1] == (NOW - 120 + STEP, NOW + 300)
+    expected, _, _ = await RangeQueryCache().query_range("other", FakePrometheus(), NOW - 3300, NOW + 300, STEP)
+    assert second == expected
+    assert [len(s["values"]) for s in second["data"]["result"]] == [61, 61]
+    assert second["data"]["result"][1]["values"][0] == [int(NOW - 3300), str((NOW - 3300) / STEP + 0.5)]
+
+
+@pytest.mark.asyncio
+async def test_range_before_the_cached_start_is_refetched(now):
+    cache = RangeQueryCache(freshness=0)
+    prometheus = FakePrometheus()
+
+    await cache.query_range("panel", prometheus, NOW - 600, NOW, STEP)
+    await cache.query_range("panel", prometheus, NOW - 1200, NOW, STEP)
+    await cache.query_range("panel", prometheus, NOW - 1200, NOW, STEP)
+
+    assert prometheus.calls == [(NOW - 600, NOW), (NOW - 1200, NOW)]
+
+
+@pytest.mark.asyncio
+async def test_non_matrix_results_are_not_cached(now):
+    cache = RangeQueryCache(freshness=0)
+    calls = []
+
+    async def failing(start, end):
+        calls.append(start)
+        return {"status": "error", "error": "bad query"}
+
+    response, _, _ = await cache.query_range("panel", failing, NOW - 600, NOW, STEP)
+    await cache.query_range("panel", failing, NOW - 600, NOW, STEP)
+
+    assert response["status"] == "error"
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_ranges_are_evicted_over_budget(now):
+    cache = RangeQueryCache(freshness=0)
+    await cache.query_range("one", FakePrometheus(), NOW - 3600, NOW, STEP)
+    cache.max_bytes = cache._bytes * 1.5
+
+    await cache.query_range("two", FakePrometheus(), NOW - 3600, NOW, STEP)
+
+    assert list(cache._entries) == ["two"]
+    assert cache._bytes <= cache.max_bytes
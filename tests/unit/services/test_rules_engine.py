@@ -6,7 +6,11 @@ from unittest.mock import MagicMock, patch
 import sys
 
 # Import directly without mock - the actual json_logic is from json_logic_qubit
-from app.services.rules_engine import match_pattern, match_rule, flatten_alert
+from uuid import uuid4
+from app.services.rules_engine import (
+    match_pattern, match_rule, flatten_alert,
+    compile_pattern, compile_json_logic, RuleIndex, get_rule_index, invalidate_rule_index,
+)
 from app.models import AutoAnalyzeRule
 
 
@@ -309,3 +313,116 @@ class TestEdgeCases:
         long_pattern = "a" * 1000
         long_value = "a" * 1000
         assert match_pattern(long_pattern, long_value) is True
+
+
+class TestRuleIndex:
+    """Test the compiled, cached rule index."""
+    
+    def _rule(self, name, priority, action="auto_analyze", **patterns):
+        return AutoAnalyzeRule(
+            id=uuid4(),
+            name=name,
+            priority=priority,
+            action=action,
+            enabled=True,
+            condition_json=patterns.pop("condition_json", None),
+            alert_name_pattern=patterns.get("alert_name_pattern", "*"),
+            severity_pattern=patterns.get("severity_pattern", "*"),
+            instance_pattern=patterns.get("instance_pattern", "*"),
+            job_pattern=patterns.get("job_pattern", "*"),
+        )
+    
+    def test_compile_pattern_matches_match_pattern(self):
+        """Compiled patterns agree with match_pattern for all cases."""
+        patterns = ["*", "HighCPU", "prod-*", "*-prod", "server-0?", "test.example.com", "test[1]", ""]
+        values = ["HighCPU", "highcpu", "prod-db-01", "db-prod", "server-01", "server-001",
+                  "test.example.com", "testXexample.com", "test[1]", ""]
+        for pattern in patterns:
+            matcher = compile_pattern(pattern)
+            for value in values:
+                expected = match_pattern(pattern, value)
+                actual = True if matcher is None else matcher(value)
+                assert actual == expected, (pattern, value)
+    
+    def test_literal_bucket_respects_priority(self):
+        """A higher-priority wildcard rule wins over a later literal rule."""
+        wildcard = self._rule("wildcard", 10, action="ignore", severity_pattern="info")
+        literal = self._rule("literal", 20, alert_name_pattern="HighCPU")
+        index = RuleIndex([wildcard, literal])
+        
+        matched, action = index.match("HighCPU", "info", "web-01", "node")
+        assert matched.name == "wildcard"
+        assert action == "ignore"
+        
+        matched, action = index.match("highcpu", "critical", "web-01", "node")
+        assert matched.name == "literal"
+        assert action == "auto_analyze"
+    
+    def test_no_match_defaults_to_manual(self):
+        index = RuleIndex([self._rule("only", 1, alert_name_pattern="DiskFull")])
+        assert index.match("HighCPU", "critical", "web-01", "node") == (None, "manual")
+    
+    def test_match_many_agrees_with_match_rule(self):
+        """Batch matching returns the same first match as evaluating rules in order."""
+        rules = [
+            self._rule("a", 1, alert_name_pattern="Nginx*", instance_pattern="prod-*"),
+            self._rule("b", 2, alert_name_pattern="NginxDown", action="ignore"),
+            self._rule("c", 3, severity_pattern="critical"),
+        ]
+        index = RuleIndex(rules)
+        alerts = [
+            ("NginxDown", "critical", "prod-web-01", "nginx"),
+            ("NginxDown", "warning", "dev-web-01", "nginx"),
+            ("HighCPU", "critical", "db-01", "node"),
+            ("HighCPU", "warning", "db-01", "node"),
+            ("NginxDown", "critical", "prod-web-01", "nginx"),
+        ]
+        for (compiled, action), alert in zip(index.match_many(alerts), alerts):
+            expected = next((r for r in rules if match_rule(r, *alert)), None)
+            assert (compiled.rule_id if compiled else None) == (expected.id if expected else None)
+    
+    def test_compiled_json_logic(self):
+        logic = compile_json_logic({
+            "and": [
+                {"==": [{"var": "severity"}, "critical"]},
+                {"in": [{"var": "job"}, ["node", "nginx"]]},
+            ]
+        })
+        assert logic({"severity": "critical", "job": "node"}) is True
+        assert not logic({"severity": "critical", "job": "mysql"})
+        assert not logic({"severity": "warning", "job": "node"})
+    
+    def test_json_logic_compares_loosely(self):
+        def check(logic, **data):
+            return compile_json_logic(logic)(data)
+
+        assert check({">": [{"var": "x"}, "5"]}, x="10") is True
+        assert check({">": [{"var": "x"}, 5]}, x="10") is True
+        assert check({"<=": [{"var": "x"}, "10.0"]}, x=10) is True
+        assert check({"<": [1, {"var": "x"}, 3]}, x="2") is True
+        assert check({"==": [{"var": "x"}, 10]}, x="10") is True
+        assert check({"!=": [{"var": "x"}, "10"]}, x=10) is False
+        assert check({"===": [{"var": "x"}, 10]}, x="10") is False
+        assert check({"<": [{"var": "severity"}, "warning"]}, severity="critical") is True
+        assert check({"in": [{"var": "x"}, [1, 2]]}, x=2.0) is True
+
+    def test_json_logic_missing_var_does_not_raise(self):
+        logic = compile_json_logic({">": [{"var": "missing"}, 5]})
+
+        assert logic({}) is False
+        assert compile_json_logic({"in": [{"var": "missing"}, "critical"]})({}) is False
+        assert compile_json_logic({"!": [{"var": "missing"}]})({}) is True
+
+    def test_invalidate_rule_index(self):
+        db = MagicMock()
+        db.execute.return_value.scalars.return_value.all.return_value = [self._rule("r", 1)]
+        
+        invalidate_rule_index()
+        first = get_rule_index(db)
+        assert get_rule_index(db) is first
+        assert db.execute.call_count == 1
+        
+        invalidate_rule_index()
+        assert get_rule_index(db) is not first
+        assert db.execute.call_count == 2
+        invalidate_rule_index()
@@ -0,0 +1,53 @@
+"""
+Unit tests for near-linear semantic grouping.
+"""
+import numpy as np
+
+from app.services.semantic_clustering import SemanticVectorizer, semantic_groups, signature_blocks
+
+
+class TestSemanticVectorizer:
+    """Test hashed TF-IDF with running document frequencies."""
+
+    def test_rows_are_normalized(self):
+        vectors = SemanticVectorizer().update_transform(["disk full on db-01", "cpu high on web-01"])
+        norms = np.sqrt(vectors.multiply(vectors).sum(axis=1)).A1
+        assert np.allclose(norms, 1.0)
+
+    def test_document_frequencies_accumulate(self):
+        vectorizer = SemanticVectorizer()
+        vectorizer.update_transform(["disk full"] * 3)
+        vectorizer.update_transform(["disk full", "cpu high"])
+
+        assert vectorizer._docs == 5
+        assert vectorizer._df.max() == 4
+
+
+class TestSemanticGroups:
+    """Test signature-sorted neighbour search and union-find grouping."""
+
+    def test_groups_similar_texts_only(self):
+        texts = [
+            "disk space on /var almost full db-01",
+            "disk space on /var almost full db-02",
+            "disk space on /var almost full db-03",
+            "p99 latency above slo for checkout api",
+            "p99 latency above slo for checkout api",
+            "certificate expires in seven days",
+        ]
+        vectors = SemanticVectorizer().update_transform(texts)
+
+        groups = sorted(semantic_groups(vectors, 0.6))
+
+        assert groups == [[0, 1, 2], [3, 4]]
+
+    def test_identical_rows_chain_into_one_group(self):
+        vectors = SemanticVectorizer().update_transform(["node exporter down"] * 50)
+
+        assert semantic_groups(vectors, 0.9) == [list(range(50))]
+
+    def test_signatures_are_deterministic(self):
+        vectors = SemanticVectorizer().update_transform(["a b c d", "memory pressure on host"])
+
+        assert np.array_equal(signature_blocks(vectors), signature_blocks(vectors))
+        assert signature_blocks(vectors).shape == (2, 16)
@@ -0,0 +1,89 @@
+"""
+Unit tests for batched knowledge source metadata lookups.
+"""
+import uuid
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from app.services.knowledge_search_service import KnowledgeSearchService
+from app.services import source_metadata
+from app.services.source_metadata import SourceMetadataCache, invalidate_source_metadata, load_source_metadata
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestSourceMetadataCache:
+    """Test TTL expiry and size bound."""
+
+    def test_entries_expire(self):
+        clock = FakeClock()
+        cache = SourceMetadataCache(ttl=60, clock=clock)
+        source_id = uuid.uuid4()
+        cache.put_many('document', {source_id: {'source_title': 'SOP'}})
+
+        assert cache.get_many('document', [source_id]) == ({source_id: {'source_title': 'SOP'}}, [])
+
+        clock.now = 61
+        assert cache.get_many('document', [source_id]) == ({}, [source_id])
+
+    def test_kinds_are_separate_and_size_is_bounded(self):
+        cache = SourceMetadataCache(max_entries=2)
+        a, b, c = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+        cache.put_many('document', {a: {}, b: {}})
+        cache.put_many('runbook', {c: {}})
+
+        found, missing = cache.get_many('document', [a, b])
+        assert list(found) == [b] and missing == [a]
+        assert cache.get_many('image', [c]) == ({}, [c])
+
+
+def chunk(source_type, doc_type=None):
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        source_type=source_type,
+        source_id=uuid.uuid4(),
+        content="text",
+        content_type="text",
+        similarity=0.9,
+        chunk_metadata={'doc_type': doc_type} if doc_type else {},
+    )
+
+
+def test_enrichment_looks_up_each_source_kind_once():
+    chunks = [chunk('document') for _ in range(5)] + [chunk('document', 'runbook') for _ in range(3)] + [chunk('image')]
+
+    def load(db, kind, ids):
+        return {source_id: {
+            'source_title': f"{kind} title", 'source_url': None, 'doc_type': kind,
+            'app_id': None, 'image_type': 'diagram', 'view_url': '/view'
+        } for source_id in ids}
+
+    with patch('app.services.knowledge_search_service.load_source_metadata', side_effect=load) as loader:
+        results = KnowledgeSearchService(MagicMock())._enrich(chunks)
+
+    assert sorted(call.args[1] for call in loader.call_args_list) == ['document', 'image', 'runbook']
+    assert [r['source_title'] for r in results] == ['document title'] * 5 + ['runbook title'] * 3 + ['image title']
+    assert results[5]['view_url'] == '/view'
+
+
+def test_runbook_edit_is_visible_immediately():
+    runbook_id = uuid.uuid4()
+    stored = {'enabled': True, 'approval_required': False}
+    loader = MagicMock(side_effect=lambda db, ids: {runbook_id: dict(stored)})
+    invalidate_source_metadata()
+
+    with patch.dict(source_metadata._LOADERS, {'runbook': loader}):
+        assert load_source_metadata(None, 'runbook', [runbook_id])[runbook_id]['enabled'] is True
+
+        # What the runbook update route does after committing
+        stored.update(enabled=False, approval_required=True)
+        invalidate_source_metadata()
+
+        assert load_source_metadata(None, 'runbook', [runbook_id])[runbook_id] == stored
+    assert loader.call_count == 2
@@ -0,0 +1,210 @@
+"""
+Unit tests for the SSH connection pool.
+"""
+import asyncio
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from app.services.executor_ssh import SSHExecutor
+from app.services.ssh_pool import SSHConnectionPool, pool_key
+
+
+class FakeConnection:
+    """Stands in for an asyncssh connection."""
+
+    def __init__(self, healthy=True):
+        self.healthy = healthy
+        self.runs = 0
+        self.active = 0
+        self.peak = 0
+        self._closed = asyncio.Event()
+
+    async def run(self, command, check=False):
+        self.runs += 1
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        return SimpleNamespace(exit_status=0 if self.healthy else 1, stdout="ok\n", stderr="")
+
+    def close(self):
+        self._closed.set()
+
+    async def wait_closed(self):
+        await self._closed.wait()
+
+    @property
+    def is_closed(self):
+        return self._closed.is_set()
+
+
+def opener_for(connections):
+    async def opener():
+        await asyncio.sleep(0.01)
+        conn = FakeConnection()
+        connections.append(conn)
+        return conn
+    return opener
+
+
+def test_pool_key_separates_credentials():
+    assert pool_key("web-01", 22, "root", "a") == pool_key("web-01", 22, "root", "a")
+    assert pool_key("web-01", 22, "root", "a") != pool_key("web-01", 22, "root", "b")
+    assert "hunter2" not in pool_key("web-01", 22, "root", "hunter2")
+
+
+@pytest.mark.asyncio
+class TestSSHConnectionPool:
+    """Test reuse, bounds, eviction and health checks."""
+
+    async def test_reuses_connection_after_release(self):
+        pool = SSHConnectionPool()
+        opened = []
+
+        entry = await pool.acquire("k", opener_for(opened))
+        await pool.release(entry)
+        again = await pool.acquire("k", opener_for(opened))
+
+        assert again is entry
+        assert len(opened) == 1
+        await pool.close_all()
+
+    async def test_concurrent_misses_share_one_handshake(self):
+        pool = SSHConnectionPool()
+        opened = []
+
+        entries = await asyncio.gather(*(pool.acquire("k", opener_for(opened)) for _ in range(5)))
+
+        assert len(opened) == 1
+        assert entries[0].leases == 5
+        await pool.close_all()
+
+    async def test_channel_limit_per_connection(self):
+        pool = SSHConnectionPool(max_channels_per_host=2)
+        opened = []
+        entry = await pool.acquire("k", opener_for(opened))
+
+        async def run():
+            async with pool.channel(entry) as conn:
+                await conn.run("true")
+
+        await asyncio.gather(*(run() for _ in range(6)))
+
+        assert opened[0].runs == 6
+        assert opened[0].peak == 2
+        await pool.close_all()
+
+    async def test_full_pool_evicts_least_recently_used_idle(self):
+        pool = SSHConnectionPool(max_connections=2)
+        opened = []
+
+        for key in ("a", "b"):
+            await pool.release(await pool.acquire(key, opener_for(opened)))
+        await pool.release(await pool.acquire("a", opener_for(opened)))
+        await pool.acquire("c", opener_for(opened))
+
+        assert set(pool._entries) == {"a", "c"}
+        assert opened[1].is_closed
+        await pool.close_all()
+
+    async def test_full_pool_waits_for_release(self):
+        pool = SSHConnectionPool(max_connections=1, acquire_timeout=1)
+        opened = []
+        held = await pool.acquire("a", opener_for(opened))
+
+        waiter = asyncio.create_task(pool.acquire("b", opener_for(opened)))
+        await asyncio.sleep(0.05)
+        assert not waiter.done()
+
+        await pool.release(held)
+        entry = await asyncio.wait_for(waiter, timeout=1)
+
+        assert entry.key == "b"
+        assert opened[0].is_closed
+        await pool.close_all()
+
+    async def test_full_pool_times_out(self):
+        pool = SSHConnectionPool(max_connections=1, acquire_timeout=0.05)
+        await pool.acquire("a", opener_for([]))
+
+        with pytest.raises(ConnectionError, match="exhausted"):
+            await pool.acquire("b", opener_for([]))
+        await pool.close_all()
+
+    async def test_idle_ttl_eviction(self):
+        pool = SSHConnectionPool(idle_ttl=0.02)
+        opened = []
+
+        await pool.release(await pool.acquire("k", opener_for(opened)))
+        await asyncio.sleep(0.05)
+        await pool.acquire("k", opener_for(opened))
+
+        assert len(opened) == 2
+        assert opened[0].is_closed
+        await pool.close_all()
+
+    async def test_remote_close_is_detected(self):
+        pool = SSHConnectionPool()
+        opened = []
+
+        await pool.release(await pool.acquire("k", opener_for(opened)))
+        opened[0].close()
+        await asyncio.sleep(0.01)
+        await pool.acquire("k", opener_for(opened))
+
+        assert len(opened) == 2
+        await pool.close_all()
+
+    async def test_unhealthy_connection_replaced_after_probe(self):
+        pool = SSHConnectionPool(health_check_interval=0)
+        opened = []
+
+        await pool.release(await pool.acquire("k", opener_for(opened)))
+        opened[0].healthy = False
+        entry = await pool.acquire("k", opener_for(opened))
+
+        assert entry.conn is opened[1]
+        assert opened[0].runs == 1
+        await pool.close_all()
+
+    async def test_failed_handshake_propagates_and_frees_slot(self):
+        pool = SSHConnectionPool(max_connections=1)
+
+        async def failing():
+            raise ConnectionError("SSH authentication failed")
+
+        with pytest.raises(ConnectionError, match="authentication"):
+            await pool.acquire("k", failing)
+
+        assert pool.stats()["opening"] == 0
+        entry = await pool.acquire("k", opener_for([]))
+        assert entry.leases == 1
+        await pool.close_all()
+
+
+@pytest.mark.asyncio
+class TestPooledSSHExecutor:
+    """Test SSHExecutor leasing connections from the pool."""
+
+    async def test_executors_share_connection(self):
+        pool = SSHConnectionPool()
+        conn = FakeConnection()
+        handshakes = 0
+
+        async def open_connection(self):
+            nonlocal handshakes
+            handshakes += 1
+            return conn
+
+        with patch.object(SSHExecutor, "_open_connection", open_connection):
+            for _ in range(3):
+                async with SSHExecutor("web-01", password="secret", pool=pool) as executor:
+                    result = await executor.execute("uptime")
+                    assert result.success
+
+        assert handshakes == 1
+        assert conn.runs == 3
+        assert not conn.is_closed
+        assert pool._entries[executor.pool_key].leases == 0
+        await pool.close_all()
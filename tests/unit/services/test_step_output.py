@@ -0,0 +1,192 @@
+"""
+Unit tests for streamed step output capture.
+"""
+import asyncio
+import uuid
+import pytest
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from app.services.executor_base import HeadTailBuffer
+from app.services.executor_ssh import SSHExecutor
+from app.services.step_output import StepOutputWriter, publish_output, read_output_range, subscribe_output
+
+
+class TestHeadTailBuffer:
+    """Test bounded in-memory output capture."""
+
+    def test_small_output_kept_whole(self):
+        buffer = HeadTailBuffer(100)
+        buffer.write("hello ")
+        buffer.write("world")
+        assert buffer.getvalue() == "hello world"
+
+    def test_keeps_head_and_tail(self):
+        buffer = HeadTailBuffer(10)
+        for i in range(100):
+            buffer.write(f"{i:03d}\n")
+
+        value = buffer.getvalue()
+        assert value.startswith("000\n0")
+        assert value.endswith("\n099\n")
+        assert "[390 characters omitted]" in value
+        assert buffer.total == 400
+
+
+class FakeChunkStore:
+    """Session factory recording inserted and deleted chunk seqs."""
+
+    def __init__(self):
+        self.rows = {}
+        self.fail = False
+
+    def __call__(self):
+        store = self
+
+        @asynccontextmanager
+        async def session():
+            db = AsyncMock()
+
+            async def execute(stmt):
+                if store.fail:
+                    raise ConnectionError("database unavailable")
+                params = stmt.compile().params
+                if stmt.is_insert:
+                    store.rows[params["seq"]] = params
+                else:
+                    for seq in params["seq_1"]:
+                        store.rows.pop(seq, None)
+
+            db.execute.side_effect = execute
+            yield db
+
+        return session()
+
+
+@pytest.mark.asyncio
+class TestStepOutputWriter:
+    """Test chunking, stream switches and head/tail retention."""
+
+    def make_writer(self, store, **limits):
+        return StepOutputWriter(
+            uuid.uuid4(), uuid.uuid4(), session_factory=store,
+            flush_interval=60, **limits
+        )
+
+    async def test_chunks_by_size_and_stream(self):
+        store = FakeChunkStore()
+        writer = self.make_writer(store, chunk_chars=4, head_chars=100, tail_chars=100)
+
+        await writer.write("stdout", "abcdef")
+        await writer.write("stderr", "E")
+        total, dropped = await writer.close()
+
+        assert [(r["stream"], r["offset"], r["content"]) for r in store.rows.values()] == [
+            ("stdout", 0, "abcd"), ("stdout", 4, "ef"), ("stderr", 6, "E")
+        ]
+        assert (total, dropped) == (7, 0)
+
+    async def test_drops_middle_beyond_head_and_tail(self):
+        store = FakeChunkStore()
+        writer = self.make_writer(store, chunk_chars=10, head_chars=20, tail_chars=20)
+
+        await writer.write("stdout", "x" * 100)
+        total, dropped = await writer.close()
+
+        assert sorted(r["offset"] for r in store.rows.values()) == [0, 10, 80, 90]
+        assert (total, dropped) == (100, 60)
+
+    async def test_failed_write_does_not_advance_offsets(self):
+        store = FakeChunkStore()
+        writer = self.make_writer(store, chunk_chars=10, head_chars=0, tail_chars=10)
+
+        await writer.write("stdout", "a" * 10)
+        store.fail = True
+        await writer.write("stdout", "b" * 10)
+        store.fail = False
+        await writer.write("stdout", "c" * 10)
+        total, dropped = await writer.close()
+
+        assert [(r["seq"], r["offset"], r["content"][0]) for r in store.rows.values()] == [(1, 10, "c")]
+        assert (total, dropped) == (20, 10)
+
+    async def test_interval_flush_and_live_wakeup(self):
+        store = FakeChunkStore()
+        writer = StepOutputWriter(uuid.uuid4(), uuid.uuid4(), session_factory=store, flush_interval=0.01)
+
+        async with subscribe_output(writer.execution_id) as updated:
+            await writer.write("stdout", "line\n")
+            await asyncio.wait_for(updated.wait(), timeout=1)
+
+        assert store.rows[0]["content"] == "line\n"
+        await writer.close()
+        assert len(store.rows) == 1
+
+    async def test_publish_without_listeners_is_noop(self):
+        publish_output(uuid.uuid4())
+
+
+class FakeReader:
+    def __init__(self, text):
+        self.text = text
+
+    async def read(self, n):
+        data, self.text = self.text[:n], self.text[n:]
+        await asyncio.sleep(0)
+        return data
+
+
+class FakeProcess:
+    def __init__(self, stdout, stderr, exit_status):
+        self.stdout = FakeReader(stdout)
+        self.stderr = FakeReader(stderr)
+        self._exit_status = exit_status
+        self.exit_status = None
+
+    async def wait_closed(self):
+        self.exit_status = self._exit_status
+
+    def close(self):
+        pass
+
+
+@pytest.mark.asyncio
+class TestSSHStreaming:
+    """Test SSHExecutor.execute_streaming."""
+
+    async def test_streams_both_streams_and_exit_code(self):
+        executor = SSHExecutor("web-01")
+        conn = AsyncMock()
+        conn.create_process.return_value = FakeProcess("a\nb\n", "warn\n", 3)
+        executor._conn = conn
+        executor._connected = True
+        received = []
+
+        async def on_output(stream, text):
+            received.append((stream, text))
+
+        result = await executor.execute_streaming("tail log", on_output)
+
+        assert ("stdout", "a\nb\n") in received
+        assert ("stderr", "warn\n") in received
+        assert result.exit_code == 3
+        assert not result.success
+        assert result.stdout == "a\nb\n"
+        assert result.error_message == "warn\n"
+
+
+@pytest.mark.asyncio
+async def test_read_output_range_reports_stream_end():
+    chunks = [SimpleNamespace(seq=0, stream="stdout", offset=0, length=5, content="hello")]
+    rows = MagicMock()
+    rows.scalars.return_value = chunks
+    ends = MagicMock()
+    ends.one.return_value = (12, 5)
+    db = AsyncMock()
+    db.execute.side_effect = [rows, ends]
+
+    page = await read_output_range(db, uuid.uuid4(), stream="stdout")
+
+    assert page["next_offset"] == 5
+    assert (page["stored_end"], page["stream_end"]) == (12, 5)
@@ -0,0 +1,157 @@
+"""
+Unit tests for the runbook trigger index and batched safety evaluation.
+"""
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from app.services.trigger_matcher import (
+    TriggerIndex,
+    RunbookSafetyState,
+    evaluate_safety_state,
+)
+
+
+def make_trigger(
+    alert_name="*",
+    severity="*",
+    instance="*",
+    job="*",
+    labels=None,
+    priority=100,
+    runbook_id=None
+):
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        runbook_id=runbook_id or uuid.uuid4(),
+        alert_name_pattern=alert_name,
+        severity_pattern=severity,
+        instance_pattern=instance,
+        job_pattern=job,
+        label_matchers_json=labels,
+        priority=priority,
+    )
+
+
+def matched_ids(index, alert_name, severity="critical", instance="", job="", labels=None):
+    return [
+        compiled.trigger_id
+        for compiled, _ in index.match(alert_name, severity, instance, job, labels or {})
+    ]
+
+
+class TestTriggerIndex:
+    """Test bucketing and match semantics."""
+
+    def test_literal_names_are_bucketed(self):
+        literal = make_trigger(alert_name="HighCPU")
+        regex = make_trigger(alert_name="Disk*")
+        index = TriggerIndex([literal, regex])
+
+        assert "highcpu" in index.by_name
+        assert index.scan and index.scan[0].trigger_id == regex.id
+        assert matched_ids(index, "HighCPU") == [literal.id]
+        assert matched_ids(index, "DiskFull") == [regex.id]
+
+    def test_literal_matches_by_prefix_ignoring_case(self):
+        # Patterns are applied with re.match, so literals are prefix matches
+        trigger = make_trigger(alert_name="HighCPU")
+        index = TriggerIndex([trigger])
+
+        assert matched_ids(index, "highcpuusage") == [trigger.id]
+        assert matched_ids(index, "CPUHigh") == []
+
+    def test_severity_bucket_for_wildcard_names(self):
+        trigger = make_trigger(severity="critical")
+        index = TriggerIndex([trigger])
+
+        assert "critical" in index.by_severity
+        assert matched_ids(index, "Anything", severity="critical") == [trigger.id]
+        assert matched_ids(index, "Anything", severity="warning") == []
+
+    def test_all_patterns_and_labels_must_match(self):
+        trigger = make_trigger(
+            alert_name="HighCPU",
+            instance="web-*",
+            labels={"env": "prod", "team": "*"}
+        )
+        index = TriggerIndex([trigger])
+
+        assert matched_ids(
+            index, "HighCPU", instance="web-01", labels={"env": "prod", "team": "x"}
+        ) == [trigger.id]
+        assert matched_ids(index, "HighCPU", instance="db-01", labels={"env": "prod", "team": "x"}) == []
+        assert matched_ids(index, "HighCPU", instance="web-01", labels={"env": "prod"}) == []
+
+    def test_matched_conditions(self):
+        index = TriggerIndex([make_trigger(alert_name="HighCPU", labels={"env": "prod"})])
+
+        (_, conditions), = index.match("HighCPU", "critical", "", "", {"env": "prod"})
+
+        assert conditions == ["alert_name: HighCPU", "labels matched"]
+
+    def test_results_follow_load_order(self):
+        first = make_trigger(alert_name=".*", priority=1)
+        second = make_trigger(alert_name="HighCPU", priority=5)
+        index = TriggerIndex([first, second])
+
+        assert matched_ids(index, "HighCPU") == [first.id, second.id]
+
+    def test_invalid_pattern_is_skipped(self):
+        broken = make_trigger(alert_name="([")
+        index = TriggerIndex([broken])
+
+        assert len(index) == 0
+        assert matched_ids(index, "([") == []
+
+
+class TestEvaluateSafetyState:
+    """Test the per-runbook decision made from batched safety state."""
+
+    def setup_method(self):
+        self.now = datetime.now(timezone.utc)
+        self.runbook = SimpleNamespace(
+            max_executions_per_hour=5, cooldown_minutes=10, auto_execute=True, approval_required=False
+        )
+
+    def test_allowed_when_clear(self):
+        assert evaluate_safety_state(self.runbook, RunbookSafetyState(), self.now) == (True, None)
+
+    def test_open_circuit_blocks(self):
+        allowed, reason = evaluate_safety_state(
+            self.runbook, RunbookSafetyState(circuit_state="open"), self.now
+        )
+        assert not allowed
+        assert "Circuit breaker" in reason
+
+    def test_blackout_blocks(self):
+        allowed, reason = evaluate_safety_state(
+            self.runbook, RunbookSafetyState(blackout_name="freeze"), self.now
+        )
+        assert not allowed
+        assert reason == "Blackout window active: freeze"
+
+    def test_auto_only_blackout_spares_runbooks_awaiting_approval(self):
+        state = RunbookSafetyState(auto_only_blackout_name="change freeze")
+        needs_approval = SimpleNamespace(
+            max_executions_per_hour=None, cooldown_minutes=None, auto_execute=True, approval_required=True
+        )
+
+        assert evaluate_safety_state(needs_approval, state, self.now) == (True, None)
+        assert evaluate_safety_state(self.runbook, state, self.now) == (
+            False, "Blackout window active: change freeze"
+        )
+
+    def test_rate_limit_blocks(self):
+        allowed, reason = evaluate_safety_state(
+            self.runbook, RunbookSafetyState(recent_executions=5), self.now
+        )
+        assert not allowed
+        assert "5/5" in reason
+
+    def test_cooldown_blocks_until_elapsed(self):
+        recent = RunbookSafetyState(last_queued_at=self.now - timedelta(minutes=3))
+        old = RunbookSafetyState(last_queued_at=self.now - timedelta(minutes=30))
+
+        assert evaluate_safety_state(self.runbook, recent, self.now)[0] is False
+        assert evaluate_safety_state(self.runbook, old, self.now) == (True, None)
@@ -0,0 +1,31 @@
+"""
+Unit tests for vector search tuning.
+"""
+from unittest.mock import MagicMock
+
+from app.services.vector_search import candidate_count, tune_vector_search
+
+
+def executed_sql(db):
+    return [str(call.args[0]) for call in db.execute.call_args_list]
+
+
+def test_filtered_queries_overfetch():
+    assert candidate_count(10) == 10
+    assert candidate_count(10, filtered=True) > 10
+
+
+def test_ef_search_covers_candidates():
+    db = MagicMock()
+
+    tune_vector_search(db, candidates=120, ef_search=40, probes=5)
+
+    assert executed_sql(db) == ["SET LOCAL hnsw.ef_search = 120", "SET LOCAL ivfflat.probes = 5"]
+
+
+def test_ef_search_is_capped():
+    db = MagicMock()
+
+    tune_vector_search(db, candidates=5000)
+
+    assert executed_sql(db)[0] == "SET LOCAL hnsw.ef_search = 1000"
@@ -0,0 +1,148 @@
+"""
+Unit tests for the WinRM shell runtime.
+"""
+import asyncio
+import threading
+import time
+import pytest
+from types import SimpleNamespace
+
+from winrm.exceptions import WinRMOperationTimeoutError
+
+from app.services.executor_base import ErrorType
+from app.services.executor_winrm import WinRMExecutor
+from app.services.winrm_session import WinRMShell, WinRMThreadPool, clean_powershell_error
+
+
+class FakeProtocol:
+    """Records WS-Man calls; commands containing 'hang' never finish."""
+
+    def __init__(self):
+        self.shells_opened = 0
+        self.shells_closed = 0
+        self.cleaned_up = []
+        self.threads = set()
+        self._ids = 0
+
+    def open_shell(self):
+        self.shells_opened += 1
+        return f"shell-{self.shells_opened}"
+
+    def close_shell(self, shell_id):
+        self.shells_closed += 1
+
+    def run_command(self, shell_id, command, args=()):
+        self._ids += 1
+        self.threads.add(threading.current_thread().name)
+        return (f"cmd-{self._ids}", command)
+
+    def get_command_output_raw(self, shell_id, command_id):
+        _, command = command_id
+        time.sleep(0.01)
+        if "hang" in command:
+            raise WinRMOperationTimeoutError()
+        return b"OK\r\n", b"", 0, True
+
+    def cleanup_command(self, shell_id, command_id):
+        self.cleaned_up.append(command_id[1])
+
+
+def make_shell(pool=None):
+    shell = WinRMShell("http://win-01:5985/wsman", "admin", "secret", pool=pool or WinRMThreadPool(2))
+    protocol = FakeProtocol()
+    shell._session = SimpleNamespace(protocol=protocol)
+    return shell, protocol
+
+
+@pytest.mark.asyncio
+class TestWinRMShell:
+    """Test shell reuse, cancellation and the dedicated pool."""
+
+    async def test_reuses_one_shell(self):
+        shell, protocol = make_shell()
+
+        for _ in range(3):
+            stdout, _, code = await shell.run("echo OK", timeout=5)
+            assert (stdout, code) == (b"OK\r\n", 0)
+
+        assert protocol.shells_opened == 1
+        await shell.close()
+        assert protocol.shells_closed == 1
+
+    async def test_timeout_terminates_remote_command(self):
+        shell, protocol = make_shell()
+
+        with pytest.raises(asyncio.TimeoutError):
+            await shell.run("hang", timeout=0.05)
+
+        # The next command waits for the cancelled one to be cleaned up
+        stdout, _, _ = await shell.run("echo OK", timeout=5)
+
+        assert protocol.cleaned_up[0] == "hang"
+        assert stdout == b"OK\r\n"
+        assert protocol.shells_opened == 1
+
+    async def test_close_deferred_while_command_in_flight(self):
+        shell, protocol = make_shell()
+        with pytest.raises(asyncio.TimeoutError):
+            await shell.run("hang", timeout=0.05)
+
+        await shell.close()
+        for _ in range(50):
+            if protocol.shells_closed:
+                break
+            await asyncio.sleep(0.01)
+
+        assert protocol.cleaned_up == ["hang"]
+        assert protocol.shells_closed == 1
+
+    async def test_runs_on_dedicated_threads(self):
+        shell, protocol = make_shell(WinRMThreadPool(1))
+
+        await shell.run("echo OK", timeout=5)
+
+        assert all(name.startswith("winrm") for name in protocol.threads)
+
+    async def test_lock_released_when_submit_fails(self):
+        shell, _ = make_shell()
+        pool = shell.pool
+        shell.pool = SimpleNamespace(run=lambda *args: (_ for _ in ()).throw(RuntimeError("pool shut down")))
+
+        with pytest.raises(RuntimeError):
+            await shell.run("echo OK", timeout=5)
+
+        assert not shell._lock.locked()
+        shell.pool = pool
+        stdout, _, _ = await shell.run("echo OK", timeout=5)
+        assert stdout == b"OK\r\n"
+
+
+def test_clean_powershell_error():
+    clixml = (
+        b'#< CLIXML\r\n<Objs Version="1.1.0.1" xmlns="http://schemas.microsoft.com/powershell/2004/04">'
+        b'<S S="Error">Access is denied._x000D__x000A_</S><S S="Error">At line:1</S></Objs>'
+    )
+
+    assert clean_powershell_error(clixml) == b"Access is denied.\nAt line:1"
+    assert clean_powershell_error(b"plain error") == b"plain error"
+    assert clean_powershell_error(b"#< CLIXML\r\n<broken") == b"#< CLIXML\r\n<broken"
+
+
+@pytest.mark.asyncio
+class TestWinRMExecutor:
+    """Test the executor on top of the shell."""
+
+    async def test_timeout_result(self):
+        executor = WinRMExecutor("win-01", 5985, "admin", password="secret")
+        executor._shell, protocol = make_shell()
+
+        result = await executor.execute("cmd /c hang", timeout=0.05)
+
+        assert not result.success
+        assert result.error_type == ErrorType.TIMEOUT
+        await executor.disconnect()
+        for _ in range(50):
+            if protocol.shells_closed:
+                break
+            await asyncio.sleep(0.01)
+        assert protocol.cleaned_up == ["cmd /c hang"]